@@ -20,6 +20,8 @@ bl_info = {
 from . import properties
 from . import operators
 from . import ui
+from .utils.threading_utils import task_manager
+from .utils import task_events
 
 # Module list for registration
 MODULES = [
@@ -37,6 +39,10 @@ def unregister():
     """Unregister all addon components."""
     for module in reversed(MODULES):
         module.unregister()
+    
+    # Stop queued background work and release the worker pools
+    task_events.shutdown()
+    task_manager.shutdown()
 
 if __name__ == "__main__":
     register()
\ No newline at end of file
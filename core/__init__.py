@@ -5,20 +5,46 @@ This module provides the core functionality without Blender registration.
 """
 from . import delta_anim
 from . import qc_builder
+from . import qc_batch
 from . import collision
+from . import collision_shapes
+from . import convex_decomposition
 from . import sequences
 from . import vtf_conversion
 from . import smd_export
+from . import smd_writer
+from . import anim_bake
 from . import studiomdl
+from . import qc_dependencies
+from . import compile_queue
 from . import material_vtf
+from . import vtfcmd_batch
+from . import dxt_compression
+from . import image_resize
+from . import build_cache
+from . import vtf_writer
+from . import vtf_reader
 
 __all__ = [
     'delta_anim',
     'qc_builder',
+    'qc_batch',
     'collision',
+    'collision_shapes',
+    'convex_decomposition',
     'sequences',
     'vtf_conversion',
     'smd_export',
+    'smd_writer',
+    'anim_bake',
     'studiomdl',
+    'qc_dependencies',
+    'compile_queue',
     'material_vtf',
+    'vtfcmd_batch',
+    'dxt_compression',
+    'image_resize',
+    'build_cache',
+    'vtf_writer',
+    'vtf_reader',
 ]
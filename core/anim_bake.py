@@ -0,0 +1,479 @@
+"""
+Vectorized animation baking.
+
+Evaluates an action's F-curves for every frame at once and turns the
+resulting pose channels into SMD bone transforms with NumPy, instead of
+stepping the scene with frame_set and reading pose matrices frame by
+frame.
+
+This covers the usual case of keyframed location/rotation/scale channels
+on bones that fully inherit their parent's transform. core/smd_export.py
+snapshots the Blender data into the structures below and falls back to
+frame-by-frame evaluation for rigs with constraints or drivers.
+
+This module has no Blender dependency, so snapshots can be baked in
+worker threads or processes.
+"""
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .smd_writer import matrices_to_smd_transforms, to_parent_space, write_animation_smd
+
+
+INTERPOLATION_CONSTANT = 0
+INTERPOLATION_LINEAR = 1
+INTERPOLATION_BEZIER = 2
+
+INTERPOLATION_CODES = {
+    'CONSTANT': INTERPOLATION_CONSTANT,
+    'LINEAR': INTERPOLATION_LINEAR,
+    'BEZIER': INTERPOLATION_BEZIER,
+}
+
+# Pose bone channels and their sizes
+POSE_CHANNELS = {
+    'location': 3,
+    'rotation_quaternion': 4,
+    'rotation_euler': 3,
+    'rotation_axis_angle': 4,
+    'scale': 3,
+}
+
+# Bezier segments are solved for their curve parameter by bisection, then
+# refined with Newton's method
+_BISECTION_STEPS = 12
+_NEWTON_STEPS = 3
+
+
+@dataclass
+class FCurveData:
+    """
+    Keyframe data of one F-curve.
+
+    Attributes:
+        keyframes: float array (K, 2) of keyframe (frame, value) points
+        handles_left: float array (K, 2) of left handles
+        handles_right: float array (K, 2) of right handles
+        interpolation: int array (K,) of INTERPOLATION_* codes, each
+            applying to the segment that starts at that keyframe
+        extrapolation: 'CONSTANT' or 'LINEAR'
+        samples: Values already evaluated for every baked frame, used
+            instead of the keyframes for curves that cannot be evaluated
+            here (modifiers, easing presets, sampled curves)
+    """
+    keyframes: np.ndarray = field(default_factory=lambda: np.empty((0, 2)))
+    handles_left: np.ndarray = field(default_factory=lambda: np.empty((0, 2)))
+    handles_right: np.ndarray = field(default_factory=lambda: np.empty((0, 2)))
+    interpolation: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int64))
+    extrapolation: str = 'CONSTANT'
+    samples: Optional[np.ndarray] = None
+
+
+@dataclass
+class SkeletonData:
+    """
+    Bone hierarchy and current pose values of an armature.
+
+    Attributes:
+        names: Bone names in SMD node order (parents first)
+        parents: Parent index of each bone (-1 for root bones)
+        rest_matrices: float array (B, 4, 4) of armature-space rest matrices
+        rotation_modes: Pose bone rotation mode of each bone
+        defaults: Current value of each pose channel, as (B, n) arrays
+            keyed by channel name; used for channels the action does
+            not animate
+        connected: bool array (B,) of bones connected to their parent,
+            whose location channels have no effect
+    """
+    names: List[str]
+    parents: List[int]
+    rest_matrices: np.ndarray
+    rotation_modes: List[str]
+    defaults: Dict[str, np.ndarray]
+    connected: Optional[np.ndarray] = None
+
+    @property
+    def nodes(self) -> List[Tuple[str, int]]:
+        return list(zip(self.names, self.parents))
+
+
+@dataclass
+class ActionData:
+    """
+    F-curves of one action.
+
+    Attributes:
+        name: Action name
+        frame_start: First baked frame
+        frame_end: Last baked frame (inclusive)
+        channels: Mapping of (bone name, channel name, array index) to
+            the channel's FCurveData
+    """
+    name: str
+    frame_start: int
+    frame_end: int
+    channels: Dict[Tuple[str, str, int], FCurveData] = field(default_factory=dict)
+
+    @property
+    def frames(self) -> np.ndarray:
+        return np.arange(self.frame_start, self.frame_end + 1, dtype=np.float64)
+
+
+# ============================================================================
+# F-Curve Evaluation
+# ============================================================================
+
+def _correct_bezier_handles(p0, p1, p2, p3) -> tuple:
+    """Shorten handles that overlap in time, as Blender does before evaluating."""
+    length = p3[:, 0] - p0[:, 0]
+    left = np.abs(p0[:, 0] - p1[:, 0])
+    right = np.abs(p3[:, 0] - p2[:, 0])
+    total = left + right
+
+    scale = np.where(total > length, length / np.where(total > 0, total, 1.0), 1.0)[:, None]
+    return p0 - scale * (p0 - p1), p3 - scale * (p3 - p2)
+
+
+def _cubic_coefficients(p0, p1, p2, p3) -> tuple:
+    """Get the power-basis coefficients (a, b, c, d) of a cubic Bezier."""
+    return p3 - p0 + 3.0 * (p1 - p2), 3.0 * (p0 - 2.0 * p1 + p2), 3.0 * (p1 - p0), p0
+
+
+def _evaluate_bezier(p0, p1, p2, p3, frames) -> np.ndarray:
+    """Evaluate cubic Bezier segments, one per frame, at the given frames."""
+    p1, p2 = _correct_bezier_handles(p0, p1, p2, p3)
+    a, b, c, d = _cubic_coefficients(p0[:, 0], p1[:, 0], p2[:, 0], p3[:, 0])
+
+    # x(t) is monotonic after handle correction: bracket t by bisection,
+    # then polish it with a few Newton steps kept inside the bracket
+    low = np.zeros(len(frames))
+    high = np.ones(len(frames))
+    for _ in range(_BISECTION_STEPS):
+        t = 0.5 * (low + high)
+        below = ((a * t + b) * t + c) * t + d < frames
+        low = np.where(below, t, low)
+        high = np.where(below, high, t)
+
+    t = 0.5 * (low + high)
+    for _ in range(_NEWTON_STEPS):
+        error = ((a * t + b) * t + c) * t + d - frames
+        slope = (3.0 * a * t + 2.0 * b) * t + c
+        step = np.divide(error, slope, out=np.zeros_like(error), where=np.abs(slope) > 1e-12)
+        t = np.clip(t - step, low, high)
+
+    a, b, c, d = _cubic_coefficients(p0[:, 1], p1[:, 1], p2[:, 1], p3[:, 1])
+    return ((a * t + b) * t + c) * t + d
+
+
+def _extrapolation_slope(curve: FCurveData, end: int) -> float:
+    """
+    Get the slope used for linear extrapolation past the first (end=0) or
+    last (end=-1) keyframe, which depends on that keyframe's interpolation.
+    """
+    keys = curve.keyframes
+    mode = curve.interpolation[end]
+    if mode == INTERPOLATION_CONSTANT:
+        return 0.0
+
+    if mode == INTERPOLATION_BEZIER:
+        a, b = (curve.handles_left[0], keys[0]) if end == 0 else (keys[-1], curve.handles_right[-1])
+    else:
+        a, b = (keys[0], keys[1]) if end == 0 else (keys[-2], keys[-1])
+
+    dx = b[0] - a[0]
+    return (b[1] - a[1]) / dx if dx != 0 else 0.0
+
+
+def _evaluate_keyed_curves(curves: List[FCurveData], frames: np.ndarray) -> np.ndarray:
+    """
+    Evaluate curves with two or more keyframes, all in one vectorized pass.
+
+    The keyframes of all curves are concatenated and each curve's frames
+    are offset into its own disjoint range, so a single searchsorted
+    finds the segment of every (curve, frame) pair.
+
+    Returns:
+        float64 array of shape (C, F)
+    """
+    keys = [np.asarray(curve.keyframes, dtype=np.float64) for curve in curves]
+    counts = np.array([len(k) for k in keys])
+    starts = np.zeros(len(keys), dtype=np.int64)
+    np.cumsum(counts[:-1], out=starts[1:])
+
+    all_keys = np.concatenate(keys)
+    handles_left = np.concatenate([np.asarray(c.handles_left, dtype=np.float64) for c in curves])
+    handles_right = np.concatenate([np.asarray(c.handles_right, dtype=np.float64) for c in curves])
+    interpolation = np.concatenate([np.asarray(c.interpolation) for c in curves])
+
+    # Shift every curve into its own frame window
+    low = min(all_keys[:, 0].min(), frames.min())
+    width = max(all_keys[:, 0].max(), frames.max()) - low + 1.0
+    curve_ids = np.repeat(np.arange(len(keys)), counts)
+    shifted_keys = all_keys[:, 0] - low + curve_ids * width
+    shifted_frames = (frames[None, :] - low + np.arange(len(keys))[:, None] * width).ravel()
+
+    # Segment of each (curve, frame), clamped to the curve's keyed range
+    first = np.repeat(starts, len(frames))
+    last = np.repeat(starts + counts - 2, len(frames))
+    segment = np.clip(np.searchsorted(shifted_keys, shifted_frames, side='right') - 1, first, last)
+
+    flat_frames = np.tile(frames, len(keys))
+    start, end = all_keys[segment], all_keys[segment + 1]
+    mode = interpolation[segment]
+    values = np.empty(len(flat_frames))
+
+    constant = mode == INTERPOLATION_CONSTANT
+    values[constant] = start[constant, 1]
+
+    linear = mode == INTERPOLATION_LINEAR
+    span = np.where(end[:, 0] > start[:, 0], end[:, 0] - start[:, 0], 1.0)
+    values[linear] = (start[:, 1] + (flat_frames - start[:, 0]) / span * (end[:, 1] - start[:, 1]))[linear]
+
+    bezier = mode == INTERPOLATION_BEZIER
+    if bezier.any():
+        segments = segment[bezier]
+        values[bezier] = _evaluate_bezier(
+            all_keys[segments], handles_right[segments],
+            handles_left[segments + 1], all_keys[segments + 1],
+            flat_frames[bezier],
+        )
+
+    values = values.reshape(len(keys), len(frames))
+
+    # Hold or extrapolate outside each curve's keyed range
+    for i, curve in enumerate(curves):
+        first_key, last_key = keys[i][0], keys[i][-1]
+        before = frames < first_key[0]
+        after = frames >= last_key[0]
+        slope_before = slope_after = 0.0
+        if curve.extrapolation == 'LINEAR':
+            slope_before = _extrapolation_slope(curve, 0)
+            slope_after = _extrapolation_slope(curve, -1)
+        values[i, before] = first_key[1] + (frames[before] - first_key[0]) * slope_before
+        values[i, after] = last_key[1] + (frames[after] - last_key[0]) * slope_after
+
+    return values
+
+
+def evaluate_fcurves(curves: List[FCurveData], frames: np.ndarray) -> np.ndarray:
+    """
+    Evaluate many F-curves at many frames at once.
+
+    Args:
+        curves: Keyframe data of each curve
+        frames: float array of frames
+
+    Returns:
+        float64 array of shape (C, F)
+    """
+    frames = np.asarray(frames, dtype=np.float64)
+    values = np.zeros((len(curves), len(frames)))
+
+    keyed = []
+    for i, curve in enumerate(curves):
+        if curve.samples is not None:
+            values[i] = curve.samples
+        elif len(curve.keyframes) == 1:
+            values[i] = curve.keyframes[0][1]
+        elif len(curve.keyframes) > 1:
+            keyed.append(i)
+
+    if keyed and len(frames):
+        values[keyed] = _evaluate_keyed_curves([curves[i] for i in keyed], frames)
+    return values
+
+
+def evaluate_fcurve(curve: FCurveData, frames: np.ndarray) -> np.ndarray:
+    """
+    Evaluate one F-curve at many frames.
+
+    Args:
+        curve: The curve's keyframe data
+        frames: float array of frames
+
+    Returns:
+        float64 array of values, one per frame
+    """
+    return evaluate_fcurves([curve], frames)[0]
+
+
+# ============================================================================
+# Rotation Matrices
+# ============================================================================
+
+def quaternion_matrices(quaternions: np.ndarray) -> np.ndarray:
+    """Convert (..., 4) w, x, y, z quaternions to (..., 3, 3) rotation matrices."""
+    q = np.asarray(quaternions, dtype=np.float64)
+    length = np.linalg.norm(q, axis=-1, keepdims=True)
+    identity = np.array([1.0, 0.0, 0.0, 0.0])
+    q = np.where(length > 0, q / np.where(length > 0, length, 1.0), identity)
+    w, x, y, z = np.moveaxis(q, -1, 0)
+
+    return np.stack([
+        np.stack([1 - 2 * (y * y + z * z), 2 * (x * y - w * z), 2 * (x * z + w * y)], axis=-1),
+        np.stack([2 * (x * y + w * z), 1 - 2 * (x * x + z * z), 2 * (y * z - w * x)], axis=-1),
+        np.stack([2 * (x * z - w * y), 2 * (y * z + w * x), 1 - 2 * (x * x + y * y)], axis=-1),
+    ], axis=-2)
+
+
+def axis_angle_matrices(axis_angles: np.ndarray) -> np.ndarray:
+    """Convert (..., 4) angle, x, y, z axis-angle rotations to rotation matrices."""
+    axis_angles = np.asarray(axis_angles, dtype=np.float64)
+    half = 0.5 * axis_angles[..., 0:1]
+    axis = axis_angles[..., 1:]
+    length = np.linalg.norm(axis, axis=-1, keepdims=True)
+    axis = np.where(length > 0, axis / np.where(length > 0, length, 1.0), 0.0)
+    return quaternion_matrices(np.concatenate([np.cos(half), np.sin(half) * axis], axis=-1))
+
+
+def euler_matrices(eulers: np.ndarray, order: str = 'XYZ') -> np.ndarray:
+    """Convert (..., 3) Euler angles to rotation matrices, applying axes in order."""
+    eulers = np.asarray(eulers, dtype=np.float64)
+    cos, sin = np.cos(eulers), np.sin(eulers)
+    zero, one = np.zeros(eulers.shape[:-1]), np.ones(eulers.shape[:-1])
+
+    def axis_matrix(axis):
+        c, s = cos[..., axis], sin[..., axis]
+        rows = {
+            0: [[one, zero, zero], [zero, c, -s], [zero, s, c]],
+            1: [[c, zero, s], [zero, one, zero], [-s, zero, c]],
+            2: [[c, -s, zero], [s, c, zero], [zero, zero, one]],
+        }[axis]
+        return np.stack([np.stack(row, axis=-1) for row in rows], axis=-2)
+
+    result = None
+    for letter in order:
+        matrix = axis_matrix('XYZ'.index(letter))
+        result = matrix if result is None else matrix @ result
+    return result
+
+
+def _rotation_matrices(skeleton: SkeletonData, values: Dict[str, np.ndarray]) -> np.ndarray:
+    """Build the (F, B, 3, 3) rotation of every bone from its rotation mode."""
+    modes = np.array(skeleton.rotation_modes)
+    frame_count = values['location'].shape[0]
+    rotations = np.empty((frame_count, len(modes), 3, 3))
+
+    quaternion = modes == 'QUATERNION'
+    rotations[:, quaternion] = quaternion_matrices(values['rotation_quaternion'][:, quaternion])
+
+    axis_angle = modes == 'AXIS_ANGLE'
+    rotations[:, axis_angle] = axis_angle_matrices(values['rotation_axis_angle'][:, axis_angle])
+
+    for order in set(modes[~(quaternion | axis_angle)]):
+        bones = modes == order
+        rotations[:, bones] = euler_matrices(values['rotation_euler'][:, bones], order)
+
+    return rotations
+
+
+# ============================================================================
+# Baking
+# ============================================================================
+
+def evaluate_pose_channels(skeleton: SkeletonData, action: ActionData) -> Dict[str, np.ndarray]:
+    """
+    Evaluate every pose channel of every bone for all frames of an action.
+
+    Args:
+        skeleton: Bone hierarchy and default channel values
+        action: The action's F-curves
+
+    Returns:
+        dict: (F, B, n) value arrays keyed by channel name
+    """
+    frames = action.frames
+    bone_indices = {name: i for i, name in enumerate(skeleton.names)}
+
+    values = {
+        channel: np.repeat(np.asarray(skeleton.defaults[channel], dtype=np.float64)[None], len(frames), axis=0)
+        for channel in POSE_CHANNELS
+    }
+
+    targets = []
+    curves = []
+    for (bone_name, channel, index), curve in action.channels.items():
+        bone = bone_indices.get(bone_name)
+        if bone is None or channel not in values or index >= POSE_CHANNELS[channel]:
+            continue
+        targets.append((channel, bone, index))
+        curves.append(curve)
+
+    for (channel, bone, index), curve_values in zip(targets, evaluate_fcurves(curves, frames)):
+        values[channel][:, bone, index] = curve_values
+
+    return values
+
+
+def bake_pose_matrices(skeleton: SkeletonData, action: ActionData) -> np.ndarray:
+    """
+    Compute every bone's parent-space matrix for all frames of an action.
+
+    With full inheritance a pose bone's matrix relative to its posed
+    parent is its rest offset from the parent times its local pose
+    (location @ rotation @ scale), so no hierarchy walk is needed.
+
+    Returns:
+        float64 array of shape (F, B, 4, 4)
+    """
+    values = evaluate_pose_channels(skeleton, action)
+    frame_count, bone_count = values['location'].shape[:2]
+    if skeleton.connected is not None:
+        values['location'][:, np.asarray(skeleton.connected, dtype=bool)] = 0.0
+
+    basis = np.zeros((frame_count, bone_count, 4, 4))
+    basis[..., :3, :3] = _rotation_matrices(skeleton, values) * values['scale'][..., None, :]
+    basis[..., :3, 3] = values['location']
+    basis[..., 3, 3] = 1.0
+
+    rest = to_parent_space(skeleton.rest_matrices, skeleton.parents)
+    return rest[None] @ basis
+
+
+def bake_action_transforms(skeleton: SkeletonData, action: ActionData) -> np.ndarray:
+    """
+    Bake an action into SMD bone transforms.
+
+    Args:
+        skeleton: Bone hierarchy and default channel values
+        action: The action's F-curves
+
+    Returns:
+        float64 array of shape (F, B, 6)
+    """
+    return matrices_to_smd_transforms(bake_pose_matrices(skeleton, action))
+
+
+def encode_animation_job(job: dict) -> dict:
+    """
+    Bake (if needed) and write one animation SMD.
+
+    Runs in worker threads or processes: the job only holds snapshots.
+
+    Args:
+        job: dict with 'name', 'filepath' and 'nodes', plus either
+            'frames' (already baked transforms) or 'skeleton' and
+            'action' (SkeletonData and ActionData to bake)
+
+    Returns:
+        dict with 'name', 'filepath', 'frame_count', and 'bake_time' and
+        'write_time' in seconds
+    """
+    start = time.perf_counter()
+    frames = job.get('frames')
+    if frames is None:
+        frames = bake_action_transforms(job['skeleton'], job['action'])
+
+    baked = time.perf_counter()
+    write_animation_smd(job['filepath'], job['nodes'], frames)
+
+    return {
+        'name': job['name'],
+        'filepath': job['filepath'],
+        'frame_count': len(frames),
+        'bake_time': baked - start,
+        'write_time': time.perf_counter() - baked,
+    }
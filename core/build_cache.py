@@ -0,0 +1,258 @@
+"""
+Content-hash build cache for incremental conversions.
+
+A manifest file next to the outputs records, for every output file, the
+hash of the source it was built from and the hash of the settings used.
+An output is up to date when both hashes match and the output file is
+still the one that was written (same size and modification time).
+
+Source hashes are memoized by file size and modification time, so
+unchanged files are only re-read when their timestamps change (e.g. after
+a fresh checkout); identical content is still recognized then.
+"""
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+
+MANIFEST_NAME = ".von_build_cache.json"
+MANIFEST_VERSION = 1
+
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+# ============================================================================
+# Hashing
+# ============================================================================
+
+def hash_bytes(data: Union[bytes, bytearray, memoryview]) -> str:
+    """
+    Hash a block of data.
+
+    Args:
+        data: Bytes-like object
+
+    Returns:
+        str: Hex digest
+    """
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def hash_file(path: Union[str, Path]) -> str:
+    """
+    Hash a file's contents.
+
+    Args:
+        path: File path
+
+    Returns:
+        str: Hex digest
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_settings(settings: Dict[str, Any]) -> str:
+    """
+    Hash a dictionary of conversion settings.
+
+    Args:
+        settings: JSON-serializable settings
+
+    Returns:
+        str: Hex digest, independent of key order
+    """
+    encoded = json.dumps(settings, sort_keys=True, default=str)
+    return hash_bytes(encoded.encode("utf-8"))
+
+
+def _normalize_path(path: Union[str, Path]) -> str:
+    """Get the manifest key for a file path."""
+    return os.path.normcase(os.path.abspath(str(path)))
+
+
+# ============================================================================
+# Build Cache
+# ============================================================================
+
+class BuildCache:
+    """
+    Persistent record of which outputs are up to date.
+
+    Safe to use from several worker threads; call save() once the build
+    is finished.
+    """
+
+    def __init__(self, manifest_path: Union[str, Path]):
+        """
+        Args:
+            manifest_path: Path of the JSON manifest file
+        """
+        self.manifest_path = Path(manifest_path)
+        self._lock = threading.Lock()
+        self._sources: Dict[str, Dict[str, Any]] = {}
+        self._outputs: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+        self.load()
+
+    @classmethod
+    def for_folder(cls, folder: Union[str, Path]) -> "BuildCache":
+        """Get the cache whose manifest lives in an output folder."""
+        return cls(Path(folder) / MANIFEST_NAME)
+
+    def load(self) -> None:
+        """Load the manifest, starting empty if it is missing or unreadable."""
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+
+        if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+            data = {}
+
+        with self._lock:
+            self._sources = data.get("sources", {})
+            self._outputs = data.get("outputs", {})
+            self._dirty = False
+
+    def save(self) -> None:
+        """Write the manifest if anything changed."""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {
+                "version": MANIFEST_VERSION,
+                "sources": self._sources,
+                "outputs": self._outputs,
+            }
+            self._dirty = False
+
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.manifest_path.with_suffix(".tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=1, sort_keys=True)
+        os.replace(temp_path, self.manifest_path)
+
+    def hash_source(self, source_path: Union[str, Path]) -> str:
+        """
+        Get the content hash of a source file.
+
+        The file is only read if its size or modification time differs
+        from the last time it was hashed.
+
+        Args:
+            source_path: Source file path
+
+        Returns:
+            str: Hex digest
+
+        Raises:
+            OSError: If the file cannot be read
+        """
+        key = _normalize_path(source_path)
+        stat = os.stat(source_path)
+
+        with self._lock:
+            known = self._sources.get(key)
+        if known and known["size"] == stat.st_size and known["mtime_ns"] == stat.st_mtime_ns:
+            return known["hash"]
+
+        digest = hash_file(source_path)
+        with self._lock:
+            self._sources[key] = {
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "hash": digest,
+            }
+            self._dirty = True
+        return digest
+
+    def is_up_to_date(
+        self,
+        output_path: Union[str, Path],
+        source_hash: str,
+        settings_hash: str
+    ) -> bool:
+        """
+        Check whether an output was built from this source and settings.
+
+        Args:
+            output_path: Output file path
+            source_hash: Current hash of the source data
+            settings_hash: Current hash of the conversion settings
+
+        Returns:
+            bool: True if the output can be reused
+        """
+        with self._lock:
+            entry = self._outputs.get(_normalize_path(output_path))
+        if not entry:
+            return False
+        if entry["source_hash"] != source_hash or entry["settings_hash"] != settings_hash:
+            return False
+
+        # Outputs deleted or edited since they were built are stale
+        try:
+            stat = os.stat(output_path)
+        except OSError:
+            return False
+        return stat.st_size == entry["size"] and stat.st_mtime_ns == entry["mtime_ns"]
+
+    def record(
+        self,
+        output_path: Union[str, Path],
+        source_hash: str,
+        settings_hash: str,
+        source_path: Optional[Union[str, Path]] = None
+    ) -> None:
+        """
+        Record a freshly built output.
+
+        Args:
+            output_path: Output file path (must exist)
+            source_hash: Hash of the source data it was built from
+            settings_hash: Hash of the conversion settings
+            source_path: Source file path, if the source is a file
+        """
+        stat = os.stat(output_path)
+        entry = {
+            "source": _normalize_path(source_path) if source_path else None,
+            "source_hash": source_hash,
+            "settings_hash": settings_hash,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+        }
+        with self._lock:
+            self._outputs[_normalize_path(output_path)] = entry
+            self._dirty = True
+
+    def forget(self, output_path: Union[str, Path]) -> None:
+        """Drop the record of an output so it is rebuilt next time."""
+        with self._lock:
+            if self._outputs.pop(_normalize_path(output_path), None) is not None:
+                self._dirty = True
+
+    def get_stale_outputs(self, source_paths: Iterable[Union[str, Path]]) -> List[str]:
+        """
+        Find recorded outputs whose source file is no longer part of the build.
+
+        Args:
+            source_paths: Source files of the current build
+
+        Returns:
+            List of output paths that still exist on disk
+        """
+        current = {_normalize_path(path) for path in source_paths}
+        with self._lock:
+            orphaned = [
+                output for output, entry in self._outputs.items()
+                if entry.get("source") and entry["source"] not in current
+            ]
+        return sorted(output for output in orphaned if os.path.exists(output))
@@ -2,69 +2,250 @@
 Collision model generation logic.
 """
 import bpy  # type: ignore
-import bmesh  # type: ignore
+import numpy as np
 
+from .collision_shapes import (
+    BOX_FACES,
+    CollisionShape,
+    DEFAULT_MAX_HULL_VERTICES,
+    SHAPE_AABB,
+    compute_collision_shapes,
+)
+from .convex_decomposition import (
+    DEFAULT_CONCAVITY,
+    DEFAULT_MAX_HULLS,
+    decompose_mesh,
+)
 
-def get_skinned_meshes(armature) -> list:
+
+class SceneObjectIndex:
+    """
+    One-pass index of scene objects for collision generation.
+    
+    Scanning bpy.data.objects for every armature and every generated
+    shape makes collision generation quadratic in the scene size. Build
+    one index per operation instead and reuse it.
+    """
+    
+    def __init__(self, objects=None):
+        """
+        Args:
+            objects: Objects to index (defaults to bpy.data.objects)
+        """
+        self.objects = list(bpy.data.objects if objects is None else objects)
+        self._skinned_meshes = {}
+        self._prefix_cache = {}
+        
+        for obj in self.objects:
+            if obj.type != 'MESH':
+                continue
+            armatures = {
+                mod.object for mod in obj.modifiers
+                if mod.type == 'ARMATURE' and mod.object is not None
+            }
+            for armature in armatures:
+                self._skinned_meshes.setdefault(armature.name, []).append(obj)
+    
+    def get_skinned_meshes(self, armature) -> list:
+        """Get all meshes with an armature modifier targeting the armature."""
+        return list(self._skinned_meshes.get(armature.name, []))
+    
+    def get_objects_with_prefix(self, prefix: str) -> list:
+        """Get all indexed objects whose name starts with prefix."""
+        matches = self._prefix_cache.get(prefix)
+        if matches is None:
+            matches = [obj for obj in self.objects if obj.name.startswith(prefix)]
+            self._prefix_cache[prefix] = matches
+        return list(matches)
+    
+    def add(self, objects) -> None:
+        """Register newly created objects."""
+        for obj in objects:
+            self.objects.append(obj)
+            for prefix, matches in self._prefix_cache.items():
+                if obj.name.startswith(prefix):
+                    matches.append(obj)
+
+
+def get_skinned_meshes(armature, index: SceneObjectIndex = None) -> list:
     """
     Get all meshes that are skinned to an armature.
     
     Args:
         armature: The armature object
+        index: Prebuilt scene index (a new one is built if omitted)
     
     Returns:
         list: List of mesh objects controlled by the armature
     """
-    controlled_meshes = []
+    if index is None:
+        index = SceneObjectIndex()
+    return index.get_skinned_meshes(armature)
+
+
+def read_world_coordinates(obj) -> np.ndarray:
+    """
+    Read all vertex coordinates of a mesh object in world space.
+    
+    Args:
+        obj: The mesh object
     
-    for obj in bpy.data.objects:
-        if obj.type == 'MESH':
-            for mod in obj.modifiers:
-                if mod.type == 'ARMATURE' and mod.object == armature:
-                    controlled_meshes.append(obj)
-                    break
+    Returns:
+        float64 array of shape (vertex_count, 3)
+    """
+    vertices = obj.data.vertices
+    coords = np.empty(len(vertices) * 3, dtype=np.float32)
+    vertices.foreach_get("co", coords)
+    coords = coords.reshape(-1, 3).astype(np.float64)
     
-    return controlled_meshes
+    matrix = np.array(obj.matrix_world, dtype=np.float64)
+    return coords @ matrix[:3, :3].T + matrix[:3, 3]
 
 
-def get_vertices_by_highest_weight(obj) -> dict:
+def read_world_triangles(objects: list) -> tuple:
     """
-    Get all vertices grouped by their highest-weighted vertex group.
+    Read the triangulated geometry of mesh objects in world space.
+    
+    Args:
+        objects: Mesh objects to combine
+    
+    Returns:
+        tuple: (vertices, triangles) arrays of shape (V, 3) and (T, 3)
+    """
+    vertex_chunks = []
+    triangle_chunks = []
+    vertex_offset = 0
+    
+    for obj in objects:
+        mesh = obj.data
+        mesh.calc_loop_triangles()
+        triangles = np.empty(len(mesh.loop_triangles) * 3, dtype=np.int32)
+        mesh.loop_triangles.foreach_get("vertices", triangles)
+        
+        vertex_chunks.append(read_world_coordinates(obj))
+        triangle_chunks.append(triangles.reshape(-1, 3).astype(np.int64) + vertex_offset)
+        vertex_offset += len(mesh.vertices)
+    
+    if not vertex_chunks:
+        return np.empty((0, 3)), np.empty((0, 3), dtype=np.int64)
+    return np.concatenate(vertex_chunks), np.concatenate(triangle_chunks)
+
+
+def read_vertex_weights(mesh_data) -> tuple:
+    """
+    Read the vertex group weights of a mesh as flat arrays.
+    
+    Vertex group assignments have no bulk accessor, so this is the only
+    per-vertex loop. It only copies group indices and weights; all other
+    work happens on the returned arrays.
+    
+    Args:
+        mesh_data: The mesh data block
+    
+    Returns:
+        Tuple of (counts, groups, weights). counts is an int array with
+        the number of groups of each vertex; groups and weights hold the
+        group indices and weights of all vertices, concatenated in
+        vertex order.
+    """
+    counts = []
+    groups = []
+    weights = []
+    
+    for vertex in mesh_data.vertices:
+        elements = vertex.groups
+        counts.append(len(elements))
+        for element in elements:
+            groups.append(element.group)
+            weights.append(element.weight)
+    
+    return (
+        np.array(counts, dtype=np.int64),
+        np.array(groups, dtype=np.int64),
+        np.array(weights, dtype=np.float32),
+    )
+
+
+def get_highest_weight_groups(counts: np.ndarray, groups: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """
+    Find the highest-weighted group of every vertex.
+    
+    Ties go to the group listed first, like max() over vertex.groups.
+    
+    Args:
+        counts: Number of groups per vertex (see read_vertex_weights)
+        groups: Concatenated group indices
+        weights: Concatenated weights
+    
+    Returns:
+        int array of shape (vertex_count,) with the group index of each
+        vertex, -1 for vertices without groups
+    """
+    highest = np.full(len(counts), -1, dtype=np.int64)
+    if not len(groups):
+        return highest
+    
+    owners = np.repeat(np.arange(len(counts)), counts)
+    
+    # Sort by vertex, then by descending weight (stable, so ties keep order)
+    order = np.lexsort((-weights, owners))
+    sorted_owners = owners[order]
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = sorted_owners[1:] != sorted_owners[:-1]
+    
+    highest[sorted_owners[first]] = groups[order[first]]
+    return highest
+
+
+def get_vertex_indices_by_highest_weight(obj) -> tuple:
+    """
+    Get the vertex indices of each vertex group, by highest weight.
     
     Args:
         obj: The mesh object
     
     Returns:
-        dict: Dictionary mapping vertex group names to lists of world-space coordinates
+        Tuple of (world_coords, group_indices). world_coords is a float64
+        array of shape (vertex_count, 3); group_indices maps each vertex
+        group name to an int array of the vertex indices whose
+        highest-weighted group it is.
     """
-    mesh_data = obj.data
-    vertex_groups = obj.vertex_groups
-    vgroups = {}
+    world_coords = read_world_coordinates(obj)
+    highest = get_highest_weight_groups(*read_vertex_weights(obj.data))
     
-    index_to_name = {vg.index: vg.name for vg in vertex_groups}
+    group_indices = {}
+    for vg in obj.vertex_groups:
+        group_indices[vg.name] = np.flatnonzero(highest == vg.index)
     
-    for vg in vertex_groups:
-        vgroups[vg.name] = []
+    return world_coords, group_indices
+
+
+def get_vertices_by_highest_weight(obj) -> dict:
+    """
+    Get all vertices grouped by their highest-weighted vertex group.
     
-    for v in mesh_data.vertices:
-        if not v.groups:
-            continue
-        
-        highest_influence = max(v.groups, key=lambda g: g.weight)
-        group_name = index_to_name[highest_influence.group]
-        world_co = obj.matrix_world @ v.co.copy()
-        vgroups[group_name].append(world_co)
+    Args:
+        obj: The mesh object
     
-    return vgroups
+    Returns:
+        dict: Dictionary mapping vertex group names to float64 arrays of
+        world-space coordinates with shape (count, 3)
+    """
+    world_coords, group_indices = get_vertex_indices_by_highest_weight(obj)
+    return {
+        name: world_coords[indices]
+        for name, indices in group_indices.items()
+    }
 
 
-def generate_collision_bounds(vertex_groups_dict: dict, obj) -> dict:
+def generate_collision_bounds(vertex_groups_dict: dict, obj=None) -> dict:
     """
     Generate bounding box corners for each vertex group.
     
     Args:
         vertex_groups_dict: Dictionary from get_vertices_by_highest_weight
-        obj: The mesh object
+            (coordinates are already in world space)
+        obj: Unused, kept for backwards compatibility
     
     Returns:
         dict: Dictionary mapping vertex group names to corner positions
@@ -72,22 +253,12 @@ def generate_collision_bounds(vertex_groups_dict: dict, obj) -> dict:
     collision_bounds = {}
     
     for vgroup_name, data in vertex_groups_dict.items():
-        if not data:
+        points = np.asarray(data, dtype=np.float64).reshape(-1, 3)
+        if not len(points):
             continue
         
-        x_coords = []
-        y_coords = []
-        z_coords = []
-        
-        for v in data:
-            world_co = obj.matrix_world @ v
-            x_coords.append(world_co.x)
-            y_coords.append(world_co.y)
-            z_coords.append(world_co.z)
-        
-        min_x, max_x = min(x_coords), max(x_coords)
-        min_y, max_y = min(y_coords), max(y_coords)
-        min_z, max_z = min(z_coords), max(z_coords)
+        min_x, min_y, min_z = points.min(axis=0).tolist()
+        max_x, max_y, max_z = points.max(axis=0).tolist()
         
         corners = {
             "0_bottom_back_right": (max_x, min_y, min_z),
@@ -105,126 +276,278 @@ def generate_collision_bounds(vertex_groups_dict: dict, obj) -> dict:
     return collision_bounds
 
 
+def generate_collision_shapes(
+    vertex_groups_dict: dict,
+    shape_type: str = SHAPE_AABB,
+    max_hull_vertices: int = DEFAULT_MAX_HULL_VERTICES
+) -> dict:
+    """
+    Generate a collision shape for each vertex group.
+    
+    Args:
+        vertex_groups_dict: Dictionary from get_vertices_by_highest_weight
+        shape_type: 'AABB', 'OBB' (oriented box) or 'HULL' (convex hull)
+        max_hull_vertices: Vertex cap for convex hulls
+    
+    Returns:
+        dict: Dictionary mapping vertex group names to CollisionShape objects
+    """
+    return compute_collision_shapes(vertex_groups_dict, shape_type, max_hull_vertices)
+
+
+def generate_convex_decomposition(
+    objects: list,
+    max_hulls: int = DEFAULT_MAX_HULLS,
+    concavity: float = DEFAULT_CONCAVITY,
+    max_hull_vertices: int = DEFAULT_MAX_HULL_VERTICES,
+    executor=None
+) -> list:
+    """
+    Split the combined geometry of mesh objects into convex hulls.
+    
+    Args:
+        objects: Mesh objects forming the concave model
+        max_hulls: Maximum number of convex pieces
+        concavity: Tolerance as a fraction of the bounding box diagonal
+        max_hull_vertices: Vertex cap for each hull
+        executor: Executor used to split pieces concurrently
+            (see convex_decomposition.decompose_points)
+    
+    Returns:
+        list: CollisionShape objects in world space
+    """
+    vertices, triangles = read_world_triangles(objects)
+    return decompose_mesh(
+        vertices,
+        triangles,
+        max_hulls=max_hulls,
+        concavity=concavity,
+        max_hull_vertices=max_hull_vertices,
+        executor=executor,
+    )
+
+
+def _shape_geometry(shape) -> tuple:
+    """Get (vertices, faces) of a CollisionShape or a corners dictionary."""
+    if isinstance(shape, CollisionShape):
+        return np.asarray(shape.vertices, dtype=np.float64), shape.faces
+    return np.array([shape[key] for key in sorted(shape)], dtype=np.float64), BOX_FACES
+
+
+def build_collision_mesh(name: str, shapes: list):
+    """
+    Build one mesh data block from collision shapes in a single pass.
+    
+    All vertices, loops and polygons are written with foreach_set, so the
+    cost does not grow with the number of Python-level mesh operations.
+    
+    Args:
+        name: Name of the new mesh
+        shapes: CollisionShape objects or corners dictionaries
+    
+    Returns:
+        tuple: (mesh, vertex_ranges) where vertex_ranges holds the
+        (start, count) of each shape's vertices in the mesh
+    """
+    vertex_chunks = []
+    loop_chunks = []
+    loop_totals = []
+    vertex_ranges = []
+    vertex_offset = 0
+    
+    for shape in shapes:
+        vertices, faces = _shape_geometry(shape)
+        vertex_chunks.append(vertices)
+        for face in faces:
+            loop_chunks.append(np.asarray(face, dtype=np.int32) + vertex_offset)
+            loop_totals.append(len(face))
+        vertex_ranges.append((vertex_offset, len(vertices)))
+        vertex_offset += len(vertices)
+    
+    coords = np.concatenate(vertex_chunks).astype(np.float32)
+    loops = np.concatenate(loop_chunks)
+    loop_totals = np.array(loop_totals, dtype=np.int32)
+    loop_starts = np.zeros(len(loop_totals), dtype=np.int32)
+    np.cumsum(loop_totals[:-1], out=loop_starts[1:])
+    
+    mesh = bpy.data.meshes.new(name)
+    mesh.vertices.add(len(coords))
+    mesh.vertices.foreach_set("co", coords.ravel())
+    mesh.loops.add(len(loops))
+    mesh.loops.foreach_set("vertex_index", loops)
+    mesh.polygons.add(len(loop_totals))
+    mesh.polygons.foreach_set("loop_start", loop_starts)
+    try:
+        mesh.polygons.foreach_set("loop_total", loop_totals)
+    except (AttributeError, TypeError, RuntimeError):
+        pass  # Read-only since Blender 4.0, derived from loop_start
+    mesh.polygons.foreach_set("use_smooth", np.ones(len(loop_totals), dtype=bool))
+    
+    mesh.update(calc_edges=True)
+    mesh.validate()
+    return mesh, vertex_ranges
+
+
+def _style_collision_object(obj, wireframe: bool) -> None:
+    """Apply the collision display style to an object."""
+    if wireframe:
+        obj.display_type = 'WIRE'
+        try:
+            obj.color = (0.0, 1.0, 0.0, 0.25)
+        except Exception:
+            pass
+
+
 def create_collision_boxes(
     collision_bounds: dict,
     collection_name: str = "collisions",
     wireframe: bool = False,
-    prefix: str = "CollisionCube"
+    prefix: str = "CollisionCube",
+    merge: bool = False
 ) -> list:
     """
-    Create collision box meshes from bounding box data.
+    Create collision meshes from bounding box or collision shape data.
+    
+    Meshes are built in bulk from arrays (see build_collision_mesh).
+    With merge enabled, all shapes become one multi-part object, which is
+    what $collisionmodel expects; each part's vertices are assigned to a
+    vertex group named after its bone.
     
     Args:
-        collision_bounds: Dictionary from generate_collision_bounds
+        collision_bounds: Dictionary from generate_collision_bounds, or
+            from generate_collision_shapes
         collection_name: Name of the collection to place boxes in
         wireframe: Whether to display as wireframe
         prefix: Prefix for collision object names
+        merge: Create a single object named after the prefix instead of
+            one object per shape
     
     Returns:
         list: List of created objects
     """
+    if not collision_bounds:
+        return []
+    
     # Get or create collection
     collisions_col = bpy.data.collections.get(collection_name)
     if collisions_col is None:
         collisions_col = bpy.data.collections.new(collection_name)
         bpy.context.scene.collection.children.link(collisions_col)
     
+    if merge:
+        names = list(collision_bounds.keys())
+        mesh, vertex_ranges = build_collision_mesh(
+            f"collision_{prefix}", list(collision_bounds.values())
+        )
+        obj = bpy.data.objects.new(prefix, mesh)
+        for vgroup_name, (start, count) in zip(names, vertex_ranges):
+            vertex_group = obj.vertex_groups.new(name=vgroup_name)
+            vertex_group.add(range(start, start + count), 1.0, 'REPLACE')
+        collisions_col.objects.link(obj)
+        _style_collision_object(obj, wireframe)
+        return [obj]
+    
     created_objs = []
     
-    for vgroup_name, corners in collision_bounds.items():
-        verts_coords = [
-            corners["0_bottom_back_right"],
-            corners["1_bottom_front_right"],
-            corners["2_bottom_front_left"],
-            corners["3_bottom_back_left"],
-            corners["4_top_back_right"],
-            corners["5_top_front_right"],
-            corners["6_top_front_left"],
-            corners["7_top_back_left"],
-        ]
-        
-        face_indices = [
-            (0, 1, 2, 3),
-            (4, 5, 6, 7),
-            (0, 4, 5, 1),
-            (1, 5, 6, 2),
-            (2, 6, 7, 3),
-            (3, 7, 4, 0)
-        ]
-        
-        mesh = bpy.data.meshes.new(f"collision_cube_{vgroup_name}")
-        bm = bmesh.new()
-        bm_verts = [bm.verts.new(co) for co in verts_coords]
-        bm.verts.ensure_lookup_table()
-        
-        for fi in face_indices:
-            face = bm.faces.new([bm_verts[i] for i in fi])
-            face.smooth = True
-        
-        bm.to_mesh(mesh)
-        bm.free()
-        
+    for vgroup_name, shape in collision_bounds.items():
+        mesh, _ = build_collision_mesh(f"collision_cube_{vgroup_name}", [shape])
         obj = bpy.data.objects.new(f"{prefix}_{vgroup_name}", mesh)
         collisions_col.objects.link(obj)
-        
-        if wireframe:
-            obj.display_type = 'WIRE'
-            try:
-                obj.color = (0.0, 1.0, 0.0, 0.25)
-            except Exception:
-                pass
-        
+        _style_collision_object(obj, wireframe)
         created_objs.append(obj)
     
     return created_objs
 
 
-def parent_collision_to_bones(armature_obj, prefix: str = "CollisionCube_") -> None:
+def parent_collision_to_bones(
+    armature_obj,
+    prefix: str = "CollisionCube_",
+    objects=None
+) -> None:
     """
     Parent collision cubes to their corresponding bones.
     
     Args:
         armature_obj: The armature object
         prefix: Prefix used for collision cube names
+        objects: Collision objects to parent, or a SceneObjectIndex to
+            search by prefix (defaults to all objects in bpy.data)
     """
     if armature_obj.type != 'ARMATURE':
         print(f"{armature_obj.name} is not an armature object.")
         return
     
-    bpy.ops.object.mode_set(mode='OBJECT')
+    if bpy.context.mode != 'OBJECT':
+        bpy.ops.object.mode_set(mode='OBJECT')
+    
+    if objects is None:
+        objects = bpy.data.objects
+    elif isinstance(objects, SceneObjectIndex):
+        objects = objects.get_objects_with_prefix(prefix)
+    
+    bones = armature_obj.data.bones
+    parent_inverse = armature_obj.matrix_world.inverted()
     
-    for obj in bpy.data.objects:
+    for obj in objects:
         if not obj.name.startswith(prefix):
             continue
         
         bone_name = obj.name[len(prefix):]
         
-        if bone_name not in armature_obj.data.bones:
+        if bone_name not in bones:
             print(f"Bone '{bone_name}' not found for object '{obj.name}'")
             continue
         
         obj.parent = armature_obj
         obj.parent_type = 'BONE'
         obj.parent_bone = bone_name
-        obj.matrix_parent_inverse = armature_obj.matrix_world.inverted()
+        obj.matrix_parent_inverse = parent_inverse
         
         print(f"Parented '{obj.name}' → bone '{bone_name}'")
     
     print("Parenting complete.")
 
 
-def create_collisions_for_armatures(armature_list: list) -> None:
+def create_collisions_for_armatures(
+    armature_list: list,
+    shape_type: str = SHAPE_AABB,
+    max_hull_vertices: int = DEFAULT_MAX_HULL_VERTICES,
+    merge: bool = False
+) -> None:
     """
-    Create collision boxes for all meshes skinned to the given armatures.
+    Create collision shapes for all meshes skinned to the given armatures.
+    
+    The scene is indexed once; each armature's new collision objects are
+    parented directly instead of rescanning the scene per mesh.
     
     Args:
         armature_list: List of armature objects
+        shape_type: 'AABB', 'OBB' (oriented box) or 'HULL' (convex hull)
+        max_hull_vertices: Vertex cap for convex hulls
+        merge: Create one multi-part collision object per mesh instead of
+            one object per bone
     """
+    index = SceneObjectIndex()
+    
     for armature in armature_list:
-        skinned_meshes = get_skinned_meshes(armature)
+        skinned_meshes = index.get_skinned_meshes(armature)
+        created_objs = []
         
         for mesh in skinned_meshes:
             highest_groups = get_vertices_by_highest_weight(mesh)
-            collision_bounds = generate_collision_bounds(highest_groups, mesh)
-            create_collision_boxes(collision_bounds)
-            parent_collision_to_bones(armature)
+            shapes = generate_collision_shapes(highest_groups, shape_type, max_hull_vertices)
+            
+            if merge:
+                # Skin the merged object to the armature through its vertex groups
+                for obj in create_collision_boxes(shapes, prefix=f"Collision_{mesh.name}", merge=True):
+                    obj.parent = armature
+                    obj.matrix_parent_inverse = armature.matrix_world.inverted()
+                    modifier = obj.modifiers.new(name="Armature", type='ARMATURE')
+                    modifier.object = armature
+                continue
+            
+            created_objs.extend(create_collision_boxes(shapes))
+        
+        index.add(created_objs)
+        if created_objs:
+            parent_collision_to_bones(armature, objects=created_objs)
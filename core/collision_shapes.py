@@ -0,0 +1,408 @@
+"""
+Collision shape computation.
+
+This module turns point clouds (one per bone or vertex group) into
+collision shapes: axis-aligned boxes, oriented boxes fitted by principal
+component analysis, or convex hulls computed with quickhull. It only uses
+NumPy and has no Blender dependency.
+
+Shapes are returned as CollisionShape objects holding vertex positions and
+polygon index tuples wound counter-clockwise when seen from outside.
+"""
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+SHAPE_AABB = 'AABB'
+SHAPE_OBB = 'OBB'
+SHAPE_HULL = 'HULL'
+SHAPE_TYPES = (SHAPE_AABB, SHAPE_OBB, SHAPE_HULL)
+
+# studiomdl rejects convex pieces with too many vertices; hulls above
+# this count are simplified
+DEFAULT_MAX_HULL_VERTICES = 64
+
+# Boxes thinner than this on any axis are inflated to it
+DEFAULT_MIN_EXTENT = 0.01
+
+# Unit box corners, in the corner order used by generate_collision_bounds
+_BOX_CORNER_SIGNS = np.array([
+    (1, -1, -1),
+    (1, 1, -1),
+    (-1, 1, -1),
+    (-1, -1, -1),
+    (1, -1, 1),
+    (1, 1, 1),
+    (-1, 1, 1),
+    (-1, -1, 1),
+], dtype=np.float64)
+
+# Box faces for the corners above, wound outwards
+BOX_FACES = [
+    (3, 2, 1, 0),
+    (4, 5, 6, 7),
+    (0, 1, 5, 4),
+    (1, 2, 6, 5),
+    (2, 3, 7, 6),
+    (3, 0, 4, 7),
+]
+
+
+@dataclass
+class CollisionShape:
+    """A closed convex collision mesh."""
+    shape_type: str
+    vertices: np.ndarray
+    faces: List[tuple] = field(default_factory=list)
+
+    @property
+    def vertex_count(self) -> int:
+        return len(self.vertices)
+
+
+# ============================================================================
+# Boxes
+# ============================================================================
+
+def _box_shape(center: np.ndarray, axes: np.ndarray, half_extents: np.ndarray, shape_type: str) -> CollisionShape:
+    """Build a box shape from its center, axes (rows) and half extents."""
+    corners = center + (_BOX_CORNER_SIGNS * half_extents) @ axes
+    return CollisionShape(shape_type, corners, list(BOX_FACES))
+
+
+def compute_aabb(points: np.ndarray, min_extent: float = DEFAULT_MIN_EXTENT) -> CollisionShape:
+    """
+    Compute the axis-aligned bounding box of a point cloud.
+
+    Args:
+        points: float array of shape (N, 3)
+        min_extent: Minimum box size along each axis
+
+    Returns:
+        CollisionShape with 8 vertices
+    """
+    low = points.min(axis=0)
+    high = points.max(axis=0)
+    half_extents = np.maximum((high - low) / 2.0, min_extent / 2.0)
+    return _box_shape((low + high) / 2.0, np.eye(3), half_extents, SHAPE_AABB)
+
+
+def compute_obb(points: np.ndarray, min_extent: float = DEFAULT_MIN_EXTENT) -> CollisionShape:
+    """
+    Compute an oriented bounding box aligned to the principal axes.
+
+    Args:
+        points: float array of shape (N, 3)
+        min_extent: Minimum box size along each axis
+
+    Returns:
+        CollisionShape with 8 vertices
+    """
+    if len(points) < 3:
+        shape = compute_aabb(points, min_extent)
+        shape.shape_type = SHAPE_OBB
+        return shape
+
+    mean = points.mean(axis=0)
+    centered = points - mean
+    _, eigenvectors = np.linalg.eigh(centered.T @ centered)
+
+    # Rows are the axes, largest variance first, right handed
+    axes = eigenvectors[:, ::-1].T
+    if np.linalg.det(axes) < 0:
+        axes[2] = -axes[2]
+
+    projected = centered @ axes.T
+    low = projected.min(axis=0)
+    high = projected.max(axis=0)
+    half_extents = np.maximum((high - low) / 2.0, min_extent / 2.0)
+    center = mean + ((low + high) / 2.0) @ axes
+    return _box_shape(center, axes, half_extents, SHAPE_OBB)
+
+
+# ============================================================================
+# Convex Hulls
+# ============================================================================
+
+def _plane(points: np.ndarray, face: Tuple[int, int, int]) -> Tuple[np.ndarray, float]:
+    """Get the unit normal and offset of a triangle's plane."""
+    a, b, c = points[list(face)]
+    normal = np.cross(b - a, c - a)
+    length = np.linalg.norm(normal)
+    if length > 0:
+        normal = normal / length
+    return normal, float(normal @ a)
+
+
+def _initial_simplex(points: np.ndarray, eps: float) -> Optional[List[int]]:
+    """Pick four affinely independent extreme points, or None if degenerate."""
+    extremes = np.concatenate([points.argmin(axis=0), points.argmax(axis=0)])
+
+    # Most distant pair among the axis extremes
+    candidates = points[extremes]
+    distances = np.linalg.norm(candidates[:, None] - candidates[None, :], axis=2)
+    i, j = np.unravel_index(distances.argmax(), distances.shape)
+    a, b = int(extremes[i]), int(extremes[j])
+    if distances[i, j] <= eps:
+        return None
+
+    # Farthest point from the line ab
+    direction = (points[b] - points[a]) / np.linalg.norm(points[b] - points[a])
+    offsets = points - points[a]
+    line_distances = np.linalg.norm(offsets - np.outer(offsets @ direction, direction), axis=1)
+    c = int(line_distances.argmax())
+    if line_distances[c] <= eps:
+        return None
+
+    # Farthest point from the plane abc
+    normal = np.cross(points[b] - points[a], points[c] - points[a])
+    normal /= np.linalg.norm(normal)
+    plane_distances = (points - points[a]) @ normal
+    d = int(np.abs(plane_distances).argmax())
+    if abs(plane_distances[d]) <= eps:
+        return None
+
+    return [a, b, c, d]
+
+
+class HullVertexLimitExceeded(Exception):
+    """Raised by quickhull() when the hull grows past its vertex limit."""
+
+
+def quickhull(
+    points: np.ndarray,
+    eps: Optional[float] = None,
+    vertex_limit: Optional[int] = None
+) -> Optional[List[Tuple[int, int, int]]]:
+    """
+    Compute the convex hull of a point cloud with quickhull.
+
+    Each iteration adds one hull vertex, so a vertex limit also bounds
+    the running time on dense, rounded point clouds.
+
+    Args:
+        points: float array of shape (N, 3)
+        eps: Distance tolerance (defaults to a fraction of the cloud size)
+        vertex_limit: Abort once the hull has more vertices than this
+
+    Returns:
+        List of outward-wound triangles as index tuples into points, or
+        None if the points are coplanar or fewer than four
+
+    Raises:
+        HullVertexLimitExceeded: If the hull has more than vertex_limit
+            vertices
+    """
+    if len(points) < 4:
+        return None
+
+    if eps is None:
+        eps = 1e-7 * max(float(np.ptp(points, axis=0).max()), 1e-12)
+
+    simplex = _initial_simplex(points, eps)
+    if simplex is None:
+        return None
+
+    a, b, c, d = simplex
+    centroid = points[simplex].mean(axis=0)
+
+    faces = {}
+    next_id = 0
+
+    def add_face(tri, candidates):
+        nonlocal next_id
+        normal, offset = _plane(points, tri)
+        if normal @ centroid - offset > 0:
+            tri = (tri[0], tri[2], tri[1])
+            normal, offset = -normal, -offset
+        distances = points[candidates] @ normal - offset
+        outside = candidates[distances > eps]
+        faces[next_id] = (tri, normal, offset, outside)
+        next_id += 1
+        return outside
+
+    remaining = np.setdiff1d(np.arange(len(points)), simplex)
+    assigned = np.zeros(len(points), dtype=bool)
+    for tri in ((a, b, c), (a, b, d), (a, c, d), (b, c, d)):
+        outside = add_face(tri, remaining[~assigned[remaining]])
+        assigned[outside] = True
+
+    while True:
+        # Any face that still has outside points
+        face_id = next((fid for fid, face in faces.items() if len(face[3])), None)
+        if face_id is None:
+            break
+
+        if vertex_limit is not None:
+            hull_vertices = {i for face in faces.values() for i in face[0]}
+            if len(hull_vertices) >= vertex_limit:
+                raise HullVertexLimitExceeded()
+
+        _, normal, offset, outside = faces[face_id]
+        apex = int(outside[np.argmax(points[outside] @ normal - offset)])
+        apex_point = points[apex]
+
+        visible = [
+            fid for fid, (_, f_normal, f_offset, _) in faces.items()
+            if apex_point @ f_normal - f_offset > eps
+        ]
+
+        # Horizon: directed edges of visible faces whose twin is not visible
+        visible_edges = set()
+        for fid in visible:
+            tri = faces[fid][0]
+            for k in range(3):
+                visible_edges.add((tri[k], tri[(k + 1) % 3]))
+        horizon = [edge for edge in visible_edges if (edge[1], edge[0]) not in visible_edges]
+
+        orphans = np.concatenate([faces.pop(fid)[3] for fid in visible])
+        orphans = orphans[orphans != apex]
+
+        assigned = np.zeros(len(points), dtype=bool)
+        for edge in horizon:
+            candidates = orphans[~assigned[orphans]]
+            outside = add_face((edge[0], edge[1], apex), candidates)
+            assigned[outside] = True
+
+    return [face[0] for face in faces.values()]
+
+
+def _support_directions(count: int) -> np.ndarray:
+    """Get roughly uniform unit directions on the sphere (Fibonacci lattice)."""
+    indices = np.arange(count) + 0.5
+    z = 1.0 - 2.0 * indices / count
+    radius = np.sqrt(1.0 - z * z)
+    theta = np.pi * (1.0 + 5.0 ** 0.5) * indices
+    return np.stack([radius * np.cos(theta), radius * np.sin(theta), z], axis=1)
+
+
+def _reindex_hull(points: np.ndarray, triangles: List[tuple]) -> CollisionShape:
+    """Build a hull shape that only contains the hull's own vertices."""
+    used = np.unique(np.array(triangles).ravel())
+    remap = {int(old): new for new, old in enumerate(used)}
+    faces = [tuple(remap[i] for i in tri) for tri in triangles]
+    return CollisionShape(SHAPE_HULL, points[used], faces)
+
+
+def support_points(points: np.ndarray, max_vertices: int) -> np.ndarray:
+    """
+    Pick at most max_vertices extreme points spread over all directions.
+
+    Every support point is a hull vertex, so their hull is an inner
+    approximation of the full hull with at most max_vertices vertices.
+
+    Args:
+        points: float array of shape (N, 3), without duplicates
+        max_vertices: Maximum number of points to pick
+
+    Returns:
+        float array of shape (M, 3) with M <= max_vertices
+    """
+    best = None
+    for factor in (1, 2, 4, 8, 16):
+        directions = _support_directions(max_vertices * factor)
+        support = np.unique((points @ directions.T).argmax(axis=0))
+        if len(support) > max_vertices:
+            break
+        best = support
+    return points[best]
+
+
+def compute_convex_hull(
+    points: np.ndarray,
+    max_vertices: int = DEFAULT_MAX_HULL_VERTICES,
+    min_extent: float = DEFAULT_MIN_EXTENT
+) -> CollisionShape:
+    """
+    Compute a convex hull with at most max_vertices vertices.
+
+    Hulls that would have more vertices are replaced by the hull of the
+    point cloud's support points along evenly spread directions. Flat or
+    tiny point clouds fall back to an oriented box.
+
+    Args:
+        points: float array of shape (N, 3)
+        max_vertices: Vertex cap for the hull (at least 4)
+        min_extent: Minimum size of the fallback box
+
+    Returns:
+        CollisionShape
+    """
+    points = np.unique(np.asarray(points, dtype=np.float64), axis=0)
+    max_vertices = max(4, max_vertices)
+
+    try:
+        triangles = quickhull(points, vertex_limit=max_vertices)
+    except HullVertexLimitExceeded:
+        points = support_points(points, max_vertices)
+        triangles = quickhull(points)
+
+    if triangles is None:
+        return compute_obb(points, min_extent)
+    return _reindex_hull(points, triangles)
+
+
+# ============================================================================
+# Per-Group Shapes
+# ============================================================================
+
+def compute_collision_shape(
+    points: np.ndarray,
+    shape_type: str = SHAPE_AABB,
+    max_hull_vertices: int = DEFAULT_MAX_HULL_VERTICES,
+    min_extent: float = DEFAULT_MIN_EXTENT
+) -> CollisionShape:
+    """
+    Compute one collision shape for a point cloud.
+
+    Args:
+        points: float array of shape (N, 3), N >= 1
+        shape_type: SHAPE_AABB, SHAPE_OBB or SHAPE_HULL
+        max_hull_vertices: Vertex cap for convex hulls
+        min_extent: Minimum box size along each axis
+
+    Returns:
+        CollisionShape
+
+    Raises:
+        ValueError: If the shape type is unknown
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    shape_type = shape_type.upper()
+
+    if shape_type == SHAPE_AABB:
+        return compute_aabb(points, min_extent)
+    if shape_type == SHAPE_OBB:
+        return compute_obb(points, min_extent)
+    if shape_type == SHAPE_HULL:
+        return compute_convex_hull(points, max_hull_vertices, min_extent)
+    raise ValueError(f"Unknown collision shape type: {shape_type}")
+
+
+def compute_collision_shapes(
+    vertex_groups_dict: Dict[str, np.ndarray],
+    shape_type: str = SHAPE_AABB,
+    max_hull_vertices: int = DEFAULT_MAX_HULL_VERTICES,
+    min_extent: float = DEFAULT_MIN_EXTENT
+) -> Dict[str, CollisionShape]:
+    """
+    Compute a collision shape for each vertex group.
+
+    Args:
+        vertex_groups_dict: Mapping of group names to world-space point
+            arrays of shape (N, 3); empty groups are skipped
+        shape_type: SHAPE_AABB, SHAPE_OBB or SHAPE_HULL
+        max_hull_vertices: Vertex cap for convex hulls
+        min_extent: Minimum box size along each axis
+
+    Returns:
+        dict: Mapping of group names to CollisionShape objects
+    """
+    shapes = {}
+    for name, points in vertex_groups_dict.items():
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        if len(points):
+            shapes[name] = compute_collision_shape(points, shape_type, max_hull_vertices, min_extent)
+    return shapes
@@ -0,0 +1,608 @@
+"""
+Parallel studiomdl compile queue.
+
+Compiles many QC files with a bounded number of concurrent studiomdl
+processes. Every compile is a background task of the addon's task
+manager, so operators can poll each job like any other task, and the
+compiler's output is streamed line by line while it runs.
+
+Any studiomdl-compatible executable can be used: it is called as
+
+    <executable> [extra args] [-game <game dir>] <file.qc>
+
+and a non-zero exit code marks the compile as failed.
+
+With a build cache, compiles are incremental: a QC is skipped when the
+hash of all its inputs (see qc_dependencies) and of the compiler
+settings matches its last successful build, and the compiled .mdl in
+the game folder is still the one that build wrote.
+
+Command line (Blender's Python, since the addon imports bpy):
+
+    blender --background --python-expr "import sys, VonSourceTools.core.compile_queue as c; sys.exit(c.main(sys.argv[sys.argv.index('--') + 1:]))" -- studiomdl.exe models/ -j 8
+"""
+import argparse
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional, Sequence, Union
+
+from .build_cache import BuildCache, hash_settings
+from .qc_dependencies import get_compiled_model_path, hash_dependencies, scan_qc_dependencies
+from .studiomdl import build_studiomdl_command, run_studiomdl
+from ..utils.threading_utils import (
+    TaskCancelled,
+    TaskStatus,
+    TaskToken,
+    cancel_task,
+    cleanup_task,
+    run_in_background,
+)
+
+
+_FINISHED_STATES = (TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED)
+
+
+@dataclass
+class CompileJob:
+    """
+    One QC file in a compile queue.
+
+    Attributes:
+        qc_path: Path to the QC file
+        status: PENDING until a compile slot is free, then RUNNING, then
+            COMPLETED, FAILED or CANCELLED
+        task_id: ID of the job's background task
+        returncode: Exit code of the compiler
+        stdout: Output lines printed so far
+        stderr: Error lines printed so far
+        error: Failure message of a failed job
+        elapsed: Compile time in seconds
+        skipped: True if the compile was skipped as up to date
+    """
+    qc_path: Path
+    status: TaskStatus = TaskStatus.PENDING
+    task_id: Optional[str] = None
+    returncode: Optional[int] = None
+    stdout: List[str] = field(default_factory=list)
+    stderr: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+    elapsed: float = 0.0
+    skipped: bool = False
+
+    @property
+    def name(self) -> str:
+        return self.qc_path.stem
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in _FINISHED_STATES
+
+
+def _failure_message(job: CompileJob) -> str:
+    """Pick the most useful line of a failed compile's output."""
+    for line in job.stdout + job.stderr:
+        if "ERROR" in line.upper():
+            return line.strip()
+    if job.stderr:
+        return job.stderr[-1].strip()
+    return f"studiomdl exited with code {job.returncode}"
+
+
+def _hash_compile_settings(
+    studiomdl_exe: Path,
+    game_dir: Optional[Path],
+    extra_args: Sequence[str]
+) -> str:
+    """Hash the compiler settings a build cache entry depends on."""
+    return hash_settings({
+        'studiomdl': str(studiomdl_exe),
+        'game_dir': str(game_dir) if game_dir else None,
+        'extra_args': list(extra_args),
+    })
+
+
+def _compile_job(
+    job: CompileJob,
+    studiomdl_exe: Path,
+    game_dir: Optional[Path],
+    extra_args: Sequence[str],
+    settings_hash: str,
+    cache: Optional[BuildCache],
+    line_callback: Optional[Callable[[CompileJob, str, str], None]],
+    token: Optional[TaskToken] = None
+) -> None:
+    """Run the compiler on one job in the calling thread, raising if it fails."""
+    if not job.qc_path.exists():
+        raise FileNotFoundError(f"QC file not found at {job.qc_path}")
+
+    model_path = None
+    if cache is not None:
+        dependencies = scan_qc_dependencies(job.qc_path)
+        input_hash = hash_dependencies(dependencies, game_dir, cache)
+        # Builds are recorded under the compiled .mdl, so a model that was
+        # deleted or overwritten since is rebuilt. Without a game folder
+        # its location is unknown and the QC is always compiled.
+        model_path = get_compiled_model_path(dependencies, game_dir)
+        if model_path is not None and cache.is_up_to_date(model_path, input_hash, settings_hash):
+            job.skipped = True
+            return
+
+    def on_line(stream_name, line):
+        # run_studiomdl collects the lines itself; mirror them on the job
+        # so they are visible while the compile is still running
+        (job.stdout if stream_name == 'stdout' else job.stderr).append(line)
+        if line_callback is not None:
+            line_callback(job, stream_name, line)
+
+    command = build_studiomdl_command(studiomdl_exe, job.qc_path, game_dir, extra_args)
+    job.returncode, _, _ = run_studiomdl(command, line_callback=on_line, token=token)
+
+    if job.returncode != 0:
+        job.error = _failure_message(job)
+        if model_path is not None:
+            cache.forget(model_path)
+        raise RuntimeError(job.error)
+
+    if model_path is not None:
+        if model_path.is_file():
+            cache.record(model_path, input_hash, settings_hash, source_path=job.qc_path)
+        else:
+            cache.forget(model_path)
+
+
+class CompileQueue:
+    """
+    Runs studiomdl on submitted QC files, a bounded number at a time.
+
+    Jobs wait in the queue until one of the queue's slots is free and are
+    then handed to the task manager's thread pool, whose own limit also
+    applies; submit() never blocks.
+    """
+
+    def __init__(
+        self,
+        studiomdl_exe: Union[str, Path],
+        game_dir: Optional[Union[str, Path]] = None,
+        max_workers: Optional[int] = None,
+        extra_args: Sequence[str] = (),
+        line_callback: Optional[Callable[[CompileJob, str, str], None]] = None,
+        job_callback: Optional[Callable[[CompileJob], None]] = None,
+        cache: Optional[BuildCache] = None
+    ):
+        """
+        Args:
+            studiomdl_exe: Path to studiomdl.exe or a compatible executable
+            game_dir: Optional game folder passed as -game
+            max_workers: Number of concurrent compiles
+                (None or 0 uses the CPU core count)
+            extra_args: Additional compiler arguments (e.g. "-nop4")
+            line_callback: Optional callable invoked from worker threads
+                for each output line as callback(job, stream_name, line)
+            job_callback: Optional callable invoked from worker threads
+                when a job finishes as callback(job)
+            cache: Optional build cache; QC files whose inputs are
+                unchanged since their last successful compile are skipped.
+                Call cache.save() once the queue is finished.
+        """
+        self.studiomdl_exe = Path(studiomdl_exe)
+        self.game_dir = Path(game_dir) if game_dir else None
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.extra_args = tuple(extra_args)
+        self.line_callback = line_callback
+        self.job_callback = job_callback
+        self.cache = cache
+        self._settings_hash = _hash_compile_settings(self.studiomdl_exe, self.game_dir, self.extra_args)
+
+        self._lock = threading.Lock()
+        self._finished = threading.Condition()
+        self._jobs: List[CompileJob] = []
+        self._waiting = deque()
+        self._running = 0
+        self._cancelled = False
+
+    @property
+    def jobs(self) -> List[CompileJob]:
+        """All submitted jobs, in submission order."""
+        with self._lock:
+            return list(self._jobs)
+
+    def submit(self, qc_path: Union[str, Path]) -> CompileJob:
+        """
+        Queue a QC file for compilation.
+
+        Args:
+            qc_path: Path to the QC file
+
+        Returns:
+            CompileJob: The queued job
+        """
+        job = CompileJob(qc_path=Path(qc_path).resolve())
+        with self._lock:
+            self._jobs.append(job)
+            self._waiting.append(job)
+        self._dispatch()
+        return job
+
+    def submit_many(self, qc_paths: Iterable[Union[str, Path]]) -> List[CompileJob]:
+        """Queue several QC files; see submit()."""
+        return [self.submit(qc_path) for qc_path in qc_paths]
+
+    def _dispatch(self) -> None:
+        """Start waiting jobs while the queue has free slots."""
+        with self._lock:
+            ready = []
+            while self._waiting and self._running < self.max_workers:
+                ready.append(self._waiting.popleft())
+                self._running += 1
+
+        for job in ready:
+            try:
+                job.task_id = run_in_background(self._run_job, job)
+            except RuntimeError as e:
+                # The task manager's pools have been shut down
+                job.error = str(e)
+                job.status = TaskStatus.FAILED
+                with self._lock:
+                    self._running -= 1
+                self._job_finished(job)
+
+    def cancel(self) -> None:
+        """
+        Cancel all jobs that have not finished.
+
+        Waiting jobs never start; running compilers are killed. Jobs
+        submitted afterwards are cancelled as well.
+        """
+        with self._lock:
+            self._cancelled = True
+            waiting = list(self._waiting)
+            self._waiting.clear()
+            # Jobs handed to the pool but not started yet see the flag
+            running = [job for job in self._jobs if job.status is TaskStatus.RUNNING]
+
+        for job in waiting:
+            job.status = TaskStatus.CANCELLED
+            self._job_finished(job)
+        for job in running:
+            if job.task_id is not None:
+                cancel_task(job.task_id)
+
+    def _run_job(self, job: CompileJob, token: Optional[TaskToken] = None) -> dict:
+        """Task function of one job."""
+        job.status = TaskStatus.RUNNING
+        start = time.perf_counter()
+        try:
+            if self._cancelled:
+                raise TaskCancelled("Compile queue cancelled")
+            self._compile(job, token)
+        except TaskCancelled:
+            job.status = TaskStatus.CANCELLED
+            raise
+        except Exception as e:
+            job.error = job.error or str(e)
+            job.status = TaskStatus.FAILED
+            raise
+        finally:
+            job.elapsed = time.perf_counter() - start
+            if job.status is TaskStatus.RUNNING:
+                job.status = TaskStatus.COMPLETED
+            with self._lock:
+                self._running -= 1
+            self._dispatch()
+            self._job_finished(job)
+
+        return {
+            'qc_path': str(job.qc_path),
+            'returncode': job.returncode,
+            'elapsed': job.elapsed,
+            'skipped': job.skipped,
+        }
+
+    def _compile(self, job: CompileJob, token: Optional[TaskToken] = None) -> None:
+        """Run the compiler on one job, raising if it fails."""
+        _compile_job(
+            job, self.studiomdl_exe, self.game_dir, self.extra_args,
+            self._settings_hash, self.cache, self.line_callback, token
+        )
+
+    def _job_finished(self, job: CompileJob) -> None:
+        """Notify callbacks and waiters that a job is done."""
+        try:
+            if self.job_callback is not None:
+                self.job_callback(job)
+        finally:
+            with self._finished:
+                self._finished.notify_all()
+
+    @property
+    def is_finished(self) -> bool:
+        """Check if every submitted job has finished."""
+        return all(job.is_finished for job in self.jobs)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until every submitted job has finished.
+
+        Args:
+            timeout: Maximum time to wait in seconds (None waits forever)
+
+        Returns:
+            bool: True if all jobs finished, False on timeout
+        """
+        with self._finished:
+            return self._finished.wait_for(lambda: self.is_finished, timeout)
+
+    def summary(self) -> dict:
+        """
+        Summarize the queue's jobs.
+
+        Returns:
+            dict with 'success', 'failed', 'cancelled', 'skipped', 'pending'
+            and 'total' counts (skipped jobs also count as successful),
+            'compiled' listing the compiled QC paths, 'errors' mapping each
+            failed QC path to its error message and 'timings' mapping
+            each finished QC path to its compile time in seconds
+        """
+        jobs = self.jobs
+        return {
+            'success': sum(job.status is TaskStatus.COMPLETED for job in jobs),
+            'failed': sum(job.status is TaskStatus.FAILED for job in jobs),
+            'cancelled': sum(job.status is TaskStatus.CANCELLED for job in jobs),
+            'skipped': sum(job.skipped for job in jobs),
+            'pending': sum(not job.is_finished for job in jobs),
+            'total': len(jobs),
+            'compiled': [str(job.qc_path) for job in jobs if job.status is TaskStatus.COMPLETED],
+            'errors': {str(job.qc_path): job.error for job in jobs if job.status is TaskStatus.FAILED},
+            'timings': {str(job.qc_path): job.elapsed for job in jobs if job.is_finished},
+        }
+
+    def cleanup(self) -> None:
+        """Remove the finished jobs' tasks from the task manager."""
+        for job in self.jobs:
+            if job.is_finished and job.task_id is not None:
+                cleanup_task(job.task_id)
+
+
+def find_qc_files(paths: Iterable[Union[str, Path]]) -> List[Path]:
+    """
+    Expand files and folders into a sorted list of QC files.
+
+    Args:
+        paths: QC files, or folders searched recursively for *.qc
+
+    Returns:
+        list: Unique QC file paths
+    """
+    qc_files = set()
+    for path in map(Path, paths):
+        if path.is_dir():
+            qc_files.update(path.rglob("*.qc"))
+        else:
+            qc_files.add(path)
+    return sorted(qc_files)
+
+
+def compile_qc_files(
+    studiomdl_exe: Union[str, Path],
+    qc_paths: Iterable[Union[str, Path]],
+    game_dir: Optional[Union[str, Path]] = None,
+    max_workers: Optional[int] = None,
+    extra_args: Sequence[str] = (),
+    line_callback: Optional[Callable[[CompileJob, str, str], None]] = None,
+    progress_callback: Optional[Callable[[int, int, CompileJob, bool], None]] = None,
+    cache: Optional[BuildCache] = None,
+    token: Optional[TaskToken] = None
+) -> dict:
+    """
+    Compile many QC files and wait for all of them.
+
+    Cancelling the token (or interrupting with Ctrl+C) cancels the queue.
+
+    Args:
+        studiomdl_exe: Path to studiomdl.exe or a compatible executable
+        qc_paths: QC files to compile
+        game_dir: Optional game folder passed as -game
+        max_workers: Number of concurrent compiles
+            (None or 0 uses the CPU core count)
+        extra_args: Additional compiler arguments
+        line_callback: Optional callable invoked for each output line as
+            callback(job, stream_name, line)
+        progress_callback: Optional callable invoked after each compile as
+            callback(completed, total, job, success)
+        cache: Optional build cache for incremental compiles; it is saved
+            when all compiles are finished
+        token: Optional task token for progress reporting and cancellation
+
+    Returns:
+        dict: See CompileQueue.summary(), plus 'elapsed' holding the total
+        wall time in seconds
+
+    Raises:
+        TaskCancelled: If the token was cancelled
+    """
+    start = time.perf_counter()
+    qc_paths = list(qc_paths)
+    completed = []
+    lock = threading.Lock()
+
+    def on_job_finished(job):
+        with lock:
+            completed.append(job)
+            count = len(completed)
+        if token is not None:
+            token.report_count(count, len(qc_paths), f"{count}/{len(qc_paths)} QC files")
+        if progress_callback is not None:
+            progress_callback(count, len(qc_paths), job, job.status is TaskStatus.COMPLETED)
+
+    queue = CompileQueue(
+        studiomdl_exe,
+        game_dir=game_dir,
+        max_workers=max_workers,
+        extra_args=extra_args,
+        line_callback=line_callback,
+        job_callback=on_job_finished,
+        cache=cache,
+    )
+    queue.submit_many(qc_paths)
+    try:
+        while not queue.wait(timeout=0.1):
+            if token is not None and token.is_cancelled:
+                queue.cancel()
+    except KeyboardInterrupt:
+        queue.cancel()
+        queue.wait()
+        raise
+    finally:
+        queue.cleanup()
+        if cache is not None:
+            cache.save()
+
+    if token is not None:
+        token.check()
+
+    result = queue.summary()
+    result['elapsed'] = time.perf_counter() - start
+    return result
+
+
+def compile_qc_file(
+    studiomdl_exe: Union[str, Path],
+    qc_path: Union[str, Path],
+    game_dir: Optional[Union[str, Path]] = None,
+    extra_args: Sequence[str] = (),
+    line_callback: Optional[Callable[[CompileJob, str, str], None]] = None,
+    cache: Optional[BuildCache] = None,
+    token: Optional[TaskToken] = None
+) -> CompileJob:
+    """
+    Compile one QC file in the calling thread.
+
+    Unlike compile_qc_files() no task is started, so this is safe to call
+    from a task that already runs on the task manager's thread pool
+    (e.g. a TaskGraph node); waiting there for another pool task can
+    deadlock when the pool has no free worker.
+
+    Args:
+        studiomdl_exe: Path to studiomdl.exe or a compatible executable
+        qc_path: QC file to compile
+        game_dir: Optional game folder passed as -game
+        extra_args: Additional compiler arguments
+        line_callback: Optional callable invoked for each output line as
+            callback(job, stream_name, line)
+        cache: Optional build cache for incremental compiles; it is saved
+            when the compile is finished
+        token: Optional task token for cancellation
+
+    Returns:
+        CompileJob: The finished job (COMPLETED, or FAILED with its error)
+
+    Raises:
+        TaskCancelled: If the token was cancelled
+    """
+    studiomdl_exe = Path(studiomdl_exe)
+    game_dir = Path(game_dir) if game_dir else None
+    job = CompileJob(qc_path=Path(qc_path).resolve(), status=TaskStatus.RUNNING)
+    start = time.perf_counter()
+    try:
+        _compile_job(
+            job, studiomdl_exe, game_dir, extra_args,
+            _hash_compile_settings(studiomdl_exe, game_dir, extra_args),
+            cache, line_callback, token
+        )
+        job.status = TaskStatus.COMPLETED
+    except TaskCancelled:
+        job.status = TaskStatus.CANCELLED
+        raise
+    except Exception as e:
+        job.error = job.error or str(e)
+        job.status = TaskStatus.FAILED
+    finally:
+        job.elapsed = time.perf_counter() - start
+        if cache is not None:
+            cache.save()
+    return job
+
+
+# ============================================================================
+# Command Line Entry Point
+# ============================================================================
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Compile QC files and print a summary.
+
+    Args:
+        argv: Command line arguments (defaults to sys.argv[1:])
+
+    Returns:
+        int: Exit code (0 if every QC file compiled)
+    """
+    parser = argparse.ArgumentParser(
+        prog="compile_queue",
+        description="Compile many QC files with parallel studiomdl processes."
+    )
+    parser.add_argument("studiomdl", help="studiomdl executable (or a compatible stand-in)")
+    parser.add_argument("qc", nargs="+", help="QC files, or folders searched for *.qc")
+    parser.add_argument("-g", "--game", default=None, help="Game folder passed as -game")
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=0,
+        help="Number of concurrent compiles (default: one per CPU core)"
+    )
+    parser.add_argument(
+        "-i", "--incremental", action="store_true",
+        help="Skip QC files whose inputs are unchanged since their last successful compile"
+    )
+    parser.add_argument(
+        "--cache", default=None,
+        help="Build cache file for --incremental (default: in the QC files' common folder)"
+    )
+    parser.add_argument("-v", "--verbose", action="store_true", help="Print compiler output")
+    args = parser.parse_args(argv)
+
+    qc_files = find_qc_files(args.qc)
+    if not qc_files:
+        print("No QC files found")
+        return 2
+
+    cache = None
+    if args.incremental:
+        if args.cache:
+            cache = BuildCache(args.cache)
+        else:
+            cache = BuildCache.for_folder(os.path.commonpath([str(path.parent) for path in qc_files]))
+
+    print_lock = threading.Lock()
+
+    def print_line(job, stream_name, line):
+        with print_lock:
+            print(f"[{job.name}] {line}")
+
+    def print_progress(completed, total, job, success):
+        with print_lock:
+            if job.skipped:
+                state = "up to date"
+            elif job.status is TaskStatus.CANCELLED:
+                state = "cancelled"
+            else:
+                state = "OK" if success else f"FAILED - {job.error}"
+            print(f"({completed}/{total}) {job.qc_path.name}: {state} [{job.elapsed:.1f}s]")
+
+    result = compile_qc_files(
+        args.studiomdl,
+        qc_files,
+        game_dir=args.game,
+        max_workers=args.jobs,
+        line_callback=print_line if args.verbose else None,
+        progress_callback=print_progress,
+        cache=cache,
+    )
+
+    print(
+        f"Compile completed in {result['elapsed']:.1f}s! Success: {result['success']}, "
+        f"Failed: {result['failed']}, Up to date: {result['skipped']}, Total: {result['total']}"
+    )
+    return 1 if result['failed'] else 0
@@ -0,0 +1,490 @@
+"""
+Approximate convex decomposition for concave collision models.
+
+Source physics only handles convex pieces, so concave props need their
+$collisionmodel split into several convex hulls (with $concave). This
+module does that automatically, in the spirit of V-HACD but working on a
+surface point sampling instead of voxels:
+
+1. The mesh surface is sampled uniformly (area weighted).
+2. Each piece's concavity is measured as in V-HACD: rays are cast from
+   the piece's hull surface inward along the face normals, and the
+   concavity is the longest distance a ray travels before it reaches the
+   sampled surface. A point's distance to the hull boundary would not do,
+   since it is never more than half the piece's thickness, which makes
+   thin concave parts (an L-shaped plate) look convex. The faces made by
+   cutting a piece are not sampled, so rays starting there are skipped.
+3. The most concave pieces are split by the best of several candidate
+   planes along their principal axes, until every piece is within the
+   concavity tolerance or the hull budget is used up. A split is kept
+   even if it does not lower the concavity yet, as when a ring is cut
+   open.
+
+Different pieces can be split concurrently in worker processes (the
+splitting is pure Python and NumPy, so threads would be held back by the
+GIL). It only uses NumPy and has no Blender dependency.
+"""
+from concurrent.futures import BrokenExecutor, Executor
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .collision_shapes import (
+    CollisionShape,
+    DEFAULT_MAX_HULL_VERTICES,
+    SHAPE_HULL,
+    compute_convex_hull,
+    quickhull,
+    support_points,
+)
+from ..utils.threading_utils import task_manager
+
+
+DEFAULT_MAX_HULLS = 8
+
+# Concavity tolerance as a fraction of the mesh's bounding box diagonal
+DEFAULT_CONCAVITY = 0.02
+
+DEFAULT_SAMPLE_COUNT = 4000
+
+# Mesh vertices kept in a sampling; dense meshes are thinned to this many
+DEFAULT_MAX_VERTICES = 4000
+
+# Split plane positions along each principal axis, as point quantiles
+_SPLIT_QUANTILES = (0.2, 0.35, 0.5, 0.65, 0.8)
+
+# Points used to score one candidate split (larger pieces are subsampled)
+_MAX_SCORING_POINTS = 800
+
+# Vertex cap of the coarse hulls used to score candidate splits
+_SCORING_HULL_VERTICES = 24
+
+# Pieces with fewer points are never split
+_MIN_PIECE_POINTS = 16
+
+# Rays cast from a hull's surface to measure its piece's concavity
+_CONCAVITY_RAYS = 256
+
+# A ray reaches the surface at a sample point closer to it than this many
+# times the average sample spacing
+_RAY_RADIUS_SCALE = 1.5
+
+# Hull faces whose normal is this close to a cut plane's are its cap
+_CUT_FACE_COSINE = 0.9
+
+# Surface points compared with all rays at once, bounding the memory used
+_CONCAVITY_CHUNK = 4096
+
+
+@dataclass(eq=False)
+class _Piece:
+    """A part of the decomposition: its surface points and convex hull."""
+    points: np.ndarray
+    hull: CollisionShape
+    concavity: float
+    cuts: tuple = ()
+    final: bool = False
+
+
+# ============================================================================
+# Geometry Helpers
+# ============================================================================
+
+def sample_surface(
+    vertices: np.ndarray,
+    triangles: np.ndarray,
+    count: int = DEFAULT_SAMPLE_COUNT,
+    seed: int = 0,
+    max_vertices: int = DEFAULT_MAX_VERTICES
+) -> np.ndarray:
+    """
+    Sample points uniformly over a triangle mesh's surface.
+
+    The mesh vertices are included, so thin features survive. Dense
+    meshes only keep a random subset of max_vertices of them, so the
+    sampling size (and the decomposition's cost) does not grow with the
+    mesh resolution.
+
+    Args:
+        vertices: float array of shape (V, 3)
+        triangles: int array of shape (T, 3)
+        count: Number of random samples
+        seed: Random seed (sampling is deterministic)
+        max_vertices: Maximum number of mesh vertices kept
+
+    Returns:
+        float64 array of shape (min(V, max_vertices) + count, 3)
+    """
+    vertices = np.asarray(vertices, dtype=np.float64)
+    corners = vertices[np.asarray(triangles, dtype=np.int64)]
+    if len(vertices) > max_vertices:
+        rng = np.random.default_rng(seed)
+        vertices = vertices[np.sort(rng.choice(len(vertices), size=max_vertices, replace=False))]
+
+    areas = np.linalg.norm(np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0]), axis=1)
+    if not len(corners) or areas.sum() <= 0:
+        return vertices
+
+    _, samples = _sample_triangles(corners, areas, count, seed)
+    return np.concatenate([vertices, samples])
+
+
+def _sample_triangles(corners: np.ndarray, areas: np.ndarray, count: int, seed: int = 0) -> tuple:
+    """
+    Pick area-weighted random points on triangles.
+
+    Returns:
+        Tuple of the chosen triangle indices (count,) and points (count, 3)
+    """
+    rng = np.random.default_rng(seed)
+    chosen = rng.choice(len(corners), size=count, p=areas / areas.sum())
+    u, v = rng.random((2, count))
+    flip = u + v > 1.0
+    u[flip], v[flip] = 1.0 - u[flip], 1.0 - v[flip]
+
+    tri = corners[chosen]
+    samples = tri[:, 0] + u[:, None] * (tri[:, 1] - tri[:, 0]) + v[:, None] * (tri[:, 2] - tri[:, 0])
+    return chosen, samples
+
+
+def _hull_corners(hull: CollisionShape) -> np.ndarray:
+    """Get the corners (T, 3, 3) of a hull's faces, split into triangles."""
+    triangles = [
+        (face[0], face[i], face[i + 1])
+        for face in hull.faces
+        for i in range(1, len(face) - 1)
+    ]
+    return hull.vertices[np.array(triangles, dtype=np.int64).reshape(-1, 3)]
+
+
+def get_ray_radius(points: np.ndarray, hull: CollisionShape) -> float:
+    """
+    Get the radius within which a concavity ray reaches a sample point.
+
+    Args:
+        points: Surface points of shape (N, 3)
+        hull: Convex hull of the points
+
+    Returns:
+        float: The points' average spacing over the hull's surface area,
+        scaled by _RAY_RADIUS_SCALE
+    """
+    corners = _hull_corners(hull)
+    area = 0.5 * np.linalg.norm(
+        np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0]), axis=1
+    ).sum()
+    return _RAY_RADIUS_SCALE * (area / max(len(points), 1)) ** 0.5
+
+
+def compute_concavity(
+    points: np.ndarray,
+    hull: CollisionShape,
+    cuts: Sequence[Tuple[np.ndarray, float]] = (),
+    radius: Optional[float] = None,
+    surface: Optional[np.ndarray] = None,
+    ray_count: int = _CONCAVITY_RAYS
+) -> float:
+    """
+    Measure how deep a sampled surface lies inside its convex hull.
+
+    Rays start at random points of the hull surface and go inward along
+    the face normal. A ray reaches the surface at the first sample point
+    within a radius of it, and the concavity is the longest such ray.
+    Rays that reach no sample point are ignored.
+
+    When the points are a part cut out of a surface, the hull faces on
+    the cut planes cover the solid's cross-section rather than a recess,
+    and no sample points lie on them. No rays start on hull faces that
+    lie beyond a cut plane and face the same way.
+
+    Args:
+        points: Surface points of shape (N, 3)
+        hull: Convex hull of the points
+        cuts: (normal, offset) pairs of the cut planes; faces whose
+            centre x has x . normal >= offset, and whose normal is close
+            to the cut's, cast no rays
+        radius: Distance from a ray within which it reaches a point
+            (defaults to get_ray_radius())
+        surface: Sample points the rays can reach (defaults to points).
+            For part of a sampling, pass the whole sampling (and its
+            radius): a subset is sparser, and has none of the
+            neighbouring points along its cut edges, so rays would slip
+            through the surface.
+        ray_count: Number of rays
+
+    Returns:
+        float: Largest distance from the hull surface to the sampled
+        surface along the hull's normals
+    """
+    corners = _hull_corners(hull)
+    if not len(corners) or not len(points):
+        return 0.0
+
+    normals = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+    areas = np.linalg.norm(normals, axis=1)
+    if radius is None:
+        radius = get_ray_radius(points, hull)
+
+    # Point the normals outward whatever the face winding
+    outward = np.einsum('ij,ij->i', normals, corners.mean(axis=1) - hull.vertices.mean(axis=0))
+    normals[outward < 0] *= -1.0
+
+    rays_from = areas.copy()
+    for cut_normal, cut_offset in cuts:
+        beyond = corners.mean(axis=1) @ cut_normal >= cut_offset
+        facing = normals @ cut_normal > _CUT_FACE_COSINE * areas
+        rays_from[beyond & facing] = 0.0
+    if rays_from.sum() <= 0:
+        return 0.0
+
+    chosen, origins = _sample_triangles(corners, rays_from, ray_count)
+    normals = normals[chosen] / areas[chosen, None]
+
+    # Start on the points' supporting plane; the faces of a hull reduced
+    # to support points can lie inside the surface
+    support = (normals @ points.T).max(axis=1)
+    origins += (support - np.einsum('ij,ij->i', origins, normals))[:, None] * normals
+
+    if surface is None:
+        surface = points
+    else:
+        near = np.all(
+            (surface >= hull.vertices.min(axis=0) - radius)
+            & (surface <= hull.vertices.max(axis=0) + radius),
+            axis=1
+        )
+        surface = surface[near]
+
+    # Distance of each point along each ray, and squared distance from it,
+    # for a chunk of points at a time
+    origin_offsets = np.einsum('ij,ij->i', origins, normals)[:, None]
+    origin_squares = np.einsum('ij,ij->i', origins, origins)[:, None]
+    lengths = np.full(len(origins), np.inf)
+    for start in range(0, len(surface), _CONCAVITY_CHUNK):
+        chunk = surface[start:start + _CONCAVITY_CHUNK]
+        along = origin_offsets - normals @ chunk.T
+        squared = origin_squares - 2.0 * origins @ chunk.T + np.einsum('ij,ij->i', chunk, chunk)[None, :]
+        reached = (squared - along * along <= radius * radius) & (along >= -radius)
+        np.minimum(lengths, np.where(reached, along, np.inf).min(axis=1), out=lengths)
+
+    lengths = lengths[np.isfinite(lengths)]
+    if not len(lengths):
+        return 0.0
+    return float(max(lengths.max(), 0.0))
+
+
+def _make_piece(
+    points: np.ndarray,
+    surface: np.ndarray,
+    radius: float,
+    max_hull_vertices: int,
+    cuts: tuple = ()
+) -> _Piece:
+    """Compute the hull and concavity of a piece of the sampled surface."""
+    hull = compute_convex_hull(points, max_hull_vertices)
+    return _Piece(points, hull, compute_concavity(points, hull, cuts, radius, surface), cuts)
+
+
+def _scoring_concavity(points: np.ndarray, surface: np.ndarray, radius: float, cuts: tuple) -> float:
+    """Estimate a point set's concavity from a coarse support point hull."""
+    support = support_points(np.unique(points, axis=0), _SCORING_HULL_VERTICES)
+    triangles = quickhull(support)
+    if triangles is None:
+        return 0.0
+    hull = CollisionShape(SHAPE_HULL, support, triangles)
+    return compute_concavity(points, hull, cuts, radius, surface)
+
+
+def _child_cuts(piece: _Piece, axis: np.ndarray, position: float, overlap: float) -> tuple:
+    """Get the cut planes of the two halves of a piece split at a plane."""
+    return (
+        piece.cuts + ((axis, position - overlap),),
+        piece.cuts + ((-axis, -(position + overlap)),),
+    )
+
+
+def _subsample(points: np.ndarray, count: int) -> np.ndarray:
+    """Take an evenly strided subset of at most count points."""
+    if len(points) <= count:
+        return points
+    return points[np.linspace(0, len(points) - 1, count).astype(np.int64)]
+
+
+# ============================================================================
+# Splitting
+# ============================================================================
+
+def _split_piece(
+    piece: _Piece,
+    surface: np.ndarray,
+    radius: float,
+    overlap: float,
+    max_hull_vertices: int
+) -> Optional[tuple]:
+    """
+    Split a piece by the candidate plane with the lowest resulting concavity.
+
+    The split is made even when no plane lowers the concavity of both
+    halves: one cut through a ring or loop leaves two C shapes as deep as
+    the ring, and only the next cuts make it convex.
+
+    Points within overlap of the plane go to both halves so the child
+    hulls meet without a gap. surface and radius are the whole sampling
+    and its ray radius (see compute_concavity).
+
+    Returns:
+        Tuple of two child pieces, or None if the piece is too small to split
+    """
+    points = piece.points
+    if len(points) < _MIN_PIECE_POINTS:
+        return None
+
+    centered = points - points.mean(axis=0)
+    _, axes = np.linalg.eigh(centered.T @ centered)
+    scoring = _subsample(points, _MAX_SCORING_POINTS)
+
+    best = None
+    for axis in axes.T:
+        distances = points @ axis
+        scoring_distances = scoring @ axis
+        for position in np.quantile(distances, _SPLIT_QUANTILES):
+            low = scoring[scoring_distances <= position + overlap]
+            high = scoring[scoring_distances >= position - overlap]
+            if len(low) < 4 or len(high) < 4:
+                continue
+
+            low_cuts, high_cuts = _child_cuts(piece, axis, position, overlap)
+            score = max(
+                _scoring_concavity(low, surface, radius, low_cuts),
+                _scoring_concavity(high, surface, radius, high_cuts),
+            )
+            if best is None or score < best[0]:
+                best = (score, axis, position)
+
+    if best is None:
+        return None
+
+    _, axis, position = best
+    distances = points @ axis
+    low_cuts, high_cuts = _child_cuts(piece, axis, position, overlap)
+    low = points[distances <= position + overlap]
+    high = points[distances >= position - overlap]
+    return (
+        _make_piece(low, surface, radius, max_hull_vertices, low_cuts),
+        _make_piece(high, surface, radius, max_hull_vertices, high_cuts),
+    )
+
+
+def decompose_points(
+    points: np.ndarray,
+    max_hulls: int = DEFAULT_MAX_HULLS,
+    concavity: float = DEFAULT_CONCAVITY,
+    max_hull_vertices: int = DEFAULT_MAX_HULL_VERTICES,
+    overlap: Optional[float] = None,
+    executor: Optional[Executor] = None
+) -> List[CollisionShape]:
+    """
+    Decompose a sampled surface into convex hulls.
+
+    Args:
+        points: Surface points of shape (N, 3)
+        max_hulls: Maximum number of convex pieces
+        concavity: Tolerance as a fraction of the bounding box diagonal;
+            pieces at or below it are not split further
+        max_hull_vertices: Vertex cap for each hull
+        overlap: Distance by which neighbouring pieces overlap (defaults
+            to the average sample spacing)
+        executor: Executor used to split pieces concurrently, such as the
+            task manager's process pool. Pieces are split one by one in
+            this process if omitted or if the pool breaks.
+
+    Returns:
+        list: CollisionShape objects, one per convex piece
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    if not len(points):
+        return []
+
+    diagonal = float(np.linalg.norm(points.max(axis=0) - points.min(axis=0)))
+    tolerance = concavity * diagonal
+    if overlap is None:
+        overlap = diagonal / max(len(points), 1) ** 0.5
+
+    hull = compute_convex_hull(points, max_hull_vertices)
+    radius = get_ray_radius(points, hull)
+    pieces = [_Piece(points, hull, compute_concavity(points, hull, radius=radius))]
+
+    while len(pieces) < max_hulls:
+        splittable = sorted(
+            (p for p in pieces if not p.final and p.concavity > tolerance),
+            key=lambda p: p.concavity,
+            reverse=True
+        )[:max_hulls - len(pieces)]
+        if not splittable:
+            break
+
+        results = None
+        if executor is not None and len(splittable) > 1:
+            try:
+                results = list(executor.map(
+                    _split_piece,
+                    splittable,
+                    [points] * len(splittable),
+                    [radius] * len(splittable),
+                    [overlap] * len(splittable),
+                    [max_hull_vertices] * len(splittable)
+                ))
+            except BrokenExecutor as e:
+                print(f"Process pool unavailable, splitting in this process: {e}")
+                task_manager.reset_executor(executor)
+                executor = None
+        if results is None:
+            results = [
+                _split_piece(piece, points, radius, overlap, max_hull_vertices)
+                for piece in splittable
+            ]
+
+        for piece, children in zip(splittable, results):
+            if children is None:
+                piece.final = True
+            else:
+                pieces.remove(piece)
+                pieces.extend(children)
+
+    return [piece.hull for piece in pieces]
+
+
+def decompose_mesh(
+    vertices: np.ndarray,
+    triangles: np.ndarray,
+    max_hulls: int = DEFAULT_MAX_HULLS,
+    concavity: float = DEFAULT_CONCAVITY,
+    max_hull_vertices: int = DEFAULT_MAX_HULL_VERTICES,
+    sample_count: int = DEFAULT_SAMPLE_COUNT,
+    executor: Optional[Executor] = None
+) -> List[CollisionShape]:
+    """
+    Decompose a triangle mesh into at most max_hulls convex hulls.
+
+    Args:
+        vertices: float array of shape (V, 3)
+        triangles: int array of shape (T, 3)
+        max_hulls: Maximum number of convex pieces
+        concavity: Tolerance as a fraction of the bounding box diagonal
+        max_hull_vertices: Vertex cap for each hull
+        sample_count: Number of surface samples
+        executor: Executor used to split pieces concurrently
+            (see decompose_points)
+
+    Returns:
+        list: CollisionShape objects, one per convex piece
+    """
+    points = sample_surface(vertices, triangles, sample_count)
+    return decompose_points(
+        points,
+        max_hulls=max_hulls,
+        concavity=concavity,
+        max_hull_vertices=max_hull_vertices,
+        executor=executor,
+    )
@@ -0,0 +1,831 @@
+"""
+DXT (BC1/BC2/BC3) block compression.
+
+This module compresses RGBA pixel arrays into DXT1, DXT3 and DXT5 block
+data, and decompresses such block data back into pixels. All 4x4
+blocks of an image are processed together as NumPy array operations;
+there is no per-block Python loop.
+
+Two quality tiers are available:
+- FAST: range fit. Endpoints are the extremes of each block's principal
+  axis and indices are picked by projecting onto the endpoint line.
+- HIGH: cluster fit. Every ordered split of the block's pixels along the
+  principal axis is solved by least squares and the best endpoints are
+  kept. Indices and DXT5 alpha modes are chosen by exact error.
+
+Pixel arrays are expected as uint8 with shape (height, width, 4), rows
+ordered top to bottom.
+"""
+import itertools
+
+import numpy as np
+
+
+QUALITY_FAST = 'FAST'
+QUALITY_HIGH = 'HIGH'
+QUALITY_LEVELS = (QUALITY_FAST, QUALITY_HIGH)
+
+# Bit offsets of the 16 pixel indices inside a block, row-major order
+_COLOR_INDEX_SHIFTS = (np.arange(16, dtype=np.uint64) * 2)
+_ALPHA_INDEX_SHIFTS = (np.arange(16, dtype=np.uint64) * 3)
+_EXPLICIT_ALPHA_SHIFTS = (np.arange(16, dtype=np.uint64) * 4)
+
+# Pixels with alpha below this are transparent in DXT1 (1-bit alpha)
+DXT1_ALPHA_THRESHOLD = 128
+
+# Palette index for each step along the endpoint line
+_FOUR_COLOR_ORDER = np.array([0, 2, 3, 1], dtype=np.uint8)
+_THREE_COLOR_ORDER = np.array([0, 2, 1], dtype=np.uint8)
+_ALPHA8_ORDER = np.array([0, 2, 3, 4, 5, 6, 7, 1], dtype=np.uint8)
+
+# Blocks processed per cluster fit batch (bounds temporary memory)
+_CLUSTER_FIT_BATCH = 512
+
+
+# ============================================================================
+# Block Layout Helpers
+# ============================================================================
+
+def get_block_count(width: int, height: int) -> int:
+    """
+    Get the number of 4x4 blocks needed to cover an image.
+
+    Args:
+        width: Image width in pixels
+        height: Image height in pixels
+
+    Returns:
+        int: Number of blocks
+    """
+    return max(1, (width + 3) // 4) * max(1, (height + 3) // 4)
+
+
+def blockify(rgba: np.ndarray) -> np.ndarray:
+    """
+    Split an image into 4x4 pixel blocks.
+
+    Images whose dimensions are not multiples of 4 are padded by
+    repeating their edge pixels.
+
+    Args:
+        rgba: Pixel array of shape (height, width, channels)
+
+    Returns:
+        Array of shape (block_count, 16, channels) in block row-major order
+    """
+    height, width, channels = rgba.shape
+    pad_h = (-height) % 4
+    pad_w = (-width) % 4
+    if pad_h or pad_w:
+        rgba = np.pad(rgba, ((0, pad_h), (0, pad_w), (0, 0)), mode='edge')
+
+    blocks_y = rgba.shape[0] // 4
+    blocks_x = rgba.shape[1] // 4
+
+    blocks = rgba.reshape(blocks_y, 4, blocks_x, 4, channels)
+    blocks = blocks.transpose(0, 2, 1, 3, 4)
+    return blocks.reshape(blocks_y * blocks_x, 16, channels)
+
+
+def unblockify(blocks: np.ndarray, width: int, height: int) -> np.ndarray:
+    """
+    Reassemble 4x4 pixel blocks into an image (inverse of blockify).
+
+    Args:
+        blocks: Array of shape (block_count, 16, channels) in block
+            row-major order
+        width: Image width in pixels
+        height: Image height in pixels
+
+    Returns:
+        Array of shape (height, width, channels)
+    """
+    blocks_x = max(1, (width + 3) // 4)
+    blocks_y = max(1, (height + 3) // 4)
+    channels = blocks.shape[-1]
+
+    image = blocks.reshape(blocks_y, blocks_x, 4, 4, channels)
+    image = image.transpose(0, 2, 1, 3, 4)
+    image = image.reshape(blocks_y * 4, blocks_x * 4, channels)
+    return image[:height, :width]
+
+
+def _check_quality(quality: str) -> str:
+    """Validate a quality tier name."""
+    quality = quality.upper()
+    if quality not in QUALITY_LEVELS:
+        raise ValueError(f"Unknown DXT quality: {quality}")
+    return quality
+
+
+# ============================================================================
+# RGB565 Helpers
+# ============================================================================
+
+def quantize_565(colors: np.ndarray) -> np.ndarray:
+    """
+    Quantize float RGB colors (0-255) to packed RGB565 values.
+
+    Args:
+        colors: Array of shape (..., 3)
+
+    Returns:
+        uint16 array of shape (...)
+    """
+    colors = np.clip(colors, 0.0, 255.0)
+    r = np.rint(colors[..., 0] * (31.0 / 255.0)).astype(np.uint16)
+    g = np.rint(colors[..., 1] * (63.0 / 255.0)).astype(np.uint16)
+    b = np.rint(colors[..., 2] * (31.0 / 255.0)).astype(np.uint16)
+    return (r << 11) | (g << 5) | b
+
+
+def expand_565(packed: np.ndarray) -> np.ndarray:
+    """
+    Expand packed RGB565 values to float RGB colors (0-255).
+
+    Args:
+        packed: uint16 array of shape (...)
+
+    Returns:
+        float32 array of shape (..., 3)
+    """
+    packed = packed.astype(np.uint16)
+    r = (packed >> 11) & 0x1F
+    g = (packed >> 5) & 0x3F
+    b = packed & 0x1F
+    r = (r << 3) | (r >> 2)
+    g = (g << 2) | (g >> 4)
+    b = (b << 3) | (b >> 2)
+    return np.stack([r, g, b], axis=-1).astype(np.float32)
+
+
+# ============================================================================
+# Color Endpoint Fitting
+# ============================================================================
+
+def _dot3(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Dot product over a trailing RGB axis (faster than a size-3 reduction)."""
+    return a[..., 0] * b[..., 0] + a[..., 1] * b[..., 1] + a[..., 2] * b[..., 2]
+
+
+def _principal_axis(points: np.ndarray, mask: np.ndarray) -> tuple:
+    """
+    Compute the weighted centroid and principal axis of each block.
+
+    Args:
+        points: float32 array of shape (N, 16, 3)
+        mask: bool array of shape (N, 16) selecting the pixels to use
+
+    Returns:
+        Tuple of (centroid (N, 3), axis (N, 3))
+    """
+    weights = mask.astype(np.float32)
+    counts = np.maximum(weights.sum(axis=1), 1.0)
+
+    centroid = (points * weights[..., None]).sum(axis=1) / counts[:, None]
+    centered = (points - centroid[:, None, :]) * weights[..., None]
+    r, g, b = centered[..., 0], centered[..., 1], centered[..., 2]
+
+    # Symmetric 3x3 covariance, one row of unique terms per block
+    rr = (r * r).sum(axis=1)
+    gg = (g * g).sum(axis=1)
+    bb = (b * b).sum(axis=1)
+    rg = (r * g).sum(axis=1)
+    rb = (r * b).sum(axis=1)
+    gb = (g * b).sum(axis=1)
+
+    # Power iteration, seeded with the channel of largest variance
+    diagonal = np.stack([rr, gg, bb], axis=1)
+    axis = np.zeros_like(centroid)
+    axis[np.arange(len(axis)), diagonal.argmax(axis=1)] = 1.0
+
+    for _ in range(4):
+        x, y, z = axis[:, 0], axis[:, 1], axis[:, 2]
+        axis = np.stack([
+            rr * x + rg * y + rb * z,
+            rg * x + gg * y + gb * z,
+            rb * x + gb * y + bb * z,
+        ], axis=1)
+        scale = np.abs(axis).max(axis=1, keepdims=True)
+        axis = axis / np.maximum(scale, 1e-8)
+
+    length = np.sqrt(_dot3(axis, axis))[:, None]
+    axis = axis / np.maximum(length, 1e-8)
+    return centroid, axis
+
+
+def range_fit_endpoints(points: np.ndarray, mask: np.ndarray) -> tuple:
+    """
+    Pick color endpoints at the extremes of each block's principal axis.
+
+    Args:
+        points: float32 array of shape (N, 16, 3)
+        mask: bool array of shape (N, 16) selecting the pixels to use
+
+    Returns:
+        Tuple of (start (N, 3), end (N, 3)) float colors
+    """
+    centroid, axis = _principal_axis(points, mask)
+    projection = _dot3(points - centroid[:, None, :], axis[:, None, :])
+
+    low = np.where(mask, projection, np.inf).min(axis=1)
+    high = np.where(mask, projection, -np.inf).max(axis=1)
+    low = np.where(np.isfinite(low), low, 0.0)
+    high = np.where(np.isfinite(high), high, 0.0)
+
+    start = centroid + axis * high[:, None]
+    end = centroid + axis * low[:, None]
+    return np.clip(start, 0.0, 255.0), np.clip(end, 0.0, 255.0)
+
+
+def _build_cluster_partitions() -> tuple:
+    """
+    Enumerate every split of 16 ordered pixels into 4 consecutive clusters.
+
+    Returns:
+        Tuple of (selector (P, 17), alpha2 (P,), beta2 (P,), alphabeta (P,)).
+        Multiplying selector by a block's pixel prefix sums gives the sum
+        of the pixels weighted by their start endpoint weight for each
+        split; the other terms are the least squares normal equations.
+    """
+    boundaries = np.array(
+        list(itertools.combinations_with_replacement(range(17), 3)),
+        dtype=np.intp
+    )
+
+    s1, s2, s3 = boundaries.T
+    c0 = s1
+    c1 = s2 - s1
+    c2 = s3 - s2
+    c3 = 16 - s3
+
+    # Interpolation weights of the 4 palette entries are 1, 2/3, 1/3 and 0,
+    # so the weighted pixel sum collapses to a third of three prefix sums
+    selector = np.zeros((len(boundaries), 17), dtype=np.float32)
+    for column in range(3):
+        np.add.at(selector, (np.arange(len(boundaries)), boundaries[:, column]), 1.0 / 3.0)
+
+    alpha2 = c0 + c1 * (4.0 / 9.0) + c2 * (1.0 / 9.0)
+    beta2 = c1 * (1.0 / 9.0) + c2 * (4.0 / 9.0) + c3
+    alphabeta = (c1 + c2) * (2.0 / 9.0)
+
+    return (
+        selector,
+        alpha2.astype(np.float32),
+        beta2.astype(np.float32),
+        alphabeta.astype(np.float32),
+    )
+
+
+_CLUSTER_PARTITIONS = _build_cluster_partitions()
+
+
+def cluster_fit_endpoints(points: np.ndarray) -> tuple:
+    """
+    Pick 4-color mode endpoints by cluster fit.
+
+    Pixels are ordered along each block's principal axis and every split
+    into 4 consecutive clusters is solved by least squares. The split
+    explaining the most of the block's energy wins.
+
+    Args:
+        points: float32 array of shape (N, 16, 3)
+
+    Returns:
+        Tuple of (start (N, 3), end (N, 3)) float colors
+    """
+    selector, alpha2, beta2, alphabeta = _CLUSTER_PARTITIONS
+    determinant = alpha2 * beta2 - alphabeta * alphabeta
+    valid = determinant > 1e-6
+    inverse = np.where(valid, 1.0 / np.where(valid, determinant, 1.0), 0.0)[:, None]
+    alpha2 = alpha2[:, None]
+    beta2 = beta2[:, None]
+    alphabeta = alphabeta[:, None]
+
+    start = np.empty((len(points), 3), dtype=np.float32)
+    end = np.empty((len(points), 3), dtype=np.float32)
+
+    for first in range(0, len(points), _CLUSTER_FIT_BATCH):
+        batch = points[first:first + _CLUSTER_FIT_BATCH]
+        count = len(batch)
+        mask = np.ones(batch.shape[:2], dtype=bool)
+
+        centroid, axis = _principal_axis(batch, mask)
+        projection = _dot3(batch - centroid[:, None, :], axis[:, None, :])
+        order = np.argsort(projection, axis=1)
+        ordered = np.take_along_axis(batch, order[..., None], axis=1)
+
+        # Channel-first prefix sums (3, 17, N) so every split is one matmul
+        prefix = np.zeros((3, 17, count), dtype=np.float32)
+        np.cumsum(ordered.transpose(2, 1, 0), axis=1, out=prefix[:, 1:])
+        total = prefix[:, 16]
+
+        alphax = selector @ prefix
+
+        # At the least squares optimum the error is the block's energy
+        # minus a.alphax + b.betax; expand that with betax = total - alphax
+        alphax_sq = alphax[0] * alphax[0] + alphax[1] * alphax[1] + alphax[2] * alphax[2]
+        alphax_total = selector @ (prefix * total[:, None, :]).sum(axis=0)
+        total_sq = (total * total).sum(axis=0)
+
+        explained = inverse * (
+            beta2 * alphax_sq
+            - 2.0 * alphabeta * (alphax_total - alphax_sq)
+            + alpha2 * (total_sq - 2.0 * alphax_total + alphax_sq)
+        )
+        explained[~valid] = -np.inf
+
+        best = explained.argmax(axis=0)
+        rows = np.arange(count)
+        best_alphax = alphax[:, best, rows].T
+        best_betax = total.T - best_alphax
+        best_alpha2 = alpha2[best]
+        best_beta2 = beta2[best]
+        best_alphabeta = alphabeta[best]
+        best_inverse = inverse[best]
+
+        start[first:first + count] = (
+            best_alphax * best_beta2 - best_betax * best_alphabeta
+        ) * best_inverse
+        end[first:first + count] = (
+            best_betax * best_alpha2 - best_alphax * best_alphabeta
+        ) * best_inverse
+
+    return np.clip(start, 0.0, 255.0), np.clip(end, 0.0, 255.0)
+
+
+# ============================================================================
+# Color Block Encoding
+# ============================================================================
+
+def _line_indices(points: np.ndarray, p0: np.ndarray, p1: np.ndarray, steps: int) -> np.ndarray:
+    """
+    Pick the nearest step along the line from p0 to p1 for every pixel.
+
+    Args:
+        points: float32 array of shape (N, 16, 3)
+        p0: float32 array of shape (N, 3)
+        p1: float32 array of shape (N, 3)
+        steps: Number of intervals on the line (3 for 4 colors, 2 for 3)
+
+    Returns:
+        int array of shape (N, 16) with values 0..steps
+    """
+    direction = p1 - p0
+    length2 = _dot3(direction, direction)
+    scale = np.where(length2 > 0, steps / np.where(length2 > 0, length2, 1.0), 0.0)
+    t = _dot3(points - p0[:, None, :], direction[:, None, :]) * scale[:, None]
+    return np.clip(np.rint(t), 0, steps).astype(np.intp)
+
+
+def _nearest_indices(points: np.ndarray, palette: np.ndarray) -> tuple:
+    """
+    Find the nearest palette entry for every pixel.
+
+    Args:
+        points: float32 array of shape (N, 16, 3)
+        palette: float32 array of shape (N, P, 3)
+
+    Returns:
+        Tuple of (indices uint8 (N, 16), squared error (N, 16))
+    """
+    diff = points[:, :, None, :] - palette[:, None, :, :]
+    distance = _dot3(diff, diff)
+    indices = distance.argmin(axis=2)
+    error = np.take_along_axis(distance, indices[..., None], axis=2)[..., 0]
+    return indices.astype(np.uint8), error
+
+
+def _pack_indices(indices: np.ndarray, shifts: np.ndarray) -> np.ndarray:
+    """Pack per-pixel indices of shape (N, 16) into one integer per block."""
+    return (indices.astype(np.uint64) << shifts).sum(axis=1, dtype=np.uint64)
+
+
+def encode_color_blocks(
+    points: np.ndarray,
+    start: np.ndarray,
+    end: np.ndarray,
+    transparent: np.ndarray = None,
+    exact: bool = False
+) -> tuple:
+    """
+    Encode color blocks from chosen endpoints.
+
+    Blocks without transparent pixels use the 4-color mode. Blocks with
+    transparent pixels (DXT1 only) use the 3-color mode, where index 3
+    is transparent black.
+
+    Args:
+        points: float32 array of shape (N, 16, 3)
+        start: float32 array of shape (N, 3)
+        end: float32 array of shape (N, 3)
+        transparent: Optional bool array of shape (N, 16)
+        exact: Pick indices by exact palette distance instead of by
+            projection onto the endpoint line, and report the error
+
+    Returns:
+        Tuple of (blocks, error). blocks is a uint64 array of shape (N,)
+        holding the little-endian 8-byte blocks; error is the per-block
+        squared error when exact is True, otherwise None
+    """
+    count = len(points)
+    if transparent is None:
+        transparent = np.zeros((count, 16), dtype=bool)
+    punch_through = transparent.any(axis=1)
+
+    color0 = quantize_565(start)
+    color1 = quantize_565(end)
+
+    # 4-color mode requires color0 > color1, 3-color mode color0 <= color1
+    swap = np.where(punch_through, color0 > color1, color0 < color1)
+    color0, color1 = np.where(swap, color1, color0), np.where(swap, color0, color1)
+
+    p0 = expand_565(color0)
+    p1 = expand_565(color1)
+
+    error = None
+    if exact:
+        four_color = np.stack([p0, p1, (2 * p0 + p1) / 3, (p0 + 2 * p1) / 3], axis=1)
+        three_color = np.stack([p0, p1, (p0 + p1) / 2, (p0 + p1) / 2], axis=1)
+        palette = np.where(punch_through[:, None, None], three_color, four_color)
+        indices, pixel_error = _nearest_indices(points, palette)
+        indices[transparent] = 3
+        error = np.where(transparent, 0.0, pixel_error).sum(axis=1)
+    else:
+        four_color = _FOUR_COLOR_ORDER[_line_indices(points, p0, p1, 3)]
+        three_color = _THREE_COLOR_ORDER[_line_indices(points, p0, p1, 2)]
+        indices = np.where(punch_through[:, None], three_color, four_color)
+        indices[transparent] = 3
+
+    # Equal endpoints in 4-color mode would decode as 3-color mode
+    solid = (color0 == color1) & ~punch_through
+    indices[solid] = 0
+
+    packed = _pack_indices(indices, _COLOR_INDEX_SHIFTS)
+    blocks = (
+        color0.astype(np.uint64)
+        | (color1.astype(np.uint64) << np.uint64(16))
+        | (packed << np.uint64(32))
+    )
+    return blocks, error
+
+
+def compress_color_blocks(
+    blocks: np.ndarray,
+    transparent: np.ndarray = None,
+    quality: str = QUALITY_FAST
+) -> np.ndarray:
+    """
+    Compress the RGB part of pixel blocks into 8-byte color blocks.
+
+    Args:
+        blocks: uint8 array of shape (N, 16, 4)
+        transparent: Optional bool array of shape (N, 16) of pixels to
+            encode as DXT1 transparent black
+        quality: QUALITY_FAST or QUALITY_HIGH
+
+    Returns:
+        uint64 array of shape (N,)
+    """
+    quality = _check_quality(quality)
+    points = blocks[..., :3].astype(np.float32)
+    mask = np.ones(points.shape[:2], dtype=bool) if transparent is None else ~transparent
+
+    start, end = range_fit_endpoints(points, mask)
+    if quality == QUALITY_FAST:
+        return encode_color_blocks(points, start, end, transparent)[0]
+
+    encoded, error = encode_color_blocks(points, start, end, transparent, exact=True)
+
+    # Cluster fit only applies to the 4-color mode
+    opaque = np.ones(len(points), dtype=bool) if transparent is None else ~transparent.any(axis=1)
+    if opaque.any():
+        cluster_start, cluster_end = cluster_fit_endpoints(points[opaque])
+        cluster_encoded, cluster_error = encode_color_blocks(
+            points[opaque], cluster_start, cluster_end, exact=True
+        )
+        better = cluster_error < error[opaque]
+        selected = np.flatnonzero(opaque)[better]
+        encoded[selected] = cluster_encoded[better]
+
+    return encoded
+
+
+# ============================================================================
+# Alpha Block Encoding
+# ============================================================================
+
+def _pack_alpha_blocks(alpha0: np.ndarray, alpha1: np.ndarray, indices: np.ndarray) -> np.ndarray:
+    """Pack DXT5 alpha endpoints and 3-bit indices into uint64 blocks."""
+    packed = _pack_indices(indices, _ALPHA_INDEX_SHIFTS)
+    return (
+        alpha0.astype(np.uint64)
+        | (alpha1.astype(np.uint64) << np.uint64(8))
+        | (packed << np.uint64(16))
+    )
+
+
+def _alpha_palette(alpha0: np.ndarray, alpha1: np.ndarray) -> np.ndarray:
+    """
+    Build the 8-entry DXT5 alpha palette for each block.
+
+    Args:
+        alpha0: float32 array of shape (N,)
+        alpha1: float32 array of shape (N,)
+
+    Returns:
+        float32 array of shape (N, 8)
+    """
+    eight = np.arange(1, 7, dtype=np.float32) / 7.0
+    six = np.arange(1, 5, dtype=np.float32) / 5.0
+
+    eight_values = alpha0[:, None] * (1.0 - eight) + alpha1[:, None] * eight
+    six_values = alpha0[:, None] * (1.0 - six) + alpha1[:, None] * six
+    six_values = np.concatenate([
+        six_values,
+        np.zeros((len(alpha0), 1), dtype=np.float32),
+        np.full((len(alpha0), 1), 255.0, dtype=np.float32),
+    ], axis=1)
+
+    interpolated = np.where((alpha0 > alpha1)[:, None], eight_values, six_values)
+    return np.concatenate([alpha0[:, None], alpha1[:, None], np.floor(interpolated)], axis=1)
+
+
+def _exact_alpha_indices(alpha: np.ndarray, alpha0: np.ndarray, alpha1: np.ndarray) -> tuple:
+    """Pick the nearest alpha palette entry for every pixel and report error."""
+    palette = _alpha_palette(alpha0, alpha1)
+    distance = np.abs(alpha[:, :, None] - palette[:, None, :])
+    indices = distance.argmin(axis=2)
+    error = np.take_along_axis(distance, indices[..., None], axis=2)[..., 0]
+    return indices.astype(np.uint8), (error * error).sum(axis=1)
+
+
+def encode_dxt5_alpha_blocks(alpha: np.ndarray, quality: str = QUALITY_FAST) -> np.ndarray:
+    """
+    Encode interpolated (DXT5) alpha blocks.
+
+    The fast tier always uses the 8-value mode spanning the block's alpha
+    range. The high tier also tries the 6-value mode, which has exact 0
+    and 255 entries, and keeps whichever has less error.
+
+    Args:
+        alpha: uint8 array of shape (N, 16)
+        quality: QUALITY_FAST or QUALITY_HIGH
+
+    Returns:
+        uint64 array of shape (N,) holding the little-endian 8-byte blocks
+    """
+    quality = _check_quality(quality)
+    alpha = alpha.astype(np.float32)
+    alpha0 = alpha.max(axis=1)
+    alpha1 = alpha.min(axis=1)
+
+    if quality == QUALITY_FAST:
+        span = alpha0 - alpha1
+        scale = np.where(span > 0, 7.0 / np.where(span > 0, span, 1.0), 0.0)
+        steps = np.clip(np.rint((alpha0[:, None] - alpha) * scale[:, None]), 0, 7)
+        indices = _ALPHA8_ORDER[steps.astype(np.intp)]
+        return _pack_alpha_blocks(alpha0, alpha1, indices)
+
+    indices, error = _exact_alpha_indices(alpha, alpha0, alpha1)
+
+    # 6-value mode: endpoints span the values strictly between 0 and 255
+    inner = (alpha > 0) & (alpha < 255)
+    low = np.where(inner, alpha, 255.0).min(axis=1)
+    high = np.where(inner, alpha, 0.0).max(axis=1)
+    low, high = np.minimum(low, high), np.maximum(low, high)
+    six_indices, six_error = _exact_alpha_indices(alpha, low, high)
+
+    use_six = six_error < error
+    alpha0 = np.where(use_six, low, alpha0)
+    alpha1 = np.where(use_six, high, alpha1)
+    indices = np.where(use_six[:, None], six_indices, indices)
+    return _pack_alpha_blocks(alpha0, alpha1, indices)
+
+
+def encode_dxt3_alpha_blocks(alpha: np.ndarray) -> np.ndarray:
+    """
+    Encode explicit 4-bit (DXT3) alpha blocks.
+
+    Args:
+        alpha: uint8 array of shape (N, 16)
+
+    Returns:
+        uint64 array of shape (N,) holding the little-endian 8-byte blocks
+    """
+    quantized = np.rint(alpha.astype(np.float32) * (15.0 / 255.0)).astype(np.uint8)
+    return _pack_indices(quantized, _EXPLICIT_ALPHA_SHIFTS)
+
+
+# ============================================================================
+# Public Compression API
+# ============================================================================
+
+def _to_bytes(*block_arrays: np.ndarray) -> bytes:
+    """Interleave per-block uint64 arrays and serialize them little-endian."""
+    interleaved = np.stack(block_arrays, axis=1).astype('<u8')
+    return interleaved.tobytes()
+
+
+def compress_dxt1(
+    rgba: np.ndarray,
+    alpha_threshold: int = DXT1_ALPHA_THRESHOLD,
+    quality: str = QUALITY_FAST
+) -> bytes:
+    """
+    Compress an image to DXT1.
+
+    Pixels with alpha below alpha_threshold are encoded as transparent
+    using DXT1's 1-bit alpha mode.
+
+    Args:
+        rgba: uint8 array of shape (height, width, 4)
+        alpha_threshold: Alpha cutoff for 1-bit transparency (0 disables it)
+        quality: QUALITY_FAST or QUALITY_HIGH
+
+    Returns:
+        bytes: DXT1 block data
+    """
+    blocks = blockify(rgba)
+    transparent = blocks[..., 3] < alpha_threshold
+    return _to_bytes(compress_color_blocks(blocks, transparent, quality))
+
+
+def compress_dxt3(rgba: np.ndarray, quality: str = QUALITY_FAST) -> bytes:
+    """
+    Compress an image to DXT3 (explicit alpha).
+
+    Args:
+        rgba: uint8 array of shape (height, width, 4)
+        quality: QUALITY_FAST or QUALITY_HIGH
+
+    Returns:
+        bytes: DXT3 block data
+    """
+    blocks = blockify(rgba)
+    alpha_blocks = encode_dxt3_alpha_blocks(blocks[..., 3])
+    return _to_bytes(alpha_blocks, compress_color_blocks(blocks, quality=quality))
+
+
+def compress_dxt5(rgba: np.ndarray, quality: str = QUALITY_FAST) -> bytes:
+    """
+    Compress an image to DXT5 (interpolated alpha).
+
+    Args:
+        rgba: uint8 array of shape (height, width, 4)
+        quality: QUALITY_FAST or QUALITY_HIGH
+
+    Returns:
+        bytes: DXT5 block data
+    """
+    blocks = blockify(rgba)
+    alpha_blocks = encode_dxt5_alpha_blocks(blocks[..., 3], quality)
+    return _to_bytes(alpha_blocks, compress_color_blocks(blocks, quality=quality))
+
+
+# ============================================================================
+# Block Decompression
+# ============================================================================
+
+def _read_blocks(data, width: int, height: int, block_size: int) -> np.ndarray:
+    """
+    View block data as one little-endian uint64 per 8 bytes.
+
+    Returns:
+        uint64 array of shape (block_count, block_size // 8)
+    """
+    count = get_block_count(width, height)
+    blocks = np.frombuffer(data, dtype='<u8', count=count * block_size // 8)
+    return blocks.reshape(count, block_size // 8).astype(np.uint64)
+
+
+def _unpack_indices(packed: np.ndarray, shifts: np.ndarray, bits: int) -> np.ndarray:
+    """Unpack one integer per block into per-pixel indices of shape (N, 16)."""
+    mask = np.uint64((1 << bits) - 1)
+    return ((packed[:, None] >> shifts) & mask).astype(np.intp)
+
+
+def decode_color_blocks(blocks: np.ndarray, allow_transparent: bool) -> np.ndarray:
+    """
+    Decode 8-byte color blocks into RGBA pixels.
+
+    Args:
+        blocks: uint64 array of shape (N,)
+        allow_transparent: Whether color0 <= color1 selects the 3-color
+            mode with transparent black (DXT1). DXT3/DXT5 color blocks
+            always use the 4-color mode.
+
+    Returns:
+        uint8 array of shape (N, 16, 4)
+    """
+    color0 = (blocks & np.uint64(0xFFFF)).astype(np.uint16)
+    color1 = ((blocks >> np.uint64(16)) & np.uint64(0xFFFF)).astype(np.uint16)
+    indices = _unpack_indices(blocks >> np.uint64(32), _COLOR_INDEX_SHIFTS, 2)
+
+    p0 = expand_565(color0)
+    p1 = expand_565(color1)
+    alpha = np.full((len(blocks), 1), 255.0, dtype=np.float32)
+
+    four_color = np.stack([
+        np.concatenate([p0, alpha], axis=1),
+        np.concatenate([p1, alpha], axis=1),
+        np.concatenate([(2 * p0 + p1) / 3, alpha], axis=1),
+        np.concatenate([(p0 + 2 * p1) / 3, alpha], axis=1),
+    ], axis=1)
+
+    palette = four_color
+    if allow_transparent:
+        three_color = np.stack([
+            four_color[:, 0],
+            four_color[:, 1],
+            np.concatenate([(p0 + p1) / 2, alpha], axis=1),
+            np.zeros((len(blocks), 4), dtype=np.float32),
+        ], axis=1)
+        palette = np.where((color0 > color1)[:, None, None], four_color, three_color)
+
+    palette = np.rint(palette).astype(np.uint8)
+    return np.take_along_axis(palette, indices[..., None], axis=1)
+
+
+def decode_dxt5_alpha_blocks(blocks: np.ndarray) -> np.ndarray:
+    """
+    Decode interpolated (DXT5) alpha blocks.
+
+    Args:
+        blocks: uint64 array of shape (N,)
+
+    Returns:
+        uint8 array of shape (N, 16)
+    """
+    alpha0 = (blocks & np.uint64(0xFF)).astype(np.float32)
+    alpha1 = ((blocks >> np.uint64(8)) & np.uint64(0xFF)).astype(np.float32)
+    indices = _unpack_indices(blocks >> np.uint64(16), _ALPHA_INDEX_SHIFTS, 3)
+
+    palette = _alpha_palette(alpha0, alpha1).astype(np.uint8)
+    return np.take_along_axis(palette, indices, axis=1)
+
+
+def decode_dxt3_alpha_blocks(blocks: np.ndarray) -> np.ndarray:
+    """
+    Decode explicit 4-bit (DXT3) alpha blocks.
+
+    Args:
+        blocks: uint64 array of shape (N,)
+
+    Returns:
+        uint8 array of shape (N, 16)
+    """
+    return (_unpack_indices(blocks, _EXPLICIT_ALPHA_SHIFTS, 4) * 17).astype(np.uint8)
+
+
+def decompress_dxt1(data, width: int, height: int) -> np.ndarray:
+    """
+    Decompress DXT1 block data.
+
+    Args:
+        data: Buffer holding at least the image's block data
+        width: Image width in pixels
+        height: Image height in pixels
+
+    Returns:
+        uint8 array of shape (height, width, 4)
+    """
+    blocks = _read_blocks(data, width, height, 8)
+    pixels = decode_color_blocks(blocks[:, 0], allow_transparent=True)
+    return unblockify(pixels, width, height)
+
+
+def decompress_dxt3(data, width: int, height: int) -> np.ndarray:
+    """
+    Decompress DXT3 block data.
+
+    Args:
+        data: Buffer holding at least the image's block data
+        width: Image width in pixels
+        height: Image height in pixels
+
+    Returns:
+        uint8 array of shape (height, width, 4)
+    """
+    blocks = _read_blocks(data, width, height, 16)
+    pixels = decode_color_blocks(blocks[:, 1], allow_transparent=False)
+    pixels[..., 3] = decode_dxt3_alpha_blocks(blocks[:, 0])
+    return unblockify(pixels, width, height)
+
+
+def decompress_dxt5(data, width: int, height: int) -> np.ndarray:
+    """
+    Decompress DXT5 block data.
+
+    Args:
+        data: Buffer holding at least the image's block data
+        width: Image width in pixels
+        height: Image height in pixels
+
+    Returns:
+        uint8 array of shape (height, width, 4)
+    """
+    blocks = _read_blocks(data, width, height, 16)
+    pixels = decode_color_blocks(blocks[:, 1], allow_transparent=False)
+    pixels[..., 3] = decode_dxt5_alpha_blocks(blocks[:, 0])
+    return unblockify(pixels, width, height)
@@ -3,15 +3,27 @@ Core logic for Material to VTF conversion.
 
 This module handles:
 - Extracting textures from Blender materials
-- Converting images to VTF format using VTFCmd
+- Converting images to VTF format using VTFCmd or the built-in encoder
 - Generating VMT files with Source Engine shader parameters
 """
 import os
 import shutil
-import subprocess
 from pathlib import Path
+from types import SimpleNamespace
+from concurrent.futures import BrokenExecutor, Executor
 from typing import Dict, List, Optional, Tuple, Any
 
+import numpy as np
+
+from .build_cache import BuildCache, hash_bytes, hash_settings
+from .image_resize import resize_to_power_of_two
+from .vtf_writer import (
+    write_vtf,
+    select_image_format,
+    TEXTUREFLAGS_NORMAL,
+)
+from ..utils.threading_utils import TaskToken, task_manager
+
 
 def get_image_texture_node(material) -> Optional[Any]:
     """
@@ -326,6 +338,95 @@ def write_vmt_file(output_path: str, material_name: str, vmt_content: str) -> st
     return vmt_filepath
 
 
+def snapshot_vmt_jobs(
+    material_objects,
+    additional_textures: Dict[str, Dict[str, str]]
+) -> List[Dict[str, Any]]:
+    """
+    Snapshot the data write_vmt_files needs, on the main thread.
+    
+    Args:
+        material_objects: Material list items with 'material_name' and
+            'vmt_params'
+        additional_textures: Mapping of material names to their
+            {texture type: VTF path} (see process_additional_textures)
+        
+    Returns:
+        List of dicts with 'name', 'vmt_params' (a plain copy of the
+        property group), 'normal_texture' and 'phong_texture'
+    """
+    jobs = []
+    for mat_object in material_objects:
+        params = mat_object.vmt_params
+        values = {}
+        for prop in params.bl_rna.properties:
+            if prop.identifier == 'rna_type':
+                continue
+            value = getattr(params, prop.identifier)
+            # Vector properties are views into Blender data
+            values[prop.identifier] = tuple(value) if getattr(prop, 'is_array', False) else value
+        
+        textures = additional_textures.get(mat_object.material_name, {})
+        jobs.append({
+            'name': mat_object.material_name,
+            'vmt_params': SimpleNamespace(**values),
+            'normal_texture': (
+                os.path.splitext(os.path.basename(textures['normal']))[0]
+                if 'normal' in textures else None
+            ),
+            'phong_texture': (
+                os.path.splitext(os.path.basename(textures['phong']))[0]
+                if 'phong' in textures else None
+            ),
+        })
+    return jobs
+
+
+def write_vmt_files(
+    vmt_jobs: List[Dict[str, Any]],
+    output_path: str,
+    shader_type: str,
+    global_params: Optional[Dict[str, bool]] = None
+) -> Dict[str, Any]:
+    """
+    Write a VMT file for each snapshotted material.
+    
+    Safe to call from a background thread.
+    
+    Args:
+        vmt_jobs: Job dicts from snapshot_vmt_jobs
+        output_path: Directory the VTF and VMT files are in
+        shader_type: Source Engine shader type
+        global_params: Global VMT parameters (additive, translucent, nocull)
+        
+    Returns:
+        dict with 'written' (VMT paths) and 'errors' (material name to
+        error message)
+    """
+    materials_relative_path = get_materials_relative_path(output_path)
+    written = []
+    errors = {}
+    
+    for job in vmt_jobs:
+        try:
+            vmt_content = generate_vmt_content(
+                job['name'],
+                job['vmt_params'],
+                shader_type,
+                job['name'],
+                job['normal_texture'],
+                job['phong_texture'],
+                materials_relative_path,
+                global_params
+            )
+            written.append(write_vmt_file(output_path, job['name'], vmt_content))
+        except Exception as e:
+            errors[job['name']] = str(e)
+            print(f"VMT generation error for {job['name']}: {e}")
+    
+    return {'written': written, 'errors': errors}
+
+
 def build_vtfcmd_command(
     vtfcmd_exe: str,
     image_paths: List[str],
@@ -338,6 +439,7 @@ def build_vtfcmd_command(
     resize_method: str = 'BIGGEST',
     resize_filter: str = 'TRIANGLE',
     clamp_size: str = '512x512',
+    mip_filter: str = 'BOX',
     shader: Optional[str] = None,
     vmt_params: Optional[Dict[str, bool]] = None,
     additional_texture_paths: Optional[Dict[str, List[str]]] = None
@@ -357,6 +459,7 @@ def build_vtfcmd_command(
         resize_method: Resize method
         resize_filter: Resize filter algorithm
         clamp_size: Maximum texture dimensions
+        mip_filter: Mipmap filter algorithm
         shader: Shader type for VMT generation (None to skip VMT)
         vmt_params: VMT parameters (additive, translucent, nocull)
         additional_texture_paths: Additional textures to process
@@ -418,6 +521,8 @@ def build_vtfcmd_command(
         command_line.extend(["-rclampwidth", clamp_value])
         command_line.extend(["-rclampheight", clamp_value])
     
+    command_line.extend(["-mfilter", mip_filter])
+    
     # Add VMT shader parameters if enabled
     if shader:
         command_line.extend(["-shader", shader])
@@ -439,35 +544,299 @@ def build_vtfcmd_command(
     return command_line
 
 
-def execute_vtfcmd(command_line: List[str]) -> Tuple[bool, str, str]:
+def read_image_pixels(image) -> np.ndarray:
+    """
+    Read a Blender image into an 8-bit RGBA pixel array.
+    
+    Must be called from the main thread.
+    
+    Args:
+        image: Blender image datablock
+        
+    Returns:
+        uint8 array of shape (height, width, 4), rows ordered top to bottom
+    """
+    width, height = image.size
+    channels = image.channels
+    
+    pixels = np.empty(width * height * channels, dtype=np.float32)
+    image.pixels.foreach_get(pixels)
+    pixels = pixels.reshape(height, width, channels)[::-1]
+    
+    # Float buffers hold linear values; encode color data back to sRGB
+    if image.is_float and image.colorspace_settings.name != 'Non-Color':
+        rgb = np.clip(pixels[..., :3], 0.0, 1.0)
+        pixels[..., :3] = np.where(
+            rgb <= 0.0031308,
+            rgb * 12.92,
+            1.055 * np.power(rgb, 1.0 / 2.4) - 0.055
+        )
+    
+    # Expand grayscale and RGB images to RGBA
+    rgba = np.ones((height, width, 4), dtype=np.float32)
+    rgba[..., :3] = pixels[..., :3] if channels >= 3 else pixels[..., :1]
+    if channels in (2, 4):
+        rgba[..., 3] = pixels[..., -1]
+    
+    return np.rint(np.clip(rgba, 0.0, 1.0) * 255.0).astype(np.uint8)
+
+
+def get_additional_texture_images(material_name: str, vmt_params) -> Dict[str, Tuple[str, Any]]:
+    """
+    Get the normal and phong exponent images for a material.
+    
+    Args:
+        material_name: Name of the material
+        vmt_params: VMT parameters property group
+        
+    Returns:
+        Dictionary mapping texture type to (texture_name, image)
+    """
+    additional_images = {}
+    
+    if vmt_params.normal_map:
+        additional_images['normal'] = (f"{material_name}_n", vmt_params.normal_map)
+    
+    if vmt_params.phong_exponent_map:
+        additional_images['phong'] = (f"{material_name}_e", vmt_params.phong_exponent_map)
+    
+    return additional_images
+
+
+def filter_unchanged_vtfcmd_sources(
+    cache: BuildCache,
+    image_paths: List[str],
+    image_name_mapping: Dict[str, str],
+    additional_texture_paths: Dict[str, List[str]],
+    output_path: str,
+    settings_hash: str
+) -> Dict[str, Any]:
     """
-    Execute VTFCmd with the given arguments.
+    Drop VTFCmd sources whose VTF outputs are up to date.
     
     Args:
-        command_line: List of command line arguments
+        cache: Build cache of the material output folder
+        image_paths: Base texture source paths
+        image_name_mapping: Mapping of image paths to material names
+        additional_texture_paths: Additional textures by type
+        output_path: Output directory for VTF files
+        settings_hash: Hash of the conversion settings
         
     Returns:
-        Tuple of (success, stdout, stderr)
+        dict with the remaining 'image_paths' and
+        'additional_texture_paths', 'pending' (output path -> (source
+        path, source hash) to record once converted) and 'skipped' count
+    """
+    pending = {}
+    skipped = 0
+    
+    def needs_build(source_path: str, output_name: str) -> bool:
+        nonlocal skipped
+        vtf_path = os.path.join(output_path, f"{output_name}.vtf")
+        source_hash = cache.hash_source(source_path)
+        if cache.is_up_to_date(vtf_path, source_hash, settings_hash):
+            skipped += 1
+            return False
+        pending[vtf_path] = (source_path, source_hash)
+        return True
+    
+    remaining_images = [
+        path for path in image_paths
+        if needs_build(path, image_name_mapping[path])
+    ]
+    remaining_additional = {}
+    for texture_type, texture_paths in additional_texture_paths.items():
+        paths = [
+            path for path in texture_paths
+            if needs_build(path, os.path.splitext(os.path.basename(path))[0])
+        ]
+        if paths:
+            remaining_additional[texture_type] = paths
+    
+    return {
+        'image_paths': remaining_images,
+        'additional_texture_paths': remaining_additional,
+        'pending': pending,
+        'skipped': skipped,
+    }
+
+
+def encode_vtf_texture(
+    vtf_path: str,
+    pixels: np.ndarray,
+    flags: int,
+    settings: Dict[str, Any]
+) -> str:
+    """
+    Resize (if enabled) and encode one texture to a VTF file.
+    
+    Pure CPU work on its arguments, so it can run in a worker process.
+    
+    Args:
+        vtf_path: Output VTF file path
+        pixels: uint8 RGBA array
+        flags: VTF texture flags
+        settings: Encoder settings as built by encode_vtf_textures()
+    
+    Returns:
+        str: The written VTF file path
     """
-    try:
-        process = subprocess.Popen(
-            command_line,
-            stdin=subprocess.DEVNULL,
-            stderr=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-            shell=False,
-            text=True
+    if settings['resize']:
+        pixels = resize_to_power_of_two(
+            pixels, settings['resize_method'], settings['resize_filter'], settings['clamp_size']
         )
+    image_format = select_image_format(pixels, settings['format'], settings['alpha_format'])
+    write_vtf(
+        vtf_path,
+        pixels,
+        image_format=image_format,
+        version=settings['version'],
+        flags=flags,
+        quality=settings['quality'],
+        mip_filter=settings['mip_filter']
+    )
+    return vtf_path
+
+
+def encode_vtf_textures(
+    texture_jobs: List[Dict[str, Any]],
+    output_path: str,
+    vtf_format: str = 'dxt5',
+    alpha_format: str = 'dxt5',
+    vtf_version: str = '7.5',
+    quality: str = 'FAST',
+    resize: bool = False,
+    resize_method: str = 'BIGGEST',
+    resize_filter: str = 'TRIANGLE',
+    clamp_size: str = '512x512',
+    mip_filter: str = 'BOX',
+    cache: Optional[BuildCache] = None,
+    executor: Optional[Executor] = None,
+    token: Optional[TaskToken] = None
+) -> Dict[str, Any]:
+    """
+    Encode textures to VTF with the built-in encoder.
+    
+    Safe to call from a background thread; the pixel data must already
+    have been read on the main thread. With a build cache, textures whose
+    pixels and settings are unchanged since the last run are skipped.
+    With an executor (e.g. the task manager's process pool), textures are
+    encoded concurrently on it. Cancelling the token stops the encoder
+    before the next texture; textures already written stay recorded in
+    the build cache.
+    
+    Args:
+        texture_jobs: List of dicts with 'name' (output file stem),
+            'pixels' (uint8 RGBA array) and 'normal' (bool)
+        output_path: Output directory for VTF files
+        vtf_format: Texture compression format
+        alpha_format: Alpha channel compression format
+        vtf_version: VTF file format version
+        quality: DXT compression quality ('FAST' or 'HIGH')
+        resize: Whether to resize images to power-of-two dimensions
+        resize_method: Resize method
+        resize_filter: Resize filter algorithm
+        clamp_size: Maximum texture dimensions
+        mip_filter: Mipmap filter algorithm
+        cache: Optional build cache of the output folder
+        executor: Optional executor the textures are encoded on; if its
+            workers die, it is discarded from the task manager and the
+            remaining textures are encoded in this thread
+        token: Optional task token for progress reporting and cancellation
         
-        stdout, stderr = process.communicate()
+    Returns:
+        dict with 'written' and 'skipped' (lists of file paths) and
+        'errors' (mapping of texture name to error message)
+    
+    Raises:
+        TaskCancelled: If the token was cancelled
+    """
+    if not os.path.exists(output_path):
+        raise FileNotFoundError(f"Material output folder not found: {output_path}")
+    
+    settings = {
+        'tool': 'native',
+        'format': vtf_format,
+        'alpha_format': alpha_format,
+        'version': vtf_version,
+        'quality': quality,
+        'resize': resize,
+        'resize_method': resize_method if resize else None,
+        'resize_filter': resize_filter if resize else None,
+        'clamp_size': clamp_size if resize else None,
+        'mip_filter': mip_filter,
+    }
+    
+    written = []
+    skipped = []
+    errors = {}
+    pending = []
+    broken = False
+    
+    def discard_executor():
+        # A dead worker breaks the whole pool; later textures are encoded
+        # here and the next call gets a fresh pool
+        nonlocal broken
+        if not broken:
+            broken = True
+            task_manager.reset_executor(executor)
+    
+    for job in texture_jobs:
+        flags = TEXTUREFLAGS_NORMAL if job.get('normal') else 0
+        vtf_path = os.path.join(output_path, f"{job['name']}.vtf")
         
-        if process.returncode == 0:
-            return True, stdout, stderr
-        else:
-            return False, stdout, stderr
-            
-    except Exception as e:
-        return False, "", str(e)
+        hashes = None
+        if cache is not None:
+            source_hash = hash_bytes(np.ascontiguousarray(job['pixels']).data)
+            settings_hash = hash_settings(dict(settings, normal=bool(flags)))
+            if cache.is_up_to_date(vtf_path, source_hash, settings_hash):
+                skipped.append(vtf_path)
+                continue
+            hashes = (source_hash, settings_hash)
+        
+        arguments = (vtf_path, job['pixels'], flags, settings)
+        future = None
+        if executor is not None and not broken:
+            try:
+                future = executor.submit(encode_vtf_texture, *arguments)
+            except BrokenExecutor:
+                discard_executor()
+        pending.append((job, hashes, arguments, future))
+    
+    for index, (job, hashes, arguments, future) in enumerate(pending):
+        if token is not None:
+            if token.is_cancelled:
+                for _, _, _, queued in pending[index:]:
+                    if queued is not None:
+                        queued.cancel()
+                break
+            token.report_count(index, len(pending), f"Encoding {job['name']}")
+        
+        try:
+            try:
+                vtf_path = future.result() if future is not None else encode_vtf_texture(*arguments)
+            except BrokenExecutor:
+                discard_executor()
+                vtf_path = encode_vtf_texture(*arguments)
+            written.append(vtf_path)
+            print(f"Generated VTF file: {vtf_path}")
+        except Exception as e:
+            errors[job['name']] = str(e)
+            continue
+        
+        if hashes is not None:
+            cache.record(vtf_path, *hashes)
+    
+    if cache is not None:
+        cache.save()
+    if token is not None:
+        token.check()
+    
+    return {
+        'written': written,
+        'skipped': skipped,
+        'errors': errors,
+    }
 
 
 def collect_scene_materials(context) -> List[Any]:
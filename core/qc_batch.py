@@ -0,0 +1,263 @@
+"""
+Headless batch QC generation from a manifest file.
+
+A manifest describes many QCData records, so QC files for hundreds of
+models can be generated in one run without touching the scene. Files are
+built and written concurrently; all builds share the compiled template
+registry of qc_builder.
+
+Manifest format (JSON, or TOML with the same structure):
+
+    {
+        "defaults": {"model_type": "PROP", "output_dir": "qc"},
+        "models": [
+            {"model_name": "props/crate01", "material_paths": ["models/props"]},
+            {"model_name": "props/crate02", "output_path": "qc/crate02.qc"}
+        ]
+    }
+
+Keys of each record are QCData field names. "defaults" are merged into
+every record. Records without an output_path are written to
+"<output_dir>/<model name>.qc". Relative paths are resolved against the
+manifest's folder. A manifest may also be a plain list of records.
+
+Command line (Blender's Python, since the addon imports bpy):
+
+    blender --background --python-expr "import sys, VonSourceTools.core.qc_batch as b; b.main(sys.argv[sys.argv.index('--') + 1:])" -- manifest.json
+"""
+import argparse
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import fields
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from .qc_builder import QCData, write_qc_file_from_data
+
+
+# Manifest keys that are not QCData fields
+_OUTPUT_DIR_KEY = "output_dir"
+
+_QC_FIELDS = {f.name for f in fields(QCData)}
+
+
+# ============================================================================
+# Manifest Loading
+# ============================================================================
+
+def _read_manifest(manifest_path: Path) -> Any:
+    """Parse a JSON or TOML manifest file."""
+    if manifest_path.suffix.lower() == ".toml":
+        try:
+            import tomllib
+        except ImportError:
+            raise ValueError("TOML manifests require Python 3.11 or newer") from None
+        with manifest_path.open("rb") as f:
+            return tomllib.load(f)
+
+    with manifest_path.open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def qc_data_from_dict(record: Dict[str, Any], base_dir: Optional[Path] = None) -> QCData:
+    """
+    Create a QCData object from a manifest record.
+
+    Args:
+        record: Mapping of QCData field names to values, plus an optional
+            output_dir used when output_path is missing
+        base_dir: Folder relative paths are resolved against
+
+    Returns:
+        QCData object
+
+    Raises:
+        ValueError: If the record has unknown keys or no model name
+    """
+    record = dict(record)
+    output_dir = record.pop(_OUTPUT_DIR_KEY, "")
+
+    unknown = sorted(set(record) - _QC_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown QC fields: {', '.join(unknown)}")
+
+    qc_data = QCData(**record)
+    if not qc_data.model_name:
+        raise ValueError("Record has no model_name")
+
+    qc_data.model_type = qc_data.model_type.upper()
+    qc_data.origin = tuple(qc_data.origin)
+
+    if not qc_data.output_path:
+        model_file = Path(qc_data.model_name).name
+        qc_data.output_path = os.path.join(output_dir, f"{model_file}.qc")
+
+    if base_dir is not None and not os.path.isabs(qc_data.output_path):
+        qc_data.output_path = str(base_dir / qc_data.output_path)
+
+    return qc_data
+
+
+def load_qc_manifest(manifest_path: Union[str, Path]) -> List[QCData]:
+    """
+    Load all QC records from a manifest file.
+
+    Args:
+        manifest_path: Path to a .json or .toml manifest
+
+    Returns:
+        list: QCData objects, in manifest order
+
+    Raises:
+        ValueError: If the manifest or any record is invalid
+    """
+    manifest_path = Path(manifest_path)
+    data = _read_manifest(manifest_path)
+
+    if isinstance(data, list):
+        defaults, records = {}, data
+    elif isinstance(data, dict):
+        defaults = data.get("defaults", {})
+        records = data.get("models", [])
+    else:
+        raise ValueError(f"Invalid QC manifest: {manifest_path}")
+
+    base_dir = manifest_path.resolve().parent
+    qc_records = []
+    for index, record in enumerate(records):
+        try:
+            qc_records.append(qc_data_from_dict({**defaults, **record}, base_dir))
+        except (TypeError, ValueError, AttributeError) as e:
+            raise ValueError(f"Invalid QC record #{index} in {manifest_path}: {e}") from None
+
+    return qc_records
+
+
+# ============================================================================
+# Batch Generation
+# ============================================================================
+
+def batch_generate_qc_files(
+    qc_records: List[QCData],
+    max_workers: Optional[int] = None,
+    progress_callback: Optional[Callable[[int, int, QCData, bool], None]] = None
+) -> dict:
+    """
+    Build and write many QC files concurrently.
+
+    Args:
+        qc_records: QCData objects to generate
+        max_workers: Number of concurrent writers
+            (None or 0 uses the CPU core count)
+        progress_callback: Optional callable invoked after each file as
+            callback(completed, total, qc_data, success)
+
+    Returns:
+        dict with 'success', 'failed' and 'total' counts, 'written'
+        listing the written file paths and 'errors' mapping the index of
+        each failed record in qc_records to its error message (model
+        names and output paths need not be unique)
+    """
+    if not max_workers:
+        max_workers = os.cpu_count() or 1
+    max_workers = max(1, min(max_workers, len(qc_records)))
+
+    written = []
+    errors = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(write_qc_file_from_data, qc_data): index
+            for index, qc_data in enumerate(qc_records)
+        }
+
+        for future in as_completed(futures):
+            index = futures[future]
+            qc_data = qc_records[index]
+            try:
+                written.append(future.result())
+                success = True
+            except Exception as e:
+                # A malformed record (e.g. a bodygroup that is not a mapping)
+                # can fail anywhere in the builder; it only fails that record
+                errors[index] = str(e)
+                success = False
+
+            if progress_callback is not None:
+                progress_callback(len(written) + len(errors), len(qc_records), qc_data, success)
+
+    return {
+        'success': len(written),
+        'failed': len(errors),
+        'total': len(qc_records),
+        'written': sorted(written),
+        'errors': errors,
+    }
+
+
+def batch_generate_from_manifest(
+    manifest_path: Union[str, Path],
+    max_workers: Optional[int] = None
+) -> dict:
+    """
+    Generate all QC files described by a manifest.
+
+    Args:
+        manifest_path: Path to a .json or .toml manifest
+        max_workers: Number of concurrent writers
+
+    Returns:
+        dict: See batch_generate_qc_files()
+    """
+    return batch_generate_qc_files(load_qc_manifest(manifest_path), max_workers)
+
+
+# ============================================================================
+# Command Line Entry Point
+# ============================================================================
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Generate QC files from one or more manifests and print a summary.
+
+    Args:
+        argv: Command line arguments (defaults to sys.argv[1:])
+
+    Returns:
+        int: Exit code (0 if every QC file was written)
+    """
+    parser = argparse.ArgumentParser(
+        prog="qc_batch",
+        description="Generate QC files for many models from a manifest."
+    )
+    parser.add_argument("manifests", nargs="+", help="JSON or TOML manifest files")
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=0,
+        help="Number of concurrent writers (default: one per CPU core)"
+    )
+    parser.add_argument("-v", "--verbose", action="store_true", help="List every written file")
+    args = parser.parse_args(argv)
+
+    qc_records = []
+    for manifest in args.manifests:
+        try:
+            qc_records.extend(load_qc_manifest(manifest))
+        except (OSError, ValueError) as e:
+            print(f"Failed to load manifest: {e}")
+            return 2
+
+    result = batch_generate_qc_files(qc_records, max_workers=args.jobs)
+
+    if args.verbose:
+        for path in result['written']:
+            print(f"Written: {path}")
+    for index, error in sorted(result['errors'].items()):
+        qc_data = qc_records[index]
+        print(f"Failed: {qc_data.model_name} ({qc_data.output_path}), {error}")
+
+    print(
+        f"QC generation completed! Success: {result['success']}, "
+        f"Failed: {result['failed']}, Total: {result['total']}"
+    )
+    return 1 if result['failed'] else 0
@@ -6,8 +6,10 @@ This module generates QC files for Source Engine models using:
 - Templates from storeditems/qcgenerator/templates/commands/
 - Section ordering from qc_section_order.json
 """
-import json
 import os
+import string
+import threading
+import time
 from pathlib import Path
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, field
@@ -18,7 +20,11 @@ try:
 except ImportError:
     bpy = None
 
-from ..data.paths import get_templates_directory, get_commands_directory
+from ..data.paths import (
+    get_commands_directory,
+    get_qc_section_order_path,
+)
+from ..utils.file_utils import CachedJsonLoader
 
 
 # ============================================================================
@@ -73,6 +79,163 @@ class QCData:
 # Template Loading
 # ============================================================================
 
+class CompiledTemplate:
+    """
+    A QC command template parsed once into its replacement fields.
+    
+    The source is parsed with string.Formatter when loaded, so malformed
+    templates fail at load time and missing values are reported with the
+    template name. Rendering uses str.format on the normalized source.
+    """
+    
+    _formatter = string.Formatter()
+    
+    def __init__(self, name: str, source: str):
+        self.name = name
+        self.source = source.replace('\r\n', '\n').replace('\r', '\n')
+        
+        try:
+            parsed = list(self._formatter.parse(self.source))
+        except ValueError as e:
+            raise ValueError(f"Invalid QC template '{name}': {e}") from None
+        
+        self.fields = frozenset(
+            field_name for _, field_name, _, _ in parsed
+            if field_name
+        )
+    
+    def format(self, **values) -> str:
+        """Fill in the template's fields."""
+        return self.format_map(values)
+    
+    def format_map(self, values: Dict[str, Any]) -> str:
+        """Fill in the template's fields from a mapping."""
+        try:
+            return self.source.format_map(values)
+        except KeyError as e:
+            raise KeyError(f"QC template '{self.name}' is missing value {e}") from None
+
+
+class TemplateRegistry:
+    """
+    Shared cache of compiled QC command templates and section orders.
+    
+    All command templates are loaded and compiled on first use. A cached
+    template is reloaded when its file's mtime or size changes; files are
+    re-checked at most every check_interval seconds. Safe to use from
+    multiple threads.
+    """
+    
+    def __init__(self, check_interval: float = 1.0):
+        self._check_interval = check_interval
+        self._templates: Dict[str, tuple] = {}
+        self._preloaded = False
+        self._lock = threading.Lock()
+        self._section_orders = CachedJsonLoader(get_qc_section_order_path, check_interval)
+    
+    @staticmethod
+    def _signature(path: Path) -> Optional[tuple]:
+        """Get a file's (mtime, size), or None if it does not exist."""
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+    
+    def _compile(self, name: str, path: Path) -> tuple:
+        """Load and compile one template file into a cache entry."""
+        signature = self._signature(path)
+        if signature is None:
+            raise FileNotFoundError(f"Template not found: {path}")
+        
+        with open(path, "r", encoding="utf-8") as f:
+            template = CompiledTemplate(name, f.read())
+        
+        entry = (template, signature, time.monotonic())
+        self._templates[name] = entry
+        return entry
+    
+    def _preload(self):
+        """Compile every template in the commands directory."""
+        self._preloaded = True
+        commands_dir = get_commands_directory()
+        if not commands_dir.is_dir():
+            return
+        for path in commands_dir.glob("*.txt"):
+            try:
+                self._compile(path.stem, path)
+            except (OSError, ValueError) as e:
+                print(f"Failed to load QC template {path}: {e}")
+    
+    def get(self, template_name: str) -> CompiledTemplate:
+        """
+        Get a compiled command template.
+        
+        Args:
+            template_name: Name of the template file (without .txt extension)
+        
+        Returns:
+            CompiledTemplate
+        
+        Raises:
+            FileNotFoundError: If the template file does not exist
+        """
+        with self._lock:
+            if not self._preloaded:
+                self._preload()
+            
+            entry = self._templates.get(template_name)
+            if entry is not None and time.monotonic() - entry[2] < self._check_interval:
+                return entry[0]
+            
+            path = get_commands_directory() / f"{template_name}.txt"
+            if entry is not None and self._signature(path) == entry[1]:
+                self._templates[template_name] = (entry[0], entry[1], time.monotonic())
+                return entry[0]
+            
+            self._templates.pop(template_name, None)
+            return self._compile(template_name, path)[0]
+    
+    def get_section_orders(self) -> Dict[str, Any]:
+        """
+        Get the section order configuration of all model types.
+        
+        Raises:
+            FileNotFoundError: If qc_section_order.json cannot be loaded
+        """
+        with self._lock:
+            data = self._section_orders.load()
+        if data is None:
+            raise FileNotFoundError(
+                f"Section order config not found: {get_qc_section_order_path()}"
+            )
+        return data
+    
+    def clear(self):
+        """Drop all cached templates and section orders."""
+        with self._lock:
+            self._templates.clear()
+            self._preloaded = False
+            self._section_orders.clear()
+
+
+# Registry shared by all QC builds
+template_registry = TemplateRegistry()
+
+
+def get_template(template_name: str) -> CompiledTemplate:
+    """
+    Get a compiled QC command template from the shared registry.
+    
+    Args:
+        template_name: Name of the template file (without .txt extension)
+    
+    Returns:
+        CompiledTemplate
+    """
+    return template_registry.get(template_name)
+
+
 def load_template(template_name: str) -> str:
     """
     Load a QC command template.
@@ -83,16 +246,7 @@ def load_template(template_name: str) -> str:
     Returns:
         Template content as string
     """
-    template_path = get_commands_directory() / f"{template_name}.txt"
-    
-    if not template_path.exists():
-        raise FileNotFoundError(f"Template not found: {template_path}")
-    
-    with open(template_path, "r", encoding="utf-8") as f:
-        content = f.read()
-    
-    # Normalize line endings
-    return content.replace('\r\n', '\n').replace('\r', '\n')
+    return get_template(template_name).source
 
 
 def load_section_order(model_type: str) -> Dict[str, Any]:
@@ -105,13 +259,7 @@ def load_section_order(model_type: str) -> Dict[str, Any]:
     Returns:
         Dictionary with 'sections' and 'flags' lists
     """
-    json_path = get_templates_directory() / "qc_section_order.json"
-    
-    if not json_path.exists():
-        raise FileNotFoundError(f"Section order config not found: {json_path}")
-    
-    with open(json_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    data = template_registry.get_section_orders()
     
     model_type_upper = model_type.upper()
     if model_type_upper not in data:
@@ -129,7 +277,7 @@ def generate_modelname(qc_data: QCData) -> str:
     if not qc_data.model_name:
         return ""
     
-    template = load_template("modelname")
+    template = get_template("modelname")
     return template.format(mdlModelName=qc_data.model_name)
 
 
@@ -138,7 +286,7 @@ def generate_scale(qc_data: QCData) -> str:
     if qc_data.scale == 1:
         return ""  # Default scale, not needed
     
-    template = load_template("scale")
+    template = get_template("scale")
     return template.format(scale=qc_data.scale)
 
 
@@ -148,7 +296,7 @@ def generate_origin(qc_data: QCData) -> str:
     if x == 0 and y == 0 and z == 0:
         return ""  # Default origin, not needed
     
-    template = load_template("origin")
+    template = get_template("origin")
     return template.format(x=x, y=y, z=z)
 
 
@@ -157,7 +305,7 @@ def generate_surfaceprop(qc_data: QCData) -> str:
     if not qc_data.surfaceprop:
         return ""
     
-    template = load_template("surfaceprop")
+    template = get_template("surfaceprop")
     return template.format(surfaceProp=qc_data.surfaceprop)
 
 
@@ -166,7 +314,7 @@ def generate_cdmaterials(qc_data: QCData) -> str:
     if not qc_data.material_paths:
         return ""
     
-    template = load_template("cdmaterials")
+    template = get_template("cdmaterials")
     lines = []
     
     for path in qc_data.material_paths:
@@ -182,7 +330,7 @@ def generate_bodygroups(qc_data: QCData) -> str:
     if not qc_data.bodygroups:
         return ""
     
-    template = load_template("bodygroup")
+    template = get_template("bodygroup")
     sections = []
     
     for bg_name, collections in qc_data.bodygroups.items():
@@ -260,7 +408,7 @@ def generate_attachments(qc_data: QCData) -> str:
     if not qc_data.attachments:
         return ""
     
-    template = load_template("attachment")
+    template = get_template("attachment")
     lines = []
     
     for att in qc_data.attachments:
@@ -285,7 +433,7 @@ def generate_includes(qc_data: QCData) -> str:
     if not qc_data.include_files:
         return ""
     
-    template = load_template("include")
+    template = get_template("include")
     lines = []
     
     for filename in qc_data.include_files:
@@ -346,6 +494,22 @@ FLAG_GENERATORS = {
 # Data Gathering from Blender
 # ============================================================================
 
+def get_qc_output_directory(qc_settings) -> str:
+    """
+    Get the folder the QC file and the SMDs it references are written to.
+    
+    Args:
+        qc_settings: The scene's QCGeneratorSettings
+    
+    Returns:
+        str: Absolute folder path
+    """
+    output_dir = bpy.path.abspath(qc_settings.string_outputPath).rstrip('/\\')
+    if output_dir.lower().endswith('.qc'):
+        output_dir = os.path.dirname(output_dir)
+    return output_dir
+
+
 def gather_qc_data_from_scene(context) -> QCData:
     """
     Gather all QC data from Blender scene properties.
@@ -384,6 +548,9 @@ def gather_qc_data_from_scene(context) -> QCData:
     # Collision
     qc_data.generate_collision = qc_settings.bool_generateCollision
     qc_data.collision_collection = qc_settings.string_existingCollisionCollection
+    qc_data.collision_concave = (
+        qc_data.generate_collision and qc_settings.int_collisionPieceCount > 1
+    )
     
     # Material paths (cdmaterials)
     qc_data.material_paths = []
@@ -660,8 +827,8 @@ def populate_template(template_file: str, replacements: dict) -> str:
     Returns:
         str: The populated template content
     """
-    template_content = load_template(template_file.replace('.txt', ''))
-    return template_content.format_map(replacements)
+    template = get_template(template_file.replace('.txt', ''))
+    return template.format_map(replacements)
 
 
 def load_qc_section_order() -> dict:
@@ -670,14 +837,9 @@ def load_qc_section_order() -> dict:
     
     Returns:
         dict: The section order configuration for all model types
+            (shared with the template registry; do not modify)
     """
-    json_file = get_templates_directory() / "qc_section_order.json"
-    
-    if not json_file.exists():
-        raise FileNotFoundError(f"QC section order JSON not found: {json_file}")
-    
-    with json_file.open("r", encoding="utf-8") as f:
-        return json.load(f)
+    return template_registry.get_section_orders()
 
 
 def write_qc_file(qc_type: str, qc_commands: dict, qc_controls: dict) -> str:
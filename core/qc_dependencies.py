@@ -0,0 +1,261 @@
+"""
+QC dependency scanning for incremental compiles.
+
+Collects every file a QC compile reads: the QC itself, $include'd QC
+files and the meshes and animations referenced by $body, $model,
+studio, $sequence, $animation and $collisionmodel (and the flex and LOD
+files inside their blocks). $cdmaterials is ignored, since materials
+are not part of the compiled model.
+
+The combined hash of all of these changes whenever any input of the
+compile changes, so a build cache can skip compiles whose hash matches
+the last successful build.
+"""
+import os
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+from .build_cache import BuildCache, hash_file, hash_settings
+
+
+# Extensions studiomdl tries for source files named without one
+_SOURCE_EXTENSIONS = ("", ".smd", ".dmx", ".fbx")
+
+_COMMENT_PATTERN = re.compile(r'//[^\n]*|/\*.*?\*/', re.DOTALL)
+_TOKEN_PATTERN = re.compile(r'"([^"\n]*)"|([{}])|([^\s{}"]+)')
+
+# Commands whose n-th argument is a source file
+_FILE_ARGUMENTS = {
+    "$body": 2,
+    "$model": 2,
+    "studio": 1,
+    "flexfile": 1,
+    "replacemodel": 2,
+    "$collisionmodel": 1,
+    "$collisionjoints": 1,
+}
+
+# Commands whose arguments and block may hold any number of source files
+_ANIMATION_COMMANDS = ("$sequence", "$animation")
+
+
+@dataclass
+class QCDependencies:
+    """
+    Inputs of one QC compile.
+
+    Attributes:
+        qc_path: Path to the QC file
+        model_name: Value of $modelname (None if not set)
+        files: Existing input files, including the QC and its includes
+        missing: Referenced source files that could not be found
+        included_models: Values of $includemodel (compiled .mdl paths
+            relative to the game's models folder)
+    """
+    qc_path: Path
+    model_name: Optional[str] = None
+    files: List[Path] = field(default_factory=list)
+    missing: List[str] = field(default_factory=list)
+    included_models: List[str] = field(default_factory=list)
+
+
+def tokenize_qc(text: str) -> List[Tuple[int, str]]:
+    """
+    Split QC text into tokens.
+
+    Args:
+        text: QC file contents
+
+    Returns:
+        list: (line number, token) pairs; quotes are removed and braces
+        are separate tokens
+    """
+    # Keep line numbers intact by blanking comments without their newlines
+    text = _COMMENT_PATTERN.sub(lambda match: "\n" * match.group().count("\n"), text)
+
+    tokens = []
+    for line_number, line in enumerate(text.splitlines()):
+        for match in _TOKEN_PATTERN.finditer(line):
+            quoted, brace, word = match.groups()
+            tokens.append((line_number, quoted if quoted is not None else brace or word))
+    return tokens
+
+
+def _command_arguments(tokens: list, index: int) -> list:
+    """Get the tokens of a command's line and of the block that follows it."""
+    line_number = tokens[index][0]
+    arguments = []
+    depth = 0
+    for line, token in tokens[index + 1:]:
+        if depth == 0 and line != line_number and token != "{":
+            break
+        if token == "{":
+            depth += 1
+        elif token == "}":
+            depth -= 1
+            if depth <= 0:
+                break
+        else:
+            arguments.append(token)
+        line_number = line
+    return arguments
+
+
+class _Scanner:
+    """Walks a QC and its includes, resolving paths like studiomdl does."""
+
+    def __init__(self, qc_path: Path):
+        self.result = QCDependencies(qc_path=qc_path)
+        self._directories = [qc_path.parent]
+        self._seen = set()
+
+    def _resolve(self, name: str, extensions=("",)) -> Optional[Path]:
+        for extension in extensions:
+            path = self._directories[-1] / (name + extension)
+            if path.is_file():
+                return path.resolve()
+        return None
+
+    def _add_file(self, path: Path) -> None:
+        if path not in self._seen:
+            self._seen.add(path)
+            self.result.files.append(path)
+
+    def _add_source(self, name: str) -> None:
+        path = self._resolve(name, _SOURCE_EXTENSIONS)
+        if path is None:
+            self.result.missing.append(name)
+        else:
+            self._add_file(path)
+
+    def scan(self, qc_path: Path) -> None:
+        qc_path = qc_path.resolve()
+        if qc_path in self._seen:
+            return
+        self._add_file(qc_path)
+
+        with open(qc_path, "r", encoding="utf-8", errors="replace") as f:
+            tokens = tokenize_qc(f.read())
+
+        for index, (_, token) in enumerate(tokens):
+            command = token.lower()
+            following = [value for _, value in tokens[index + 1:index + 3]]
+
+            if command in _FILE_ARGUMENTS:
+                position = _FILE_ARGUMENTS[command] - 1
+                if position < len(following) and following[position] not in "{}":
+                    self._add_source(following[position])
+            elif command in _ANIMATION_COMMANDS:
+                # Arguments are a mix of files, animation names and options;
+                # only the ones that name an existing file are inputs
+                for argument in _command_arguments(tokens, index)[1:]:
+                    path = self._resolve(argument, _SOURCE_EXTENSIONS)
+                    if path is not None:
+                        self._add_file(path)
+            elif command == "$include" and following:
+                include = self._resolve(following[0]) or self._resolve_beside(qc_path, following[0])
+                if include is None:
+                    self.result.missing.append(following[0])
+                else:
+                    self.scan(include)
+            elif command == "$includemodel" and following:
+                self.result.included_models.append(following[0])
+            elif command == "$modelname" and following and self.result.model_name is None:
+                self.result.model_name = following[0]
+            elif command == "$pushd" and following:
+                self._directories.append(self._directories[-1] / following[0])
+            elif command == "$popd" and len(self._directories) > 1:
+                self._directories.pop()
+            elif command == "$cd" and following:
+                self._directories[-1] = self._directories[-1] / following[0]
+
+    @staticmethod
+    def _resolve_beside(qc_path: Path, name: str) -> Optional[Path]:
+        path = qc_path.parent / name
+        return path.resolve() if path.is_file() else None
+
+
+def scan_qc_dependencies(qc_path: Union[str, Path]) -> QCDependencies:
+    """
+    Collect the input files of a QC compile.
+
+    Args:
+        qc_path: Path to the QC file
+
+    Returns:
+        QCDependencies
+
+    Raises:
+        OSError: If the QC file cannot be read
+    """
+    qc_path = Path(qc_path).resolve()
+    scanner = _Scanner(qc_path)
+    scanner.scan(qc_path)
+    return scanner.result
+
+
+def get_compiled_model_path(
+    dependencies: QCDependencies,
+    game_dir: Optional[Union[str, Path]]
+) -> Optional[Path]:
+    """
+    Get the path studiomdl writes a QC's compiled .mdl to.
+
+    Args:
+        dependencies: Scanned QC
+        game_dir: Game folder passed to studiomdl with -game
+
+    Returns:
+        Path to <game dir>/models/<$modelname>, or None if the QC has no
+        $modelname or no game folder is known
+    """
+    if not game_dir or not dependencies.model_name:
+        return None
+    model_path = Path(game_dir) / "models" / dependencies.model_name
+    if model_path.suffix.lower() != ".mdl":
+        model_path = model_path.with_name(model_path.name + ".mdl")
+    return model_path
+
+
+def hash_dependencies(
+    dependencies: QCDependencies,
+    game_dir: Optional[Union[str, Path]] = None,
+    cache: Optional[BuildCache] = None
+) -> str:
+    """
+    Hash the contents of every input of a QC compile.
+
+    Args:
+        dependencies: Scanned QC
+        game_dir: Game folder, used to find $includemodel .mdl files
+        cache: Optional build cache whose memoized file hashes are reused
+
+    Returns:
+        str: Hex digest that changes when any input changes, appears or
+        disappears
+
+    Raises:
+        OSError: If an input file cannot be read
+    """
+    hash_source = cache.hash_source if cache is not None else hash_file
+    root = dependencies.qc_path.parent
+
+    def key(path: Path) -> str:
+        # Relative keys keep the hash stable when the whole tree is moved
+        try:
+            return os.path.relpath(path, root).replace(os.sep, "/")
+        except ValueError:
+            return str(path)
+
+    inputs = {key(path): hash_source(path) for path in dependencies.files}
+    for name in dependencies.included_models:
+        model_path = Path(game_dir) / "models" / name if game_dir else None
+        inputs[f"$includemodel:{name}"] = (
+            hash_source(model_path) if model_path is not None and model_path.is_file() else None
+        )
+    for name in dependencies.missing:
+        inputs[f"missing:{name}"] = None
+
+    return hash_settings(inputs)
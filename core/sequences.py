@@ -1,8 +1,19 @@
 """
 Animation sequence collection and management.
 """
+import os
+import pickle
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Optional
+
 import bpy  # type: ignore
 
+from .anim_bake import encode_animation_job
+from .smd_export import bake_action, can_bake_directly, snapshot_action, snapshot_skeleton_data
+from ..utils.threading_utils import POOL_PROCESS, task_manager
+
 
 def collect_actions_from_armature(obj) -> set:
     """
@@ -79,3 +90,199 @@ def populate_sequence_data(context) -> None:
             seq = rig_data.sequences.add()
             seq.originalName = action.name
             seq.sequenceName = action.name
+
+
+# ============================================================================
+# Batch Sequence Export
+# ============================================================================
+
+def _check_unique_sequence_names(sequence_objectdata) -> None:
+    """
+    Make sure no two exported sequences share a file name.
+    
+    populate_sequence_data adds an action once per armature using it, and
+    sequence names can be edited, so names can repeat. Their SMDs would
+    overwrite each other, with a random one winning.
+    
+    Raises:
+        ValueError: Naming the first repeated sequence and its armatures
+    """
+    seen = {}
+    for rig_data in sequence_objectdata:
+        for seq in rig_data.sequences:
+            if not seq.shouldExport:
+                continue
+            name = seq.sequenceName or seq.originalName
+            # File names are case-insensitive on Windows
+            key = name.lower()
+            if key in seen:
+                raise ValueError(
+                    f"Sequence name '{name}' is used more than once (armatures '{seen[key]}' "
+                    f"and '{rig_data.armatureName}'); rename one or turn off its export"
+                )
+            seen[key] = rig_data.armatureName
+
+
+def snapshot_sequence_jobs(context, output_dir: str) -> list:
+    """
+    Snapshot every sequence marked for export, on the main thread.
+    
+    Actions of rigs that can be baked directly are copied as F-curve data
+    and baked by the workers. Other rigs are baked frame by frame here,
+    since that needs the scene, and only the writing is left to workers.
+    
+    Args:
+        context: Blender context
+        output_dir: Folder the sequence SMDs are written to (the QC folder)
+    
+    Returns:
+        list: Job dicts for anim_bake.encode_animation_job, each with an
+        extra 'snapshot_time' in seconds
+    
+    Raises:
+        ValueError: If a sequence's armature or action no longer exists,
+            or two sequences would be written to the same file
+    """
+    _check_unique_sequence_names(context.scene.von_qc_data.sequence_objectdata)
+    jobs = []
+    
+    for rig_data in context.scene.von_qc_data.sequence_objectdata:
+        sequences = [seq for seq in rig_data.sequences if seq.shouldExport]
+        if not sequences:
+            continue
+        
+        armature = bpy.data.objects.get(rig_data.armatureName)
+        if armature is None or armature.type != 'ARMATURE':
+            raise ValueError(f"Armature '{rig_data.armatureName}' not found")
+        
+        skeleton = snapshot_skeleton_data(armature) if can_bake_directly(armature) else None
+        
+        for seq in sequences:
+            action = bpy.data.actions.get(seq.originalName)
+            if action is None:
+                raise ValueError(f"Action '{seq.originalName}' not found")
+            
+            start = time.perf_counter()
+            name = seq.sequenceName or seq.originalName
+            job = {'name': name, 'filepath': os.path.join(output_dir, f"{name}.smd")}
+            
+            if skeleton is not None:
+                job.update(nodes=skeleton.nodes, skeleton=skeleton, action=snapshot_action(action))
+            else:
+                nodes, frames = bake_action(context, armature, action)
+                job.update(nodes=nodes, frames=frames)
+            
+            job['snapshot_time'] = time.perf_counter() - start
+            jobs.append(job)
+    
+    return jobs
+
+
+def _run_sequence_jobs(
+    executor,
+    jobs: list,
+    progress_callback,
+    results: dict,
+    errors: dict,
+    total: int
+):
+    """
+    Encode jobs on an executor, adding to results and errors.
+    
+    Finished jobs stay recorded when the executor breaks, so only the
+    rest have to be run again.
+    """
+    def record(job, future):
+        try:
+            result = future.result()
+            result['snapshot_time'] = job.get('snapshot_time', 0.0)
+            results[job['filepath']] = result
+            success = True
+        except (OSError, ValueError) as e:
+            errors[job['filepath']] = str(e)
+            success = False
+        
+        if progress_callback is not None:
+            progress_callback(len(results) + len(errors), total, job, success)
+    
+    futures = {}
+    try:
+        for job in jobs:
+            futures[executor.submit(encode_animation_job, job)] = job
+        for future in as_completed(futures):
+            record(futures[future], future)
+    except (BrokenProcessPool, OSError, pickle.PicklingError):
+        # Keep jobs that completed before the pool broke
+        for future, job in futures.items():
+            filepath = job['filepath']
+            if (filepath not in results and filepath not in errors and future.done() and
+                    not future.cancelled() and future.exception() is None):
+                record(job, future)
+        raise
+
+
+def export_sequence_jobs(
+    jobs: list,
+    max_workers: Optional[int] = None,
+    use_processes: bool = True,
+    progress_callback: Optional[Callable[[int, int, dict, bool], None]] = None
+) -> dict:
+    """
+    Bake and write snapshotted sequences concurrently.
+    
+    Baking is CPU-bound NumPy and string work, so the task manager's
+    process pool is used by default; if worker processes cannot be
+    started, a thread pool is used instead.
+    
+    Args:
+        jobs: Job dicts from snapshot_sequence_jobs
+        max_workers: Number of worker threads when processes are not used
+            (None or 0 uses the CPU core count)
+        use_processes: Use the shared process pool instead of threads
+        progress_callback: Optional callable invoked after each sequence
+            as callback(completed, total, job, success)
+    
+    Returns:
+        dict with 'success', 'failed' and 'total' counts, 'written'
+        listing the written file paths, 'errors' mapping the file paths of
+        failed sequences to error messages, 'timings' mapping written file
+        paths to their snapshot_time/bake_time/write_time in seconds, and
+        'elapsed' holding the total wall time
+    """
+    start = time.perf_counter()
+    if not max_workers:
+        max_workers = os.cpu_count() or 1
+    max_workers = max(1, min(max_workers, len(jobs)))
+    
+    results = {}
+    errors = {}
+    remaining = jobs
+    if use_processes and len(jobs) > 1:
+        executor = task_manager.get_pool(POOL_PROCESS)
+        try:
+            _run_sequence_jobs(executor, jobs, progress_callback, results, errors, len(jobs))
+            remaining = []
+        except (BrokenProcessPool, OSError, pickle.PicklingError) as e:
+            print(f"Process pool unavailable, using threads: {e}")
+            task_manager.reset_pool(POOL_PROCESS, executor)
+            remaining = [
+                job for job in jobs
+                if job['filepath'] not in results and job['filepath'] not in errors
+            ]
+    
+    if remaining:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            _run_sequence_jobs(executor, remaining, progress_callback, results, errors, len(jobs))
+    
+    return {
+        'success': len(results),
+        'failed': len(errors),
+        'total': len(jobs),
+        'written': sorted(results),
+        'errors': errors,
+        'timings': {
+            filepath: {key: result[key] for key in ('snapshot_time', 'bake_time', 'write_time')}
+            for filepath, result in results.items()
+        },
+        'elapsed': time.perf_counter() - start,
+    }
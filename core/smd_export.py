@@ -3,6 +3,32 @@ SMD export utilities for batch exporting.
 """
 import bpy  # type: ignore
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+import numpy as np
+
+from .anim_bake import (
+    INTERPOLATION_CODES,
+    POSE_CHANNELS,
+    ActionData,
+    FCurveData,
+    SkeletonData,
+    bake_action_transforms,
+)
+from .collision import read_vertex_weights
+from .smd_writer import (
+    DEFAULT_MATERIAL,
+    DEFAULT_PHYSICS_MATERIAL,
+    DEFAULT_ROOT_BONE,
+    MeshSnapshot,
+    matrices_to_smd_transforms,
+    to_parent_space,
+    write_animation_smd,
+    write_reference_smd,
+)
 
 
 def split_objects_into_collections(context) -> dict:
@@ -112,3 +138,657 @@ def export_scene_smd(context, export_folder: str) -> bool:
     except Exception as e:
         print(f"Export failed: {e}")
         return False
+
+
+# ============================================================================
+# Native SMD Export
+# ============================================================================
+
+def find_armature(obj):
+    """
+    Find the armature a mesh object is deformed by or parented to.
+    
+    Args:
+        obj: The mesh object
+    
+    Returns:
+        The armature object, or None
+    """
+    for modifier in obj.modifiers:
+        if modifier.type == 'ARMATURE' and modifier.object:
+            return modifier.object
+    if obj.parent and obj.parent.type == 'ARMATURE':
+        return obj.parent
+    return None
+
+
+def get_bone_order(armature) -> list:
+    """
+    Get an armature's bones with every parent before its children.
+    
+    Args:
+        armature: The armature object
+    
+    Returns:
+        list: Bones in SMD node order
+    """
+    ordered = []
+    pending = [bone for bone in armature.data.bones if bone.parent is None]
+    while pending:
+        bone = pending.pop(0)
+        ordered.append(bone)
+        pending.extend(bone.children)
+    return ordered
+
+
+def snapshot_skeleton(armature) -> tuple:
+    """
+    Read an armature's node list and rest pose.
+    
+    Args:
+        armature: The armature object, or None for a single root bone
+    
+    Returns:
+        tuple: (nodes, bone_indices, rest_pose) where nodes holds the
+        (name, parent_index) pairs, bone_indices maps bone names to node
+        indices and rest_pose is a (B, 6) transform array
+    """
+    if armature is None:
+        return [(DEFAULT_ROOT_BONE, -1)], {}, np.zeros((1, 6))
+    
+    bones = get_bone_order(armature)
+    bone_indices = {bone.name: i for i, bone in enumerate(bones)}
+    parents = [bone_indices[bone.parent.name] if bone.parent else -1 for bone in bones]
+    nodes = [(bone.name, parent) for bone, parent in zip(bones, parents)]
+    
+    matrices = np.array([bone.matrix_local for bone in bones], dtype=np.float64)
+    rest_pose = matrices_to_smd_transforms(to_parent_space(matrices, parents))
+    return nodes, bone_indices, rest_pose
+
+
+def _read_corner_normals(mesh) -> np.ndarray:
+    """Read the custom/split normal of every loop as an (L, 3) array."""
+    normals = np.empty(len(mesh.loops) * 3, dtype=np.float32)
+    if hasattr(mesh, "corner_normals"):
+        mesh.corner_normals.foreach_get("vector", normals)
+    else:
+        mesh.calc_normals_split()  # Before Blender 4.1
+        mesh.loops.foreach_get("normal", normals)
+    return normals.reshape(-1, 3)
+
+
+def _read_bone_links(obj, mesh, bone_indices: dict) -> tuple:
+    """
+    Read vertex weights as normalized bone links, heaviest first.
+    
+    Vertex groups that do not match a bone are ignored.
+    
+    Returns:
+        tuple: (link_counts, link_bones, link_weights) as used by
+        MeshSnapshot
+    """
+    counts, groups, weights = read_vertex_weights(mesh)
+    group_bones = np.array([bone_indices.get(group.name, -1) for group in obj.vertex_groups], dtype=np.int64)
+    
+    owners = np.repeat(np.arange(len(counts)), counts)
+    bones = group_bones[groups]
+    keep = (bones >= 0) & (weights > 0)
+    owners, bones, weights = owners[keep], bones[keep], weights[keep].astype(np.float64)
+    
+    order = np.lexsort((-weights, owners))
+    owners, bones, weights = owners[order], bones[order], weights[order]
+    totals = np.bincount(owners, weights=weights, minlength=len(counts))
+    
+    return (
+        np.bincount(owners, minlength=len(counts)),
+        bones,
+        weights / totals[owners] if len(owners) else weights,
+    )
+
+
+def snapshot_mesh(
+    obj,
+    depsgraph,
+    armature=None,
+    bone_indices: dict = None,
+    material: str = None
+) -> MeshSnapshot:
+    """
+    Read a mesh object's evaluated geometry in bulk.
+    
+    All arrays are copied with foreach_get, so the snapshot no longer
+    references Blender data and can be written from any thread.
+    
+    Args:
+        obj: The mesh object
+        depsgraph: Evaluated dependency graph
+        armature: Armature the SMD skeleton comes from; positions are
+            written in its space
+        bone_indices: Bone name to node index mapping (see snapshot_skeleton)
+        material: Material name to use for every triangle instead of the
+            object's materials
+    
+    Returns:
+        MeshSnapshot
+    """
+    bone_indices = bone_indices or {}
+    eval_obj = obj.evaluated_get(depsgraph)
+    mesh = eval_obj.to_mesh()
+    
+    try:
+        mesh.calc_loop_triangles()
+        triangle_count = len(mesh.loop_triangles)
+        
+        triangles = np.empty(triangle_count * 3, dtype=np.int32)
+        mesh.loop_triangles.foreach_get("vertices", triangles)
+        triangle_loops = np.empty(triangle_count * 3, dtype=np.int32)
+        mesh.loop_triangles.foreach_get("loops", triangle_loops)
+        material_indices = np.empty(triangle_count, dtype=np.int32)
+        mesh.loop_triangles.foreach_get("material_index", material_indices)
+        
+        positions = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+        mesh.vertices.foreach_get("co", positions)
+        normals = _read_corner_normals(mesh)
+        
+        uvs = np.zeros(len(mesh.loops) * 2, dtype=np.float32)
+        if mesh.uv_layers.active:
+            mesh.uv_layers.active.data.foreach_get("uv", uvs)
+        
+        links = (None, None, None)
+        if bone_indices and obj.vertex_groups:
+            links = _read_bone_links(obj, mesh, bone_indices)
+    finally:
+        eval_obj.to_mesh_clear()
+    
+    matrix = np.array(obj.matrix_world, dtype=np.float64)
+    if armature is not None:
+        matrix = np.linalg.inv(np.array(armature.matrix_world, dtype=np.float64)) @ matrix
+    
+    positions = positions.reshape(-1, 3).astype(np.float64) @ matrix[:3, :3].T + matrix[:3, 3]
+    normals = normals.astype(np.float64) @ np.linalg.inv(matrix[:3, :3])
+    lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+    normals = np.divide(normals, lengths, out=np.zeros_like(normals), where=lengths > 0)
+    
+    if material:
+        materials = [material]
+        material_indices[:] = 0
+    else:
+        materials = [
+            slot.material.name if slot.material else DEFAULT_MATERIAL
+            for slot in obj.material_slots
+        ] or [DEFAULT_MATERIAL]
+    
+    bone_index = 0
+    if obj.parent_type == 'BONE' and obj.parent_bone in bone_indices:
+        bone_index = bone_indices[obj.parent_bone]
+    
+    return MeshSnapshot(
+        positions=positions,
+        triangles=triangles.reshape(-1, 3),
+        normals=normals[triangle_loops].reshape(-1, 3, 3),
+        uvs=uvs.reshape(-1, 2)[triangle_loops].reshape(-1, 3, 2),
+        material_indices=material_indices,
+        materials=materials,
+        link_counts=links[0],
+        link_bones=links[1],
+        link_weights=links[2],
+        bone_index=bone_index,
+    )
+
+
+@contextmanager
+def rest_pose(context, armatures: list):
+    """Temporarily put armatures in their rest position, updating the scene once."""
+    posed = [arm for arm in armatures if arm is not None and arm.data.pose_position != 'REST']
+    if not posed:
+        yield
+        return
+    
+    for armature in posed:
+        armature.data.pose_position = 'REST'
+    context.view_layer.update()
+    try:
+        yield
+    finally:
+        for armature in posed:
+            armature.data.pose_position = 'POSE'
+        context.view_layer.update()
+
+
+def _group_armature(meshes: list):
+    """Get the first armature deforming or parenting any of the meshes."""
+    return next(filter(None, map(find_armature, meshes)), None)
+
+
+def snapshot_reference(context, objects: list, armature=None, material: str = None) -> tuple:
+    """
+    Snapshot everything needed to write a reference SMD.
+    
+    Args:
+        context: Blender context
+        objects: Objects to export (non-mesh objects are skipped)
+        armature: Armature for the skeleton (found from the meshes if omitted)
+        material: Optional material name overriding the objects' materials
+    
+    Returns:
+        tuple: (nodes, rest_pose, mesh_snapshots)
+    """
+    meshes = [obj for obj in objects if obj.type == 'MESH']
+    if armature is None:
+        armature = _group_armature(meshes)
+    
+    nodes, bone_indices, rest = snapshot_skeleton(armature)
+    with rest_pose(context, [armature]):
+        depsgraph = context.evaluated_depsgraph_get()
+        snapshots = [
+            snapshot_mesh(obj, depsgraph, armature, bone_indices, material)
+            for obj in meshes
+        ]
+    return nodes, rest, snapshots
+
+
+def export_reference_smd(context, objects: list, filepath: str, armature=None) -> str:
+    """
+    Export mesh objects to a reference SMD without Blender Source Tools.
+    
+    Args:
+        context: Blender context
+        objects: Objects to export (non-mesh objects are skipped)
+        filepath: Output .smd path
+        armature: Armature for the skeleton (found from the meshes if omitted)
+    
+    Returns:
+        str: The written file path
+    """
+    nodes, rest, snapshots = snapshot_reference(context, objects, armature)
+    return write_reference_smd(filepath, nodes, rest, snapshots)
+
+
+def export_physics_smd(context, objects: list, filepath: str, armature=None) -> str:
+    """
+    Export collision mesh objects to a physics SMD.
+    
+    Args:
+        context: Blender context
+        objects: Collision mesh objects
+        filepath: Output .smd path
+        armature: Armature for the skeleton (found from the meshes if omitted)
+    
+    Returns:
+        str: The written file path
+    """
+    nodes, rest, snapshots = snapshot_reference(context, objects, armature, DEFAULT_PHYSICS_MATERIAL)
+    return write_reference_smd(filepath, nodes, rest, snapshots)
+
+
+def bake_pose_transforms(context, armature, frame_start: int, frame_end: int) -> np.ndarray:
+    """
+    Evaluate an armature's pose for a frame range.
+    
+    Args:
+        context: Blender context
+        armature: The armature object
+        frame_start: First frame
+        frame_end: Last frame (inclusive)
+    
+    Returns:
+        float64 array of shape (F, B, 6) with SMD bone transforms
+    """
+    scene = context.scene
+    nodes, _, _ = snapshot_skeleton(armature)
+    pose_bones = [armature.pose.bones[name] for name, _ in nodes]
+    parents = [parent for _, parent in nodes]
+    
+    original_frame = scene.frame_current
+    matrices = np.empty((frame_end - frame_start + 1, len(pose_bones), 4, 4))
+    try:
+        for i, frame in enumerate(range(frame_start, frame_end + 1)):
+            scene.frame_set(frame)
+            matrices[i] = [pose_bone.matrix for pose_bone in pose_bones]
+    finally:
+        scene.frame_set(original_frame)
+    
+    return matrices_to_smd_transforms(to_parent_space(matrices, parents))
+
+
+# F-curve data paths of pose bone channels: pose.bones["name"].channel
+_POSE_CHANNEL_PATH = re.compile(r'^pose\.bones\["((?:[^"\\]|\\.)*)"\]\.(\w+)$')
+
+
+def can_bake_directly(armature) -> bool:
+    """
+    Check whether an armature's pose follows from its F-curves alone.
+    
+    Constraints, drivers and non-default inheritance need the full scene
+    evaluation, so such rigs are baked frame by frame instead.
+    
+    Args:
+        armature: The armature object
+    
+    Returns:
+        bool: True if actions can be baked by evaluating F-curves directly
+    """
+    animation_data = armature.animation_data
+    if animation_data is not None and len(animation_data.drivers):
+        return False
+    
+    if any(len(pose_bone.constraints) for pose_bone in armature.pose.bones):
+        return False
+    
+    for bone in armature.data.bones:
+        inherit_scale = getattr(bone, "inherit_scale", 'FULL')  # Blender 2.81+
+        if not bone.use_inherit_rotation or inherit_scale != 'FULL' or not bone.use_local_location:
+            return False
+    
+    return True
+
+
+def snapshot_skeleton_data(armature) -> SkeletonData:
+    """
+    Read the bone hierarchy and current pose values used for direct baking.
+    
+    Args:
+        armature: The armature object
+    
+    Returns:
+        SkeletonData
+    """
+    bones = get_bone_order(armature)
+    bone_indices = {bone.name: i for i, bone in enumerate(bones)}
+    pose_bones = [armature.pose.bones[bone.name] for bone in bones]
+    
+    return SkeletonData(
+        names=[bone.name for bone in bones],
+        parents=[bone_indices[bone.parent.name] if bone.parent else -1 for bone in bones],
+        rest_matrices=np.array([bone.matrix_local for bone in bones], dtype=np.float64),
+        rotation_modes=[pose_bone.rotation_mode for pose_bone in pose_bones],
+        defaults={
+            channel: np.array([getattr(pose_bone, channel) for pose_bone in pose_bones], dtype=np.float64).reshape(-1, size)
+            for channel, size in POSE_CHANNELS.items()
+        },
+        connected=np.array([bool(bone.parent and bone.use_connect) for bone in bones], dtype=bool),
+    )
+
+
+def snapshot_fcurve(fcurve, frames: np.ndarray) -> FCurveData:
+    """
+    Copy an F-curve's keyframes with foreach_get.
+    
+    Curves using features the vectorized evaluator does not implement
+    (modifiers, easing presets, baked samples) are evaluated here with
+    fcurve.evaluate instead, which still needs no frame changes.
+    
+    Args:
+        fcurve: The F-curve
+        frames: Frames the action will be baked at
+    
+    Returns:
+        FCurveData
+    """
+    points = fcurve.keyframe_points
+    count = len(points)
+    
+    interpolation = np.empty(count, dtype=np.int32)
+    points.foreach_get("interpolation", interpolation)
+    
+    supported = set(INTERPOLATION_CODES.values())
+    if len(fcurve.modifiers) or len(fcurve.sampled_points) or not set(interpolation.tolist()) <= supported:
+        return FCurveData(samples=np.array([fcurve.evaluate(frame) for frame in frames], dtype=np.float64))
+    
+    arrays = {}
+    for name in ("co", "handle_left", "handle_right"):
+        values = np.empty(count * 2, dtype=np.float32)
+        points.foreach_get(name, values)
+        arrays[name] = values.reshape(-1, 2).astype(np.float64)
+    
+    return FCurveData(
+        keyframes=arrays["co"],
+        handles_left=arrays["handle_left"],
+        handles_right=arrays["handle_right"],
+        interpolation=interpolation.astype(np.int64),
+        extrapolation=fcurve.extrapolation,
+    )
+
+
+def snapshot_action(action) -> ActionData:
+    """
+    Copy the pose bone F-curves of an action.
+    
+    Args:
+        action: The action
+    
+    Returns:
+        ActionData covering the action's frame range
+    """
+    frame_start, frame_end = (int(round(frame)) for frame in action.frame_range)
+    action_data = ActionData(action.name, frame_start, frame_end)
+    frames = action_data.frames
+    
+    for fcurve in action.fcurves:
+        match = _POSE_CHANNEL_PATH.match(fcurve.data_path)
+        if fcurve.mute or not match or match.group(2) not in POSE_CHANNELS:
+            continue
+        
+        bone_name = re.sub(r'\\(.)', r'\1', match.group(1))
+        action_data.channels[(bone_name, match.group(2), fcurve.array_index)] = snapshot_fcurve(fcurve, frames)
+    
+    return action_data
+
+
+def bake_action(context, armature, action) -> tuple:
+    """
+    Bake an action of an armature into SMD bone transforms.
+    
+    F-curves are evaluated for all frames at once when the rig allows it
+    (see can_bake_directly); otherwise the scene is stepped frame by frame.
+    
+    Args:
+        context: Blender context
+        armature: The armature object
+        action: The action to bake
+    
+    Returns:
+        tuple: (nodes, frames) with the SMD node list and an (F, B, 6)
+        transform array
+    """
+    if can_bake_directly(armature):
+        skeleton = snapshot_skeleton_data(armature)
+        return skeleton.nodes, bake_action_transforms(skeleton, snapshot_action(action))
+    
+    if armature.animation_data is None:
+        armature.animation_data_create()
+    
+    frame_start, frame_end = (int(round(frame)) for frame in action.frame_range)
+    nodes, _, _ = snapshot_skeleton(armature)
+    
+    original_action = armature.animation_data.action
+    armature.animation_data.action = action
+    try:
+        frames = bake_pose_transforms(context, armature, frame_start, frame_end)
+    finally:
+        armature.animation_data.action = original_action
+    
+    return nodes, frames
+
+
+def export_animation_smd(context, armature, filepath: str, action=None) -> str:
+    """
+    Export an armature action to an animation SMD without Blender Source Tools.
+    
+    Args:
+        context: Blender context
+        armature: The armature object
+        filepath: Output .smd path
+        action: Action to export (defaults to the armature's active action)
+    
+    Returns:
+        str: The written file path
+    """
+    if action is None and armature.animation_data is not None:
+        action = armature.animation_data.action
+    if action is None:
+        raise ValueError(f"Armature '{armature.name}' has no action to export")
+    
+    nodes, frames = bake_action(context, armature, action)
+    return write_animation_smd(filepath, nodes, frames)
+
+
+# ============================================================================
+# Batch Export
+# ============================================================================
+
+EXPORT_BY_OBJECT = 'OBJECT'
+EXPORT_BY_COLLECTION = 'COLLECTION'
+
+
+def _iter_collections(collection):
+    """Yield a collection and all of its child collections."""
+    yield collection
+    for child in collection.children:
+        yield from _iter_collections(child)
+
+
+def get_export_groups(context, grouping: str = EXPORT_BY_OBJECT) -> dict:
+    """
+    Group the scene's visible mesh objects into SMD files.
+    
+    Args:
+        context: Blender context
+        grouping: EXPORT_BY_OBJECT for one SMD per object, or
+            EXPORT_BY_COLLECTION for one SMD per collection (objects
+            directly in the scene collection are grouped under the
+            scene's name)
+    
+    Returns:
+        dict: Mapping of SMD names to lists of mesh objects
+    """
+    def visible_meshes(objects):
+        return [obj for obj in objects if obj.type == 'MESH' and obj.visible_get()]
+    
+    if grouping != EXPORT_BY_COLLECTION:
+        return {obj.name: [obj] for obj in visible_meshes(context.scene.objects)}
+    
+    groups = {}
+    scene_collection = context.scene.collection
+    for collection in _iter_collections(scene_collection):
+        meshes = visible_meshes(collection.objects)
+        if meshes:
+            name = context.scene.name if collection == scene_collection else collection.name
+            groups[name] = meshes
+    return groups
+
+
+def snapshot_export_jobs(context, groups: dict, export_folder: str) -> list:
+    """
+    Snapshot the data of every SMD file to export, on the main thread.
+    
+    All armatures are put in rest position together, so the scene is
+    re-evaluated once instead of once per file, and each skeleton is only
+    read once however many files use it.
+    
+    Args:
+        context: Blender context
+        groups: Mapping of SMD names to mesh objects (see get_export_groups)
+        export_folder: Folder the SMD files are written to
+    
+    Returns:
+        list: One job dict per SMD with 'name', 'filepath', 'nodes',
+        'rest_pose' and 'meshes' (MeshSnapshot objects)
+    """
+    group_armatures = {name: _group_armature(meshes) for name, meshes in groups.items()}
+    armatures = {arm.name: arm for arm in group_armatures.values() if arm is not None}
+    skeletons = {None: snapshot_skeleton(None)}
+    skeletons.update({name: snapshot_skeleton(arm) for name, arm in armatures.items()})
+    
+    jobs = []
+    with rest_pose(context, list(armatures.values())):
+        depsgraph = context.evaluated_depsgraph_get()
+        for name, meshes in groups.items():
+            armature = group_armatures[name]
+            nodes, bone_indices, rest = skeletons[armature.name if armature else None]
+            jobs.append({
+                'name': name,
+                'filepath': os.path.join(export_folder, f"{name}.smd"),
+                'nodes': nodes,
+                'rest_pose': rest,
+                'meshes': [snapshot_mesh(obj, depsgraph, armature, bone_indices) for obj in meshes],
+            })
+    return jobs
+
+
+def write_export_jobs(
+    jobs: list,
+    max_workers: Optional[int] = None,
+    progress_callback: Optional[Callable[[int, int, dict, bool], None]] = None
+) -> dict:
+    """
+    Write snapshotted SMD files concurrently.
+    
+    Jobs hold no Blender data, so this can run in a background thread.
+    
+    Args:
+        jobs: Job dicts from snapshot_export_jobs
+        max_workers: Number of concurrent writers
+            (None or 0 uses the CPU core count)
+        progress_callback: Optional callable invoked after each file as
+            callback(completed, total, job, success)
+    
+    Returns:
+        dict with 'success', 'failed' and 'total' counts, 'written'
+        listing the written file paths and 'errors' mapping each failed
+        SMD name to its error message
+    """
+    if not max_workers:
+        max_workers = os.cpu_count() or 1
+    max_workers = max(1, min(max_workers, len(jobs)))
+    
+    written = []
+    errors = {}
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(write_reference_smd, job['filepath'], job['nodes'], job['rest_pose'], job['meshes']): job
+            for job in jobs
+        }
+        
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                written.append(future.result())
+                success = True
+            except (OSError, ValueError) as e:
+                errors[job['name']] = str(e)
+                success = False
+            
+            if progress_callback is not None:
+                progress_callback(len(written) + len(errors), len(jobs), job, success)
+    
+    return {
+        'success': len(written),
+        'failed': len(errors),
+        'total': len(jobs),
+        'written': sorted(written),
+        'errors': errors,
+    }
+
+
+def export_smd_batch(
+    context,
+    export_folder: str,
+    grouping: str = EXPORT_BY_OBJECT,
+    max_workers: Optional[int] = None
+) -> dict:
+    """
+    Export one SMD per object or collection without touching collections.
+    
+    Args:
+        context: Blender context
+        export_folder: Folder the SMD files are written to
+        grouping: EXPORT_BY_OBJECT or EXPORT_BY_COLLECTION
+        max_workers: Number of concurrent writers
+    
+    Returns:
+        dict: See write_export_jobs()
+    """
+    jobs = snapshot_export_jobs(context, get_export_groups(context, grouping), export_folder)
+    return write_export_jobs(jobs, max_workers)
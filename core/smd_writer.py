@@ -0,0 +1,391 @@
+"""
+Native SMD file writing.
+
+Writes Source SMD files (reference, physics and animation) directly from
+NumPy arrays, without going through Blender Source Tools' exporter. Rows
+are formatted in bulk with one string formatting operation per chunk
+and streamed to disk through a large write buffer, so big meshes
+export in seconds.
+
+This module has no Blender dependency; core/smd_export.py reads the
+scene data into the snapshots written here.
+"""
+import os
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .collision_shapes import CollisionShape
+
+
+DEFAULT_ROOT_BONE = "root"
+DEFAULT_PHYSICS_MATERIAL = "phys"
+DEFAULT_MATERIAL = "no_material"
+
+# Triangles formatted per write
+_CHUNK_TRIANGLES = 16384
+
+# Skeleton frames formatted per write
+_CHUNK_FRAMES = 256
+
+_WRITE_BUFFER_SIZE = 1 << 20
+
+_TRIANGLE_FORMAT = "%s\n%s\n%s\n%s\n"
+
+
+@dataclass
+class MeshSnapshot:
+    """
+    Triangulated mesh data ready to be written to an SMD.
+
+    Attributes:
+        positions: float array (V, 3) of vertex positions
+        triangles: int array (T, 3) of vertex indices
+        normals: float array (T, 3, 3) of corner normals
+        uvs: float array (T, 3, 2) of corner UVs
+        material_indices: int array (T,) indexing materials
+        materials: Material names
+        link_counts: int array (V,) with the number of bone links per
+            vertex (None for unweighted meshes)
+        link_bones: Concatenated bone indices of all links
+        link_weights: Concatenated weights of all links
+        bone_index: Bone used by vertices without links
+    """
+    positions: np.ndarray
+    triangles: np.ndarray
+    normals: np.ndarray
+    uvs: np.ndarray
+    material_indices: np.ndarray
+    materials: List[str] = field(default_factory=lambda: [DEFAULT_MATERIAL])
+    link_counts: Optional[np.ndarray] = None
+    link_bones: Optional[np.ndarray] = None
+    link_weights: Optional[np.ndarray] = None
+    bone_index: int = 0
+
+    @property
+    def triangle_count(self) -> int:
+        return len(self.triangles)
+
+
+# ============================================================================
+# Transforms
+# ============================================================================
+
+def matrices_to_smd_transforms(matrices: np.ndarray) -> np.ndarray:
+    """
+    Convert transform matrices to SMD position and XYZ Euler rotation rows.
+
+    Args:
+        matrices: float array of shape (..., 4, 4)
+
+    Returns:
+        float64 array of shape (..., 6): x, y, z, rx, ry, rz
+    """
+    matrices = np.asarray(matrices, dtype=np.float64)
+    rotation = matrices[..., :3, :3]
+
+    # Remove scale so the rotation decomposition stays valid
+    scale = np.linalg.norm(rotation, axis=-2, keepdims=True)
+    rotation = rotation / np.where(scale > 0, scale, 1.0)
+
+    sin_y = np.clip(-rotation[..., 2, 0], -1.0, 1.0)
+    cos_y = np.sqrt(1.0 - sin_y * sin_y)
+    gimbal = cos_y < 1e-6
+
+    rx = np.where(gimbal,
+                  np.arctan2(-rotation[..., 1, 2], rotation[..., 1, 1]),
+                  np.arctan2(rotation[..., 2, 1], rotation[..., 2, 2]))
+    ry = np.arcsin(sin_y)
+    rz = np.where(gimbal, 0.0, np.arctan2(rotation[..., 1, 0], rotation[..., 0, 0]))
+
+    return np.concatenate([matrices[..., :3, 3], np.stack([rx, ry, rz], axis=-1)], axis=-1)
+
+
+def to_parent_space(matrices: np.ndarray, parents: Sequence[int]) -> np.ndarray:
+    """
+    Convert bone matrices from armature space to their parent's space.
+
+    Args:
+        matrices: float array of shape (..., B, 4, 4) in armature space
+        parents: Parent index of each bone (-1 for root bones)
+
+    Returns:
+        float64 array of the same shape; root bones stay in armature space
+    """
+    matrices = np.asarray(matrices, dtype=np.float64)
+    parents = np.asarray(parents, dtype=np.int64)
+    local = matrices.copy()
+
+    child = parents >= 0
+    if child.any():
+        local[..., child, :, :] = np.linalg.inv(matrices[..., parents[child], :, :]) @ matrices[..., child, :, :]
+    return local
+
+
+# ============================================================================
+# Row Formatting
+# ============================================================================
+
+def _format_rows(row_format: str, rows: np.ndarray) -> List[str]:
+    """Format every row of a 2D array with one formatting operation."""
+    if not len(rows):
+        return []
+    text = (row_format + "\n") * len(rows) % tuple(rows.ravel().tolist())
+    return text.split("\n")[:-1]
+
+
+def _vertex_prefixes(snapshot: MeshSnapshot, parents: np.ndarray) -> np.ndarray:
+    """Format "<parent> <x> <y> <z>" for every vertex."""
+    rows = np.empty((len(parents), 4), dtype=object)
+    rows[:, 0] = parents
+    rows[:, 1:] = snapshot.positions
+    return np.array(_format_rows("%d %.6f %.6f %.6f", rows), dtype=object)
+
+
+def _vertex_links(snapshot: MeshSnapshot) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Get each vertex's parent bone and formatted " <count> <bone> <weight>..." links.
+
+    Returns:
+        Tuple of (parents, suffixes) arrays with one entry per vertex
+    """
+    vertex_count = len(snapshot.positions)
+    parents = np.full(vertex_count, snapshot.bone_index, dtype=np.int64)
+    suffixes = np.full(vertex_count, "", dtype=object)
+
+    counts = snapshot.link_counts
+    if counts is None or not len(snapshot.link_bones):
+        return parents, suffixes
+
+    starts = np.zeros(vertex_count, dtype=np.int64)
+    np.cumsum(counts[:-1], out=starts[1:])
+
+    has_links = counts > 0
+    parents[has_links] = snapshot.link_bones[starts[has_links]]
+
+    # Format all vertices with the same number of links together
+    for count in np.unique(counts[has_links]):
+        vertices = np.nonzero(counts == count)[0]
+        offsets = starts[vertices, None] + np.arange(count)
+        rows = np.empty((len(vertices), 1 + 2 * count), dtype=object)
+        rows[:, 0] = int(count)
+        rows[:, 1::2] = snapshot.link_bones[offsets]
+        rows[:, 2::2] = snapshot.link_weights[offsets]
+        row_format = " %d" + " %d %.6f" * int(count)
+        suffixes[vertices] = _format_rows(row_format, rows)
+
+    return parents, suffixes
+
+
+# ============================================================================
+# Block Writers
+# ============================================================================
+
+def _open_smd(filepath: str):
+    """Open an SMD file for buffered text writing, creating its folder."""
+    output_dir = os.path.dirname(filepath)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    return open(filepath, 'w', encoding='utf-8', newline='\n', buffering=_WRITE_BUFFER_SIZE)
+
+
+def _write_nodes(f, nodes: Sequence[Tuple[str, int]]) -> None:
+    """Write the nodes block from (name, parent_index) pairs."""
+    f.write("version 1\nnodes\n")
+    f.write("".join(f'{i} "{name}" {parent}\n' for i, (name, parent) in enumerate(nodes)))
+    f.write("end\n")
+
+
+def _write_skeleton(f, frames: np.ndarray, first_frame: int = 0) -> None:
+    """Write the skeleton block from an (F, B, 6) transform array."""
+    frames = np.asarray(frames, dtype=np.float64)
+    frame_count, bone_count = frames.shape[:2]
+
+    rows = np.empty((bone_count, 7), dtype=object)
+    rows[:, 0] = list(range(bone_count))
+    row_format = "%d %.6f %.6f %.6f %.6f %.6f %.6f\n" * bone_count
+
+    f.write("skeleton\n")
+    for start in range(0, frame_count, _CHUNK_FRAMES):
+        chunk = []
+        for frame in range(start, min(start + _CHUNK_FRAMES, frame_count)):
+            rows[:, 1:] = frames[frame]
+            chunk.append(f"time {first_frame + frame}\n")
+            chunk.append(row_format % tuple(rows.ravel().tolist()))
+        f.write("".join(chunk))
+    f.write("end\n")
+
+
+def _corner_strings(snapshot: MeshSnapshot, prefixes: np.ndarray, suffixes: np.ndarray) -> np.ndarray:
+    """
+    Format the vertex line of every triangle corner.
+
+    Corners of a vertex usually share its normal and UV (smooth shading,
+    no UV seam), so each corner identical to the vertex's first corner
+    reuses that corner's line instead of being formatted again.
+
+    Returns:
+        Object array of shape (T, 3) with one vertex line per corner
+    """
+    vertices = np.asarray(snapshot.triangles, dtype=np.int64).ravel()
+    attributes = np.concatenate([
+        np.asarray(snapshot.normals, dtype=np.float64).reshape(-1, 3),
+        np.asarray(snapshot.uvs, dtype=np.float64).reshape(-1, 2),
+    ], axis=1)
+    corners = np.arange(len(vertices))
+
+    # First corner of each vertex (reversed so the earliest write wins)
+    first = np.zeros(len(snapshot.positions), dtype=np.int64)
+    first[vertices[::-1]] = corners[::-1]
+    representative = first[vertices]
+    representative = np.where(
+        (attributes == attributes[representative]).all(axis=1), representative, corners
+    )
+
+    distinct = np.nonzero(representative == corners)[0]
+    rows = np.empty((len(distinct), 7), dtype=object)
+    rows[:, 0] = prefixes[vertices[distinct]]
+    rows[:, 1:6] = attributes[distinct]
+    rows[:, 6] = suffixes[vertices[distinct]]
+
+    lines = np.empty(len(vertices), dtype=object)
+    lines[distinct] = _format_rows("%s %.6f %.6f %.6f %.6f %.6f%s", rows)
+    return lines[representative].reshape(-1, 3)
+
+
+def _write_triangles(f, snapshot: MeshSnapshot) -> None:
+    """Stream a mesh's triangles, writing one chunk at a time."""
+    parents, suffixes = _vertex_links(snapshot)
+    prefixes = _vertex_prefixes(snapshot, parents)
+    corner_lines = _corner_strings(snapshot, prefixes, suffixes)
+
+    materials = np.array(snapshot.materials or [DEFAULT_MATERIAL], dtype=object)
+    material_indices = np.clip(np.asarray(snapshot.material_indices, dtype=np.int64), 0, len(materials) - 1)
+
+    for start in range(0, len(corner_lines), _CHUNK_TRIANGLES):
+        chunk = slice(start, start + _CHUNK_TRIANGLES)
+        rows = np.empty((len(corner_lines[chunk]), 4), dtype=object)
+        rows[:, 0] = materials[material_indices[chunk]]
+        rows[:, 1:] = corner_lines[chunk]
+        f.write(_TRIANGLE_FORMAT * len(rows) % tuple(rows.ravel().tolist()))
+
+
+# ============================================================================
+# File Writers
+# ============================================================================
+
+def write_reference_smd(
+    filepath: str,
+    nodes: Sequence[Tuple[str, int]],
+    rest_pose: np.ndarray,
+    meshes: Sequence[MeshSnapshot]
+) -> str:
+    """
+    Write a reference (or physics) SMD with a rest pose and triangles.
+
+    Args:
+        filepath: Output .smd path
+        nodes: (name, parent_index) of each bone, parents first
+        rest_pose: float array (B, 6) of bone positions and rotations
+        meshes: Mesh snapshots to write
+
+    Returns:
+        str: The written file path
+    """
+    with _open_smd(filepath) as f:
+        _write_nodes(f, nodes)
+        _write_skeleton(f, np.asarray(rest_pose, dtype=np.float64)[None])
+        f.write("triangles\n")
+        for snapshot in meshes:
+            if snapshot.triangle_count:
+                _write_triangles(f, snapshot)
+        f.write("end\n")
+    return filepath
+
+
+def write_animation_smd(
+    filepath: str,
+    nodes: Sequence[Tuple[str, int]],
+    frames: np.ndarray,
+    first_frame: int = 0
+) -> str:
+    """
+    Write an animation SMD (skeleton only).
+
+    Args:
+        filepath: Output .smd path
+        nodes: (name, parent_index) of each bone, parents first
+        frames: float array (F, B, 6) of bone transforms per frame
+        first_frame: Number of the first "time" block
+
+    Returns:
+        str: The written file path
+    """
+    with _open_smd(filepath) as f:
+        _write_nodes(f, nodes)
+        _write_skeleton(f, frames, first_frame)
+    return filepath
+
+
+def shape_to_snapshot(shape: CollisionShape, material: str = DEFAULT_PHYSICS_MATERIAL) -> MeshSnapshot:
+    """
+    Convert a collision shape into a flat-shaded mesh snapshot.
+
+    Args:
+        shape: CollisionShape with polygon faces
+        material: Material name of the triangles
+
+    Returns:
+        MeshSnapshot
+    """
+    triangles = np.array([
+        (face[0], face[i], face[i + 1])
+        for face in shape.faces
+        for i in range(1, len(face) - 1)
+    ], dtype=np.int64).reshape(-1, 3)
+    positions = np.asarray(shape.vertices, dtype=np.float64)
+
+    corners = positions[triangles]
+    normals = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+    lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+    normals = np.divide(normals, lengths, out=np.zeros_like(normals), where=lengths > 0)
+
+    return MeshSnapshot(
+        positions=positions,
+        triangles=triangles,
+        normals=np.repeat(normals[:, None, :], 3, axis=1),
+        uvs=np.zeros((len(triangles), 3, 2)),
+        material_indices=np.zeros(len(triangles), dtype=np.int64),
+        materials=[material],
+    )
+
+
+def write_collision_smd(
+    filepath: str,
+    shapes: list,
+    bone_name: str = DEFAULT_ROOT_BONE,
+    material: str = DEFAULT_PHYSICS_MATERIAL
+) -> str:
+    """
+    Write convex collision shapes as a static physics SMD.
+
+    Each shape is written as its own closed set of triangles, so
+    studiomdl treats it as one convex piece (use $concave for more than
+    one).
+
+    Args:
+        filepath: Output .smd path
+        shapes: CollisionShape objects
+        bone_name: Name of the single root bone
+        material: Material name of the triangles
+
+    Returns:
+        str: The written file path
+    """
+    snapshots = [
+        shape_to_snapshot(shape, material)
+        for shape in shapes
+        if isinstance(shape, CollisionShape) and shape.faces
+    ]
+    return write_reference_smd(filepath, [(bone_name, -1)], np.zeros((1, 6)), snapshots)
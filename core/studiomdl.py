@@ -1,10 +1,14 @@
 """
 StudioMDL compilation utilities.
 """
+import os
 import subprocess
+import threading
 from pathlib import Path
+from typing import Callable, Optional, Sequence
 
 from ..data.paths import get_studiomdl_path
+from ..utils.threading_utils import TaskToken
 
 
 def run_definebones(
@@ -65,6 +69,111 @@ def run_definebones(
     return result.stdout, result.stderr
 
 
+def build_studiomdl_command(
+    studiomdl_exe: Path,
+    qc_path: Path,
+    game_dir: Optional[Path] = None,
+    extra_args: Sequence[str] = ()
+) -> list:
+    """
+    Build the command line of one studiomdl compile.
+    
+    Args:
+        studiomdl_exe: Path to studiomdl.exe or a compatible executable
+        qc_path: Path to the QC file
+        game_dir: Optional game folder passed as -game
+        extra_args: Additional arguments placed before the QC path
+    
+    Returns:
+        list: Command arguments
+    """
+    command = [str(studiomdl_exe), *extra_args]
+    if game_dir:
+        command += ["-game", str(game_dir)]
+    command.append(str(qc_path))
+    return command
+
+
+def _pump_lines(stream, name: str, lines: list, line_callback) -> None:
+    """Read a process pipe line by line until it closes."""
+    for line in stream:
+        line = line.rstrip("\r\n")
+        lines.append(line)
+        if line_callback is not None:
+            line_callback(name, line)
+    stream.close()
+
+
+def run_studiomdl(
+    command: list,
+    cwd: Optional[Path] = None,
+    line_callback: Optional[Callable[[str, str], None]] = None,
+    token: Optional[TaskToken] = None
+) -> tuple:
+    """
+    Run a studiomdl command, streaming its output as it is printed.
+    
+    stdout and stderr are read concurrently, so neither pipe can fill up
+    and stall the compiler.
+    
+    Args:
+        command: Command from build_studiomdl_command()
+        cwd: Working directory (defaults to the executable's folder)
+        line_callback: Optional callable invoked from reader threads for
+            each output line as callback(stream_name, line), where
+            stream_name is 'stdout' or 'stderr'
+        token: Optional task token; the compiler is killed when it is
+            cancelled
+    
+    Returns:
+        tuple: (return code, stdout lines, stderr lines)
+    
+    Raises:
+        OSError: If the executable cannot be started
+        TaskCancelled: If the token was cancelled
+    """
+    if token is not None:
+        token.check()
+    
+    if cwd is None:
+        cwd = Path(command[0]).resolve().parent
+    
+    process = subprocess.Popen(
+        command,
+        cwd=cwd,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        errors="replace",
+        bufsize=1,
+        creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0) if os.name == "nt" else 0,
+    )
+    
+    if token is not None:
+        token.register_process(process)
+    
+    stdout_lines = []
+    stderr_lines = []
+    try:
+        stderr_reader = threading.Thread(
+            target=_pump_lines,
+            args=(process.stderr, "stderr", stderr_lines, line_callback),
+            daemon=True
+        )
+        stderr_reader.start()
+        _pump_lines(process.stdout, "stdout", stdout_lines, line_callback)
+        stderr_reader.join()
+        returncode = process.wait()
+    finally:
+        if token is not None:
+            token.unregister_process(process)
+    
+    if token is not None:
+        token.check()
+    return returncode, stdout_lines, stderr_lines
+
+
 def resolve_studiomdl_path(ui_path: str = "") -> Path:
     """
     Resolve the studiomdl.exe path using multiple sources.
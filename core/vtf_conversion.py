@@ -1,20 +1,191 @@
 """
 VTF (Valve Texture Format) batch conversion utilities.
 """
-import subprocess
+import os
+import struct
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Tuple, List, Optional
+from typing import Callable, Tuple, List, Optional
 
+import numpy as np
 
-def convert_file_with_structure(
+from .build_cache import BuildCache, hash_settings
+from .vtfcmd_batch import build_chunk_command, plan_vtfcmd_chunks
+from ..utils.threading_utils import TaskCancelled, TaskToken, run_subprocess
+
+
+# Conversions done in-process with the VTF reader instead of VTFCmd
+NATIVE_EXPORT_FORMATS = ('png', 'tga')
+
+
+def get_default_worker_count() -> int:
+    """
+    Get the default number of concurrent converter processes.
+    
+    Returns:
+        int: Number of CPU cores (at least 1)
+    """
+    return os.cpu_count() or 1
+
+
+def get_output_path(
+    file_path: Path,
+    export_format: str,
+    input_folder: Path,
+    output_folder: Path
+) -> Path:
+    """
+    Get the path VTFCmd writes a converted file to.
+    
+    Args:
+        file_path: Path to the source file
+        export_format: Target format (e.g., "vtf", "png", "tga")
+        input_folder: Root input folder
+        output_folder: Root output folder
+    
+    Returns:
+        Path: Output file path, mirroring the input folder structure
+    """
+    relative_path = file_path.relative_to(input_folder)
+    return output_folder / relative_path.parent / (file_path.stem + f".{export_format}")
+
+
+def is_native_conversion(source_filetype: str, target_filetype: str) -> bool:
+    """
+    Check if a conversion is done in-process instead of by VTFCmd.
+    
+    Args:
+        source_filetype: Source file extension
+        target_filetype: Target file extension
+    
+    Returns:
+        bool: True for VTF to PNG/TGA conversions
+    """
+    return source_filetype == "vtf" and target_filetype in NATIVE_EXPORT_FORMATS
+
+
+def can_convert_natively(file_path: Path, export_format: str) -> bool:
+    """
+    Check if the VTF reader can export a file, so VTFCmd is not needed.
+    
+    Only the header is read. Image formats the reader cannot decode
+    (e.g. RGBA16161616F or RGB565) are left to VTFCmd. Files whose header
+    cannot be read stay native so the reader's error is reported.
+    
+    Args:
+        file_path: Path to the source file
+        export_format: Target format (e.g., "vtf", "png", "tga")
+    
+    Returns:
+        bool: True if the file is converted in-process
+    """
+    from .vtf_reader import VTFFile, can_decode
+    
+    if not is_native_conversion(file_path.suffix[1:].lower(), export_format):
+        return False
+    
+    try:
+        with VTFFile(file_path) as vtf:
+            return can_decode(vtf.image_format)
+    except (OSError, ValueError):
+        return True
+
+
+def encode_png(rgba) -> bytes:
+    """
+    Encode an RGBA image as PNG.
+    
+    Args:
+        rgba: uint8 array of shape (height, width, 4)
+    
+    Returns:
+        bytes: PNG file contents
+    """
+    height, width = rgba.shape[:2]
+    
+    # Each scanline is prefixed with filter type 0 (none)
+    scanlines = np.zeros((height, width * 4 + 1), dtype=np.uint8)
+    scanlines[:, 1:] = rgba.reshape(height, width * 4)
+    
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        body = tag + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body))
+    
+    header = struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", header)
+        + chunk(b"IDAT", zlib.compress(scanlines.tobytes(), 6))
+        + chunk(b"IEND", b"")
+    )
+
+
+def encode_tga(rgba) -> bytes:
+    """
+    Encode an RGBA image as uncompressed 32-bit TGA.
+    
+    Args:
+        rgba: uint8 array of shape (height, width, 4)
+    
+    Returns:
+        bytes: TGA file contents
+    """
+    height, width = rgba.shape[:2]
+    
+    # Image type 2 (uncompressed true color), top-left origin, 8 alpha bits
+    header = struct.pack("<BBBHHBHHHHBB", 0, 0, 2, 0, 0, 0, 0, 0, width, height, 32, 0x28)
+    return header + rgba[..., [2, 1, 0, 3]].tobytes()
+
+
+def _convert_file_native(
+    file_path: Path,
+    export_format: str,
+    input_folder: Path,
+    output_folder: Path
+) -> Tuple[bool, Optional[str]]:
+    """
+    Export the first frame of a VTF file's top mip level as PNG or TGA.
+    
+    The file is memory-mapped, so only the exported image's bytes are read.
+    
+    Args:
+        file_path: Path to the source VTF file
+        export_format: Target format ("png" or "tga")
+        input_folder: Root input folder
+        output_folder: Root output folder
+    
+    Returns:
+        Tuple of (success, error_message). error_message is None on success.
+    """
+    from .vtf_reader import read_vtf_rgba
+    
+    output_path = get_output_path(file_path, export_format, input_folder, output_folder)
+    
+    try:
+        rgba = read_vtf_rgba(file_path)
+        data = encode_png(rgba) if export_format == "png" else encode_tga(rgba)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(output_path, "wb") as f:
+            f.write(data)
+    except (OSError, ValueError) as e:
+        return False, str(e)
+    
+    return True, None
+
+
+def _convert_file(
     file_path: Path,
     export_format: str,
     input_folder: Path,
     output_folder: Path,
-    vtfcmd_exe: Path
-) -> bool:
+    vtfcmd_exe: Path,
+    token: Optional[TaskToken] = None,
+    native: Optional[bool] = None
+) -> Tuple[bool, Optional[str]]:
     """
-    Convert a single file while preserving folder structure.
+    Convert a single file and capture any error message.
     
     Args:
         file_path: Path to the source file
@@ -22,14 +193,24 @@ def convert_file_with_structure(
         input_folder: Root input folder
         output_folder: Root output folder
         vtfcmd_exe: Path to VTFCmd.exe
+        token: Optional task token; VTFCmd is killed when it is cancelled
+        native: Convert in-process instead of with VTFCmd
+            (None checks the file with can_convert_natively)
     
     Returns:
-        bool: True if conversion succeeded, False otherwise
+        Tuple of (success, error_message). error_message is None on success.
+    
+    Raises:
+        TaskCancelled: If the token was cancelled
     """
+    if native is None:
+        native = can_convert_natively(file_path, export_format)
+    if native:
+        return _convert_file_native(file_path, export_format, input_folder, output_folder)
+    
     relative_path = file_path.relative_to(input_folder)
     output_subfolder = output_folder / relative_path.parent
     output_subfolder.mkdir(parents=True, exist_ok=True)
-    output_path = output_subfolder / (file_path.stem + f".{export_format}")
     
     cmd = [
         str(vtfcmd_exe),
@@ -40,12 +221,250 @@ def convert_file_with_structure(
     ]
     
     try:
-        subprocess.run(cmd, check=True)
+        result = run_subprocess(cmd, token)
+    except OSError as e:
+        return False, str(e)
+    
+    if result.returncode != 0:
+        error = (result.stderr or result.stdout).strip()
+        return False, error or f"VTFCmd exited with code {result.returncode}"
+    
+    return True, None
+
+
+def convert_file_with_structure(
+    file_path: Path,
+    export_format: str,
+    input_folder: Path,
+    output_folder: Path,
+    vtfcmd_exe: Path
+) -> bool:
+    """
+    Convert a single file while preserving folder structure.
+    
+    Args:
+        file_path: Path to the source file
+        export_format: Target format (e.g., "vtf", "png", "tga")
+        input_folder: Root input folder
+        output_folder: Root output folder
+        vtfcmd_exe: Path to VTFCmd.exe
+    
+    Returns:
+        bool: True if conversion succeeded, False otherwise
+    """
+    success, error = _convert_file(
+        file_path, export_format, input_folder, output_folder, vtfcmd_exe
+    )
+    
+    if success:
+        output_path = get_output_path(file_path, export_format, input_folder, output_folder)
         print(f"Converted: {file_path} -> {output_path}")
-        return True
-    except subprocess.CalledProcessError as e:
-        print(f"Failed: {file_path}, {e}")
-        return False
+    else:
+        print(f"Failed: {file_path}, {error}")
+    
+    return success
+
+
+def _convert_file_cached(
+    file_path: Path,
+    export_format: str,
+    input_folder: Path,
+    output_folder: Path,
+    vtfcmd_exe: Path,
+    cache: Optional[BuildCache],
+    settings_hash: str,
+    token: Optional[TaskToken] = None,
+    native: Optional[bool] = None
+) -> Tuple[bool, Optional[str], bool]:
+    """
+    Convert a single file unless its cached output is up to date.
+    
+    Args:
+        file_path: Path to the source file
+        export_format: Target format (e.g., "vtf", "png", "tga")
+        input_folder: Root input folder
+        output_folder: Root output folder
+        vtfcmd_exe: Path to VTFCmd.exe
+        cache: Build cache of the output folder (None always converts)
+        settings_hash: Hash of the conversion settings
+        token: Optional task token
+        native: Convert in-process (see _convert_file)
+    
+    Returns:
+        Tuple of (success, error_message, skipped)
+    
+    Raises:
+        TaskCancelled: If the token was cancelled
+    """
+    if token is not None:
+        token.check()
+    
+    if cache is None:
+        success, error = _convert_file(
+            file_path, export_format, input_folder, output_folder, vtfcmd_exe, token, native
+        )
+        return success, error, False
+    
+    output_path = get_output_path(file_path, export_format, input_folder, output_folder)
+    source_hash = cache.hash_source(file_path)
+    
+    if cache.is_up_to_date(output_path, source_hash, settings_hash):
+        return True, None, True
+    
+    success, error = _convert_file(
+        file_path, export_format, input_folder, output_folder, vtfcmd_exe, token, native
+    )
+    
+    if success and output_path.exists():
+        cache.record(output_path, source_hash, settings_hash, source_path=file_path)
+    else:
+        cache.forget(output_path)
+    
+    return success, error, False
+
+
+def _vtfcmd_base_command(vtfcmd_exe: Path, output_subfolder: Path, export_format: str) -> List[str]:
+    """Get the VTFCmd arguments shared by every file of an output folder."""
+    return [
+        str(vtfcmd_exe),
+        "-output", str(output_subfolder),
+        "-exportformat", export_format,
+        "-silent"
+    ]
+
+
+def plan_conversion_batches(
+    files: List[Path],
+    export_format: str,
+    input_folder: Path,
+    output_folder: Path,
+    vtfcmd_exe: Path,
+    max_workers: Optional[int] = None
+) -> List[List[Path]]:
+    """
+    Group files into VTFCmd runs.
+    
+    Files are grouped by output folder, since a run writes to one folder,
+    and each group is split into command lines that fit the platform's
+    command-line limit (see core.vtfcmd_batch.plan_vtfcmd_chunks).
+    
+    Args:
+        files: Source files
+        export_format: Target format (e.g., "vtf", "png", "tga")
+        input_folder: Root input folder
+        output_folder: Root output folder
+        vtfcmd_exe: Path to VTFCmd.exe
+        max_workers: Number of runs that will go in parallel
+    
+    Returns:
+        list: File lists, one per VTFCmd run
+    """
+    groups = {}
+    for file_path in files:
+        output_subfolder = output_folder / file_path.relative_to(input_folder).parent
+        groups.setdefault(output_subfolder, []).append(file_path)
+    
+    batches = []
+    for output_subfolder, group in groups.items():
+        base_command = _vtfcmd_base_command(vtfcmd_exe, output_subfolder, export_format)
+        for chunk in plan_vtfcmd_chunks(base_command, [str(path) for path in group], max_workers=max_workers):
+            batches.append([Path(path) for path in chunk])
+    return batches
+
+
+def _convert_batch_cached(
+    files: List[Path],
+    export_format: str,
+    input_folder: Path,
+    output_folder: Path,
+    vtfcmd_exe: Path,
+    cache: Optional[BuildCache],
+    settings_hash: str,
+    token: Optional[TaskToken] = None,
+    native: bool = False
+) -> List[Tuple[Path, bool, Optional[str], bool]]:
+    """
+    Convert files that share an output folder with a single VTFCmd run,
+    skipping files whose cached outputs are up to date.
+    
+    Native conversions are done file by file in-process instead.
+    
+    Args:
+        files: Source files, all with the same output folder
+        export_format: Target format (e.g., "vtf", "png", "tga")
+        input_folder: Root input folder
+        output_folder: Root output folder
+        vtfcmd_exe: Path to VTFCmd.exe
+        cache: Build cache of the output folder (None always converts)
+        settings_hash: Hash of the conversion settings
+        token: Optional task token
+        native: Convert in-process with the VTF reader
+    
+    Returns:
+        list of (file_path, success, error_message, skipped) tuples
+    
+    Raises:
+        TaskCancelled: If the token was cancelled
+    """
+    if native:
+        return [
+            (file_path, *_convert_file_cached(
+                file_path, export_format, input_folder, output_folder, vtfcmd_exe,
+                cache, settings_hash, token, native=True
+            ))
+            for file_path in files
+        ]
+    
+    if token is not None:
+        token.check()
+    
+    results = []
+    pending = []
+    for file_path in files:
+        output_path = get_output_path(file_path, export_format, input_folder, output_folder)
+        source_hash = cache.hash_source(file_path) if cache is not None else None
+        if cache is not None and cache.is_up_to_date(output_path, source_hash, settings_hash):
+            results.append((file_path, True, None, True))
+        else:
+            pending.append((file_path, output_path, source_hash))
+    
+    if not pending:
+        return results
+    
+    output_subfolder = pending[0][1].parent
+    output_subfolder.mkdir(parents=True, exist_ok=True)
+    command = build_chunk_command(
+        _vtfcmd_base_command(vtfcmd_exe, output_subfolder, export_format),
+        [str(file_path) for file_path, _, _ in pending]
+    )
+    
+    # Allow for file systems with coarse modification times
+    started = time.time() - 2
+    try:
+        result = run_subprocess(command, token)
+    except OSError as e:
+        error = str(e)
+    else:
+        if result.returncode != 0:
+            error = (result.stderr or result.stdout).strip() or f"VTFCmd exited with code {result.returncode}"
+        else:
+            error = "VTFCmd did not write the output file"
+    
+    # The exit code covers the whole run, so check each output
+    for file_path, output_path, source_hash in pending:
+        try:
+            written = output_path.stat().st_mtime >= started
+        except OSError:
+            written = False
+        
+        if cache is not None:
+            if written:
+                cache.record(output_path, source_hash, settings_hash, source_path=file_path)
+            else:
+                cache.forget(output_path)
+        results.append((file_path, written, None if written else error, False))
+    
+    return results
 
 
 def batch_convert_files(
@@ -53,20 +472,45 @@ def batch_convert_files(
     input_folder: str,
     output_folder: str,
     source_filetype: str,
-    target_filetype: str
+    target_filetype: str,
+    max_workers: Optional[int] = None,
+    progress_callback: Optional[Callable[[int, int, Path, bool], None]] = None,
+    incremental: bool = False,
+    token: Optional[TaskToken] = None
 ) -> dict:
     """
     Batch convert image files (thread-safe version).
     
+    Files are converted in batches: each VTFCmd process converts many files
+    of one output folder, with command lines kept within the platform's
+    limit, and a bounded number of processes run concurrently.
+    VTF to PNG/TGA exports are decoded in-process by the VTF reader instead,
+    except for image formats the reader cannot decode, which go to VTFCmd.
+    In incremental mode, files whose content and settings match the build
+    cache in the output folder are skipped. When the token is cancelled,
+    running VTFCmd processes are killed and no further files are started.
+    
     Args:
-        vtfcmd_exe: Path to VTFCmd.exe
+        vtfcmd_exe: Path to VTFCmd.exe (unused for native conversions)
         input_folder: Input folder path
         output_folder: Output folder path
         source_filetype: Source file extension
         target_filetype: Target file extension
+        max_workers: Number of concurrent converter processes
+            (None or 0 uses the CPU core count)
+        progress_callback: Optional callable invoked after each file as
+            callback(completed, total, file_path, success)
+        incremental: Skip files whose outputs are up to date
+        token: Optional task token for progress reporting and cancellation
     
     Returns:
-        dict with 'success', 'failed', and 'total' counts
+        dict with 'success', 'failed', 'skipped' and 'total' counts,
+        'errors' mapping each failed file path to its error message, and
+        'stale' listing outputs whose source file no longer exists
+    
+    Raises:
+        TaskCancelled: If the token was cancelled (outputs converted so far
+            are kept and recorded in the build cache)
     """
     vtfcmd_path = Path(vtfcmd_exe)
     input_path = Path(input_folder)
@@ -76,7 +520,10 @@ def batch_convert_files(
         return {
             'success': 0,
             'failed': 0,
+            'skipped': 0,
             'total': 0,
+            'errors': {},
+            'stale': [],
             'error': f"Input folder '{input_folder}' does not exist."
         }
     
@@ -86,26 +533,109 @@ def batch_convert_files(
         return {
             'success': 0,
             'failed': 0,
+            'skipped': 0,
             'total': 0,
+            'errors': {},
+            'stale': [],
             'error': f"No *.{source_filetype} files found in '{input_folder}' folder."
         }
     
-    success_count = 0
-    failure_count = 0
+    if not max_workers:
+        max_workers = get_default_worker_count()
     
+    native_files = []
+    vtfcmd_files = []
     for file in files:
-        if convert_file_with_structure(
-            file, target_filetype, input_path, output_path, vtfcmd_path
-        ):
-            success_count += 1
+        if can_convert_natively(file, target_filetype):
+            native_files.append(file)
         else:
-            failure_count += 1
+            vtfcmd_files.append(file)
+    
+    # (files, native) pairs
+    batches = [([file], True) for file in native_files]
+    batches += [
+        (batch, False)
+        for batch in plan_conversion_batches(
+            vtfcmd_files, target_filetype, input_path, output_path, vtfcmd_path, max_workers
+        )
+    ]
+    max_workers = min(max_workers, len(batches))
+    
+    cache = BuildCache.for_folder(output_path) if incremental else None
+    settings_hashes = {
+        native: hash_settings({
+            'tool': 'native' if native else 'vtfcmd',
+            'export_format': target_filetype,
+        })
+        for native in (True, False)
+    }
+    
+    success_count = 0
+    failure_count = 0
+    skipped_count = 0
+    errors = {}
     
-    print(f"Batch conversion completed! Success: {success_count}, Failed: {failure_count}")
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(
+                _convert_batch_cached,
+                batch, target_filetype, input_path, output_path, vtfcmd_path,
+                cache, settings_hashes[native], token, native
+            ): batch
+            for batch, native in batches
+        }
+        
+        for future in as_completed(futures):
+            if token is not None and token.is_cancelled:
+                executor.shutdown(wait=False, cancel_futures=True)
+                break
+            
+            try:
+                results = future.result()
+            except TaskCancelled:
+                continue
+            except Exception as e:
+                results = [(file, False, str(e), False) for file in futures[future]]
+            
+            for file, success, error, skipped in results:
+                if skipped:
+                    skipped_count += 1
+                elif success:
+                    success_count += 1
+                else:
+                    failure_count += 1
+                    errors[str(file)] = error
+                    print(f"Failed: {file}, {error}")
+                
+                completed = success_count + failure_count + skipped_count
+                if progress_callback is not None:
+                    progress_callback(completed, len(files), file, success)
+            
+            if token is not None:
+                token.report_count(completed, len(files), f"{completed}/{len(files)} files")
+    
+    if cache is not None:
+        cache.save()
+    if token is not None:
+        token.check()
+    
+    stale = []
+    if cache is not None:
+        stale = cache.get_stale_outputs(files)
+        for stale_output in stale:
+            print(f"Stale output (source removed): {stale_output}")
+    
+    print(
+        f"Batch conversion completed! Success: {success_count}, "
+        f"Failed: {failure_count}, Up to date: {skipped_count}"
+    )
     return {
         'success': success_count,
         'failed': failure_count,
+        'skipped': skipped_count,
         'total': len(files),
+        'errors': errors,
+        'stale': stale,
         'error': None
     }
 
@@ -132,34 +662,20 @@ def batch_convert(context) -> tuple:
     else:
         vtfcmd_exe = Path(img_converter.string_vtfcmdPath)
     
-    input_folder = Path(img_converter.string_inputFolder)
-    output_folder = Path(img_converter.string_outputFolder)
-    source_filetype = img_converter.enum_sourceFiletype
-    target_filetype = img_converter.enum_targetFiletype
-    
-    if not input_folder.exists():
-        print(f"Input folder '{input_folder}' does not exist.")
-        return (0, 0)
-    
-    files = list(input_folder.rglob(f"*.{source_filetype}"))
-    
-    if not files:
-        print(f"No *.{source_filetype} files found in '{input_folder}' folder.")
-        return (0, 0)
-    
-    success_count = 0
-    failure_count = 0
+    result = batch_convert_files(
+        str(vtfcmd_exe),
+        img_converter.string_inputFolder,
+        img_converter.string_outputFolder,
+        img_converter.enum_sourceFiletype,
+        img_converter.enum_targetFiletype,
+        max_workers=img_converter.int_maxWorkers,
+        incremental=img_converter.bool_incremental
+    )
     
-    for file in files:
-        if convert_file_with_structure(
-            file, target_filetype, input_folder, output_folder, vtfcmd_exe
-        ):
-            success_count += 1
-        else:
-            failure_count += 1
+    if result['error']:
+        print(result['error'])
     
-    print(f"Batch conversion completed! Success: {success_count}, Failed: {failure_count}")
-    return (success_count, failure_count)
+    return (result['success'], result['failed'])
 
 
 # Supported file types for conversion
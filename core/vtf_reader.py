@@ -0,0 +1,576 @@
+"""
+Memory-mapped VTF (Valve Texture Format) reader.
+
+This module parses the VTF header and resource directory (7.0 - 7.5) and
+memory-maps the file. Mip levels, frames, faces and slices are exposed as
+zero-copy NumPy views into the mapping; nothing is read or decoded until
+one is requested, so callers only touch the bytes they need.
+
+Decoded pixel arrays are uint8 with shape (height, width, 4), rows
+ordered top to bottom, like the arrays vtf_writer encodes.
+"""
+import mmap
+import struct
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from .dxt_compression import (
+    decompress_dxt1,
+    decompress_dxt3,
+    decompress_dxt5,
+    get_block_count,
+)
+from .vtf_writer import (
+    IMAGE_FORMAT_NONE,
+    RESOURCE_HIGH_RES_IMAGE,
+    RESOURCE_LOW_RES_IMAGE,
+    VTF_SIGNATURE,
+    HEADER_STRUCT,
+    RESOURCE_ENTRY_STRUCT,
+    BASE_HEADER_SIZE,
+)
+
+
+# ============================================================================
+# VTF Constants
+# ============================================================================
+
+# Image format names by identifier (VTFImageFormat)
+FORMAT_NAMES = {
+    0: 'RGBA8888',
+    1: 'ABGR8888',
+    2: 'RGB888',
+    3: 'BGR888',
+    4: 'RGB565',
+    5: 'I8',
+    6: 'IA88',
+    7: 'P8',
+    8: 'A8',
+    9: 'RGB888_BLUESCREEN',
+    10: 'BGR888_BLUESCREEN',
+    11: 'ARGB8888',
+    12: 'BGRA8888',
+    13: 'DXT1',
+    14: 'DXT3',
+    15: 'DXT5',
+    16: 'BGRX8888',
+    17: 'BGR565',
+    18: 'BGRX5551',
+    19: 'BGRA4444',
+    20: 'DXT1_ONEBITALPHA',
+    21: 'BGRA5551',
+    22: 'UV88',
+    23: 'UVWQ8888',
+    24: 'RGBA16161616F',
+    25: 'RGBA16161616',
+    26: 'UVLX8888',
+}
+
+# Bytes per pixel of the uncompressed formats
+_BYTES_PER_PIXEL = {
+    'RGBA8888': 4, 'ABGR8888': 4, 'RGB888': 3, 'BGR888': 3,
+    'RGB565': 2, 'I8': 1, 'IA88': 2, 'P8': 1, 'A8': 1,
+    'RGB888_BLUESCREEN': 3, 'BGR888_BLUESCREEN': 3,
+    'ARGB8888': 4, 'BGRA8888': 4, 'BGRX8888': 4,
+    'BGR565': 2, 'BGRX5551': 2, 'BGRA4444': 2, 'BGRA5551': 2,
+    'UV88': 2, 'UVWQ8888': 4, 'RGBA16161616F': 8, 'RGBA16161616': 8,
+    'UVLX8888': 4,
+}
+
+# Block size in bytes of the compressed formats
+_BLOCK_SIZES = {
+    'DXT1': 8,
+    'DXT1_ONEBITALPHA': 8,
+    'DXT3': 16,
+    'DXT5': 16,
+}
+
+_DECOMPRESSORS = {
+    'DXT1': decompress_dxt1,
+    'DXT1_ONEBITALPHA': decompress_dxt1,
+    'DXT3': decompress_dxt3,
+    'DXT5': decompress_dxt5,
+}
+
+# Source channel for each of R, G, B, A in the 8-bit formats.
+# None fills 0 for color channels and 255 for alpha.
+_CHANNEL_SOURCES = {
+    'RGBA8888': (0, 1, 2, 3),
+    'ABGR8888': (3, 2, 1, 0),
+    'RGB888': (0, 1, 2, None),
+    'BGR888': (2, 1, 0, None),
+    'RGB888_BLUESCREEN': (0, 1, 2, None),
+    'BGR888_BLUESCREEN': (2, 1, 0, None),
+    'BGRA8888': (2, 1, 0, 3),
+    'BGRX8888': (2, 1, 0, None),
+    'I8': (0, 0, 0, None),
+    'IA88': (0, 0, 0, 1),
+    'A8': (None, None, None, 0),
+}
+
+_BLUESCREEN_FORMATS = ('RGB888_BLUESCREEN', 'BGR888_BLUESCREEN')
+
+# Texture flags that change the image layout
+TEXTUREFLAGS_ENVMAP = 0x00004000
+
+# Cubemaps have 6 faces, plus a spheremap before 7.5
+CUBEMAP_FACE_COUNT = 6
+
+# Resource entry flag: the entry's offset field holds the data itself
+RESOURCE_FLAG_NO_DATA_CHUNK = 0x02
+
+_RESOURCE_COUNT_OFFSET = 68
+_FIRST_FRAME_SPHEREMAP = 0xFFFF
+
+
+# ============================================================================
+# Format Helpers
+# ============================================================================
+
+def get_format_name(format_id: int) -> Optional[str]:
+    """Get the name of a VTF image format identifier (None if unknown)."""
+    return FORMAT_NAMES.get(format_id)
+
+
+def get_image_data_size(width: int, height: int, image_format: str) -> int:
+    """
+    Get the number of bytes one image of the given size occupies.
+
+    Unlike vtf_writer.get_image_size(), this covers every VTF image
+    format, not just the ones the writer can encode.
+
+    Args:
+        width: Image width in pixels
+        height: Image height in pixels
+        image_format: Image format name
+
+    Returns:
+        int: Size in bytes
+
+    Raises:
+        ValueError: If the format is unknown
+    """
+    if image_format in _BLOCK_SIZES:
+        return get_block_count(width, height) * _BLOCK_SIZES[image_format]
+    if image_format in _BYTES_PER_PIXEL:
+        return width * height * _BYTES_PER_PIXEL[image_format]
+    raise ValueError(f"Unknown VTF image format: {image_format}")
+
+
+def can_decode(image_format: str) -> bool:
+    """Check if decode_image() supports an image format."""
+    return image_format in _DECOMPRESSORS or image_format in _CHANNEL_SOURCES
+
+
+def decode_image(data, width: int, height: int, image_format: str) -> np.ndarray:
+    """
+    Decode one image to RGBA.
+
+    Args:
+        data: Buffer holding the image's encoded bytes
+        width: Image width in pixels
+        height: Image height in pixels
+        image_format: Image format name
+
+    Returns:
+        uint8 array of shape (height, width, 4)
+
+    Raises:
+        ValueError: If the format cannot be decoded
+    """
+    decompressor = _DECOMPRESSORS.get(image_format)
+    if decompressor is not None:
+        return decompressor(data, width, height)
+
+    sources = _CHANNEL_SOURCES.get(image_format)
+    if sources is None:
+        raise ValueError(f"Decoding {image_format} images is not supported")
+
+    channels = _BYTES_PER_PIXEL[image_format]
+    pixels = np.frombuffer(data, dtype=np.uint8, count=width * height * channels)
+    pixels = pixels.reshape(height, width, channels)
+
+    rgba = np.empty((height, width, 4), dtype=np.uint8)
+    for channel, source in enumerate(sources):
+        if source is None:
+            rgba[..., channel] = 255 if channel == 3 else 0
+        else:
+            rgba[..., channel] = pixels[..., source]
+
+    if image_format in _BLUESCREEN_FORMATS:
+        blue = (rgba[..., 0] == 0) & (rgba[..., 1] == 0) & (rgba[..., 2] == 255)
+        rgba[blue] = 0
+
+    return rgba
+
+
+# ============================================================================
+# VTF File
+# ============================================================================
+
+class VTFFile:
+    """
+    A memory-mapped VTF file.
+
+    The header and resource directory are parsed on open; image data is
+    only read when a view of it is taken or decoded. Views returned by
+    get_data() and get_mip_data() point into the mapping and stay valid
+    for as long as they are referenced, even after close().
+
+    Usage:
+        with VTFFile(path) as vtf:
+            rgba = vtf.get_rgba(mip=vtf.find_mip_level(64))
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._mmap = None
+
+        with open(self.path, "rb") as f:
+            size = self.path.stat().st_size
+            if size < BASE_HEADER_SIZE - 16:
+                raise ValueError(f"File is too small to be a VTF: {self.path}")
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            self._parse_header()
+        except (ValueError, struct.error):
+            self.close()
+            raise
+
+    # ------------------------------------------------------------------
+    # Header parsing
+    # ------------------------------------------------------------------
+
+    def _parse_header(self):
+        """Parse the header, resource directory and data offsets."""
+        header = self._mmap[:HEADER_STRUCT.size].ljust(HEADER_STRUCT.size, b"\0")
+        (
+            signature,
+            major, minor,
+            self.header_size,
+            self.width, self.height,
+            self.flags,
+            self.frame_count, self.first_frame,
+            refl_r, refl_g, refl_b,
+            self.bumpmap_scale,
+            high_res_format,
+            self.mip_count,
+            low_res_format,
+            self.low_res_width, self.low_res_height,
+            depth,
+        ) = HEADER_STRUCT.unpack(header)
+
+        if signature != VTF_SIGNATURE:
+            raise ValueError(f"Not a VTF file (bad signature): {self.path}")
+        if major != 7 or minor > 5:
+            raise ValueError(f"Unsupported VTF version {major}.{minor}: {self.path}")
+
+        self.version = f"{major}.{minor}"
+        self.reflectivity = (refl_r, refl_g, refl_b)
+        self.depth = max(1, depth) if minor >= 2 else 1
+        self.frame_count = max(1, self.frame_count)
+        self.mip_count = max(1, self.mip_count)
+
+        self.format_id = high_res_format
+        self.image_format = get_format_name(high_res_format)
+        if self.image_format is None:
+            raise ValueError(f"Unknown VTF image format {high_res_format}: {self.path}")
+
+        if low_res_format in (IMAGE_FORMAT_NONE, -1) or not self.low_res_width:
+            self.low_res_format = None
+        else:
+            self.low_res_format = get_format_name(low_res_format)
+
+        if self.flags & TEXTUREFLAGS_ENVMAP:
+            has_spheremap = minor < 5 and self.first_frame != _FIRST_FRAME_SPHEREMAP
+            self.face_count = CUBEMAP_FACE_COUNT + (1 if has_spheremap else 0)
+        else:
+            self.face_count = 1
+
+        self.resources = self._parse_resources(minor)
+
+        low_res_size = 0
+        if self.low_res_format is not None:
+            low_res_size = get_image_data_size(
+                self.low_res_width, self.low_res_height, self.low_res_format
+            )
+
+        if minor >= 3:
+            self.low_res_offset = self.resources.get(RESOURCE_LOW_RES_IMAGE, (0, None))[1]
+            self.high_res_offset = self.resources.get(RESOURCE_HIGH_RES_IMAGE, (0, None))[1]
+            if self.high_res_offset is None:
+                raise ValueError(f"VTF has no high resolution image resource: {self.path}")
+        else:
+            self.low_res_offset = self.header_size if low_res_size else None
+            self.high_res_offset = self.header_size + low_res_size
+
+        self._mip_offsets = self._compute_mip_offsets()
+
+    def _parse_resources(self, minor: int) -> Dict[bytes, Tuple[int, int]]:
+        """Parse the 7.3+ resource directory into {tag: (flags, offset)}."""
+        if minor < 3:
+            return {}
+
+        (count,) = struct.unpack_from('<I', self._mmap, _RESOURCE_COUNT_OFFSET)
+        resources = {}
+        for index in range(count):
+            tag, flags, offset = RESOURCE_ENTRY_STRUCT.unpack_from(
+                self._mmap, BASE_HEADER_SIZE + index * RESOURCE_ENTRY_STRUCT.size
+            )
+            resources[tag] = (flags, offset)
+        return resources
+
+    def _compute_mip_offsets(self) -> List[int]:
+        """Get the file offset of each mip level (high resolution data)."""
+        # Mip levels are stored smallest first
+        offsets = [0] * self.mip_count
+        offset = self.high_res_offset
+        for mip in reversed(range(self.mip_count)):
+            offsets[mip] = offset
+            offset += self.get_mip_level_size(mip)
+        self.data_end = offset
+        return offsets
+
+    # ------------------------------------------------------------------
+    # Layout
+    # ------------------------------------------------------------------
+
+    def get_mip_dimensions(self, mip: int) -> Tuple[int, int, int]:
+        """
+        Get the (width, height, depth) of a mip level.
+
+        Raises:
+            IndexError: If the mip level does not exist
+        """
+        if not 0 <= mip < self.mip_count:
+            raise IndexError(f"Mip level {mip} out of range (0-{self.mip_count - 1})")
+        return (
+            max(1, self.width >> mip),
+            max(1, self.height >> mip),
+            max(1, self.depth >> mip),
+        )
+
+    def get_image_size(self, mip: int = 0) -> int:
+        """Get the size in bytes of one image (frame, face and slice) of a mip level."""
+        width, height, _ = self.get_mip_dimensions(mip)
+        return get_image_data_size(width, height, self.image_format)
+
+    def get_mip_level_size(self, mip: int) -> int:
+        """Get the size in bytes of a mip level across all frames, faces and slices."""
+        depth = self.get_mip_dimensions(mip)[2]
+        return self.get_image_size(mip) * self.frame_count * self.face_count * depth
+
+    def get_image_offset(self, mip: int = 0, frame: int = 0, face: int = 0, slice: int = 0) -> int:
+        """
+        Get the file offset of one image.
+
+        Raises:
+            IndexError: If any index is out of range
+        """
+        depth = self.get_mip_dimensions(mip)[2]
+        for name, value, count in (
+            ('Frame', frame, self.frame_count),
+            ('Face', face, self.face_count),
+            ('Slice', slice, depth),
+        ):
+            if not 0 <= value < count:
+                raise IndexError(f"{name} {value} out of range (0-{count - 1})")
+
+        index = (frame * self.face_count + face) * depth + slice
+        return self._mip_offsets[mip] + index * self.get_image_size(mip)
+
+    def find_mip_level(self, max_size: int) -> int:
+        """
+        Find the largest mip level that fits within max_size pixels.
+
+        Falls back to the smallest mip level if none fits.
+        """
+        for mip in range(self.mip_count):
+            width, height, _ = self.get_mip_dimensions(mip)
+            if width <= max_size and height <= max_size:
+                return mip
+        return self.mip_count - 1
+
+    # ------------------------------------------------------------------
+    # Data access
+    # ------------------------------------------------------------------
+
+    def _view(self, offset: int, size: int) -> np.ndarray:
+        """Create a zero-copy uint8 view of a byte range of the file."""
+        if self._mmap is None:
+            raise ValueError(f"VTF file is closed: {self.path}")
+        if offset + size > len(self._mmap):
+            raise ValueError(
+                f"VTF data is truncated (needs {offset + size} bytes, "
+                f"file has {len(self._mmap)}): {self.path}"
+            )
+        return np.frombuffer(self._mmap, dtype=np.uint8, count=size, offset=offset)
+
+    def get_data(self, mip: int = 0, frame: int = 0, face: int = 0, slice: int = 0) -> np.ndarray:
+        """
+        Get the encoded bytes of one image as a zero-copy view.
+
+        Returns:
+            Read-only uint8 array of shape (image_size,)
+        """
+        offset = self.get_image_offset(mip, frame, face, slice)
+        return self._view(offset, self.get_image_size(mip))
+
+    def get_mip_data(self, mip: int = 0) -> np.ndarray:
+        """
+        Get the encoded bytes of a whole mip level as a zero-copy view.
+
+        Returns:
+            Read-only uint8 array of shape
+            (frame_count, face_count, depth, image_size)
+        """
+        depth = self.get_mip_dimensions(mip)[2]
+        image_size = self.get_image_size(mip)
+        view = self._view(self._mip_offsets[mip], self.get_mip_level_size(mip))
+        return view.reshape(self.frame_count, self.face_count, depth, image_size)
+
+    def get_rgba(self, mip: int = 0, frame: int = 0, face: int = 0, slice: int = 0) -> np.ndarray:
+        """
+        Decode one image to RGBA.
+
+        Returns:
+            uint8 array of shape (height, width, 4)
+
+        Raises:
+            ValueError: If the image format cannot be decoded
+        """
+        width, height, _ = self.get_mip_dimensions(mip)
+        data = self.get_data(mip, frame, face, slice)
+        return decode_image(data, width, height, self.image_format)
+
+    def get_low_res_data(self) -> Optional[np.ndarray]:
+        """Get the encoded low resolution thumbnail as a zero-copy view (None if absent)."""
+        if self.low_res_format is None or self.low_res_offset is None:
+            return None
+        size = get_image_data_size(self.low_res_width, self.low_res_height, self.low_res_format)
+        return self._view(self.low_res_offset, size)
+
+    def get_low_res_rgba(self) -> Optional[np.ndarray]:
+        """Decode the low resolution thumbnail to RGBA (None if absent)."""
+        data = self.get_low_res_data()
+        if data is None:
+            return None
+        return decode_image(data, self.low_res_width, self.low_res_height, self.low_res_format)
+
+    # ------------------------------------------------------------------
+    # Lifetime
+    # ------------------------------------------------------------------
+
+    def close(self):
+        """
+        Release the file mapping.
+
+        If views into the mapping are still referenced, the mapping is
+        released once the last of them is garbage collected instead.
+        """
+        if self._mmap is None:
+            return
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass
+        self._mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __repr__(self):
+        return (
+            f"VTFFile({str(self.path)!r}, {self.version}, {self.width}x{self.height}, "
+            f"{self.image_format}, mips={self.mip_count}, frames={self.frame_count}, "
+            f"faces={self.face_count}, depth={self.depth})"
+        )
+
+
+# ============================================================================
+# Convenience Functions
+# ============================================================================
+
+def read_vtf_rgba(
+    path: Union[str, Path],
+    mip: int = 0,
+    frame: int = 0,
+    face: int = 0,
+    slice: int = 0
+) -> np.ndarray:
+    """
+    Decode a single image of a VTF file to RGBA.
+
+    Only the bytes of the requested image are read from disk.
+
+    Returns:
+        uint8 array of shape (height, width, 4)
+    """
+    with VTFFile(path) as vtf:
+        return vtf.get_rgba(mip, frame, face, slice)
+
+
+def read_vtf_thumbnail(path: Union[str, Path], max_size: int = 128) -> np.ndarray:
+    """
+    Decode the largest mip level of a VTF file that fits within max_size.
+
+    Returns:
+        uint8 array of shape (height, width, 4)
+    """
+    with VTFFile(path) as vtf:
+        return vtf.get_rgba(mip=vtf.find_mip_level(max_size))
+
+
+def validate_vtf(path: Union[str, Path]) -> List[str]:
+    """
+    Check a VTF file for structural problems.
+
+    Only the header and resource directory are read; image data is not
+    decoded.
+
+    Args:
+        path: Path to the VTF file
+
+    Returns:
+        List of problem descriptions (empty if the file is valid)
+    """
+    try:
+        vtf = VTFFile(path)
+    except (OSError, ValueError, struct.error) as e:
+        return [str(e)]
+
+    problems = []
+    with vtf:
+        file_size = len(vtf._mmap)
+
+        if vtf.data_end > file_size:
+            problems.append(
+                f"Image data is truncated (needs {vtf.data_end} bytes, file has {file_size})"
+            )
+
+        low_res = vtf.low_res_format
+        if low_res is not None and vtf.low_res_offset is not None:
+            low_res_end = vtf.low_res_offset + get_image_data_size(
+                vtf.low_res_width, vtf.low_res_height, low_res
+            )
+            if low_res_end > file_size:
+                problems.append("Low resolution image is truncated")
+
+        expected_mips = max(vtf.width, vtf.height).bit_length()
+        if vtf.mip_count > expected_mips:
+            problems.append(
+                f"Mip count {vtf.mip_count} exceeds the maximum of {expected_mips} "
+                f"for {vtf.width}x{vtf.height}"
+            )
+
+        for tag, (flags, offset) in vtf.resources.items():
+            if not flags & RESOURCE_FLAG_NO_DATA_CHUNK and offset > file_size:
+                problems.append(f"Resource {tag.hex()} points past the end of the file")
+
+    return problems
@@ -0,0 +1,356 @@
+"""
+Native VTF (Valve Texture Format) writer.
+
+This module encodes VTF 7.2 - 7.5 files directly from in-memory pixel
+arrays, without VTFCmd. It writes the header, the resource directory
+(7.3+), the low resolution thumbnail and the full mipmap chain.
+
+Pixel arrays are expected as uint8 with shape (height, width, 4), rows
+ordered top to bottom.
+"""
+import struct
+from pathlib import Path
+from typing import List, Optional, Sequence, Union
+
+import numpy as np
+
+from .dxt_compression import (
+    QUALITY_FAST,
+    compress_dxt1,
+    compress_dxt3,
+    compress_dxt5,
+    get_block_count,
+)
+from .image_resize import (
+    generate_mipmaps,
+    is_power_of_two,
+)
+
+
+# ============================================================================
+# VTF Constants
+# ============================================================================
+
+VTF_SIGNATURE = b"VTF\0"
+
+SUPPORTED_VERSIONS = ('7.2', '7.3', '7.4', '7.5')
+
+# Image format identifiers (subset of VTFImageFormat)
+IMAGE_FORMATS = {
+    'RGBA8888': 0,
+    'ABGR8888': 1,
+    'RGB888': 2,
+    'BGR888': 3,
+    'BGRA8888': 12,
+    'DXT1': 13,
+    'DXT3': 14,
+    'DXT5': 15,
+}
+
+IMAGE_FORMAT_NONE = 0xFFFFFFFF
+
+# Texture flags
+TEXTUREFLAGS_POINTSAMPLE = 0x00000001
+TEXTUREFLAGS_TRILINEAR = 0x00000002
+TEXTUREFLAGS_CLAMPS = 0x00000004
+TEXTUREFLAGS_CLAMPT = 0x00000008
+TEXTUREFLAGS_ANISOTROPIC = 0x00000010
+TEXTUREFLAGS_NORMAL = 0x00000080
+TEXTUREFLAGS_NOMIP = 0x00000100
+TEXTUREFLAGS_NOLOD = 0x00000200
+TEXTUREFLAGS_ONEBITALPHA = 0x00001000
+TEXTUREFLAGS_EIGHTBITALPHA = 0x00002000
+
+# Resource tags (7.3+)
+RESOURCE_LOW_RES_IMAGE = b"\x01\x00\x00"
+RESOURCE_HIGH_RES_IMAGE = b"\x30\x00\x00"
+
+# Header layout shared by all versions (65 bytes, padded to 80)
+HEADER_STRUCT = struct.Struct('<4s2I I HH I HH 4x 3f 4x f I B I BB H')
+RESOURCE_COUNT_STRUCT = struct.Struct('<3x I 8x')
+RESOURCE_ENTRY_STRUCT = struct.Struct('<3s B I')
+BASE_HEADER_SIZE = 80
+
+# Largest dimension of the low resolution thumbnail
+LOW_RES_MAX_SIZE = 16
+
+# Channel order of the uncompressed formats, as indices into RGBA
+_CHANNEL_ORDERS = {
+    'RGBA8888': (0, 1, 2, 3),
+    'ABGR8888': (3, 2, 1, 0),
+    'RGB888': (0, 1, 2),
+    'BGR888': (2, 1, 0),
+    'BGRA8888': (2, 1, 0, 3),
+}
+
+_COMPRESSORS = {
+    'DXT1': compress_dxt1,
+    'DXT3': compress_dxt3,
+    'DXT5': compress_dxt5,
+}
+
+# Formats that can store more than 1 bit of alpha
+_ALPHA_FORMATS = ('RGBA8888', 'ABGR8888', 'BGRA8888', 'DXT3', 'DXT5')
+
+
+# ============================================================================
+# Image Helpers
+# ============================================================================
+
+def normalize_format(image_format: str) -> str:
+    """
+    Normalize an image format name (e.g. 'dxt5' -> 'DXT5').
+
+    Raises:
+        ValueError: If the format is not supported
+    """
+    name = image_format.upper()
+    if name not in IMAGE_FORMATS:
+        raise ValueError(f"Unsupported VTF image format: {image_format}")
+    return name
+
+
+def has_alpha(rgba: np.ndarray) -> bool:
+    """Check if an RGBA image has any non-opaque pixel."""
+    return bool((rgba[..., 3] < 255).any())
+
+
+def select_image_format(rgba: np.ndarray, vtf_format: str, alpha_format: str) -> str:
+    """
+    Choose the image format the way VTFCmd does.
+
+    Images with an alpha channel use alpha_format, all others vtf_format.
+
+    Args:
+        rgba: uint8 array of shape (height, width, 4)
+        vtf_format: Format for opaque images
+        alpha_format: Format for images with alpha
+
+    Returns:
+        Normalized image format name
+    """
+    if has_alpha(rgba):
+        return normalize_format(alpha_format)
+    return normalize_format(vtf_format)
+
+
+def get_image_size(width: int, height: int, image_format: str) -> int:
+    """
+    Get the number of bytes one image of the given size occupies.
+
+    Args:
+        width: Image width in pixels
+        height: Image height in pixels
+        image_format: Normalized image format name
+
+    Returns:
+        int: Size in bytes
+    """
+    if image_format == 'DXT1':
+        return get_block_count(width, height) * 8
+    if image_format in ('DXT3', 'DXT5'):
+        return get_block_count(width, height) * 16
+    return width * height * len(_CHANNEL_ORDERS[image_format])
+
+
+def encode_image(rgba: np.ndarray, image_format: str, quality: str = QUALITY_FAST) -> bytes:
+    """
+    Encode one image (a single mip level, frame, face or slice).
+
+    Args:
+        rgba: uint8 array of shape (height, width, 4)
+        image_format: Normalized image format name
+        quality: DXT compression quality ('FAST' or 'HIGH')
+
+    Returns:
+        bytes: Encoded pixel data
+    """
+    compressor = _COMPRESSORS.get(image_format)
+    if compressor is not None:
+        return compressor(rgba, quality=quality)
+
+    order = _CHANNEL_ORDERS[image_format]
+    return np.ascontiguousarray(rgba[..., order]).tobytes()
+
+
+def compute_reflectivity(rgba: np.ndarray) -> tuple:
+    """
+    Compute the average linear color of an image.
+
+    Args:
+        rgba: uint8 array of shape (height, width, 4)
+
+    Returns:
+        tuple: (r, g, b) reflectivity in 0-1 range
+    """
+    linear = (rgba[..., :3].astype(np.float32) / 255.0) ** 2.2
+    return tuple(float(c) for c in linear.reshape(-1, 3).mean(axis=0))
+
+
+# ============================================================================
+# VTF Assembly
+# ============================================================================
+
+def _parse_version(version: str) -> tuple:
+    """Parse a 'major.minor' version string."""
+    if version not in SUPPORTED_VERSIONS:
+        raise ValueError(f"Unsupported VTF version: {version}")
+    major, minor = version.split('.')
+    return int(major), int(minor)
+
+
+def _get_low_res_image(mipmaps: List[np.ndarray]) -> Optional[np.ndarray]:
+    """Pick the largest mip level that fits the low resolution thumbnail."""
+    for level in mipmaps:
+        if level.shape[0] <= LOW_RES_MAX_SIZE and level.shape[1] <= LOW_RES_MAX_SIZE:
+            return level
+    return None
+
+
+def build_vtf(
+    image: Union[np.ndarray, Sequence[np.ndarray]],
+    image_format: str = 'DXT5',
+    version: str = '7.5',
+    flags: int = 0,
+    generate_mips: bool = True,
+    generate_low_res: bool = True,
+    bumpmap_scale: float = 1.0,
+    quality: str = QUALITY_FAST,
+    mip_filter: str = 'BOX'
+) -> bytes:
+    """
+    Build the contents of a VTF file.
+
+    Args:
+        image: uint8 array of shape (height, width, 4), or a sequence of
+            equally sized arrays for animated textures (one per frame)
+        image_format: High resolution image format (e.g. 'DXT5', 'BGR888')
+        version: VTF version ('7.2' - '7.5')
+        flags: Additional TEXTUREFLAGS_* values
+        generate_mips: Whether to write a full mipmap chain
+        generate_low_res: Whether to write the DXT1 low resolution thumbnail
+        bumpmap_scale: Bumpmap scale stored in the header
+        quality: DXT compression quality ('FAST' or 'HIGH')
+        mip_filter: Mipmap filter name (see image_resize.RESIZE_FILTERS)
+
+    Returns:
+        bytes: Complete VTF file contents
+
+    Raises:
+        ValueError: If the image size, format or version is invalid
+    """
+    frames = [image] if isinstance(image, np.ndarray) else list(image)
+    if not frames:
+        raise ValueError("No image data to write")
+
+    height, width = frames[0].shape[:2]
+    for frame in frames:
+        if frame.shape[:2] != (height, width) or frame.shape[2] != 4:
+            raise ValueError("All frames must be RGBA arrays of the same size")
+
+    if not is_power_of_two(width) or not is_power_of_two(height):
+        raise ValueError(
+            f"Image dimensions must be powers of two (got {width}x{height})"
+        )
+
+    image_format = normalize_format(image_format)
+    major, minor = _parse_version(version)
+
+    # Mipmap chains per frame, largest level first
+    if generate_mips:
+        chains = [generate_mipmaps(frame, mip_filter) for frame in frames]
+    else:
+        chains = [[frame] for frame in frames]
+        flags |= TEXTUREFLAGS_NOMIP | TEXTUREFLAGS_NOLOD
+    mip_count = len(chains[0])
+
+    # Alpha flags
+    if any(has_alpha(frame) for frame in frames):
+        if image_format == 'DXT1':
+            flags |= TEXTUREFLAGS_ONEBITALPHA
+        elif image_format in _ALPHA_FORMATS:
+            flags |= TEXTUREFLAGS_EIGHTBITALPHA
+
+    # Low resolution thumbnail (always DXT1)
+    low_res_data = b""
+    low_res_format = IMAGE_FORMAT_NONE
+    low_res_width = low_res_height = 0
+    if generate_low_res:
+        low_res = _get_low_res_image(chains[0] if generate_mips else generate_mipmaps(frames[0], mip_filter))
+        if low_res is not None:
+            low_res_data = compress_dxt1(low_res, alpha_threshold=0)
+            low_res_format = IMAGE_FORMATS['DXT1']
+            low_res_height, low_res_width = low_res.shape[:2]
+
+    # High resolution data: smallest mip first, then frame (faces/slices = 1)
+    high_res_parts = []
+    for mip in reversed(range(mip_count)):
+        for chain in chains:
+            high_res_parts.append(encode_image(chain[mip], image_format, quality))
+    high_res_data = b"".join(high_res_parts)
+
+    # Resource directory (7.3+)
+    resources = []
+    if minor >= 3:
+        if low_res_data:
+            resources.append(RESOURCE_LOW_RES_IMAGE)
+        resources.append(RESOURCE_HIGH_RES_IMAGE)
+    header_size = BASE_HEADER_SIZE + RESOURCE_ENTRY_STRUCT.size * len(resources)
+
+    low_res_offset = header_size
+    high_res_offset = low_res_offset + len(low_res_data)
+
+    header = bytearray(HEADER_STRUCT.pack(
+        VTF_SIGNATURE,
+        major, minor,
+        header_size,
+        width, height,
+        flags,
+        len(frames), 0,
+        *compute_reflectivity(frames[0]),
+        bumpmap_scale,
+        IMAGE_FORMATS[image_format],
+        mip_count,
+        low_res_format,
+        low_res_width, low_res_height,
+        1,
+    ))
+
+    if minor >= 3:
+        header += RESOURCE_COUNT_STRUCT.pack(len(resources))
+        offsets = {
+            RESOURCE_LOW_RES_IMAGE: low_res_offset,
+            RESOURCE_HIGH_RES_IMAGE: high_res_offset,
+        }
+        header = header.ljust(BASE_HEADER_SIZE, b"\0")
+        for tag in resources:
+            header += RESOURCE_ENTRY_STRUCT.pack(tag, 0, offsets[tag])
+    else:
+        header = header.ljust(BASE_HEADER_SIZE, b"\0")
+
+    return bytes(header) + low_res_data + high_res_data
+
+
+def write_vtf(
+    output_path: Union[str, Path],
+    image: Union[np.ndarray, Sequence[np.ndarray]],
+    **kwargs
+) -> str:
+    """
+    Encode and write a VTF file.
+
+    Args:
+        output_path: Destination file path
+        image: Pixel data, see build_vtf()
+        **kwargs: Encoding options, see build_vtf()
+
+    Returns:
+        Path to the written file
+    """
+    data = build_vtf(image, **kwargs)
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, "wb") as f:
+        f.write(data)
+    return str(output_path)
+
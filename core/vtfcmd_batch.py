@@ -0,0 +1,196 @@
+"""
+Batched VTFCmd invocations.
+
+VTFCmd converts every -file on its command line in one run. Starting
+one process per texture spends most of the time on process start-up.
+Passing every file at once fails as soon as the command line exceeds
+the Windows limit of 32767 characters, which Wine enforces too.
+
+The planner packs files into command lines that fit the limit. Large
+batches are also split so the chunks can run concurrently.
+"""
+import math
+import os
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Sequence, Tuple
+
+from ..utils.threading_utils import TaskCancelled, TaskToken, run_subprocess
+
+
+# CreateProcess limit in characters, including the terminating null
+COMMAND_LINE_LIMIT = 32767
+
+# A process is only worth starting for at least this many files; smaller
+# batches run in fewer processes instead of one per CPU core
+MIN_FILES_PER_CHUNK = 8
+
+
+def command_line_length(command: Sequence[str]) -> int:
+    """
+    Get the length of the command line Windows builds from arguments.
+
+    Args:
+        command: Command arguments
+
+    Returns:
+        int: Characters, including the terminating null
+    """
+    return len(subprocess.list2cmdline(list(command))) + 1
+
+
+def split_file_arguments(command: Sequence[str]) -> Tuple[List[str], List[str]]:
+    """
+    Separate the '-file <path>' pairs of a VTFCmd command.
+
+    Args:
+        command: VTFCmd command arguments, starting with the executable
+
+    Returns:
+        tuple: (command without the file arguments, file paths)
+    """
+    base_command = []
+    files = []
+    arguments = iter(command)
+    for argument in arguments:
+        if argument == "-file":
+            files.append(next(arguments))
+        else:
+            base_command.append(argument)
+    return base_command, files
+
+
+def plan_vtfcmd_chunks(
+    base_command: Sequence[str],
+    files: Sequence[str],
+    limit: int = COMMAND_LINE_LIMIT,
+    max_workers: Optional[int] = None
+) -> List[List[str]]:
+    """
+    Split files into as few VTFCmd runs as fit the command-line limit.
+
+    When there are enough files, they are spread evenly over up to
+    max_workers runs so the runs can go in parallel.
+
+    Args:
+        base_command: Command without file arguments (executable and options)
+        files: Files to convert with the same options
+        limit: Maximum command-line length in characters
+        max_workers: Number of runs that will go in parallel
+            (None or 0 uses the CPU core count)
+
+    Returns:
+        list: File lists, one per run, in the original order
+
+    Raises:
+        ValueError: If a single file does not fit the limit
+    """
+    if not files:
+        return []
+
+    workers = max_workers or os.cpu_count() or 1
+    target_chunks = max(1, min(workers, math.ceil(len(files) / MIN_FILES_PER_CHUNK)))
+    files_per_chunk = math.ceil(len(files) / target_chunks)
+
+    base_length = command_line_length(base_command)
+    chunks = []
+    current = []
+    length = base_length
+    for path in files:
+        # Arguments are joined with single spaces
+        argument_length = len(subprocess.list2cmdline(["-file", path])) + 1
+        if base_length + argument_length > limit:
+            raise ValueError(f"Command line for '{path}' exceeds {limit} characters")
+        if current and (length + argument_length > limit or len(current) >= files_per_chunk):
+            chunks.append(current)
+            current = []
+            length = base_length
+        current.append(path)
+        length += argument_length
+    chunks.append(current)
+    return chunks
+
+
+def build_chunk_command(base_command: Sequence[str], files: Sequence[str]) -> List[str]:
+    """
+    Build a VTFCmd command converting some files.
+
+    Args:
+        base_command: Command without file arguments (executable and options)
+        files: Files to convert
+
+    Returns:
+        list: Command arguments
+    """
+    file_arguments = [argument for path in files for argument in ("-file", path)]
+    return [base_command[0], *file_arguments, *base_command[1:]]
+
+
+def split_vtfcmd_command(
+    command: Sequence[str],
+    limit: int = COMMAND_LINE_LIMIT,
+    max_workers: Optional[int] = None
+) -> List[List[str]]:
+    """
+    Split a VTFCmd command with many -file arguments into commands that
+    fit the command-line limit (see plan_vtfcmd_chunks).
+
+    Args:
+        command: VTFCmd command arguments, starting with the executable
+        limit: Maximum command-line length in characters
+        max_workers: Number of commands that will run in parallel
+
+    Returns:
+        list: Commands; a command without files is returned unchanged
+
+    Raises:
+        ValueError: If a single file does not fit the limit
+    """
+    base_command, files = split_file_arguments(command)
+    if not files:
+        return [list(command)]
+    return [
+        build_chunk_command(base_command, chunk)
+        for chunk in plan_vtfcmd_chunks(base_command, files, limit, max_workers)
+    ]
+
+
+def run_vtfcmd_commands(
+    commands: Sequence[Sequence[str]],
+    max_workers: Optional[int] = None,
+    token: Optional[TaskToken] = None
+) -> List[subprocess.CompletedProcess]:
+    """
+    Run VTFCmd commands concurrently.
+
+    Args:
+        commands: Commands to run
+        max_workers: Number of concurrent processes
+            (None or 0 uses the CPU core count)
+        token: Optional task token; running processes are killed when it
+            is cancelled
+
+    Returns:
+        list: One CompletedProcess per command, in order. Commands that
+        could not be started have return code -1 and the error as stderr.
+
+    Raises:
+        TaskCancelled: If the token was cancelled
+    """
+    if not commands:
+        return []
+
+    def run(command):
+        try:
+            return run_subprocess(list(command), token)
+        except OSError as e:
+            return subprocess.CompletedProcess(list(command), -1, "", str(e))
+
+    workers = min(max_workers or os.cpu_count() or 1, len(commands))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(run, command) for command in commands]
+        try:
+            return [future.result() for future in futures]
+        except TaskCancelled:
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
@@ -13,21 +13,29 @@ from bpy.types import Operator
 from ..core.material_vtf import (
     get_image_texture_node,
     validate_image_texture,
-    get_materials_relative_path,
     process_additional_textures,
-    generate_vmt_content,
-    write_vmt_file,
+    snapshot_vmt_jobs,
+    write_vmt_files,
     build_vtfcmd_command,
-    execute_vtfcmd,
     collect_scene_materials,
+    read_image_pixels,
+    get_additional_texture_images,
+    encode_vtf_textures,
+    filter_unchanged_vtfcmd_sources,
 )
+from ..core.build_cache import BuildCache, hash_settings
+from ..core.vtfcmd_batch import run_vtfcmd_commands, split_vtfcmd_command
 from ..utils.threading_utils import (
     run_in_background,
     get_task_result,
     is_task_finished,
+    cancel_task,
     cleanup_task,
+    task_manager,
     TaskStatus,
+    POOL_PROCESS,
 )
+from ..utils.task_events import TaskWaiter
 
 
 class VONVTF_OT_refresh_materials(Operator):
@@ -78,15 +86,46 @@ def _vtf_conversion_task(
     resize_method,
     resize_filter,
     clamp_size,
+    mip_filter,
     shader,
     vmt_params,
-    additional_texture_paths
+    additional_texture_paths,
+    cache=None,
+    settings_hash=None,
+    token=None
 ):
     """
     Background task function for VTF conversion.
     
     This runs in a separate thread to avoid blocking Blender.
     """
+    pending = {}
+    skipped = 0
+    if cache is not None:
+        filtered = filter_unchanged_vtfcmd_sources(
+            cache,
+            image_paths,
+            image_name_mapping,
+            additional_texture_paths,
+            output_path,
+            settings_hash
+        )
+        image_paths = filtered['image_paths']
+        additional_texture_paths = filtered['additional_texture_paths']
+        pending = filtered['pending']
+        skipped = filtered['skipped']
+        
+        if not pending:
+            cache.save()
+            return {
+                'success': True,
+                'stdout': "",
+                'stderr': "",
+                'num_files': 0,
+                'skipped': skipped,
+                'command': "",
+            }
+    
     command_line = build_vtfcmd_command(
         vtfcmd_exe=vtfcmd_exe,
         image_paths=image_paths,
@@ -99,35 +138,386 @@ def _vtf_conversion_task(
         resize_method=resize_method,
         resize_filter=resize_filter,
         clamp_size=clamp_size,
+        mip_filter=mip_filter,
         shader=shader,
         vmt_params=vmt_params,
         additional_texture_paths=additional_texture_paths
     )
     
-    # Print command for debugging
-    command_str = ' '.join(f'"{arg}"' if ' ' in arg else arg for arg in command_line)
-    print(f"Executing VTFCmd: {command_str}")
+    # Split into command lines that fit the platform limit; the chunks
+    # run concurrently
+    commands = split_vtfcmd_command(command_line)
+    command_str = "\n".join(
+        ' '.join(f'"{arg}"' if ' ' in arg else arg for arg in command) for command in commands
+    )
+    print(f"Executing VTFCmd ({len(commands)} process(es)):\n{command_str}")
+    
+    results = run_vtfcmd_commands(commands, token=token)
+    success = all(result.returncode == 0 for result in results)
+    stdout = "\n".join(result.stdout for result in results if result.stdout)
+    stderr = "\n".join(result.stderr for result in results if result.stderr)
     
-    success, stdout, stderr = execute_vtfcmd(command_line)
+    if cache is not None:
+        if success:
+            for vtf_path, (source_path, source_hash) in pending.items():
+                if os.path.exists(vtf_path):
+                    cache.record(vtf_path, source_hash, settings_hash, source_path=source_path)
+        cache.save()
     
     return {
         'success': success,
         'stdout': stdout,
         'stderr': stderr,
         'num_files': len(image_paths),
+        'skipped': skipped,
         'command': command_str,
     }
 
 
+def _native_vtf_conversion_task(
+    texture_jobs,
+    output_path,
+    vtf_format,
+    alpha_format,
+    vtf_version,
+    quality,
+    resize,
+    resize_method,
+    resize_filter,
+    clamp_size,
+    mip_filter,
+    cache=None,
+    token=None
+):
+    """
+    Background task function for the built-in VTF encoder.
+    
+    Textures are encoded concurrently on the shared process pool.
+    
+    Returns the same result layout as _vtf_conversion_task.
+    """
+    result = encode_vtf_textures(
+        texture_jobs,
+        output_path,
+        vtf_format=vtf_format,
+        alpha_format=alpha_format,
+        vtf_version=vtf_version,
+        quality=quality,
+        resize=resize,
+        resize_method=resize_method,
+        resize_filter=resize_filter,
+        clamp_size=clamp_size,
+        mip_filter=mip_filter,
+        cache=cache,
+        executor=task_manager.get_pool(POOL_PROCESS),
+        token=token
+    )
+    
+    errors = result['errors']
+    
+    return {
+        'success': not errors,
+        'stdout': "\n".join(result['written']),
+        'stderr': "\n".join(f"{name}: {error}" for name, error in errors.items()),
+        'num_files': len(result['written']),
+        'skipped': len(result['skipped']),
+        'command': "built-in VTF encoder",
+    }
+
+
+def _get_build_cache(context):
+    """Get the output folder's build cache, or None when disabled."""
+    scene = context.scene
+    if not scene.von_vtf_incremental:
+        return None
+    return BuildCache.for_folder(scene.von_material_output_path.path)
+
+
+def _prepare_native_conversion(context, report):
+    """
+    Read source pixels for a built-in encoder task.
+    
+    Returns:
+        tuple: (task function and arguments, material list items, additional
+        textures per material), or None after reporting an error
+    """
+    scene = context.scene
+    output_path = scene.von_material_output_path.path
+    
+    texture_jobs = []
+    material_objects = []
+    all_additional_textures = {}
+    
+    for mat_object in scene.von_mats_collection:
+        if not mat_object.material_checkbox:
+            continue
+        
+        material = mat_object.material
+        if not material:
+            continue
+        
+        image_node = get_image_texture_node(material)
+        if not image_node:
+            report({'ERROR'}, f"Material '{material.name}' has no Image Texture node connected to Base Color")
+            return None
+        
+        if not image_node.image:
+            report({'ERROR'}, f"Material '{material.name}': No source image found")
+            return None
+        
+        # Pixel access must happen on the main thread
+        texture_jobs.append({
+            'name': mat_object.material_name,
+            'pixels': read_image_pixels(image_node.image),
+            'normal': False,
+        })
+        material_objects.append(mat_object)
+        
+        if scene.von_vmt_generate_bool:
+            additional_images = get_additional_texture_images(
+                mat_object.material_name,
+                mat_object.vmt_params
+            )
+            additional_textures = {}
+            for tex_type, (tex_name, image) in additional_images.items():
+                texture_jobs.append({
+                    'name': tex_name,
+                    'pixels': read_image_pixels(image),
+                    'normal': tex_type == 'normal',
+                })
+                additional_textures[tex_type] = os.path.join(output_path, f"{tex_name}.vtf")
+            if additional_textures:
+                all_additional_textures[mat_object.material_name] = additional_textures
+    
+    if not texture_jobs:
+        report({'ERROR'}, "No valid materials selected for conversion")
+        return None
+    
+    task = (
+        _native_vtf_conversion_task,
+        texture_jobs,
+        output_path,
+        scene.von_vtf_format,
+        scene.von_vtf_alpha_format,
+        scene.von_vtf_version,
+        scene.von_vtf_quality,
+        scene.von_vtf_resize_bool,
+        scene.von_vtf_resize_method,
+        scene.von_vtf_resize_filter,
+        scene.von_vtf_clamp_size,
+        scene.von_vtf_mip_filter,
+        _get_build_cache(context)
+    )
+    return task, material_objects, all_additional_textures
+
+
+def _prepare_vtfcmd_conversion(context, report):
+    """
+    Gather source images for a VTFCmd conversion task.
+    
+    Returns:
+        tuple: See _prepare_native_conversion
+    """
+    scene = context.scene
+    
+    image_paths = []
+    image_name_mapping = {}
+    material_objects = []
+    all_additional_textures = {}
+    
+    # Process each selected material
+    for mat_object in scene.von_mats_collection:
+        if not mat_object.material_checkbox:
+            continue
+            
+        material = mat_object.material
+        if not material:
+            continue
+            
+        # Get image texture node
+        image_node = get_image_texture_node(material)
+        if not image_node:
+            report({'ERROR'}, f"Material '{material.name}' has no Image Texture node connected to Base Color")
+            return None
+        
+        # Validate image
+        image_path, error_msg = validate_image_texture(image_node)
+        if error_msg:
+            report({'ERROR'}, f"Material '{material.name}': {error_msg}")
+            return None
+        
+        image_paths.append(image_path)
+        image_name_mapping[image_path] = mat_object.material_name
+        material_objects.append(mat_object)
+        
+        # Process additional textures for this material
+        if scene.von_vmt_generate_bool:
+            additional_textures = process_additional_textures(
+                mat_object.material_name,
+                mat_object.vmt_params,
+                scene.von_material_output_path.path
+            )
+            if additional_textures:
+                all_additional_textures[mat_object.material_name] = additional_textures
+    
+    if not image_paths:
+        report({'ERROR'}, "No valid materials selected for conversion")
+        return None
+    
+    # Collect all additional texture paths for VTFCmd
+    additional_texture_paths = {}
+    for mat_name, tex_dict in all_additional_textures.items():
+        for tex_type, tex_path in tex_dict.items():
+            if tex_type not in additional_texture_paths:
+                additional_texture_paths[tex_type] = []
+            additional_texture_paths[tex_type].append(tex_path)
+    
+    # Build VTFCmd path - check bundled version first, then UI path
+    from ..data.paths import get_vtfcmd_path
+    
+    bundled_vtfcmd = get_vtfcmd_path()
+    if bundled_vtfcmd is not None:
+        vtfcmd_exe = str(bundled_vtfcmd)
+    else:
+        # Fall back to UI-specified path
+        vtfcmd_path = scene.von_vtfcmd_path.path
+        if not vtfcmd_path:
+            report({'ERROR'}, "VTFCmd path not set. Either place VTFCmd in the addon's tools/vtfcmd folder or specify the path in the UI.")
+            return None
+        if not vtfcmd_path.endswith(os.sep):
+            vtfcmd_path += os.sep
+        vtfcmd_exe = os.path.join(vtfcmd_path, "VTFCmd.exe")
+    
+    # Get VMT parameters if enabled
+    vmt_params = None
+    shader = None
+    if scene.von_vmt_generate_bool:
+        shader = scene.von_vmt_shader
+        vmt_params = {
+            'additive': scene.von_vmt_param_additive,
+            'translucent': scene.von_vmt_param_translucent,
+            'nocull': scene.von_vmt_param_nocull,
+        }
+    
+    task = (
+        _vtf_conversion_task,
+        vtfcmd_exe,
+        image_paths,
+        image_name_mapping,
+        scene.von_material_output_path.path,
+        scene.von_vtf_format,
+        scene.von_vtf_alpha_format,
+        scene.von_vtf_version,
+        scene.von_vtf_resize_bool,
+        scene.von_vtf_resize_method,
+        scene.von_vtf_resize_filter,
+        scene.von_vtf_clamp_size,
+        scene.von_vtf_mip_filter,
+        shader,
+        vmt_params,
+        additional_texture_paths,
+        _get_build_cache(context),
+        hash_settings({
+            'tool': 'vtfcmd',
+            'format': scene.von_vtf_format,
+            'alpha_format': scene.von_vtf_alpha_format,
+            'version': scene.von_vtf_version,
+            'resize': scene.von_vtf_resize_bool,
+            'resize_method': scene.von_vtf_resize_method,
+            'resize_filter': scene.von_vtf_resize_filter,
+            'clamp_size': scene.von_vtf_clamp_size,
+            'mip_filter': scene.von_vtf_mip_filter,
+            'shader': shader,
+            'vmt_params': vmt_params,
+        })
+    )
+    return task, material_objects, all_additional_textures
+
+
+def prepare_texture_conversion(context, report):
+    """
+    Gather the selected materials' textures for a conversion task, on the
+    main thread, with the encoder chosen in the scene.
+    
+    Args:
+        context: Blender context
+        report: Operator report function, called for invalid materials
+    
+    Returns:
+        tuple: (task function and arguments, material list items, additional
+        textures per material), or None after reporting an error
+    """
+    if context.scene.von_vtf_encoder == 'NATIVE':
+        return _prepare_native_conversion(context, report)
+    return _prepare_vtfcmd_conversion(context, report)
+
+
+def _vmt_generation_task(vmt_jobs, output_path, shader, global_params, inputs=None):
+    """
+    Task graph node writing the VMT files once the textures are converted.
+    
+    Raises:
+        RuntimeError: If the texture conversion failed
+    """
+    if inputs is not None and not inputs['textures']['success']:
+        raise RuntimeError("Texture conversion failed; no VMT files were written")
+    return write_vmt_files(vmt_jobs, output_path, shader, global_params)
+
+
+def add_material_nodes(graph, context, report) -> bool:
+    """
+    Add the selected materials' texture conversion to a task graph.
+    
+    Adds a 'textures' node and, when VMT generation is enabled, a 'vmts'
+    node that runs after it.
+    
+    Args:
+        graph: TaskGraph to add the nodes to
+        context: Blender context
+        report: Operator report function
+    
+    Returns:
+        bool: False if the materials could not be prepared (already reported)
+    """
+    prepared = prepare_texture_conversion(context, report)
+    if prepared is None:
+        return False
+    task, material_objects, all_additional_textures = prepared
+    graph.add('textures', *task)
+    
+    scene = context.scene
+    if scene.von_vmt_generate_bool:
+        # Blender data is snapshotted here; the node runs in a worker
+        graph.add(
+            'vmts',
+            _vmt_generation_task,
+            snapshot_vmt_jobs(material_objects, all_additional_textures),
+            scene.von_material_output_path.path,
+            scene.von_vmt_shader,
+            _get_global_vmt_params(scene),
+            depends_on='textures'
+        )
+    return True
+
+
+def _get_global_vmt_params(scene):
+    """Get the VMT parameters that apply to every material."""
+    return {
+        'additive': scene.von_vmt_param_additive,
+        'translucent': scene.von_vmt_param_translucent,
+        'nocull': scene.von_vmt_param_nocull,
+    }
+
+
 class VONVTF_OT_convert_materials(Operator):
     """Convert selected materials to VTF format (threaded)."""
     bl_idname = "von.vtf_convert_materials"
     bl_label = "Convert to VTF"
-    bl_description = "Convert selected materials to VTF format using VTFCmd"
+    bl_description = "Convert selected materials to VTF format"
     bl_options = {'REGISTER'}
     
     # Modal state
-    _timer = None
+    _waiter = None
     _task_id = None
     _material_objects = None
     _all_additional_textures = None
@@ -145,6 +535,10 @@ class VONVTF_OT_convert_materials(Operator):
                 scene.von_material_output_path.path != ""):
             return False
         
+        # The built-in encoder does not need VTFCmd
+        if scene.von_vtf_encoder == 'NATIVE':
+            return True
+        
         # Check if VTFCmd is available (bundled or UI path)
         bundled_vtfcmd = get_vtfcmd_path()
         if bundled_vtfcmd is not None:
@@ -159,129 +553,44 @@ class VONVTF_OT_convert_materials(Operator):
         """Start the conversion process."""
         scene = context.scene
         
-        image_paths = []
-        image_name_mapping = {}
-        material_objects = []
-        all_additional_textures = {}
-        
-        # Process each selected material
-        for mat_object in scene.von_mats_collection:
-            if not mat_object.material_checkbox:
-                continue
-                
-            material = mat_object.material
-            if not material:
-                continue
-                
-            # Get image texture node
-            image_node = get_image_texture_node(material)
-            if not image_node:
-                self.report({'ERROR'}, f"Material '{material.name}' has no Image Texture node connected to Base Color")
-                return {'CANCELLED'}
-            
-            # Validate image
-            image_path, error_msg = validate_image_texture(image_node)
-            if error_msg:
-                self.report({'ERROR'}, f"Material '{material.name}': {error_msg}")
-                return {'CANCELLED'}
-            
-            image_paths.append(image_path)
-            image_name_mapping[image_path] = mat_object.material_name
-            material_objects.append(mat_object)
-            
-            # Process additional textures for this material
-            if scene.von_vmt_generate_bool:
-                additional_textures = process_additional_textures(
-                    mat_object.material_name,
-                    mat_object.vmt_params,
-                    scene.von_material_output_path.path
-                )
-                if additional_textures:
-                    all_additional_textures[mat_object.material_name] = additional_textures
-        
-        if not image_paths:
-            self.report({'ERROR'}, "No valid materials selected for conversion")
+        prepared = prepare_texture_conversion(context, self.report)
+        if prepared is None:
             return {'CANCELLED'}
         
         # Store for later VMT generation
-        self._material_objects = material_objects
-        self._all_additional_textures = all_additional_textures
-        
-        # Collect all additional texture paths for VTFCmd
-        additional_texture_paths = {}
-        for mat_name, tex_dict in all_additional_textures.items():
-            for tex_type, tex_path in tex_dict.items():
-                if tex_type not in additional_texture_paths:
-                    additional_texture_paths[tex_type] = []
-                additional_texture_paths[tex_type].append(tex_path)
-        
-        # Build VTFCmd path - check bundled version first, then UI path
-        from ..data.paths import get_vtfcmd_path
-        
-        bundled_vtfcmd = get_vtfcmd_path()
-        if bundled_vtfcmd is not None:
-            vtfcmd_exe = str(bundled_vtfcmd)
-        else:
-            # Fall back to UI-specified path
-            vtfcmd_path = scene.von_vtfcmd_path.path
-            if not vtfcmd_path:
-                self.report({'ERROR'}, "VTFCmd path not set. Either place VTFCmd in the addon's tools/vtfcmd folder or specify the path in the UI.")
-                return {'CANCELLED'}
-            if not vtfcmd_path.endswith(os.sep):
-                vtfcmd_path += os.sep
-            vtfcmd_exe = os.path.join(vtfcmd_path, "VTFCmd.exe")
-        
-        # Get VMT parameters if enabled
-        vmt_params = None
-        shader = None
-        if scene.von_vmt_generate_bool:
-            shader = scene.von_vmt_shader
-            vmt_params = {
-                'additive': scene.von_vmt_param_additive,
-                'translucent': scene.von_vmt_param_translucent,
-                'nocull': scene.von_vmt_param_nocull,
-            }
-        
-        # Start background task
-        self._task_id = run_in_background(
-            _vtf_conversion_task,
-            vtfcmd_exe,
-            image_paths,
-            image_name_mapping,
-            scene.von_material_output_path.path,
-            scene.von_vtf_format,
-            scene.von_vtf_alpha_format,
-            scene.von_vtf_version,
-            scene.von_vtf_resize_bool,
-            scene.von_vtf_resize_method,
-            scene.von_vtf_resize_filter,
-            scene.von_vtf_clamp_size,
-            shader,
-            vmt_params,
-            additional_texture_paths
-        )
+        task, self._material_objects, self._all_additional_textures = prepared
+        self._task_id = run_in_background(*task)
         
-        # Set up modal timer
+        # Wake up when the task reports progress or finishes
         wm = context.window_manager
-        self._timer = wm.event_timer_add(0.1, window=context.window)
+        self._waiter = TaskWaiter(context, self._task_id, progress=True)
         wm.modal_handler_add(self)
         
         self.report({'INFO'}, "VTF conversion started in background...")
         return {'RUNNING_MODAL'}
     
     def modal(self, context, event):
-        """Check task completion."""
-        if event.type == 'TIMER':
+        """Check task completion and show progress; Esc cancels the task."""
+        if event.type == 'ESC' and event.value == 'PRESS':
+            cancel_task(self._task_id)
+            return {'RUNNING_MODAL'}
+        
+        if event.type == 'TIMER' and self._waiter.consume():
             if is_task_finished(self._task_id):
                 return self._finish(context)
+            
+            result = get_task_result(self._task_id)
+            if result is not None:
+                context.workspace.status_text_set(
+                    f"Converting textures: {result.progress:.0%} {result.message} (Esc to cancel)"
+                )
         
         return {'PASS_THROUGH'}
     
     def _finish(self, context):
         """Handle task completion."""
-        # Remove timer
-        wm = context.window_manager
-        wm.event_timer_remove(self._timer)
+        self._waiter.release()
+        context.workspace.status_text_set(None)
         
         # Get result
         result = get_task_result(self._task_id)
@@ -302,7 +611,10 @@ class VONVTF_OT_convert_materials(Operator):
         # Process successful result
         task_result = result.result
         if task_result['success']:
-            self.report({'INFO'}, f"Successfully processed {task_result['num_files']} files")
+            message = f"Successfully processed {task_result['num_files']} files"
+            if task_result.get('skipped'):
+                message += f" ({task_result['skipped']} up to date)"
+            self.report({'INFO'}, message)
             if task_result['stdout']:
                 print("VTFCmd output:", task_result['stdout'])
             
@@ -324,63 +636,25 @@ class VONVTF_OT_convert_materials(Operator):
     
     def cancel(self, context):
         """Handle operator cancellation."""
-        if self._timer:
-            wm = context.window_manager
-            wm.event_timer_remove(self._timer)
+        if self._waiter:
+            self._waiter.release()
+        context.workspace.status_text_set(None)
         if self._task_id:
+            cancel_task(self._task_id)
             cleanup_task(self._task_id)
     
     def _generate_vmt_files(self, context):
         """Generate custom VMT files for each material."""
         scene = context.scene
-        output_path = scene.von_material_output_path.path
-        
-        # Get the materials relative path
-        materials_relative_path = get_materials_relative_path(output_path)
-        
-        # Global VMT parameters
-        global_params = {
-            'additive': scene.von_vmt_param_additive,
-            'translucent': scene.von_vmt_param_translucent,
-            'nocull': scene.von_vmt_param_nocull,
-        }
+        result = write_vmt_files(
+            snapshot_vmt_jobs(self._material_objects, self._all_additional_textures),
+            scene.von_material_output_path.path,
+            scene.von_vmt_shader,
+            _get_global_vmt_params(scene)
+        )
         
-        for mat_object in self._material_objects:
-            try:
-                # Determine texture paths for VMT
-                base_texture_path = mat_object.material_name
-                normal_texture_path = None
-                phong_texture_path = None
-                
-                # Get additional texture paths
-                if mat_object.material_name in self._all_additional_textures:
-                    additional_textures = self._all_additional_textures[mat_object.material_name]
-                    if 'normal' in additional_textures:
-                        normal_name = os.path.splitext(os.path.basename(additional_textures['normal']))[0]
-                        normal_texture_path = normal_name
-                    
-                    if 'phong' in additional_textures:
-                        phong_name = os.path.splitext(os.path.basename(additional_textures['phong']))[0]
-                        phong_texture_path = phong_name
-                
-                # Generate VMT content
-                vmt_content = generate_vmt_content(
-                    mat_object.material_name,
-                    mat_object.vmt_params,
-                    scene.von_vmt_shader,
-                    base_texture_path,
-                    normal_texture_path,
-                    phong_texture_path,
-                    materials_relative_path,
-                    global_params
-                )
-                
-                # Write VMT file
-                write_vmt_file(output_path, mat_object.material_name, vmt_content)
-                
-            except Exception as e:
-                self.report({'WARNING'}, f"Failed to generate VMT for {mat_object.material_name}: {e}")
-                print(f"VMT generation error for {mat_object.material_name}: {e}")
+        for name, error in result['errors'].items():
+            self.report({'WARNING'}, f"Failed to generate VMT for {name}: {error}")
         
         self.report({'INFO'}, f"Generated VMT files for {len(self._material_objects)} materials")
 
@@ -1,18 +1,36 @@
 """
 Operators for QC file generation.
 """
+import os
+
 import bpy  # type: ignore
 
-from ..core.qc_builder import generate_qc_file, gather_qc_data_from_scene, build_qc_content, write_qc_file_from_data
-from ..core.sequences import populate_sequence_data
+from ..core.collision import create_collisions_for_armatures, read_world_triangles
+from ..core.convex_decomposition import decompose_mesh
+from ..core.smd_writer import write_collision_smd
+from ..core.qc_builder import (
+    generate_qc_file,
+    gather_qc_data_from_scene,
+    build_qc_content,
+    write_qc_file_from_data,
+    get_qc_output_directory,
+)
+from ..core.sequences import (
+    populate_sequence_data,
+    snapshot_sequence_jobs,
+    export_sequence_jobs,
+)
 from ..properties.qc_generator_properties import sync_bodygroup_boxes
 from ..utils.threading_utils import (
     run_in_background,
     get_task_result,
     is_task_finished,
     cleanup_task,
+    task_manager,
+    POOL_PROCESS,
     TaskStatus,
 )
+from ..utils.task_events import TaskWaiter
 
 
 def _qc_generation_task(qc_data):
@@ -36,7 +54,7 @@ class VONQC_OT_generate_prop(bpy.types.Operator):
     bl_description = "Generate a QC file for a static prop model"
     bl_options = {'REGISTER'}
     
-    _timer = None
+    _waiter = None
     _task_id = None
     
     @classmethod
@@ -54,9 +72,9 @@ class VONQC_OT_generate_prop(bpy.types.Operator):
             # Start background task for file writing
             self._task_id = run_in_background(_qc_generation_task, qc_data)
             
-            # Set up modal timer
+            # Wake up when the task finishes
             wm = context.window_manager
-            self._timer = wm.event_timer_add(0.1, window=context.window)
+            self._waiter = TaskWaiter(context, self._task_id)
             wm.modal_handler_add(self)
             
             self.report({'INFO'}, "Generating QC file...")
@@ -66,14 +84,13 @@ class VONQC_OT_generate_prop(bpy.types.Operator):
             return {'CANCELLED'}
     
     def modal(self, context, event):
-        if event.type == 'TIMER':
+        if event.type == 'TIMER' and self._waiter.consume():
             if is_task_finished(self._task_id):
                 return self._finish(context)
         return {'PASS_THROUGH'}
     
     def _finish(self, context):
-        wm = context.window_manager
-        wm.event_timer_remove(self._timer)
+        self._waiter.release()
         
         result = get_task_result(self._task_id)
         cleanup_task(self._task_id)
@@ -88,8 +105,8 @@ class VONQC_OT_generate_prop(bpy.types.Operator):
         return {'FINISHED'}
     
     def cancel(self, context):
-        if self._timer:
-            context.window_manager.event_timer_remove(self._timer)
+        if self._waiter:
+            self._waiter.release()
         if self._task_id:
             cleanup_task(self._task_id)
 
@@ -101,7 +118,7 @@ class VONQC_OT_generate_character(bpy.types.Operator):
     bl_description = "Generate a QC file for a character/player model"
     bl_options = {'REGISTER'}
     
-    _timer = None
+    _waiter = None
     _task_id = None
     
     @classmethod
@@ -116,7 +133,7 @@ class VONQC_OT_generate_character(bpy.types.Operator):
             self._task_id = run_in_background(_qc_generation_task, qc_data)
             
             wm = context.window_manager
-            self._timer = wm.event_timer_add(0.1, window=context.window)
+            self._waiter = TaskWaiter(context, self._task_id)
             wm.modal_handler_add(self)
             
             self.report({'INFO'}, "Generating QC file...")
@@ -126,13 +143,13 @@ class VONQC_OT_generate_character(bpy.types.Operator):
             return {'CANCELLED'}
     
     def modal(self, context, event):
-        if event.type == 'TIMER':
+        if event.type == 'TIMER' and self._waiter.consume():
             if is_task_finished(self._task_id):
                 return self._finish(context)
         return {'PASS_THROUGH'}
     
     def _finish(self, context):
-        context.window_manager.event_timer_remove(self._timer)
+        self._waiter.release()
         result = get_task_result(self._task_id)
         cleanup_task(self._task_id)
         
@@ -144,8 +161,8 @@ class VONQC_OT_generate_character(bpy.types.Operator):
         return {'FINISHED'}
     
     def cancel(self, context):
-        if self._timer:
-            context.window_manager.event_timer_remove(self._timer)
+        if self._waiter:
+            self._waiter.release()
         if self._task_id:
             cleanup_task(self._task_id)
 
@@ -157,7 +174,7 @@ class VONQC_OT_generate_npc(bpy.types.Operator):
     bl_description = "Generate a QC file for an NPC model"
     bl_options = {'REGISTER'}
     
-    _timer = None
+    _waiter = None
     _task_id = None
     
     @classmethod
@@ -172,7 +189,7 @@ class VONQC_OT_generate_npc(bpy.types.Operator):
             self._task_id = run_in_background(_qc_generation_task, qc_data)
             
             wm = context.window_manager
-            self._timer = wm.event_timer_add(0.1, window=context.window)
+            self._waiter = TaskWaiter(context, self._task_id)
             wm.modal_handler_add(self)
             
             self.report({'INFO'}, "Generating QC file...")
@@ -182,13 +199,13 @@ class VONQC_OT_generate_npc(bpy.types.Operator):
             return {'CANCELLED'}
     
     def modal(self, context, event):
-        if event.type == 'TIMER':
+        if event.type == 'TIMER' and self._waiter.consume():
             if is_task_finished(self._task_id):
                 return self._finish(context)
         return {'PASS_THROUGH'}
     
     def _finish(self, context):
-        context.window_manager.event_timer_remove(self._timer)
+        self._waiter.release()
         result = get_task_result(self._task_id)
         cleanup_task(self._task_id)
         
@@ -200,8 +217,8 @@ class VONQC_OT_generate_npc(bpy.types.Operator):
         return {'FINISHED'}
     
     def cancel(self, context):
-        if self._timer:
-            context.window_manager.event_timer_remove(self._timer)
+        if self._waiter:
+            self._waiter.release()
         if self._task_id:
             cleanup_task(self._task_id)
 
@@ -213,7 +230,7 @@ class VONQC_OT_generate_viewmodel(bpy.types.Operator):
     bl_description = "Generate a QC file for a first-person viewmodel"
     bl_options = {'REGISTER'}
     
-    _timer = None
+    _waiter = None
     _task_id = None
     
     @classmethod
@@ -228,7 +245,7 @@ class VONQC_OT_generate_viewmodel(bpy.types.Operator):
             self._task_id = run_in_background(_qc_generation_task, qc_data)
             
             wm = context.window_manager
-            self._timer = wm.event_timer_add(0.1, window=context.window)
+            self._waiter = TaskWaiter(context, self._task_id)
             wm.modal_handler_add(self)
             
             self.report({'INFO'}, "Generating QC file...")
@@ -238,13 +255,13 @@ class VONQC_OT_generate_viewmodel(bpy.types.Operator):
             return {'CANCELLED'}
     
     def modal(self, context, event):
-        if event.type == 'TIMER':
+        if event.type == 'TIMER' and self._waiter.consume():
             if is_task_finished(self._task_id):
                 return self._finish(context)
         return {'PASS_THROUGH'}
     
     def _finish(self, context):
-        context.window_manager.event_timer_remove(self._timer)
+        self._waiter.release()
         result = get_task_result(self._task_id)
         cleanup_task(self._task_id)
         
@@ -256,8 +273,8 @@ class VONQC_OT_generate_viewmodel(bpy.types.Operator):
         return {'FINISHED'}
     
     def cancel(self, context):
-        if self._timer:
-            context.window_manager.event_timer_remove(self._timer)
+        if self._waiter:
+            self._waiter.release()
         if self._task_id:
             cleanup_task(self._task_id)
 
@@ -269,7 +286,7 @@ class VONQC_OT_generate_worldmodel(bpy.types.Operator):
     bl_description = "Generate a QC file for a third-person worldmodel"
     bl_options = {'REGISTER'}
     
-    _timer = None
+    _waiter = None
     _task_id = None
     
     @classmethod
@@ -284,7 +301,7 @@ class VONQC_OT_generate_worldmodel(bpy.types.Operator):
             self._task_id = run_in_background(_qc_generation_task, qc_data)
             
             wm = context.window_manager
-            self._timer = wm.event_timer_add(0.1, window=context.window)
+            self._waiter = TaskWaiter(context, self._task_id)
             wm.modal_handler_add(self)
             
             self.report({'INFO'}, "Generating QC file...")
@@ -294,13 +311,13 @@ class VONQC_OT_generate_worldmodel(bpy.types.Operator):
             return {'CANCELLED'}
     
     def modal(self, context, event):
-        if event.type == 'TIMER':
+        if event.type == 'TIMER' and self._waiter.consume():
             if is_task_finished(self._task_id):
                 return self._finish(context)
         return {'PASS_THROUGH'}
     
     def _finish(self, context):
-        context.window_manager.event_timer_remove(self._timer)
+        self._waiter.release()
         result = get_task_result(self._task_id)
         cleanup_task(self._task_id)
         
@@ -312,12 +329,145 @@ class VONQC_OT_generate_worldmodel(bpy.types.Operator):
         return {'FINISHED'}
     
     def cancel(self, context):
-        if self._timer:
-            context.window_manager.event_timer_remove(self._timer)
+        if self._waiter:
+            self._waiter.release()
         if self._task_id:
             cleanup_task(self._task_id)
 
 
+def _convex_collision_task(vertices, triangles, output_path, max_hulls, concavity, max_hull_vertices):
+    """
+    Background task function for convex collision decomposition.
+    
+    Splits the mesh into convex pieces and writes them as the physics SMD.
+    """
+    shapes = decompose_mesh(
+        vertices,
+        triangles,
+        max_hulls=max_hulls,
+        concavity=concavity,
+        max_hull_vertices=max_hull_vertices,
+        executor=task_manager.get_pool(POOL_PROCESS),
+    )
+    write_collision_smd(output_path, shapes)
+    return {
+        'output_path': output_path,
+        'piece_count': len(shapes),
+    }
+
+
+class VONQC_OT_generate_convex_collision(bpy.types.Operator):
+    """Split the selected meshes into convex pieces for the collision model (threaded)"""
+    bl_idname = "von.qcgenerator_convex_collision"
+    bl_label = "Generate Convex Collision"
+    bl_description = ("Decompose the selected meshes into convex hulls and export them "
+                      "as the model's physics SMD")
+    bl_options = {'REGISTER'}
+    
+    _waiter = None
+    _task_id = None
+    
+    @classmethod
+    def poll(cls, context):
+        qc_settings = context.scene.von_qc_settings
+        return (qc_settings.string_outputPath != "" and 
+                qc_settings.string_mdlModelName != "" and
+                any(obj.type == 'MESH' for obj in context.selected_objects))
+    
+    def execute(self, context):
+        qc_settings = context.scene.von_qc_settings
+        
+        # Read geometry on main thread (accesses Blender data)
+        meshes = [obj for obj in context.selected_objects if obj.type == 'MESH']
+        vertices, triangles = read_world_triangles(meshes)
+        if not len(triangles):
+            self.report({'ERROR'}, "Selected meshes have no faces")
+            return {'CANCELLED'}
+        
+        output_path = os.path.join(
+            get_qc_output_directory(qc_settings),
+            f"{qc_settings.string_mdlModelName}_phys.smd"
+        )
+        
+        self._task_id = run_in_background(
+            _convex_collision_task,
+            vertices,
+            triangles,
+            output_path,
+            qc_settings.int_collisionMaxHulls,
+            qc_settings.float_collisionConcavity,
+            qc_settings.int_collisionMaxHullVertices,
+        )
+        
+        wm = context.window_manager
+        self._waiter = TaskWaiter(context, self._task_id)
+        wm.modal_handler_add(self)
+        
+        self.report({'INFO'}, "Decomposing collision model...")
+        return {'RUNNING_MODAL'}
+    
+    def modal(self, context, event):
+        if event.type == 'TIMER' and self._waiter.consume():
+            if is_task_finished(self._task_id):
+                return self._finish(context)
+        return {'PASS_THROUGH'}
+    
+    def _finish(self, context):
+        self._waiter.release()
+        result = get_task_result(self._task_id)
+        cleanup_task(self._task_id)
+        
+        if result is None or result.status == TaskStatus.FAILED:
+            self.report({'ERROR'}, f"Failed to generate collision: {result.error if result else 'Unknown'}")
+            return {'CANCELLED'}
+        
+        task_result = result.result
+        context.scene.von_qc_settings.int_collisionPieceCount = task_result['piece_count']
+        self.report(
+            {'INFO'},
+            f"Collision model written ({task_result['piece_count']} convex pieces): "
+            f"{task_result['output_path']}"
+        )
+        return {'FINISHED'}
+    
+    def cancel(self, context):
+        if self._waiter:
+            self._waiter.release()
+        if self._task_id:
+            cleanup_task(self._task_id)
+
+
+class VONQC_OT_generate_bone_collision(bpy.types.Operator):
+    """Create a collision shape for each bone of the selected armatures"""
+    bl_idname = "von.qcgenerator_bone_collision"
+    bl_label = "Generate Bone Collision"
+    bl_description = ("Create a box or convex hull around the vertices each bone of the "
+                      "selected armatures mainly deforms")
+    bl_options = {'REGISTER', 'UNDO'}
+    
+    @classmethod
+    def poll(cls, context):
+        return any(obj.type == 'ARMATURE' for obj in context.selected_objects)
+    
+    def execute(self, context):
+        qc_settings = context.scene.von_qc_settings
+        armatures = [obj for obj in context.selected_objects if obj.type == 'ARMATURE']
+        
+        try:
+            create_collisions_for_armatures(
+                armatures,
+                shape_type=qc_settings.enum_collisionShapeType,
+                max_hull_vertices=qc_settings.int_collisionMaxHullVertices,
+                merge=qc_settings.bool_collisionMerge,
+            )
+        except Exception as e:
+            self.report({'ERROR'}, f"Failed to generate bone collision: {str(e)}")
+            return {'CANCELLED'}
+        
+        self.report({'INFO'}, f"Bone collision created for {len(armatures)} armature(s)")
+        return {'FINISHED'}
+
+
 class VONQC_OT_refresh_collections(bpy.types.Operator):
     """Refresh the collection list for bodygroups"""
     bl_idname = "von.qcgenerator_refresh_collections"
@@ -349,6 +499,95 @@ class VONQC_OT_collect_sequences(bpy.types.Operator):
         return {'FINISHED'}
 
 
+def _sequence_export_task(jobs):
+    """
+    Background task function for batch sequence export.
+    
+    Bakes and writes the snapshotted sequences in a worker process pool.
+    """
+    return export_sequence_jobs(jobs)
+
+
+class VONQC_OT_export_sequences(bpy.types.Operator):
+    """Export all sequences marked for export as animation SMDs (threaded)"""
+    bl_idname = "von.export_sequences"
+    bl_label = "Export Sequences"
+    bl_description = ("Write an animation SMD for every sequence marked for export "
+                      "into the QC output folder")
+    bl_options = {'REGISTER'}
+    
+    _waiter = None
+    _task_id = None
+    
+    @classmethod
+    def poll(cls, context):
+        scene = context.scene
+        return (scene.von_qc_settings.string_outputPath != "" and
+                any(seq.shouldExport
+                    for rig_data in scene.von_qc_data.sequence_objectdata
+                    for seq in rig_data.sequences))
+    
+    def execute(self, context):
+        output_dir = get_qc_output_directory(context.scene.von_qc_settings)
+        os.makedirs(output_dir, exist_ok=True)
+        
+        # Snapshot F-curves on main thread (accesses Blender data)
+        try:
+            jobs = snapshot_sequence_jobs(context, output_dir)
+        except ValueError as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
+        
+        self._task_id = run_in_background(_sequence_export_task, jobs)
+        
+        wm = context.window_manager
+        self._waiter = TaskWaiter(context, self._task_id)
+        wm.modal_handler_add(self)
+        
+        self.report({'INFO'}, f"Exporting {len(jobs)} sequences...")
+        return {'RUNNING_MODAL'}
+    
+    def modal(self, context, event):
+        if event.type == 'TIMER' and self._waiter.consume():
+            if is_task_finished(self._task_id):
+                return self._finish(context)
+        return {'PASS_THROUGH'}
+    
+    def _finish(self, context):
+        self._waiter.release()
+        result = get_task_result(self._task_id)
+        cleanup_task(self._task_id)
+        
+        if result is None or result.status == TaskStatus.FAILED:
+            self.report({'ERROR'}, f"Sequence export failed: {result.error if result else 'Unknown'}")
+            return {'CANCELLED'}
+        
+        stats = result.result
+        for filepath, timing in sorted(stats['timings'].items()):
+            print(f"  {os.path.basename(filepath)}: snapshot {timing['snapshot_time']:.3f}s, "
+                  f"bake {timing['bake_time']:.3f}s, write {timing['write_time']:.3f}s")
+        for filepath, error in stats['errors'].items():
+            print(f"  {os.path.basename(filepath)}: FAILED - {error}")
+        
+        if stats['failed'] > 0:
+            self.report(
+                {'WARNING'},
+                f"Exported {stats['success']}/{stats['total']} sequences ({stats['failed']} failed)"
+            )
+        else:
+            self.report(
+                {'INFO'},
+                f"Exported {stats['success']} sequences in {stats['elapsed']:.2f}s"
+            )
+        return {'FINISHED'}
+    
+    def cancel(self, context):
+        if self._waiter:
+            self._waiter.release()
+        if self._task_id:
+            cleanup_task(self._task_id)
+
+
 class VONQC_OT_preview_qc(bpy.types.Operator):
     """Preview the QC file that would be generated"""
     bl_idname = "von.qcgenerator_preview"
@@ -382,8 +621,11 @@ CLASSES = [
     VONQC_OT_generate_npc,
     VONQC_OT_generate_viewmodel,
     VONQC_OT_generate_worldmodel,
+    VONQC_OT_generate_convex_collision,
+    VONQC_OT_generate_bone_collision,
     VONQC_OT_refresh_collections,
     VONQC_OT_collect_sequences,
+    VONQC_OT_export_sequences,
     VONQC_OT_preview_qc,
 ]
 
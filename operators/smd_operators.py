@@ -7,8 +7,18 @@ import bpy  # type: ignore
 from ..core.smd_export import (
     split_objects_into_collections,
     restore_objects_from_collections,
-    export_scene_smd,
+    get_export_groups,
+    snapshot_export_jobs,
+    write_export_jobs,
 )
+from ..utils.threading_utils import (
+    run_in_background,
+    get_task_result,
+    is_task_finished,
+    cleanup_task,
+    TaskStatus,
+)
+from ..utils.task_events import TaskWaiter
 
 
 class VONSMD_OT_split_objects(bpy.types.Operator):
@@ -41,11 +51,17 @@ class VONSMD_OT_export(bpy.types.Operator):
     bl_label = "Export Scene"
     bl_options = {'REGISTER', 'UNDO'}
     
+    _waiter = None
+    _task_id = None
+    
     def execute(self, context):
         scene = context.scene
         smd_export = scene.von_smd_export
         export_folder = smd_export.string_exportFolder
         
+        if smd_export.bool_nativeExport:
+            return self._export_native(context, bpy.path.abspath(export_folder))
+        
         if not os.path.exists(export_folder):
             os.makedirs(export_folder)
         
@@ -60,6 +76,56 @@ class VONSMD_OT_export(bpy.types.Operator):
         except Exception as e:
             self.report({'ERROR'}, f"Export failed: {e}")
             return {'CANCELLED'}
+    
+    def _export_native(self, context, export_folder):
+        """Snapshot the meshes, then write the SMD files in the background."""
+        groups = get_export_groups(context, context.scene.von_smd_export.enum_exportGrouping)
+        if not groups:
+            self.report({'WARNING'}, "No visible mesh objects to export")
+            return {'CANCELLED'}
+        
+        # Snapshot on main thread (accesses Blender data)
+        jobs = snapshot_export_jobs(context, groups, export_folder)
+        self._task_id = run_in_background(write_export_jobs, jobs)
+        
+        wm = context.window_manager
+        self._waiter = TaskWaiter(context, self._task_id)
+        wm.modal_handler_add(self)
+        
+        self.report({'INFO'}, f"Exporting {len(jobs)} SMD files...")
+        return {'RUNNING_MODAL'}
+    
+    def modal(self, context, event):
+        if event.type == 'TIMER' and self._waiter.consume():
+            if is_task_finished(self._task_id):
+                return self._finish(context)
+        return {'PASS_THROUGH'}
+    
+    def _finish(self, context):
+        self._waiter.release()
+        result = get_task_result(self._task_id)
+        cleanup_task(self._task_id)
+        
+        if result is None or result.status == TaskStatus.FAILED:
+            self.report({'ERROR'}, f"Export failed: {result.error if result else 'Unknown'}")
+            return {'CANCELLED'}
+        
+        export_result = result.result
+        for name, error in export_result['errors'].items():
+            print(f"Failed to export {name}: {error}")
+        
+        self.report(
+            {'WARNING'} if export_result['failed'] else {'INFO'},
+            f"SMD export completed! Success: {export_result['success']}, "
+            f"Failed: {export_result['failed']}, Total: {export_result['total']}"
+        )
+        return {'FINISHED'}
+    
+    def cancel(self, context):
+        if self._waiter:
+            self._waiter.release()
+        if self._task_id:
+            cleanup_task(self._task_id)
 
 
 # Registration
@@ -1,9 +1,22 @@
 """
 Operators for StudioMDL compilation functionality.
 """
+from pathlib import Path
+
 import bpy  # type: ignore
 
-from ..core.studiomdl import run_definebones_from_context
+from ..core.build_cache import BuildCache
+from ..core.compile_queue import CompileQueue, compile_qc_file, find_qc_files
+from ..core.qc_builder import (
+    get_qc_output_directory,
+    gather_qc_data_from_scene,
+    write_qc_file_from_data,
+)
+from ..core.smd_export import get_export_groups, snapshot_export_jobs, write_export_jobs
+from ..core.studiomdl import resolve_studiomdl_path, run_definebones_from_context
+from ..utils.threading_utils import TaskGraph, TaskStatus, task_manager
+from ..utils.task_events import TaskWaiter
+from .material_vtf_operators import add_material_nodes
 
 
 class VONSTUDIOMDL_OT_run_definebones(bpy.types.Operator):
@@ -22,9 +35,293 @@ class VONSTUDIOMDL_OT_run_definebones(bpy.types.Operator):
             return {'CANCELLED'}
 
 
+class VONSTUDIOMDL_OT_compile_batch(bpy.types.Operator):
+    """Compile every QC file in a folder with parallel studiomdl processes"""
+    bl_idname = "von.compile_qc_batch"
+    bl_label = "Compile QC Files"
+    bl_description = "Compile all QC files in the compile folder with parallel studiomdl processes"
+    bl_options = {'REGISTER'}
+    
+    _waiter = None
+    _queue = None
+    _reported = None
+    
+    def execute(self, context):
+        qc_settings = context.scene.von_qc_settings
+        
+        try:
+            studiomdl_path = resolve_studiomdl_path(qc_settings.string_studiomdlFileLocation)
+        except FileNotFoundError as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
+        
+        if qc_settings.string_compileFolder:
+            qc_folder = bpy.path.abspath(qc_settings.string_compileFolder)
+        else:
+            qc_folder = get_qc_output_directory(qc_settings)
+        
+        qc_files = find_qc_files([qc_folder])
+        if not qc_files:
+            self.report({'ERROR'}, f"No QC files found in '{qc_folder}'")
+            return {'CANCELLED'}
+        
+        game_dir = None
+        if qc_settings.string_gmodExePath:
+            game_dir = Path(bpy.path.abspath(qc_settings.string_gmodExePath)).parent
+        
+        line_callback = None
+        if qc_settings.bool_studiomdlVerbose:
+            line_callback = lambda job, stream_name, line: print(f"[{job.name}] {line}")
+        
+        cache = BuildCache.for_folder(qc_folder) if qc_settings.bool_compileIncremental else None
+        
+        # Finished jobs wake the operator through the task event queue
+        event_key = f"compile_queue_{id(self)}"
+        self._queue = CompileQueue(
+            studiomdl_path,
+            game_dir=game_dir,
+            max_workers=qc_settings.int_compileJobs,
+            line_callback=line_callback,
+            job_callback=lambda job: task_manager.post_event(event_key),
+            cache=cache,
+        )
+        self._reported = set()
+        
+        wm = context.window_manager
+        self._waiter = TaskWaiter(context, event_key)
+        wm.modal_handler_add(self)
+        self._queue.submit_many(qc_files)
+        
+        self.report({'INFO'}, f"Compiling {len(qc_files)} QC files...")
+        return {'RUNNING_MODAL'}
+    
+    def modal(self, context, event):
+        if event.type == 'ESC' and event.value == 'PRESS':
+            self._queue.cancel()
+            return {'RUNNING_MODAL'}
+        
+        if event.type == 'TIMER' and self._waiter.consume():
+            # Print jobs as they finish
+            jobs = self._queue.jobs
+            for index, job in enumerate(jobs):
+                if job.is_finished and index not in self._reported:
+                    self._reported.add(index)
+                    if job.skipped:
+                        state = "up to date"
+                    elif job.status == TaskStatus.CANCELLED:
+                        state = "cancelled"
+                    else:
+                        state = "OK" if job.error is None else f"FAILED - {job.error}"
+                    print(f"({len(self._reported)}/{len(jobs)}) {job.qc_path.name}: "
+                          f"{state} [{job.elapsed:.1f}s]")
+            
+            if self._queue.is_finished:
+                return self._finish(context)
+            
+            context.workspace.status_text_set(
+                f"Compiling: {len(self._reported)}/{len(jobs)} QC files (Esc to cancel)"
+            )
+        return {'PASS_THROUGH'}
+    
+    def _finish(self, context):
+        self._waiter.release()
+        context.workspace.status_text_set(None)
+        self._queue.cleanup()
+        if self._queue.cache is not None:
+            self._queue.cache.save()
+        stats = self._queue.summary()
+        
+        if stats['cancelled'] > 0:
+            self.report(
+                {'WARNING'},
+                f"Compile cancelled after {stats['success']}/{stats['total']} QC files"
+            )
+            return {'CANCELLED'}
+        
+        if stats['failed'] > 0:
+            self.report(
+                {'WARNING'},
+                f"Compiled {stats['success']}/{stats['total']} QC files ({stats['failed']} failed). "
+                "Check console for details."
+            )
+        else:
+            self.report(
+                {'INFO'},
+                f"Compiled {stats['success'] - stats['skipped']} QC files "
+                f"({stats['skipped']} up to date)"
+            )
+        return {'FINISHED'}
+    
+    def cancel(self, context):
+        if self._waiter:
+            self._waiter.release()
+        context.workspace.status_text_set(None)
+        if self._queue:
+            self._queue.cancel()
+            self._queue.cleanup()
+
+
+def _compile_model_task(studiomdl_exe, game_dir, cache, inputs, token=None):
+    """
+    Task graph node compiling the QC written by the 'qc' node.
+    
+    Raises:
+        RuntimeError: If SMD files failed to export or the compile failed
+    """
+    if 'smd' in inputs and inputs['smd']['failed']:
+        raise RuntimeError(f"{inputs['smd']['failed']} SMD file(s) failed to export")
+    
+    # Compile in this node's own thread: the graph already occupies a pool
+    # worker, and queueing the compile on the same pool could wait forever
+    job = compile_qc_file(studiomdl_exe, inputs['qc'], game_dir=game_dir, cache=cache, token=token)
+    if job.status is TaskStatus.FAILED:
+        raise RuntimeError(job.error)
+    return {
+        'qc_path': str(job.qc_path),
+        'returncode': job.returncode,
+        'elapsed': job.elapsed,
+        'skipped': job.skipped,
+    }
+
+
+class VONSTUDIOMDL_OT_build_model(bpy.types.Operator):
+    """Convert textures, export SMDs, write the QC and compile the model in one go"""
+    bl_idname = "von.build_model"
+    bl_label = "Build Model"
+    bl_description = (
+        "Convert the selected materials, export SMD files, write the QC and compile it. "
+        "Steps that do not depend on each other run at the same time"
+    )
+    bl_options = {'REGISTER'}
+    
+    _waiter = None
+    _graph = None
+    
+    @classmethod
+    def poll(cls, context):
+        qc_settings = context.scene.von_qc_settings
+        return (qc_settings.string_outputPath != "" and 
+                qc_settings.string_mdlModelName != "")
+    
+    def execute(self, context):
+        scene = context.scene
+        qc_settings = scene.von_qc_settings
+        smd_export = scene.von_smd_export
+        
+        try:
+            studiomdl_path = resolve_studiomdl_path(qc_settings.string_studiomdlFileLocation)
+        except FileNotFoundError as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
+        
+        # Everything that reads Blender data is snapshotted here
+        event_key = f"build_model_{id(self)}"
+        graph = TaskGraph(event_key=event_key)
+        
+        if any(item.material_checkbox for item in scene.von_mats_collection):
+            if not add_material_nodes(graph, context, self.report):
+                return {'CANCELLED'}
+        
+        compile_depends_on = ['qc']
+        if smd_export.bool_nativeExport:
+            groups = get_export_groups(context, smd_export.enum_exportGrouping)
+            if groups:
+                export_folder = bpy.path.abspath(smd_export.string_exportFolder)
+                graph.add('smd', write_export_jobs, snapshot_export_jobs(context, groups, export_folder))
+                compile_depends_on.append('smd')
+        
+        try:
+            qc_data = gather_qc_data_from_scene(context)
+        except Exception as e:
+            self.report({'ERROR'}, f"Failed to gather QC data: {str(e)}")
+            return {'CANCELLED'}
+        graph.add('qc', write_qc_file_from_data, qc_data)
+        
+        game_dir = None
+        if qc_settings.string_gmodExePath:
+            game_dir = Path(bpy.path.abspath(qc_settings.string_gmodExePath)).parent
+        cache = None
+        if qc_settings.bool_compileIncremental:
+            cache = BuildCache.for_folder(get_qc_output_directory(qc_settings))
+        graph.add(
+            'compile',
+            _compile_model_task,
+            studiomdl_path,
+            game_dir,
+            cache,
+            depends_on=compile_depends_on
+        )
+        
+        self._graph = graph
+        wm = context.window_manager
+        self._waiter = TaskWaiter(context, event_key)
+        wm.modal_handler_add(self)
+        graph.start()
+        
+        self.report({'INFO'}, f"Building model ({len(graph.nodes)} steps)...")
+        return {'RUNNING_MODAL'}
+    
+    def modal(self, context, event):
+        if event.type == 'ESC' and event.value == 'PRESS':
+            self._graph.cancel()
+            return {'RUNNING_MODAL'}
+        
+        if event.type == 'TIMER' and self._waiter.consume():
+            if self._graph.is_finished:
+                return self._finish(context)
+            
+            nodes = self._graph.nodes
+            done = sum(node.is_finished for node in nodes)
+            running = ", ".join(node.name for node in nodes if node.status is TaskStatus.RUNNING)
+            context.workspace.status_text_set(
+                f"Building: {done}/{len(nodes)} steps done, running {running} (Esc to cancel)"
+            )
+        return {'PASS_THROUGH'}
+    
+    def _finish(self, context):
+        self._waiter.release()
+        context.workspace.status_text_set(None)
+        stats = self._graph.summary()
+        
+        for name, elapsed in stats['timings'].items():
+            print(f"Build step {name}: {elapsed:.1f}s")
+        for name, error in stats['errors'].items():
+            print(f"Build step {name} failed: {error}")
+        
+        if stats['failed'] > 0:
+            name, error = next(iter(stats['errors'].items()))
+            self.report({'ERROR'}, f"Build failed at '{name}': {error}")
+            return {'CANCELLED'}
+        
+        if stats['cancelled'] > 0:
+            self.report({'WARNING'}, "Build cancelled")
+            return {'CANCELLED'}
+        
+        textures = stats['results'].get('textures')
+        if textures is not None and not textures['success']:
+            self.report({'WARNING'}, f"Model built, but texture conversion failed: {textures['stderr']}")
+            return {'FINISHED'}
+        
+        compiled = stats['results']['compile']
+        if compiled['skipped']:
+            self.report({'INFO'}, "Model is up to date")
+        else:
+            self.report({'INFO'}, f"Model built: {stats['results']['qc']}")
+        return {'FINISHED'}
+    
+    def cancel(self, context):
+        if self._waiter:
+            self._waiter.release()
+        context.workspace.status_text_set(None)
+        if self._graph:
+            self._graph.cancel()
+
+
 # Registration
 CLASSES = [
     VONSTUDIOMDL_OT_run_definebones,
+    VONSTUDIOMDL_OT_compile_batch,
+    VONSTUDIOMDL_OT_build_model,
 ]
 
 
@@ -3,14 +3,16 @@ Operators for VTF batch conversion functionality.
 """
 import bpy  # type: ignore
 
-from ..core.vtf_conversion import batch_convert, batch_convert_files
+from ..core.vtf_conversion import batch_convert, batch_convert_files, is_native_conversion
 from ..utils.threading_utils import (
     run_in_background,
     get_task_result,
     is_task_finished,
+    cancel_task,
     cleanup_task,
     TaskStatus,
 )
+from ..utils.task_events import TaskWaiter
 
 
 class VONVTF_OT_batch_convert(bpy.types.Operator):
@@ -20,7 +22,7 @@ class VONVTF_OT_batch_convert(bpy.types.Operator):
     bl_options = {'REGISTER'}
     
     # Modal state
-    _timer = None
+    _waiter = None
     _task_id = None
     
     @classmethod
@@ -36,6 +38,10 @@ class VONVTF_OT_batch_convert(bpy.types.Operator):
         if not img_converter.string_outputFolder:
             return False
         
+        # VTF to PNG/TGA is decoded in-process
+        if is_native_conversion(img_converter.enum_sourceFiletype, img_converter.enum_targetFiletype):
+            return True
+        
         # Check VTFCmd is available
         bundled_vtfcmd = get_vtfcmd_path()
         if bundled_vtfcmd is not None:
@@ -64,30 +70,41 @@ class VONVTF_OT_batch_convert(bpy.types.Operator):
             img_converter.string_inputFolder,
             img_converter.string_outputFolder,
             img_converter.enum_sourceFiletype,
-            img_converter.enum_targetFiletype
+            img_converter.enum_targetFiletype,
+            max_workers=img_converter.int_maxWorkers,
+            incremental=img_converter.bool_incremental
         )
         
-        # Set up modal timer
+        # Wake up when the task reports progress or finishes
         wm = context.window_manager
-        self._timer = wm.event_timer_add(0.1, window=context.window)
+        self._waiter = TaskWaiter(context, self._task_id, progress=True)
         wm.modal_handler_add(self)
         
         self.report({'INFO'}, "Batch conversion started in background...")
         return {'RUNNING_MODAL'}
     
     def modal(self, context, event):
-        """Check task completion."""
-        if event.type == 'TIMER':
+        """Check task completion and show progress; Esc cancels the task."""
+        if event.type == 'ESC' and event.value == 'PRESS':
+            cancel_task(self._task_id)
+            return {'RUNNING_MODAL'}
+        
+        if event.type == 'TIMER' and self._waiter.consume():
             if is_task_finished(self._task_id):
                 return self._finish(context)
+            
+            result = get_task_result(self._task_id)
+            if result is not None:
+                context.workspace.status_text_set(
+                    f"Converting: {result.progress:.0%} {result.message} (Esc to cancel)"
+                )
         
         return {'PASS_THROUGH'}
     
     def _finish(self, context):
         """Handle task completion."""
-        # Remove timer
-        wm = context.window_manager
-        wm.event_timer_remove(self._timer)
+        self._waiter.release()
+        context.workspace.status_text_set(None)
         
         # Get result
         result = get_task_result(self._task_id)
@@ -114,23 +131,32 @@ class VONVTF_OT_batch_convert(bpy.types.Operator):
         
         success = task_result['success']
         failed = task_result['failed']
+        skipped = task_result.get('skipped', 0)
         
-        if success > 0 or failed > 0:
+        if success > 0 or failed > 0 or skipped > 0:
             self.report(
                 {'INFO'},
-                f"Conversion complete. Success: {success}, Failed: {failed}"
+                f"Conversion complete. Success: {success}, Failed: {failed}, Up to date: {skipped}"
             )
         else:
             self.report({'WARNING'}, "No files were converted")
         
+        stale = task_result.get('stale', [])
+        if stale:
+            self.report(
+                {'WARNING'},
+                f"{len(stale)} output file(s) have no source file anymore (see console)"
+            )
+        
         return {'FINISHED'}
     
     def cancel(self, context):
         """Handle operator cancellation."""
-        if self._timer:
-            wm = context.window_manager
-            wm.event_timer_remove(self._timer)
+        if self._waiter:
+            self._waiter.release()
+        context.workspace.status_text_set(None)
         if self._task_id:
+            cancel_task(self._task_id)
             cleanup_task(self._task_id)
 
 
@@ -5,7 +5,7 @@ This module contains all properties displayed in the Image Filetype Converter pa
 Used for batch converting between image formats (PNG, JPG, TGA, VTF, etc.).
 """
 import bpy  # type: ignore
-from bpy.props import StringProperty, EnumProperty
+from bpy.props import StringProperty, EnumProperty, IntProperty, BoolProperty
 
 
 # ============================================================================
@@ -87,6 +87,20 @@ class ImageConverterSettings(bpy.types.PropertyGroup):
         items=populate_target_filetypes,
         default=0
     )  # type: ignore
+    
+    int_maxWorkers: IntProperty(
+        name="Parallel Conversions",
+        description="Number of files converted at the same time (0 = one per CPU core)",
+        default=0,
+        min=0,
+        soft_max=32
+    )  # type: ignore
+    
+    bool_incremental: BoolProperty(
+        name="Skip Unchanged Files",
+        description="Only convert files whose content or target format changed since the last run",
+        default=True
+    )  # type: ignore
 
 
 # ============================================================================
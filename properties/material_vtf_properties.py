@@ -199,6 +199,19 @@ class VMT_PathSettings(PropertyGroup):
 # Scene Properties Registration
 # ============================================================================
 
+# Resampling filters shared by VTFCmd (-rfilter/-mfilter) and the built-in encoder
+VTF_FILTER_ITEMS = [
+    ('POINT', "Point", "Nearest pixel, sharp edges"),
+    ('BOX', "Box", "Average of covered pixels"),
+    ('TRIANGLE', "Triangle", "Smooth interpolation filter"),
+    ('CUBIC', "Cubic", "Soft cubic B-spline"),
+    ('CATROM', "Catmull-Rom", "Sharp cubic filter"),
+    ('MITCHELL', "Mitchell", "Balanced cubic filter"),
+    ('GAUSSIAN', "Gaussian", "Soft Gaussian filter"),
+    ('KAISER', "Kaiser", "Kaiser windowed sinc, sharpest detail"),
+]
+
+
 def register_scene_properties():
     """Register custom scene properties for material VTF conversion."""
     
@@ -242,6 +255,32 @@ def register_scene_properties():
     )
 
     # Enum properties
+    bpy.types.Scene.von_vtf_encoder = EnumProperty(
+        name="Encoder",
+        description="Tool used to encode VTF files",
+        items=[
+            ('NATIVE', "Built-in", "Encode VTF files inside Blender (no VTFCmd required)"),
+            ('VTFCMD', "VTFCmd", "Encode VTF files with VTFCmd.exe")
+        ],
+        default='NATIVE'
+    )
+
+    bpy.types.Scene.von_vtf_incremental = BoolProperty(
+        name="Skip Unchanged Textures",
+        description="Only re-encode textures whose image or VTF settings changed since the last run",
+        default=True
+    )
+
+    bpy.types.Scene.von_vtf_quality = EnumProperty(
+        name="Compression Quality",
+        description="DXT compression quality of the built-in encoder",
+        items=[
+            ('FAST', "Fast", "Range fit: fastest, good for previews and iteration"),
+            ('HIGH', "High", "Cluster fit: slower, lower error on gradients and smooth colors")
+        ],
+        default='FAST'
+    )
+
     bpy.types.Scene.von_vtf_clamp_size = EnumProperty(
         name="Clamp Size",
         description="Maximum texture dimensions for VTF",
@@ -310,12 +349,17 @@ def register_scene_properties():
     bpy.types.Scene.von_vtf_resize_filter = EnumProperty(
         name="Resize Filter",
         description="Filter algorithm for image resizing",
-        items=[
-            ('TRIANGLE', "Triangle", "Smooth interpolation filter")
-        ],
+        items=VTF_FILTER_ITEMS,
         default='TRIANGLE'
     )
 
+    bpy.types.Scene.von_vtf_mip_filter = EnumProperty(
+        name="Mipmap Filter",
+        description="Filter algorithm for mipmap generation",
+        items=VTF_FILTER_ITEMS,
+        default='BOX'
+    )
+
     bpy.types.Scene.von_vmt_shader = EnumProperty(
         name="VMT Shader",
         description="Source Engine shader type for VMT files",
@@ -336,7 +380,8 @@ def unregister_scene_properties():
         'von_vtf_resize_filter', 'von_vtf_resize_method', 'von_vtf_version',
         'von_vtf_alpha_format', 'von_vtf_format', 'von_vmt_generate_bool',
         'von_vmt_shader', 'von_vmt_param_additive', 'von_vmt_param_translucent',
-        'von_vmt_param_nocull'
+        'von_vmt_param_nocull', 'von_vtf_encoder', 'von_vtf_quality',
+        'von_vtf_mip_filter', 'von_vtf_incremental'
     ]
     
     for prop_name in properties_to_remove:
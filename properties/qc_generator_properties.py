@@ -4,14 +4,15 @@ Properties for QC Generator panel.
 This module contains all properties displayed in the QC Generator panel
 and its sub-panels (Bodygroups, Materials, Animations, Advanced).
 """
-import json
 import bpy  # type: ignore
 from bpy.props import (
-    StringProperty, BoolProperty, IntProperty,
+    StringProperty, BoolProperty, IntProperty, FloatProperty,
     EnumProperty, CollectionProperty
 )
 from pathlib import Path
 
+from ..utils.file_utils import CachedJsonLoader
+
 
 # ============================================================================
 # Surface Property Helpers
@@ -24,62 +25,59 @@ def _get_bundled_surfaceprops_path():
     return addon_root / "storeditems" / "qcgenerator" / "templates" / "surfaceprops.json"
 
 
-def _load_surfaceprops_data(custom_path=""):
-    """Load surface properties data from JSON file."""
-    # Try custom path first
-    if custom_path:
-        custom = Path(custom_path)
-        if custom.is_file():
-            try:
-                with custom.open("r", encoding="utf-8") as f:
-                    return json.load(f)
-            except Exception:
-                pass
-    
-    # Fall back to bundled
-    bundled = _get_bundled_surfaceprops_path()
-    if bundled.is_file():
-        try:
-            with bundled.open("r", encoding="utf-8") as f:
-                return json.load(f)
-        except Exception:
-            pass
-    
-    return None
+# Parsed surfaceprops.json and its enum items, shared by all redraws
+_surfaceprops_loader = CachedJsonLoader(_get_bundled_surfaceprops_path)
 
+_SURFACEPROP_FILE_MISSING_ITEMS = [("NONE", "None", "No surface properties file found")]
+_SURFACEPROP_NO_CATEGORIES_ITEMS = [("NONE", "None", "No categories found")]
+_SURFACEPROP_SELECT_CATEGORY_ITEMS = [("NONE", "None", "Select a category first")]
+_SURFACEPROP_EMPTY_CATEGORY_ITEMS = [("NONE", "None", "No items in category")]
 
-def surfaceprop_category_items_callback(self, context):
-    """Get surface property categories from JSON file."""
-    custom_path = getattr(self, "string_surfacepropfilelocation", "")
-    data = _load_surfaceprops_data(custom_path)
-    
-    if not data:
-        return [("NONE", "None", "No surface properties file found")]
-    
+
+def _build_surfaceprop_category_items(data):
+    """Build the surface property category items."""
     items = [
         (cat, cat.replace("_", " "), f"Select surfaceprop category: {cat}")
         for cat in data.keys()
     ]
-    return items if items else [("NONE", "None", "No categories found")]
+    return items if items else _SURFACEPROP_NO_CATEGORIES_ITEMS
 
 
-def surfaceprop_item_items_callback(self, context):
-    """Get surface property items for the selected category."""
-    custom_path = getattr(self, "string_surfacepropfilelocation", "")
-    data = _load_surfaceprops_data(custom_path)
-    
-    if not data:
-        return [("NONE", "None", "No surface properties file found")]
-    
-    cat = getattr(self, "enum_surfaceprop_category", None)
+def _build_surfaceprop_items(data, cat):
+    """Build the surface property items of one category."""
     if not cat or cat == "NONE" or cat not in data:
-        return [("NONE", "None", "Select a category first")]
+        return _SURFACEPROP_SELECT_CATEGORY_ITEMS
     
     items = [
         (key, val[0], val[1])
         for key, val in data[cat].items()
     ]
-    return items if items else [("NONE", "None", "No items in category")]
+    return items if items else _SURFACEPROP_EMPTY_CATEGORY_ITEMS
+
+
+def surfaceprop_category_items_callback(self, context):
+    """Get surface property categories from JSON file."""
+    custom_path = getattr(self, "string_surfacepropfilelocation", "")
+    
+    return _surfaceprops_loader.get_items(
+        custom_path,
+        'categories',
+        _build_surfaceprop_category_items,
+        _SURFACEPROP_FILE_MISSING_ITEMS
+    )
+
+
+def surfaceprop_item_items_callback(self, context):
+    """Get surface property items for the selected category."""
+    custom_path = getattr(self, "string_surfacepropfilelocation", "")
+    cat = getattr(self, "enum_surfaceprop_category", None)
+    
+    return _surfaceprops_loader.get_items(
+        custom_path,
+        ('items', cat),
+        lambda data: _build_surfaceprop_items(data, cat),
+        _SURFACEPROP_FILE_MISSING_ITEMS
+    )
 
 
 # ============================================================================
@@ -310,6 +308,65 @@ class QCGeneratorSettings(bpy.types.PropertyGroup):
         default="",
     )  # type: ignore
     
+    int_collisionMaxHulls: IntProperty(
+        name="Max Convex Pieces",
+        description="Maximum number of convex hulls the collision model is split into",
+        default=8,
+        min=1,
+        max=64
+    )  # type: ignore
+    
+    int_collisionPieceCount: IntProperty(
+        name="Collision Pieces",
+        description="Number of convex pieces written by the last collision decomposition "
+                    "($concave is only added for more than one)",
+        default=0,
+        min=0
+    )  # type: ignore
+    
+    bool_compileIncremental: BoolProperty(
+        name="Incremental",
+        description="Skip QC files whose inputs (QC, includes, SMD/DMX files) are unchanged "
+                    "since their last successful compile",
+        default=True
+    )  # type: ignore
+    
+    float_collisionConcavity: FloatProperty(
+        name="Concavity Tolerance",
+        description="Largest allowed gap between the mesh and its convex pieces, "
+                    "as a fraction of the model size",
+        default=0.02,
+        min=0.001,
+        max=0.5,
+        precision=3
+    )  # type: ignore
+    
+    int_collisionMaxHullVertices: IntProperty(
+        name="Max Hull Vertices",
+        description="Maximum number of vertices in each convex piece",
+        default=64,
+        min=4,
+        max=256
+    )  # type: ignore
+    
+    enum_collisionShapeType: EnumProperty(
+        name="Bone Collision Shape",
+        description="Shape created for each bone by Generate Bone Collision",
+        items=[
+            ('AABB', "Box", "Axis-aligned bounding box"),
+            ('OBB', "Oriented Box", "Smallest box rotated to fit the bone's vertices"),
+            ('HULL', "Convex Hull", "Convex hull of the bone's vertices"),
+        ],
+        default='AABB'
+    )  # type: ignore
+    
+    bool_collisionMerge: BoolProperty(
+        name="Merge Bone Collision",
+        description="Create one multi-part collision object per mesh, skinned to the armature, "
+                    "instead of one object per bone",
+        default=False
+    )  # type: ignore
+    
     # ----- Surface Property Settings -----
     string_surfacepropFileLocation: StringProperty(
         name="SurfaceProp File Location",
@@ -381,6 +438,21 @@ class QCGeneratorSettings(bpy.types.PropertyGroup):
         description="Print studiomdl output to console",
         default=False
     )  # type: ignore
+    
+    string_compileFolder: StringProperty(
+        name="Compile Folder",
+        description="Folder searched for QC files to compile (empty uses the QC output folder)",
+        default="",
+        subtype='DIR_PATH',
+    )  # type: ignore
+    
+    int_compileJobs: IntProperty(
+        name="Parallel Compiles",
+        description="Number of studiomdl processes run at once (0 uses one per CPU core)",
+        default=0,
+        min=0,
+        max=64
+    )  # type: ignore
 
 
 # ============================================================================
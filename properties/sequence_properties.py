@@ -3,7 +3,6 @@ Properties for animation sequence data.
 
 Used by the QC Generator for managing animation sequences.
 """
-import json
 import bpy  # type: ignore
 from bpy.props import (
     StringProperty, BoolProperty, EnumProperty,
@@ -12,6 +11,7 @@ from bpy.props import (
 from pathlib import Path
 
 from ..data.constants import MODEL_TYPE_CATEGORY_MAP, NONE_ENUM
+from ..utils.file_utils import CachedJsonLoader
 
 
 # ============================================================================
@@ -25,28 +25,11 @@ def _get_bundled_activities_path():
     return addon_root / "storeditems" / "qcgenerator" / "templates" / "activities.json"
 
 
-def _load_activities_data(custom_path=""):
-    """Load activities data from JSON file."""
-    # Try custom path first
-    if custom_path:
-        custom = Path(custom_path)
-        if custom.is_file():
-            try:
-                with custom.open("r", encoding="utf-8") as f:
-                    return json.load(f)
-            except Exception:
-                pass
-    
-    # Fall back to bundled
-    bundled = _get_bundled_activities_path()
-    if bundled.is_file():
-        try:
-            with bundled.open("r", encoding="utf-8") as f:
-                return json.load(f)
-        except Exception:
-            pass
-    
-    return None
+# Parsed activities.json and its enum items, shared by all sequence rows
+_activities_loader = CachedJsonLoader(_get_bundled_activities_path)
+
+_ACTIVITY_NONE_ITEMS = [("NONE", "None", "Do not replace any activity")]
+_ACTIVITY_CATEGORY_NONE_ITEMS = [("NONE", "None", "No activity category")]
 
 
 def _get_model_type(context):
@@ -69,40 +52,21 @@ def _get_activity_file_path(context):
     return ''
 
 
-def activity_item_items(self, context):
-    """Generate activity items based on selected category."""
-    none_enum = ("NONE", "None", "Do not replace any activity")
-    
-    custom_path = _get_activity_file_path(context)
-    activities_data = _load_activities_data(custom_path)
-    
-    if not activities_data:
-        return [none_enum]
-    
-    cat = self.enum_activity_category
-    
+def _build_activity_items(activities_data, cat):
+    """Build the activity items of one category."""
     if cat == "NONE" or cat not in activities_data:
-        return [none_enum]
+        return _ACTIVITY_NONE_ITEMS
     
     items = [
         (key, val[0], val[1])
         for key, val in activities_data[cat].items()
     ]
     
-    return [none_enum] + items if items else [none_enum]
+    return _ACTIVITY_NONE_ITEMS + items if items else _ACTIVITY_NONE_ITEMS
 
 
-def activity_category_items(self, context):
-    """Generate activity category items based on model type."""
-    none_enum = ("NONE", "None", "No activity category")
-    
-    custom_path = _get_activity_file_path(context)
-    activities_data = _load_activities_data(custom_path)
-    
-    if not activities_data:
-        return [none_enum]
-    
-    model_type = _get_model_type(context)
+def _build_activity_category_items(activities_data, model_type):
+    """Build the activity category items allowed for a model type."""
     allowed = MODEL_TYPE_CATEGORY_MAP.get(model_type, [])
     
     items = [
@@ -111,7 +75,33 @@ def activity_category_items(self, context):
         if cat in allowed
     ]
     
-    return [none_enum] + items if items else [none_enum]
+    return _ACTIVITY_CATEGORY_NONE_ITEMS + items if items else _ACTIVITY_CATEGORY_NONE_ITEMS
+
+
+def activity_item_items(self, context):
+    """Generate activity items based on selected category."""
+    custom_path = _get_activity_file_path(context)
+    cat = self.enum_activity_category
+    
+    return _activities_loader.get_items(
+        custom_path,
+        ('items', cat),
+        lambda data: _build_activity_items(data, cat),
+        _ACTIVITY_NONE_ITEMS
+    )
+
+
+def activity_category_items(self, context):
+    """Generate activity category items based on model type."""
+    custom_path = _get_activity_file_path(context)
+    model_type = _get_model_type(context)
+    
+    return _activities_loader.get_items(
+        custom_path,
+        ('categories', model_type),
+        lambda data: _build_activity_category_items(data, model_type),
+        _ACTIVITY_CATEGORY_NONE_ITEMS
+    )
 
 
 # ============================================================================
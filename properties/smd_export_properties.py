@@ -4,7 +4,7 @@ Properties for Batch SMD Export panel.
 This module contains all properties displayed in the Batch SMD Export panel.
 """
 import bpy  # type: ignore
-from bpy.props import StringProperty
+from bpy.props import StringProperty, BoolProperty, EnumProperty
 
 
 # ============================================================================
@@ -24,6 +24,23 @@ class SMDExportSettings(bpy.types.PropertyGroup):
         default="//",
         subtype='DIR_PATH'
     )  # type: ignore
+    
+    bool_nativeExport: BoolProperty(
+        name="Built-in Exporter",
+        description="Write SMD files with the built-in exporter instead of Blender Source Tools "
+                    "(no dialog, collections are left untouched)",
+        default=True
+    )  # type: ignore
+    
+    enum_exportGrouping: EnumProperty(
+        name="Export Grouping",
+        description="How visible meshes are grouped into SMD files by the built-in exporter",
+        items=[
+            ('OBJECT', "Per Object", "One SMD file per mesh object"),
+            ('COLLECTION', "Per Collection", "One SMD file per collection"),
+        ],
+        default='OBJECT'
+    )  # type: ignore
 
 
 # ============================================================================
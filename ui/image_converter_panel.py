@@ -46,6 +46,9 @@ class VON_PT_image_converter(bpy.types.Panel):
         row.prop(img_converter, "enum_sourceFiletype", text="Source Filetype")
         row.prop(img_converter, "enum_targetFiletype", text="Target Filetype")
         
+        layout.prop(img_converter, "int_maxWorkers")
+        layout.prop(img_converter, "bool_incremental")
+        
         layout.operator("von.batchconvertfiletypes", text="Run Conversion")
 
 
@@ -47,7 +47,17 @@ class VON_PT_qc_generator_main(bpy.types.Panel):
         
         col.prop(qc_settings, "bool_generateCollision", text="Auto-Generate Collision")
         
-        if not should_gen_collis:
+        if should_gen_collis:
+            col.prop(qc_settings, "int_collisionMaxHulls", text="Max Pieces")
+            col.prop(qc_settings, "float_collisionConcavity", text="Concavity")
+            col.prop(qc_settings, "int_collisionMaxHullVertices", text="Hull Vertices")
+            col.operator("von.qcgenerator_convex_collision", icon='MESH_ICOSPHERE')
+            
+            col.separator()
+            col.prop(qc_settings, "enum_collisionShapeType", text="Bone Shape")
+            col.prop(qc_settings, "bool_collisionMerge", text="Merge Into One Object")
+            col.operator("von.qcgenerator_bone_collision", icon='BONE_DATA')
+        else:
             col.prop(qc_settings, "string_existingCollisionCollection", text="Collision Collection")
         
         # Surface prop box
@@ -173,6 +183,8 @@ class VON_PT_qc_animations(bpy.types.Panel):
                         row = col.row(align=True)
                         row.prop(seq, "enum_activity_category", text="")
                         row.prop(seq, "enum_activity", text="")
+            
+            layout.operator("von.export_sequences", icon='EXPORT')
         else:
             layout.label(text="No sequences collected", icon='INFO')
 
@@ -223,6 +235,15 @@ class VON_PT_qc_advanced(bpy.types.Panel):
         
         box.prop(qc_settings, "string_gmodExePath", text="GMod Path")
         box.prop(qc_settings, "bool_studiomdlVerbose", text="Verbose Output")
+        
+        # Batch compile
+        box = layout.box()
+        box.label(text="Compile:", icon='MOD_BUILD')
+        box.prop(qc_settings, "string_compileFolder", text="QC Folder")
+        box.prop(qc_settings, "int_compileJobs", text="Parallel")
+        box.prop(qc_settings, "bool_compileIncremental")
+        box.operator("von.compile_qc_batch", icon='PLAY')
+        box.operator("von.build_model", icon='EXPORT')
 
 
 # ============================================================================
@@ -23,14 +23,19 @@ class VON_PT_smd_export(bpy.types.Panel):
         smd_export = scene.von_smd_export
         layout = self.layout
         
-        layout.label(text="Collections:")
-        layout.operator("object.split_objects", icon='OUTLINER_OB_GROUP_INSTANCE')
-        layout.operator("object.restore_objects", icon='FILE_REFRESH')
-        
-        layout.separator()
+        # Split/restore is only needed for the Blender Source Tools exporter
+        if not smd_export.bool_nativeExport:
+            layout.label(text="Collections:")
+            layout.operator("object.split_objects", icon='OUTLINER_OB_GROUP_INSTANCE')
+            layout.operator("object.restore_objects", icon='FILE_REFRESH')
+            
+            layout.separator()
         
         layout.label(text="Export:")
         layout.prop(smd_export, "string_exportFolder", text="Folder")
+        layout.prop(smd_export, "bool_nativeExport")
+        if smd_export.bool_nativeExport:
+            layout.prop(smd_export, "enum_exportGrouping", text="Files")
         layout.operator("object.export_smd", icon='EXPORT')
 
 
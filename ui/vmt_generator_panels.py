@@ -65,19 +65,22 @@ class VON_PT_vmt_generator(bpy.types.Panel):
         
         col = box.column(align=True)
         
-        # VTFCmd path with status indicator
-        from ..data.paths import get_vtfcmd_path
-        bundled_vtfcmd = get_vtfcmd_path()
+        col.prop(scene, "von_vtf_encoder", text="Encoder")
         
-        if bundled_vtfcmd is not None:
-            row = col.row()
-            row.label(text="VTFCmd:", icon='CHECKMARK')
-            row.label(text="Found (bundled)")
-        else:
-            col.label(text="VTFCmd Path (not bundled):")
-            col.prop(scene.von_vtfcmd_path, "path", text="")
-            if not scene.von_vtfcmd_path.path:
-                col.label(text="Place VTFCmd.exe in addon's tools/vtfcmd/ folder", icon='INFO')
+        # VTFCmd path with status indicator
+        if scene.von_vtf_encoder == 'VTFCMD':
+            from ..data.paths import get_vtfcmd_path
+            bundled_vtfcmd = get_vtfcmd_path()
+            
+            if bundled_vtfcmd is not None:
+                row = col.row()
+                row.label(text="VTFCmd:", icon='CHECKMARK')
+                row.label(text="Found (bundled)")
+            else:
+                col.label(text="VTFCmd Path (not bundled):")
+                col.prop(scene.von_vtfcmd_path, "path", text="")
+                if not scene.von_vtfcmd_path.path:
+                    col.label(text="Place VTFCmd.exe in addon's tools/vtfcmd/ folder", icon='INFO')
         
         col.separator()
         col.label(text="Material Output Path:")
@@ -96,6 +99,12 @@ class VON_PT_vmt_generator(bpy.types.Panel):
         
         col.prop(scene, "von_vtf_version", text="Version")
         
+        if scene.von_vtf_encoder == 'NATIVE':
+            col.prop(scene, "von_vtf_quality", text="Quality")
+        
+        col.prop(scene, "von_vtf_mip_filter", text="Mipmap Filter")
+        col.prop(scene, "von_vtf_incremental")
+        
         # Resize settings
         col.separator()
         col.prop(scene, "von_vtf_resize_bool", text="Enable Resize")
@@ -15,17 +15,35 @@ from .file_utils import (
     load_json_data,
     get_addon_directory,
     get_data_directory,
+    CachedJsonLoader,
 )
 from .threading_utils import (
     TaskStatus,
     TaskResult,
     BackgroundTask,
     TaskManager,
+    TaskGraph,
+    GraphNode,
+    TaskToken,
+    TaskCancelled,
     task_manager,
     run_in_background,
+    run_in_process,
     get_task_result,
+    get_task_future,
     is_task_finished,
+    cancel_task,
     cleanup_task,
+    run_subprocess,
+    create_process_pool,
+    create_thread_pool,
+    POOL_THREAD,
+    POOL_PROCESS,
+)
+from .task_events import (
+    TaskWaiter,
+    subscribe,
+    unsubscribe,
 )
 
 __all__ = [
@@ -42,14 +60,31 @@ __all__ = [
     'load_json_data',
     'get_addon_directory',
     'get_data_directory',
+    'CachedJsonLoader',
     # Threading utilities
     'TaskStatus',
     'TaskResult',
     'BackgroundTask',
     'TaskManager',
+    'TaskGraph',
+    'GraphNode',
+    'TaskToken',
+    'TaskCancelled',
     'task_manager',
     'run_in_background',
+    'run_in_process',
     'get_task_result',
+    'get_task_future',
     'is_task_finished',
+    'cancel_task',
     'cleanup_task',
+    'run_subprocess',
+    'create_process_pool',
+    'create_thread_pool',
+    'POOL_THREAD',
+    'POOL_PROCESS',
+    # Task events
+    'TaskWaiter',
+    'subscribe',
+    'unsubscribe',
 ]
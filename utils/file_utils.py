@@ -2,7 +2,9 @@
 File I/O and path utilities.
 """
 import json
+import time
 from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, List, Optional
 
 def load_json_data(relative_path: str, filename: str) -> dict:
     """
@@ -33,4 +35,112 @@ def get_addon_directory() -> Path:
 
 def get_data_directory() -> Path:
     """Get the addon's data storage directory."""
-    return get_addon_directory() / "storeditems"
\ No newline at end of file
+    return get_addon_directory() / "storeditems"
+
+
+class CachedJsonLoader:
+    """
+    Cached loader for JSON data files used by enum item callbacks.
+    
+    Blender calls enum item callbacks on every redraw, once per row that
+    shows the property. This loader parses each file once and re-parses it
+    only when its modification time or size changes; files are re-checked
+    at most every check_interval seconds. Item lists built from the data
+    are memoized per key until the file changes, which also keeps their
+    strings referenced as Blender requires for dynamic enum items.
+    
+    A custom path is used when it points to a readable JSON file,
+    otherwise the loader falls back to the default path.
+    """
+    
+    def __init__(self, default_path_getter: Callable[[], Path], check_interval: float = 1.0):
+        """
+        Args:
+            default_path_getter: Callable returning the bundled file path
+            check_interval: Minimum seconds between file modification checks
+        """
+        self._default_path_getter = default_path_getter
+        self._check_interval = check_interval
+        self._entries: Dict[str, dict] = {}
+    
+    def _get_entry(self, path: Path) -> dict:
+        """Get the cache entry for a path, reloading the file if it changed."""
+        key = str(path)
+        entry = self._entries.get(key)
+        now = time.monotonic()
+        
+        if entry is not None and now - entry['checked'] < self._check_interval:
+            return entry
+        
+        try:
+            stat = path.stat()
+            signature = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            signature = None
+        
+        if entry is None or entry['signature'] != signature:
+            data = None
+            if signature is not None:
+                try:
+                    with path.open("r", encoding="utf-8") as f:
+                        data = json.load(f)
+                except (OSError, ValueError):
+                    data = None
+            entry = {'signature': signature, 'data': data, 'items': {}}
+            self._entries[key] = entry
+        
+        entry['checked'] = now
+        return entry
+    
+    def _resolve_entry(self, custom_path: str = "") -> dict:
+        """Get the entry of the custom file if it loads, else the default file."""
+        if custom_path:
+            entry = self._get_entry(Path(custom_path))
+            if entry['data'] is not None:
+                return entry
+        return self._get_entry(self._default_path_getter())
+    
+    def load(self, custom_path: str = "") -> Optional[Any]:
+        """
+        Get the parsed JSON data.
+        
+        Args:
+            custom_path: Optional user-provided file path
+        
+        Returns:
+            Parsed data, or None if no file could be loaded
+        """
+        return self._resolve_entry(custom_path)['data']
+    
+    def get_items(
+        self,
+        custom_path: str,
+        key: Hashable,
+        builder: Callable[[Any], List[tuple]],
+        fallback: List[tuple]
+    ) -> List[tuple]:
+        """
+        Get a memoized enum item list built from the JSON data.
+        
+        Args:
+            custom_path: Optional user-provided file path
+            key: Identifies the item list (e.g. the selected category)
+            builder: Builds the item list from the parsed data
+            fallback: Items returned when no file could be loaded
+        
+        Returns:
+            list: Enum items, the same list object until the file changes
+        """
+        entry = self._resolve_entry(custom_path)
+        if entry['data'] is None:
+            return fallback
+        
+        items = entry['items'].get(key)
+        if items is None:
+            items = builder(entry['data'])
+            entry['items'][key] = items
+        return items
+    
+    def clear(self):
+        """Drop all cached data."""
+        self._entries.clear()
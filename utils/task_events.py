@@ -0,0 +1,170 @@
+"""
+Main-thread delivery of background task events.
+
+Workers post the IDs of finished tasks to the task manager's event
+queue. A single shared bpy.app.timers callback drains that queue and
+calls the subscribed callbacks on Blender's main thread, where it is
+safe to touch bpy data.
+
+The timer only runs while something is subscribed. It checks quickly
+right after a task starts or finishes and backs off while nothing
+happens, so idle work costs a few wakeups per second no matter how many
+tasks are running.
+"""
+import traceback
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+import bpy  # type: ignore
+
+from .threading_utils import task_manager, get_task_result
+
+
+MIN_INTERVAL = 0.05
+MAX_INTERVAL = 1.0
+BACKOFF = 1.5
+
+# Subscribers that show progress are checked at least this often
+PROGRESS_INTERVAL = 0.25
+
+
+@dataclass
+class _Subscription:
+    callback: Callable[[str], None]
+    progress: bool = False
+    last_progress: Optional[tuple] = None
+
+
+_subscriptions: Dict[str, List[_Subscription]] = {}
+_interval = MIN_INTERVAL
+
+
+def _notify(key: str, subscription: _Subscription) -> None:
+    # An exception escaping a timer callback unregisters the timer
+    try:
+        subscription.callback(key)
+    except Exception:
+        traceback.print_exc()
+
+
+def _dispatch() -> Optional[float]:
+    """Timer callback: deliver posted events and progress changes."""
+    global _interval
+
+    keys = task_manager.drain_events()
+    for key in keys:
+        for subscription in list(_subscriptions.get(key, ())):
+            _notify(key, subscription)
+
+    watching_progress = False
+    for key, subscriptions in list(_subscriptions.items()):
+        for subscription in subscriptions:
+            if not subscription.progress:
+                continue
+            watching_progress = True
+            result = get_task_result(key)
+            state = (result.progress, result.message) if result is not None else None
+            if state != subscription.last_progress:
+                subscription.last_progress = state
+                _notify(key, subscription)
+
+    if not _subscriptions:
+        _interval = MIN_INTERVAL
+        return None
+
+    _interval = MIN_INTERVAL if keys else min(_interval * BACKOFF, MAX_INTERVAL)
+    if watching_progress:
+        return min(_interval, PROGRESS_INTERVAL)
+    return _interval
+
+
+def _wake_dispatcher() -> None:
+    """Start the timer, or bring a backed-off timer forward."""
+    global _interval
+
+    _interval = MIN_INTERVAL
+    if bpy.app.timers.is_registered(_dispatch):
+        bpy.app.timers.unregister(_dispatch)
+    bpy.app.timers.register(_dispatch, first_interval=MIN_INTERVAL)
+
+
+def subscribe(key: str, callback: Callable[[str], None], progress: bool = False) -> None:
+    """
+    Call a function on the main thread when a task finishes.
+
+    The callback stays subscribed until unsubscribe() is called.
+
+    Args:
+        key: Task ID, or a key posted with task_manager.post_event()
+        callback: Called with the key on each event
+        progress: Also call the callback when the task's progress or
+            message changes
+    """
+    _subscriptions.setdefault(key, []).append(_Subscription(callback, progress))
+    task_manager.announce_completion(key)
+    _wake_dispatcher()
+
+
+def unsubscribe(key: str, callback: Callable[[str], None]) -> None:
+    """Remove a callback added with subscribe()."""
+    subscriptions = [
+        subscription for subscription in _subscriptions.get(key, ())
+        if subscription.callback != callback
+    ]
+    if subscriptions:
+        _subscriptions[key] = subscriptions
+    else:
+        _subscriptions.pop(key, None)
+
+
+def shutdown() -> None:
+    """Drop all subscriptions and stop the timer (e.g. when the addon is disabled)."""
+    _subscriptions.clear()
+    if bpy.app.timers.is_registered(_dispatch):
+        bpy.app.timers.unregister(_dispatch)
+
+
+class TaskWaiter:
+    """
+    Wakes a modal operator when its task has news.
+
+    Replaces a polling event timer: on each event a one-shot TIMER event
+    is sent to the operator's window. The operator checks consume() on
+    TIMER events and release()s the waiter when it finishes or is
+    cancelled.
+    """
+
+    def __init__(self, context, key: str, progress: bool = False):
+        """
+        Args:
+            context: Operator context
+            key: Task ID or event key to wait on
+            progress: Also wake on progress changes
+        """
+        self.key = key
+        self._window_manager = context.window_manager
+        self._window = context.window
+        self._timer = None
+        subscribe(key, self._on_event, progress=progress)
+
+    def _on_event(self, key: str) -> None:
+        if self._timer is None:
+            self._timer = self._window_manager.event_timer_add(0.0, window=self._window)
+
+    def consume(self) -> bool:
+        """
+        Acknowledge a wakeup.
+
+        Returns:
+            bool: True if an event arrived since the last call
+        """
+        if self._timer is None:
+            return False
+        self._window_manager.event_timer_remove(self._timer)
+        self._timer = None
+        return True
+
+    def release(self) -> None:
+        """Stop waiting."""
+        self.consume()
+        unsubscribe(self.key, self._on_event)
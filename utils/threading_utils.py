@@ -2,11 +2,27 @@
 Threading utilities for long-running operations.
 
 This module provides utilities to run operations in background threads
-while keeping Blender responsive. Uses modal operators with timers
-to check for completion.
+while keeping Blender responsive. Finished tasks are announced on an
+event queue that the main thread drains (see utils.task_events), so
+operators wait for completion without polling every task.
+
+Tasks run on shared, bounded executor pools: a thread pool for I/O and
+subprocess work and a process pool for CPU-bound encoders. Tasks beyond
+a pool's limit wait in its queue, so the addon never starts more
+workers than the machine can run.
+
+Task functions on the thread pool that have a ``token`` parameter are
+passed the task's TaskToken, through which they report progress and
+notice cancellation.
 """
+import inspect
+import multiprocessing
+import os
+import subprocess
 import threading
+import time
 import queue
+from concurrent.futures import BrokenExecutor, Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass, field
 from typing import Any, Callable, Optional, List, Dict
 from enum import Enum
@@ -31,61 +47,357 @@ class TaskResult:
     message: str = ""
 
 
+# ============================================================================
+# Process Pools
+# ============================================================================
+
+# Run in each worker before anything is unpickled. Registering the addon's
+# packages as bare namespace modules lets workers import the pure
+# Python/NumPy modules (e.g. core.anim_bake) without running the package
+# __init__ files, which import bpy and only work inside Blender.
+_WORKER_BOOTSTRAP = """
+import sys, types
+for _name, _path in {packages!r}:
+    if _name not in sys.modules:
+        _module = types.ModuleType(_name)
+        _module.__path__ = [_path] if _path else []
+        sys.modules[_name] = _module
+"""
+
+
+def _addon_packages() -> list:
+    """Get (name, path) of the addon package, its parents and subpackages."""
+    addon_package = __package__.rsplit('.', 1)[0]
+    addon_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    
+    parts = addon_package.split('.')
+    packages = [('.'.join(parts[:i]), '') for i in range(1, len(parts))]
+    packages.append((addon_package, addon_dir))
+    for sub in ('core', 'utils', 'data'):
+        packages.append((f"{addon_package}.{sub}", os.path.join(addon_dir, sub)))
+    return packages
+
+
+def create_process_pool(max_workers: Optional[int] = None) -> ProcessPoolExecutor:
+    """
+    Create a process pool that can run the addon's Blender-free functions.
+    
+    Workers are spawned (not forked from Blender) and can import any
+    module of the addon that does not need bpy. Submitted functions must
+    be module-level functions of such modules, and their arguments must
+    be picklable.
+    
+    Args:
+        max_workers: Number of worker processes (defaults to the CPU count)
+    
+    Returns:
+        ProcessPoolExecutor
+    """
+    return ProcessPoolExecutor(
+        max_workers=max_workers or os.cpu_count() or 1,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=exec,
+        initargs=(_WORKER_BOOTSTRAP.format(packages=_addon_packages()),),
+    )
+
+
+# ============================================================================
+# Progress and Cancellation
+# ============================================================================
+
+class TaskCancelled(Exception):
+    """Raised inside a task function when its task has been cancelled."""
+
+
+class TaskToken:
+    """
+    Progress and cancellation handle shared by a task and its owner.
+    
+    The task function reports progress and checks for cancellation; the
+    owner reads progress and cancels. All methods are thread-safe.
+    Child processes registered with the token are terminated as soon as
+    the task is cancelled.
+    """
+    
+    def __init__(self, min_interval: float = 0.1):
+        """
+        Args:
+            min_interval: Minimum time in seconds between two stored
+                progress updates; more frequent updates are dropped
+        """
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+        self._progress = 0.0
+        self._message = ""
+        self._last_update = 0.0
+        self._processes = set()
+    
+    def report(self, progress: float, message: Optional[str] = None):
+        """
+        Report progress.
+        
+        Cheap enough to call for every item of a large batch: updates
+        arriving within min_interval of the last stored one are dropped,
+        except the final one.
+        
+        Args:
+            progress: Fraction done, from 0.0 to 1.0
+            message: Optional status message
+        """
+        now = time.monotonic()
+        if progress < 1.0 and now - self._last_update < self.min_interval:
+            return
+        with self._lock:
+            self._last_update = now
+            self._progress = min(max(progress, 0.0), 1.0)
+            if message is not None:
+                self._message = message
+    
+    def report_count(self, completed: int, total: int, message: Optional[str] = None):
+        """Report progress as a count of finished items."""
+        self.report(completed / total if total else 1.0, message)
+    
+    @property
+    def progress(self) -> float:
+        with self._lock:
+            return self._progress
+    
+    @property
+    def message(self) -> str:
+        with self._lock:
+            return self._message
+    
+    @property
+    def is_cancelled(self) -> bool:
+        return self._cancelled.is_set()
+    
+    def check(self):
+        """
+        Stop the task if it has been cancelled.
+        
+        Raises:
+            TaskCancelled: If cancel() has been called
+        """
+        if self._cancelled.is_set():
+            raise TaskCancelled("Task cancelled")
+    
+    def cancel(self):
+        """Request cancellation and terminate registered child processes."""
+        with self._lock:
+            self._cancelled.set()
+            processes = list(self._processes)
+        for process in processes:
+            _terminate(process)
+    
+    def register_process(self, process: subprocess.Popen):
+        """
+        Terminate a child process when the task is cancelled.
+        
+        A process registered after cancellation is terminated right away.
+        """
+        with self._lock:
+            self._processes.add(process)
+            cancelled = self._cancelled.is_set()
+        if cancelled:
+            _terminate(process)
+    
+    def unregister_process(self, process: subprocess.Popen):
+        """Stop tracking a child process that has exited."""
+        with self._lock:
+            self._processes.discard(process)
+
+
+def _terminate(process: subprocess.Popen):
+    """Terminate a child process, ignoring processes that already exited."""
+    try:
+        process.kill()
+    except OSError:
+        pass
+
+
+def run_subprocess(
+    command: List[str],
+    token: Optional[TaskToken] = None,
+    **kwargs
+) -> subprocess.CompletedProcess:
+    """
+    Run a command and capture its output, like subprocess.run.
+    
+    The process is killed as soon as the token is cancelled.
+    
+    Args:
+        command: Command arguments
+        token: Optional token of the calling task
+        **kwargs: Additional subprocess.Popen arguments
+    
+    Returns:
+        subprocess.CompletedProcess with text stdout and stderr
+    
+    Raises:
+        OSError: If the command cannot be started
+        TaskCancelled: If the token was cancelled
+    """
+    if token is not None:
+        token.check()
+    
+    with subprocess.Popen(
+        command,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        **kwargs
+    ) as process:
+        if token is not None:
+            token.register_process(process)
+        try:
+            stdout, stderr = process.communicate()
+        finally:
+            if token is not None:
+                token.unregister_process(process)
+    
+    if token is not None:
+        token.check()
+    return subprocess.CompletedProcess(command, process.returncode, stdout, stderr)
+
+
+def _accepts_parameter(func: Callable, name: str) -> bool:
+    """Check whether a task function has a parameter with the given name."""
+    try:
+        return name in inspect.signature(func).parameters
+    except (TypeError, ValueError):
+        return False
+
+
+def _accepts_token(func: Callable) -> bool:
+    """Check whether a task function has a 'token' parameter."""
+    return _accepts_parameter(func, 'token')
+
+
+# ============================================================================
+# Background Tasks
+# ============================================================================
+
+# Names of the task manager's built-in pools
+POOL_THREAD = "thread"
+POOL_PROCESS = "process"
+
+
+def get_default_pool_limit(pool: str) -> int:
+    """
+    Get the default concurrency limit of a built-in pool.
+    
+    Args:
+        pool: POOL_THREAD or POOL_PROCESS
+    
+    Returns:
+        int: One worker per CPU core for processes; threads mostly wait on
+        I/O and subprocesses, so the thread pool gets a few more
+    """
+    cpu_count = os.cpu_count() or 1
+    if pool == POOL_PROCESS:
+        return cpu_count
+    return min(32, cpu_count + 4)
+
+
+def create_thread_pool(max_workers: Optional[int] = None) -> ThreadPoolExecutor:
+    """
+    Create a thread pool for background tasks.
+    
+    Args:
+        max_workers: Number of worker threads
+            (defaults to get_default_pool_limit(POOL_THREAD))
+    
+    Returns:
+        ThreadPoolExecutor
+    """
+    return ThreadPoolExecutor(
+        max_workers=max_workers or get_default_pool_limit(POOL_THREAD),
+        thread_name_prefix="VonSourceTools",
+    )
+
+
 @dataclass
 class BackgroundTask:
-    """A task to be executed in a background thread."""
+    """A task to be executed on an executor pool."""
     func: Callable
     args: tuple = field(default_factory=tuple)
     kwargs: dict = field(default_factory=dict)
+    token: TaskToken = field(default_factory=TaskToken)
     _result: TaskResult = field(default_factory=lambda: TaskResult(TaskStatus.PENDING))
-    _thread: Optional[threading.Thread] = None
+    _future: Optional[Future] = None
     _cancelled: bool = False
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
     
-    def start(self):
-        """Start the task in a background thread."""
-        self._result = TaskResult(TaskStatus.RUNNING, message="Starting...")
-        self._thread = threading.Thread(target=self._run, daemon=True)
-        self._thread.start()
+    def start(self, executor: Executor):
+        """
+        Submit the task to an executor.
+        
+        The task stays PENDING while it waits in the executor's queue.
+        The token is passed to functions that accept it, unless the
+        executor runs tasks in other processes.
+        
+        Raises:
+            BrokenExecutor: If the executor can no longer run tasks
+        """
+        kwargs = self.kwargs
+        if not isinstance(executor, ProcessPoolExecutor) and _accepts_token(self.func):
+            kwargs = dict(kwargs, token=self.token)
+        
+        self._result = TaskResult(TaskStatus.PENDING, message="Queued...")
+        self._future = executor.submit(self.func, *self.args, **kwargs)
+        self._future.add_done_callback(self._on_done)
     
-    def _run(self):
-        """Execute the task function."""
-        try:
-            if self._cancelled:
-                self._result = TaskResult(TaskStatus.CANCELLED, message="Task cancelled")
-                return
-            
-            result = self.func(*self.args, **self.kwargs)
-            
-            if self._cancelled:
-                self._result = TaskResult(TaskStatus.CANCELLED, message="Task cancelled")
-                return
-            
-            self._result = TaskResult(
+    def _on_done(self, future: Future):
+        """Record the outcome of the task's future."""
+        if (future.cancelled() or self._cancelled or
+                isinstance(future.exception(), TaskCancelled)):
+            result = TaskResult(TaskStatus.CANCELLED, message="Task cancelled")
+        elif future.exception() is not None:
+            error = future.exception()
+            result = TaskResult(
+                TaskStatus.FAILED,
+                error=str(error),
+                message=f"Failed: {str(error)}"
+            )
+        else:
+            result = TaskResult(
                 TaskStatus.COMPLETED,
-                result=result,
+                result=future.result(),
                 progress=1.0,
                 message="Completed successfully"
             )
-        except Exception as e:
-            self._result = TaskResult(
-                TaskStatus.FAILED,
-                error=str(e),
-                message=f"Failed: {str(e)}"
-            )
+        
+        with self._lock:
+            self._result = result
     
     def cancel(self):
-        """Request cancellation of the task."""
+        """
+        Request cancellation of the task.
+        
+        Queued tasks never start; running tasks stop at their next token
+        check, and their registered child processes are terminated.
+        """
         self._cancelled = True
+        self.token.cancel()
+        if self._future is not None:
+            self._future.cancel()
+    
+    @property
+    def future(self) -> Optional[Future]:
+        """Get the Future of the task's result."""
+        return self._future
     
     @property
     def is_running(self) -> bool:
-        """Check if the task is still running."""
-        return self._thread is not None and self._thread.is_alive()
+        """Check if the task is still queued or running."""
+        return self._future is not None and not self._future.done()
     
     @property
     def is_finished(self) -> bool:
         """Check if the task has finished (success, failure, or cancelled)."""
-        return self._result.status in (
+        return self.result.status in (
             TaskStatus.COMPLETED, 
             TaskStatus.FAILED, 
             TaskStatus.CANCELLED
@@ -94,14 +406,26 @@ class BackgroundTask:
     @property
     def result(self) -> TaskResult:
         """Get the current result/status of the task."""
-        return self._result
+        with self._lock:
+            if (self._result.status == TaskStatus.PENDING and
+                    self._future is not None and self._future.running()):
+                self._result = TaskResult(TaskStatus.RUNNING, message="Running...")
+            if self._result.status == TaskStatus.RUNNING:
+                return TaskResult(
+                    TaskStatus.RUNNING,
+                    progress=self.token.progress,
+                    message=self.token.message or self._result.message
+                )
+            return self._result
 
 
 class TaskManager:
     """
-    Manages background tasks.
+    Manages background tasks and the executor pools they run on.
     
     Singleton instance to track all running tasks across the addon.
+    Pools are created on first use; besides the built-in thread and
+    process pools, other executors can be plugged in with register_pool().
     """
     _instance = None
     
@@ -110,13 +434,126 @@ class TaskManager:
             cls._instance = super().__new__(cls)
             cls._instance._tasks = {}
             cls._instance._task_counter = 0
+            cls._instance._lock = threading.Lock()
+            cls._instance._pools = {}
+            cls._instance._pool_factories = {
+                POOL_THREAD: create_thread_pool,
+                POOL_PROCESS: create_process_pool,
+            }
+            cls._instance._pool_limits = {
+                POOL_THREAD: get_default_pool_limit(POOL_THREAD),
+                POOL_PROCESS: get_default_pool_limit(POOL_PROCESS),
+            }
+            cls._instance._events = queue.SimpleQueue()
+            cls._instance._announced = set()
         return cls._instance
     
+    def register_pool(
+        self,
+        name: str,
+        factory: Callable[[int], Executor],
+        max_workers: int
+    ):
+        """
+        Add or replace an executor pool.
+        
+        Args:
+            name: Pool name used with create_task_in_pool()
+            factory: Callable creating the executor as factory(max_workers)
+            max_workers: Concurrency limit of the pool
+        """
+        with self._lock:
+            self._pool_factories[name] = factory
+            self._pool_limits[name] = max(1, max_workers)
+            old_pool = self._pools.pop(name, None)
+        if old_pool is not None:
+            old_pool.shutdown(wait=False)
+    
+    def set_pool_limit(self, name: str, max_workers: int):
+        """
+        Change the concurrency limit of a pool.
+        
+        Tasks already submitted finish on the old executor; new tasks use
+        a new one.
+        
+        Args:
+            name: Pool name
+            max_workers: New concurrency limit
+        """
+        self.register_pool(name, self._pool_factories[name], max_workers)
+    
+    def get_pool_limit(self, name: str) -> int:
+        """Get the concurrency limit of a pool."""
+        return self._pool_limits[name]
+    
+    def get_pool(self, name: str = POOL_THREAD) -> Executor:
+        """
+        Get a pool's executor, creating it on first use.
+        
+        Args:
+            name: Pool name
+        
+        Returns:
+            Executor
+        """
+        with self._lock:
+            pool = self._pools.get(name)
+            if pool is None:
+                pool = self._pool_factories[name](self._pool_limits[name])
+                self._pools[name] = pool
+            return pool
+    
+    def reset_pool(self, name: str, pool: Optional[Executor] = None):
+        """
+        Discard a broken pool so the next use creates a fresh one.
+        
+        Args:
+            name: Pool name
+            pool: The executor found broken; nothing is done if the pool
+                has already been replaced since
+        """
+        with self._lock:
+            current = self._pools.get(name)
+            if current is None or (pool is not None and current is not pool):
+                return
+            del self._pools[name]
+        current.shutdown(wait=False)
+    
+    def reset_executor(self, pool: Executor):
+        """
+        Discard a broken executor if it is one of the manager's pools.
+        
+        For code that was handed a pool (e.g. by get_pool()) without its name.
+        """
+        with self._lock:
+            names = [name for name, current in self._pools.items() if current is pool]
+        for name in names:
+            self.reset_pool(name, pool)
+    
     def create_task(self, func: Callable, *args, **kwargs) -> str:
         """
-        Create and start a new background task.
+        Create and start a new background task on the thread pool.
+        
+        Args:
+            func: Function to execute
+            *args: Positional arguments for the function
+            **kwargs: Keyword arguments for the function
+            
+        Returns:
+            Task ID string
+        """
+        return self.create_task_in_pool(POOL_THREAD, func, *args, **kwargs)
+    
+    def create_task_in_pool(self, pool: str, func: Callable, *args, **kwargs) -> str:
+        """
+        Create and start a new background task on a given pool.
+        
+        For the process pool, func must be a module-level function of a
+        module that does not import bpy, and all arguments and the
+        return value must be picklable.
         
         Args:
+            pool: Pool name (POOL_THREAD, POOL_PROCESS or a registered pool)
             func: Function to execute
             *args: Positional arguments for the function
             **kwargs: Keyword arguments for the function
@@ -124,23 +561,79 @@ class TaskManager:
         Returns:
             Task ID string
         """
-        self._task_counter += 1
-        task_id = f"task_{self._task_counter}"
+        with self._lock:
+            self._task_counter += 1
+            task_id = f"task_{self._task_counter}"
         
         task = BackgroundTask(func=func, args=args, kwargs=kwargs)
-        self._tasks[task_id] = task
-        task.start()
+        executor = self.get_pool(pool)
+        try:
+            task.start(executor)
+        except BrokenExecutor:
+            # A crashed worker process breaks the whole pool; start over once
+            self.reset_pool(pool, executor)
+            task.start(self.get_pool(pool))
+        
+        with self._lock:
+            self._tasks[task_id] = task
+        task.future.add_done_callback(lambda _: self._on_task_done(task_id))
         
         return task_id
     
+    def _on_task_done(self, task_id: str):
+        """Post the completion of a task that someone is waiting for."""
+        with self._lock:
+            if task_id not in self._announced:
+                return
+            self._announced.discard(task_id)
+        self._events.put(task_id)
+    
+    def announce_completion(self, task_id: str):
+        """
+        Post an event with the task's ID once the task finishes.
+        
+        Tasks that have already finished are announced right away.
+        Unknown IDs are ignored.
+        """
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if task is None:
+                return
+            if not task.is_finished:
+                self._announced.add(task_id)
+                return
+        self._events.put(task_id)
+    
+    def post_event(self, key: str):
+        """
+        Post an event from any thread.
+        
+        Used by work that is not a single task (e.g. a compile queue) to
+        wake whoever waits on it.
+        """
+        self._events.put(key)
+    
+    def drain_events(self) -> List[str]:
+        """Take all posted events; each key appears at most once."""
+        keys = []
+        while True:
+            try:
+                key = self._events.get_nowait()
+            except queue.Empty:
+                break
+            if key not in keys:
+                keys.append(key)
+        return keys
+    
     def get_task(self, task_id: str) -> Optional[BackgroundTask]:
         """Get a task by ID."""
         return self._tasks.get(task_id)
     
     def remove_task(self, task_id: str):
         """Remove a completed task from tracking."""
-        if task_id in self._tasks:
-            del self._tasks[task_id]
+        with self._lock:
+            self._tasks.pop(task_id, None)
+            self._announced.discard(task_id)
     
     def cancel_task(self, task_id: str):
         """Cancel a running task."""
@@ -149,17 +642,28 @@ class TaskManager:
             task.cancel()
     
     def get_all_running(self) -> List[str]:
-        """Get IDs of all running tasks."""
-        return [
-            task_id for task_id, task in self._tasks.items()
-            if task.is_running
-        ]
+        """Get IDs of all queued and running tasks."""
+        with self._lock:
+            tasks = list(self._tasks.items())
+        return [task_id for task_id, task in tasks if task.is_running]
+    
+    def shutdown(self):
+        """Cancel queued tasks and release all pools (e.g. when the addon is disabled)."""
+        with self._lock:
+            pools = list(self._pools.values())
+            self._pools.clear()
+        for pool in pools:
+            pool.shutdown(wait=False, cancel_futures=True)
 
 
 # Global task manager instance
 task_manager = TaskManager()
 
 
+# ============================================================================
+# Task Functions
+# ============================================================================
+
 def run_in_background(func: Callable, *args, **kwargs) -> str:
     """
     Convenience function to run a function in the background.
@@ -175,6 +679,40 @@ def run_in_background(func: Callable, *args, **kwargs) -> str:
     return task_manager.create_task(func, *args, **kwargs)
 
 
+def run_in_process(func: Callable, *args, **kwargs) -> str:
+    """
+    Run a CPU-bound function on the shared process pool.
+    
+    func must be a module-level function of a module that does not import
+    bpy; arguments and the return value must be picklable.
+    
+    Args:
+        func: Function to execute
+        *args: Positional arguments
+        **kwargs: Keyword arguments
+        
+    Returns:
+        Task ID for tracking
+    """
+    return task_manager.create_task_in_pool(POOL_PROCESS, func, *args, **kwargs)
+
+
+def get_task_future(task_id: str) -> Optional[Future]:
+    """
+    Get the Future of a background task's result.
+    
+    Args:
+        task_id: Task ID returned from run_in_background or run_in_process
+        
+    Returns:
+        Future or None if task not found
+    """
+    task = task_manager.get_task(task_id)
+    if task:
+        return task.future
+    return None
+
+
 def get_task_result(task_id: str) -> Optional[TaskResult]:
     """
     Get the result of a background task.
@@ -199,6 +737,286 @@ def is_task_finished(task_id: str) -> bool:
     return True  # Non-existent task is considered finished
 
 
+def cancel_task(task_id: str):
+    """Cancel a background task (see BackgroundTask.cancel)."""
+    task_manager.cancel_task(task_id)
+
+
 def cleanup_task(task_id: str):
     """Remove a finished task from tracking."""
     task_manager.remove_task(task_id)
+
+
+# ============================================================================
+# Task Graphs
+# ============================================================================
+
+@dataclass
+class GraphNode:
+    """One task of a TaskGraph."""
+    name: str
+    func: Callable
+    args: tuple = field(default_factory=tuple)
+    kwargs: dict = field(default_factory=dict)
+    depends_on: tuple = field(default_factory=tuple)
+    pool: str = POOL_THREAD
+    status: TaskStatus = TaskStatus.PENDING
+    task_id: Optional[str] = None
+    result: Any = None
+    error: Optional[str] = None
+    elapsed: float = 0.0
+    _started: float = 0.0
+    
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED)
+
+
+class TaskGraph:
+    """
+    Runs tasks in dependency order on the task manager's pools.
+    
+    A node is submitted as soon as every node it depends on has completed,
+    so independent branches (e.g. texture encoding and a model compile)
+    run at the same time. Node functions with an ``inputs`` parameter are
+    passed the results of their dependencies as {name: result}, so
+    intermediate results stay in memory. When a node fails or is
+    cancelled, the nodes that depend on it are cancelled; other branches
+    keep running.
+    """
+    
+    def __init__(self, event_key: Optional[str] = None):
+        """
+        Args:
+            event_key: Optional key posted with task_manager.post_event()
+                whenever a node finishes (see utils.task_events)
+        """
+        self.event_key = event_key
+        self._nodes: Dict[str, GraphNode] = {}
+        self._lock = threading.Lock()
+        self._finished = threading.Condition()
+        self._started = False
+        self._cancelled = False
+    
+    @property
+    def nodes(self) -> List[GraphNode]:
+        """All nodes, in the order they were added."""
+        with self._lock:
+            return list(self._nodes.values())
+    
+    def add(
+        self,
+        name: str,
+        func: Callable,
+        *args,
+        depends_on=(),
+        pool: str = POOL_THREAD,
+        **kwargs
+    ) -> str:
+        """
+        Add a task to the graph.
+        
+        Dependencies must be added first, which keeps the graph acyclic.
+        
+        Args:
+            name: Unique node name, also the key of its result in the
+                inputs of dependent nodes
+            func: Task function
+            *args: Positional arguments
+            depends_on: Names of nodes that must complete first
+            pool: Name of the pool the task runs on
+            **kwargs: Keyword arguments
+        
+        Returns:
+            The node name
+        
+        Raises:
+            ValueError: If the name is taken or a dependency is unknown
+            RuntimeError: If the graph has already been started
+        """
+        depends_on = (depends_on,) if isinstance(depends_on, str) else tuple(depends_on)
+        with self._lock:
+            if self._started:
+                raise RuntimeError("Cannot add nodes to a started task graph")
+            if name in self._nodes:
+                raise ValueError(f"Task graph already has a node named '{name}'")
+            unknown = [dependency for dependency in depends_on if dependency not in self._nodes]
+            if unknown:
+                raise ValueError(f"Node '{name}' depends on unknown nodes: {', '.join(unknown)}")
+            self._nodes[name] = GraphNode(
+                name=name,
+                func=func,
+                args=args,
+                kwargs=kwargs,
+                depends_on=depends_on,
+                pool=pool,
+            )
+        return name
+    
+    def start(self):
+        """
+        Submit every node without dependencies; the rest follow as their
+        dependencies complete. Never blocks.
+        
+        Raises:
+            RuntimeError: If the graph has already been started
+        """
+        with self._lock:
+            if self._started:
+                raise RuntimeError("Task graph has already been started")
+            self._started = True
+            ready = [node for node in self._nodes.values() if not node.depends_on]
+            for node in ready:
+                node.status = TaskStatus.RUNNING
+        
+        for node in ready:
+            self._submit(node)
+        self._notify()
+    
+    def _submit(self, node: GraphNode):
+        """Hand a node whose dependencies have completed to its pool."""
+        kwargs = node.kwargs
+        if _accepts_parameter(node.func, 'inputs'):
+            with self._lock:
+                inputs = {name: self._nodes[name].result for name in node.depends_on}
+            kwargs = dict(kwargs, inputs=inputs)
+        
+        node._started = time.perf_counter()
+        try:
+            node.task_id = task_manager.create_task_in_pool(node.pool, node.func, *node.args, **kwargs)
+        except Exception as e:
+            # Unknown pool, or the pools have been shut down
+            self._node_done(node, TaskResult(TaskStatus.FAILED, error=str(e)))
+            return
+        
+        task = task_manager.get_task(node.task_id)
+        task.future.add_done_callback(lambda _: self._node_done(node, task.result))
+    
+    def _node_done(self, node: GraphNode, result: TaskResult):
+        """Record a finished node and submit the nodes it unblocked."""
+        ready = []
+        with self._lock:
+            node.status = result.status
+            node.result = result.result
+            node.error = result.error
+            node.elapsed = time.perf_counter() - node._started
+            
+            # Nodes are stored in dependency order, so one pass settles
+            # chains of dependents
+            for other in self._nodes.values():
+                if other.status is not TaskStatus.PENDING:
+                    continue
+                statuses = [self._nodes[name].status for name in other.depends_on]
+                if self._cancelled or any(
+                        status in (TaskStatus.FAILED, TaskStatus.CANCELLED) for status in statuses):
+                    other.status = TaskStatus.CANCELLED
+                    other.error = "A dependency did not complete"
+                elif all(status is TaskStatus.COMPLETED for status in statuses):
+                    other.status = TaskStatus.RUNNING
+                    ready.append(other)
+        
+        if node.task_id is not None:
+            task_manager.remove_task(node.task_id)
+        for other in ready:
+            self._submit(other)
+        self._notify()
+    
+    def _notify(self):
+        """Wake waiters and event subscribers."""
+        with self._finished:
+            self._finished.notify_all()
+        if self.event_key is not None:
+            task_manager.post_event(self.event_key)
+    
+    def cancel(self):
+        """
+        Cancel every node that has not finished.
+        
+        Pending nodes never start; running nodes are cancelled like any
+        other task (see BackgroundTask.cancel).
+        """
+        with self._lock:
+            self._cancelled = True
+            running = []
+            for node in self._nodes.values():
+                if node.status is TaskStatus.PENDING:
+                    node.status = TaskStatus.CANCELLED
+                elif node.status is TaskStatus.RUNNING and node.task_id is not None:
+                    running.append(node.task_id)
+        
+        for task_id in running:
+            task_manager.cancel_task(task_id)
+        self._notify()
+    
+    @property
+    def is_finished(self) -> bool:
+        """Check if every node has finished."""
+        return all(node.is_finished for node in self.nodes)
+    
+    @property
+    def progress(self) -> float:
+        """Fraction of nodes that have finished (0.0 to 1.0)."""
+        nodes = self.nodes
+        if not nodes:
+            return 1.0
+        return sum(node.is_finished for node in nodes) / len(nodes)
+    
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until every node has finished.
+        
+        Args:
+            timeout: Maximum time to wait in seconds (None waits forever)
+        
+        Returns:
+            bool: True if all nodes finished, False on timeout
+        """
+        with self._finished:
+            return self._finished.wait_for(lambda: self.is_finished, timeout)
+    
+    def run(self, token: Optional[TaskToken] = None) -> dict:
+        """
+        Start the graph and wait for it.
+        
+        Args:
+            token: Optional task token; the graph's progress is reported
+                to it and cancelling it cancels the graph
+        
+        Returns:
+            dict: See summary()
+        
+        Raises:
+            TaskCancelled: If the token was cancelled
+        """
+        self.start()
+        while not self.wait(timeout=0.1):
+            if token is not None:
+                token.report(self.progress)
+                if token.is_cancelled:
+                    self.cancel()
+                    self.wait()
+                    token.check()
+        return self.summary()
+    
+    def summary(self) -> dict:
+        """
+        Summarize the graph's nodes.
+        
+        Returns:
+            dict with 'success', 'failed', 'cancelled', 'pending' and
+            'total' counts, 'results' mapping each completed node to its
+            result, 'errors' mapping each failed node to its error
+            message and 'timings' mapping each finished node to its run
+            time in seconds
+        """
+        nodes = self.nodes
+        return {
+            'success': sum(node.status is TaskStatus.COMPLETED for node in nodes),
+            'failed': sum(node.status is TaskStatus.FAILED for node in nodes),
+            'cancelled': sum(node.status is TaskStatus.CANCELLED for node in nodes),
+            'pending': sum(not node.is_finished for node in nodes),
+            'total': len(nodes),
+            'results': {node.name: node.result for node in nodes if node.status is TaskStatus.COMPLETED},
+            'errors': {node.name: node.error for node in nodes if node.status is TaskStatus.FAILED},
+            'timings': {node.name: node.elapsed for node in nodes if node.task_id is not None and node.is_finished},
+        }